@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Agregados de Movimientos - Herramientas de Escritorio
+Resúmenes por grupo, concepto y tercero calculados en PostgreSQL.
+
+En lugar de traer cada movimiento a un DataFrame y agrupar en pandas, una sola
+consulta con GROUPING SETS devuelve los totales por grupo, por concepto/grupo,
+por tercero y el total general. Solo los resúmenes cruzan la red.
+
+Los resultados se guardan en caché por firma de filtros (LRU con vencimiento),
+de modo que alternar entre filtros ya consultados no vuelve a la base de datos.
+
+Uso:
+    from agregados_movimientos import obtener_resumen
+
+    resumen = obtener_resumen(date(2025, 1, 1), date(2025, 1, 31), signo='neg')
+    resumen['kpis']['total'], resumen['por_grupo'], resumen['por_concepto'], ...
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from conexion_bd import obtener_conexion
+
+# Grupo de Traslados entre cuentas propias
+GRUPO_TRASLADOS = 47
+
+# Pares (GrupoID, ConceptoID) de compras que se excluyen del análisis
+COMPRAS_EXCLUIDAS = [(4, 20), (149, 26), (199, 27)]
+
+# Caché de resúmenes por firma de filtros
+CAPACIDAD_CACHE = 32
+SEGUNDOS_VIGENCIA = 120
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _construir_consulta(fecha_inicio, fecha_fin, cuenta_id, tercero_id, grupo_id, concepto_id,
+                        excluir_traslados, excluir_compras, signo):
+    query = """
+        WITH base AS (
+            SELECT
+                m.Valor AS valor,
+                CASE WHEN g.grupoid IS NOT NULL THEN CAST(g.grupoid AS TEXT) || ' - ' || g.grupo ELSE 'Sin Grupo' END AS grupo,
+                CASE WHEN c.conceptoid IS NOT NULL THEN CAST(c.conceptoid AS TEXT) || ' - ' || c.concepto ELSE 'Sin Concepto' END AS concepto,
+                CASE WHEN t.terceroid IS NOT NULL THEN CAST(t.terceroid AS TEXT) || ' - ' || t.tercero ELSE 'Sin Tercero' END AS tercero
+            FROM movimientos m
+            LEFT JOIN grupos g ON m.GrupoID = g.grupoid
+            LEFT JOIN conceptos c ON m.ConceptoID = c.conceptoid
+            LEFT JOIN terceros t ON m.TerceroID = t.terceroid
+            WHERE m.Fecha BETWEEN %s AND %s
+    """
+    params = [fecha_inicio, fecha_fin]
+
+    if cuenta_id:
+        query += " AND m.CuentaID = %s"
+        params.append(cuenta_id)
+
+    if tercero_id:
+        query += " AND m.TerceroID = %s"
+        params.append(tercero_id)
+
+    if grupo_id:
+        query += " AND m.GrupoID = %s"
+        params.append(grupo_id)
+
+    if concepto_id:
+        query += " AND m.ConceptoID = %s"
+        params.append(concepto_id)
+
+    # Filtro de Traslados
+    if excluir_traslados:
+        query += " AND (m.GrupoID <> %s OR m.GrupoID IS NULL)"
+        params.append(GRUPO_TRASLADOS)
+
+    # Filtro de Compras Especificas
+    if excluir_compras:
+        condiciones = " OR ".join(["(m.GrupoID = %s AND m.ConceptoID = %s)"] * len(COMPRAS_EXCLUIDAS))
+        query += f" AND NOT ({condiciones})"
+        for gid, cid in COMPRAS_EXCLUIDAS:
+            params.extend([gid, cid])
+
+    # Filtro Signo
+    if signo == 'pos':
+        query += " AND m.Valor > 0"
+    elif signo == 'neg':
+        query += " AND m.Valor < 0"
+
+    query += """
+        )
+        SELECT
+            GROUPING(grupo) AS g_grupo,
+            GROUPING(concepto) AS g_concepto,
+            GROUPING(tercero) AS g_tercero,
+            grupo, concepto, tercero,
+            COALESCE(SUM(valor), 0) AS total,
+            COUNT(*) AS conteo,
+            COALESCE(SUM(valor) FILTER (WHERE valor > 0), 0) AS ingresos,
+            COALESCE(-SUM(valor) FILTER (WHERE valor < 0), 0) AS gastos
+        FROM base
+        GROUP BY GROUPING SETS ((grupo), (concepto, grupo), (tercero), ())
+    """
+    return query, params
+
+
+def _consultar_resumen(fecha_inicio, fecha_fin, cuenta_id, tercero_id, grupo_id, concepto_id,
+                       excluir_traslados, excluir_compras, signo):
+    query, params = _construir_consulta(
+        fecha_inicio, fecha_fin, cuenta_id, tercero_id, grupo_id, concepto_id,
+        excluir_traslados, excluir_compras, signo
+    )
+
+    conn = obtener_conexion()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        filas = cursor.fetchall()
+        cursor.close()
+    finally:
+        conn.close()
+
+    resumen = {
+        'kpis': {'total': 0.0, 'conteo': 0, 'n_grupos': 0},
+        'por_grupo': [],      # (grupo, total, conteo, ingresos, gastos)
+        'por_concepto': [],   # (concepto, grupo, total, conteo, ingresos, gastos)
+        'por_tercero': [],    # (tercero, total, conteo, ingresos, gastos)
+    }
+
+    for g_grupo, g_concepto, g_tercero, grupo, concepto, tercero, total, conteo, ingresos, gastos in filas:
+        total, ingresos, gastos = float(total), float(ingresos), float(gastos)
+        if g_grupo and g_concepto and g_tercero:
+            resumen['kpis']['total'] = total
+            resumen['kpis']['conteo'] = conteo
+        elif not g_concepto:
+            resumen['por_concepto'].append((concepto, grupo, total, conteo, ingresos, gastos))
+        elif not g_grupo:
+            resumen['por_grupo'].append((grupo, total, conteo, ingresos, gastos))
+        else:
+            resumen['por_tercero'].append((tercero, total, conteo, ingresos, gastos))
+
+    resumen['kpis']['n_grupos'] = len(resumen['por_grupo'])
+    for clave, indice_total in (('por_grupo', 1), ('por_concepto', 2), ('por_tercero', 1)):
+        resumen[clave].sort(key=lambda fila: fila[indice_total], reverse=True)
+
+    return resumen
+
+
+def obtener_resumen(fecha_inicio, fecha_fin, cuenta_id=None, tercero_id=None, grupo_id=None,
+                    concepto_id=None, excluir_traslados=True, excluir_compras=True, signo='todos',
+                    forzar=False):
+    """
+    Retorna los agregados del período filtrado.
+
+    Args:
+        signo: 'todos', 'pos' (solo ingresos) o 'neg' (solo gastos)
+        forzar: Si es True ignora la caché y vuelve a consultar
+
+    Returns:
+        dict con 'kpis', 'por_grupo', 'por_concepto' y 'por_tercero' (ordenados por total desc)
+    """
+    firma = (fecha_inicio, fecha_fin, cuenta_id, tercero_id, grupo_id, concepto_id,
+             bool(excluir_traslados), bool(excluir_compras), signo)
+    ahora = time.monotonic()
+
+    if not forzar:
+        with _cache_lock:
+            guardado = _cache.get(firma)
+            if guardado and ahora - guardado[0] < SEGUNDOS_VIGENCIA:
+                _cache.move_to_end(firma)
+                return guardado[1]
+
+    resumen = _consultar_resumen(*firma)
+
+    with _cache_lock:
+        _cache[firma] = (ahora, resumen)
+        _cache.move_to_end(firma)
+        while len(_cache) > CAPACIDAD_CACHE:
+            _cache.popitem(last=False)
+
+    return resumen
+
+
+def invalidar_cache():
+    """Descarta todos los resúmenes guardados (p.ej. después de modificar movimientos)."""
+    with _cache_lock:
+        _cache.clear()
@@ -11,19 +11,11 @@ Fecha: 2025-12-29
 
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
-import psycopg2
 from datetime import datetime
 from thefuzz import process
 import threading
 
-# Configuración de la base de datos
-DB_CONFIG = {
-    'host': 'localhost',
-    'port': 5433,
-    'user': 'postgres',
-    'password': 'SLB',
-    'database': 'Mvtos'
-}
+from conexion_bd import obtener_conexion
 
 
 class AsignarContactosGUI:
@@ -179,7 +171,7 @@ class AsignarContactosGUI:
         """Ejecuta la carga de datos en background."""
         try:
             # Conectar a la base de datos
-            conn = psycopg2.connect(**DB_CONFIG)
+            conn = obtener_conexion()
             cursor = conn.cursor()
             
             # Cargar descripciones sin contacto
@@ -369,7 +361,7 @@ class AsignarContactosGUI:
             descripcion_movimiento = desc_actual['descripcion']
             
             # Conectar a la base de datos
-            conn = psycopg2.connect(**DB_CONFIG)
+            conn = obtener_conexion()
             cursor = conn.cursor()
             
             # Paso 1: Crear contacto
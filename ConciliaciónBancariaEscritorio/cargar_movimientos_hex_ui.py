@@ -1,11 +1,12 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import psycopg2
 import sys
 import os
 
 sys.path.append(os.getcwd())
 
+from conexion_bd import obtener_conexion
+
 # Importar capas de Hexagonal
 from src.infrastructure.database.postgres_movimiento_repository import PostgresMovimientoRepository
 from src.infrastructure.extractors.bancolombia_adapter import BancolombiaAdapter
@@ -20,9 +21,7 @@ class CargarMovimientosHexagonalGUI:
         self.archivo_path = tk.StringVar()
         
         # Conexión DB
-        self.conn = psycopg2.connect(
-            host='localhost', port='5433', database='Mvtos', user='postgres', password='SLB'
-        )
+        self.conn = obtener_conexion()
         
         # Inicializar Componentes Hexagonales
         self.repo = PostgresMovimientoRepository(self.conn)
@@ -5,37 +5,29 @@ Cargador de Movimientos Bancarios - Interfaz Gráfica
 Permite cargar movimientos bancarios desde archivos PDF, validando duplicados
 contra la base de datos PostgreSQL.
 
+Usa el mismo núcleo de ingesta que la carga web
+(Backend/src/application/services/ingesta_movimientos.py): extractores,
+normalización, detección de duplicados por huella en una consulta e inserción
+del lote en una sola sentencia.
+
 Autor: Antigravity
 Fecha: 2025-12-28
 """
 
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox
-import psycopg2
-from psycopg2 import sql
 from datetime import datetime
-from decimal import Decimal
 import threading
 import os
 import sys
 
-# Importar extractores - agregar directorio padre al path
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from extractores.bancolombia_extractor import (
-    extraer_movimientos_bancolombia,
-    obtener_estadisticas
-)
-from extractores.fondorenta_extractor import extraer_movimientos_fondorenta
-from extractores.creditcard_extractor import extraer_movimientos_credito
+# Importar el núcleo de ingesta del Backend
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'ConciliaciónBancariaWeb', 'Backend'))
+from src.application.services.ingesta_movimientos import IngestaMovimientos, extraer_movimientos
+from src.infrastructure.database.postgres_movimiento_repository import PostgresMovimientoRepository
 
-# Configuración de la base de datos
-DB_CONFIG = {
-    'host': 'localhost',
-    'port': 5433,
-    'user': 'postgres',
-    'password': 'SLB',
-    'database': 'Mvtos'
-}
+from conexion_bd import obtener_conexion
 
 # Funciones auxiliares para detección de patrones
 def detectar_cuota_manejo(descripcion):
@@ -76,36 +68,77 @@ def obtener_contactid_bancolombia(cursor):
         return None
 
 
+def moneda_original(mov):
+    """Moneda del extracto: los movimientos USD se guardan con valor 0 y el monto en usd."""
+    return 'USD' if mov.usd else 'COP'
+
+
+def importe_original(mov):
+    """Importe tal como viene en el extracto (USD o COP)."""
+    return mov.usd if mov.usd else mov.valor
+
+
+def obtener_estadisticas(movimientos):
+    """Total, débitos y créditos de una lista de movimientos."""
+    debitos = sum(1 for m in movimientos if importe_original(m) < 0)
+    return {
+        'total': len(movimientos),
+        'debitos': debitos,
+        'creditos': len(movimientos) - debitos
+    }
+
+
+def aplicar_cuota_manejo(movimientos, contactid_bancolombia):
+    """
+    Las cuotas de manejo se guardan como 'Bancolombia' / 'Cuota de Manejo' con
+    el tercero Bancolombia. Se aplica antes de validar para que la huella de
+    duplicados sea la misma que la de la carga. Retorna cuántas se mapearon.
+    """
+    if not contactid_bancolombia:
+        return 0
+    mapeadas = 0
+    for mov in movimientos:
+        if detectar_cuota_manejo(mov.descripcion):
+            mov.descripcion = 'Bancolombia'
+            mov.referencia = 'Cuota de Manejo'
+            mov.tercero_id = contactid_bancolombia
+            mapeadas += 1
+    return mapeadas
+
+
 # Configuración de cuentas
 CUENTAS_CONFIG = {
     'Ahorros': {
         'account_id': 2,
-        'extractor': extraer_movimientos_bancolombia,
+        'tipo': 'bancolombia_ahorro',
         'file_filter': [("PDF Files", "*.pdf"), ("All Files", "*.*")]
     },
     'Fondorenta': {
         'account_id': 3,
-        'extractor': extraer_movimientos_fondorenta,
+        'tipo': 'fondo_renta',
         'file_filter': [("PDF Files", "*.pdf"), ("All Files", "*.*")]
     },
     'Mc Pesos': {
         'account_id': 4,
-        'extractor': extraer_movimientos_credito,
+        'tipo': 'credit_card',
+        'cuenta_usd_id': 5,
         'file_filter': [("PDF Files", "*.pdf"), ("All Files", "*.*")]
     },
     'Mc Dolaras': {
-        'account_id': 5,
-        'extractor': extraer_movimientos_credito,
+        'account_id': 4,  # El extracto trae ambas monedas: COP -> 4, USD -> 5
+        'tipo': 'credit_card',
+        'cuenta_usd_id': 5,
         'file_filter': [("PDF Files", "*.pdf"), ("All Files", "*.*")]
     },
     'Tarjeta Crédito (Smart)': {
-        'account_id': 4, # Default a Pesos, pero cambiará dinámicamente
-        'extractor': extraer_movimientos_credito,
+        'account_id': 4,
+        'tipo': 'credit_card',
+        'cuenta_usd_id': 5,
         'file_filter': [("PDF Files", "*.pdf"), ("All Files", "*.*")]
     },
     'Protección': {
         'account_id': 7,
-        'extractor': None,  # TODO: implementar
+        'tipo': None,  # TODO: implementar
         'file_filter': [("All Files", "*.*")]
     }
 }
@@ -423,11 +456,11 @@ class CargadorMovimientosGUI:
             var = tk.BooleanVar(value=True)
             check_vars.append((var, mov))
             
-            # Use original value from mov['valor'] and 'moneda'
-            moneda = mov.get('moneda', 'COP')
-            valor = mov['valor']
-            desc = mov['descripcion']
-            fecha = mov['fecha'].strftime('%Y-%m-%d')
+            # Importe y moneda tal como vienen en el extracto
+            moneda = moneda_original(mov)
+            valor = importe_original(mov)
+            desc = mov.descripcion
+            fecha = mov.fecha.strftime('%Y-%m-%d')
             
             chk = ttk.Checkbutton(row_frame, variable=var)
             chk.grid(row=0, column=0, padx=5)
@@ -482,7 +515,7 @@ class CargadorMovimientosGUI:
         cuenta = self.cuenta_seleccionada.get()
         config = CUENTAS_CONFIG[cuenta]
         
-        if config['extractor'] is None:
+        if config['tipo'] is None:
             self.mostrar_mensaje_custom("No Disponible", 
                                   f"El extractor para '{cuenta}' aún no está implementado.", 'warning')
             return
@@ -510,10 +543,14 @@ class CargadorMovimientosGUI:
         try:
             cuenta = self.cuenta_seleccionada.get()
             config = CUENTAS_CONFIG[cuenta]
-            extractor = config['extractor']
             
-            # Extraer movimientos
-            self.movimientos_extraidos = extractor(self.archivo_pdf)
+            # Extraer y normalizar movimientos (sin tocar la BD)
+            raw_movs = extraer_movimientos(self.archivo_pdf, config['tipo'])
+            validos, invalidos = IngestaMovimientos().normalizar(
+                raw_movs, config['account_id'], config.get('cuenta_usd_id'))
+            self.movimientos_extraidos = [mov for _, mov in validos]
+            for raw, error in invalidos:
+                self.agregar_log(f"✗ Movimiento inválido {raw}: {error}", 'error')
             
             if not self.movimientos_extraidos:
                 self.agregar_log("⚠ No se encontraron movimientos en el archivo", 'warning')
@@ -549,61 +586,40 @@ class CargadorMovimientosGUI:
         thread.start()
     
     def _ejecutar_validacion(self):
-        """Ejecuta la validación de duplicados en background."""
+        """Ejecuta la validación de duplicados en background (una sola consulta)."""
+        conn = None
         try:
             # Conectar a la base de datos
-            conn = psycopg2.connect(**DB_CONFIG)
+            conn = obtener_conexion()
             cursor = conn.cursor()
             
             cuenta = self.cuenta_seleccionada.get()
-            cuenta_id = CUENTAS_CONFIG[cuenta]['account_id']
+            tipo = CUENTAS_CONFIG[cuenta]['tipo']
             
-            # Obtener TerceroID de Bancolombia para validación consistente
+            # Aplicar las MISMAS transformaciones que se usan durante la carga
             contactid_bancolombia = obtener_contactid_bancolombia(cursor)
+            cursor.close()
+            aplicar_cuota_manejo(self.movimientos_extraidos, contactid_bancolombia)
+            
+            ingesta = IngestaMovimientos(PostgresMovimientoRepository(conn))
+            existentes = ingesta.marcar_duplicados(self.movimientos_extraidos, tipo)
             
             self.movimientos_nuevos = []
             self.movimientos_duplicados = []
             
-            # Validar cada movimiento
-            for mov in self.movimientos_extraidos:
-                # Aplicar las MISMAS transformaciones que se usan durante la carga
-                es_cuota_manejo = detectar_cuota_manejo(mov['descripcion'])
-                
-                if es_cuota_manejo and contactid_bancolombia:
-                    descripcion_a_buscar = 'Bancolombia'
-                    referencia_a_buscar = 'Cuota de Manejo'
-                else:
-                    descripcion_a_buscar = mov['descripcion'].title()
-                    referencia_a_buscar = mov['referencia'] if mov['referencia'] else ''
-                
-                # Query para buscar duplicados: Fecha + Descripción + Referencia + Valor
-                # Si tenemos moneda, también podríamos validar cuenta, pero por ahora mantengamos simple
-                cursor.execute("""
-                    SELECT COUNT(*) FROM movimientos
-                    WHERE (CuentaID = %s OR CuentaID = %s)
-                      AND Fecha = %s
-                      AND Descripcion = %s
-                      AND Referencia = %s
-                      AND Valor = %s
-                """, (cuenta_id, 5 if cuenta_id == 4 else cuenta_id, mov['fecha'].date(), descripcion_a_buscar, referencia_a_buscar, mov['valor']))
-                
-                count = cursor.fetchone()[0]
-                
-                if count > 0:
+            for mov, es_duplicado in zip(self.movimientos_extraidos, existentes):
+                if es_duplicado:
                     self.movimientos_duplicados.append(mov)
                     # Log detallado del duplicado encontrado (solo primeros 5)
                     if len(self.movimientos_duplicados) <= 5:
                         self.agregar_log(
-                            f"  → Duplicado: {mov['fecha'].strftime('%Y-%m-%d')} | " +
-                            f"{descripcion_a_buscar[:30]} | ${mov['valor']:,.2f}", 
+                            f"  → Duplicado: {mov.fecha.strftime('%Y-%m-%d')} | " +
+                            f"{mov.descripcion[:30]} | ${importe_original(mov):,.2f}", 
                             'warning'
                         )
                 else:
                     self.movimientos_nuevos.append(mov)
             
-            cursor.close()
-            conn.close()
-            
             # Mostrar resultados
             self.mostrar_resultados_validacion()
             
@@ -614,6 +630,9 @@ class CargadorMovimientosGUI:
             self.agregar_log(f"✗ Error al validar duplicados: {e}", 'error')
             import traceback
             traceback.print_exc()
+        finally:
+            if conn:
+                conn.close()
     
     def mostrar_resultados_validacion(self):
         """Muestra los resultados de la validación en el área de validación."""
@@ -638,9 +657,9 @@ class CargadorMovimientosGUI:
             resultado += "\n⚠ MOVIMIENTOS DUPLICADOS (ya existen en la base de datos):\n"
             resultado += "-" * 70 + "\n"
             for i, mov in enumerate(self.movimientos_duplicados[:10], 1):
-                resultado += f"{i}. {mov['fecha'].strftime('%Y-%m-%d')} | "
-                resultado += f"{mov['descripcion'][:35]:<35} | "
-                resultado += f"${mov['valor']:>12,.2f}\n"
+                resultado += f"{i}. {mov.fecha.strftime('%Y-%m-%d')} | "
+                resultado += f"{mov.descripcion[:35]:<35} | "
+                resultado += f"${importe_original(mov):>12,.2f}\n"
             
             if duplicados > 10:
                 resultado += f"\n... y {duplicados - 10} duplicados más.\n"
@@ -668,15 +687,15 @@ class CargadorMovimientosGUI:
             return
         
         # Ordenar movimientos por fecha (más antiguos primero)
-        movimientos_ordenados = sorted(self.movimientos_extraidos, key=lambda x: x['fecha'])
+        movimientos_ordenados = sorted(self.movimientos_extraidos, key=lambda x: x.fecha)
         
         # Mostrar primeros 20 movimientos ordenados
         for mov in movimientos_ordenados[:20]:
             self.preview_tree.insert('', 'end', values=(
-                mov['fecha'].strftime('%Y-%m-%d'),
-                mov['descripcion'][:60],  # Truncar descripción
-                mov['referencia'] if mov['referencia'] else '',
-                f"${mov['valor']:,.2f}"
+                mov.fecha.strftime('%Y-%m-%d'),
+                mov.descripcion[:60],  # Truncar descripción
+                mov.referencia if mov.referencia else '',
+                f"${importe_original(mov):,.2f}"
             ))
         
         if len(movimientos_ordenados) > 20:
@@ -724,159 +743,58 @@ class CargadorMovimientosGUI:
         thread.start()
     
     def _ejecutar_carga(self):
-        """Ejecuta la carga de registros en background."""
+        """
+        Ejecuta la carga de registros en background: un solo INSERT para todo
+        el lote, que omite los que ya existan (misma huella).
+        """
         conn = None
         try:
             # Conectar a la base de datos
-            conn = psycopg2.connect(**DB_CONFIG)
-            cursor = conn.cursor()
+            conn = obtener_conexion()
             
             cuenta = self.cuenta_seleccionada.get()
-            cuenta_id = CUENTAS_CONFIG[cuenta]['account_id']
+            tipo = CUENTAS_CONFIG[cuenta]['tipo']
             
-            # Obtener TerceroID de Bancolombia para cuotas de manejo
-            contactid_bancolombia = obtener_contactid_bancolombia(cursor)
-            if contactid_bancolombia:
-                self.agregar_log(f"✓ TerceroID Bancolombia encontrado: {contactid_bancolombia}", 'success')
-                self.agregar_log("  → Cuotas de manejo se mapearán automáticamente", 'info')
-            else:
-                self.agregar_log("⚠ TerceroID Bancolombia no encontrado. Cuotas de manejo se insertarán sin contacto.", 'warning')
-            
-            # Commit para asegurar que la transacción esté limpia antes de los INSERTs
-            conn.commit()
-            
-            sql_insert = """
-                INSERT INTO movimientos 
-                (Fecha, Descripcion, Referencia, Valor, USD, TRM, 
-                 MonedaID, CuentaID, TerceroID, GrupoID, ConceptoID)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
+            # Las cuotas de manejo ya se mapearon a Bancolombia al validar
+            cuotas_manejo_detectadas = sum(1 for m in self.movimientos_nuevos if m.tercero_id)
             
             total = len(self.movimientos_nuevos)
-            cargados = 0
-            errores = 0
-            cuotas_manejo_detectadas = 0
-            
             self.progress_bar['maximum'] = total
             self.progress_bar['value'] = 0
             
             # Ordenar movimientos por fecha (más antiguos primero)
-            movimientos_ordenados = sorted(self.movimientos_nuevos, key=lambda x: x['fecha'])
-            
-            for i, mov in enumerate(movimientos_ordenados, 1):
-                try:
-                    # Lógica de Moneda y Cuenta Dinámica
-                    target_cuenta_id = cuenta_id
-                    valor_final = mov['valor']
-                    
-                    if 'moneda' in mov:
-                        # Lógica específica para Tarjeta de Crédito (PDF incluye ambos)
-                        trm_value = 0  # Default TRM to 0 for all credit card movements
-                        moneda_id = 1  # Según requerimiento: siempre será Pesos (Id 1)
-                        
-                        if mov['moneda'] == 'COP':
-                            valor_final = mov['valor'] * -1
-                            usd_value = 0
-                            # Si estamos cargando como TC (4 o 5), forzar a 4 (Pesos)
-                            if cuenta_id in [4, 5]:
-                                target_cuenta_id = 4
-                        elif mov['moneda'] == 'USD':
-                            valor_final = 0 # Valor en 0 hasta que se defina TRM
-                            usd_value = mov['valor'] * -1
-                            # Si estamos cargando como TC (4 o 5), forzar a 5 (Dolares)
-                            if cuenta_id in [4, 5]:
-                                target_cuenta_id = 5
-                        else:
-                            usd_value = 0
-                    else:
-                        # Lógica legacy para Ahorros/Fondo
-                        if cuenta_id in [2, 3]:
-                            moneda_id = 1
-                            usd_value = 0
-                            trm_value = 0
-                        else:
-                            moneda_id = None
-                            usd_value = None
-                            trm_value = None
-                    
-                    # Detectar si es cuota de manejo
-                    es_cuota_manejo = detectar_cuota_manejo(mov['descripcion'])
-                    
-                    # Determinar TerceroID, descripción y referencia
-                    if es_cuota_manejo and contactid_bancolombia:
-                        contact_id = contactid_bancolombia
-                        descripcion = 'Bancolombia'
-                        referencia = 'Cuota de Manejo'
-                        cuotas_manejo_detectadas += 1
-                    else:
-                        contact_id = None
-                        descripcion = mov['descripcion'].title()
-                        referencia = mov['referencia'] if mov['referencia'] else ''
-                    
-                    cursor.execute(sql_insert, (
-                        mov['fecha'].date(),
-                        descripcion,
-                        referencia,
-                        valor_final,
-                        usd_value,  # USD
-                        trm_value,  # TRM
-                        moneda_id,  # MonedaID (Siempre 1 para TC)
-                        target_cuenta_id,
-                        contact_id,  # TerceroID - Bancolombia si es cuota de manejo, NULL si no
-                        None,  # GrupoID - NULL
-                        None   # ConceptoID - NULL
-                    ))
-                    
-                    # Commit individual para cada registro
-                    conn.commit()
-                    cargados += 1
-                    
-                except Exception as e:
-                    # Rollback automático en caso de error
-                    conn.rollback()
-                    errores += 1
-                    
-                    # Log detallado del error
-                    error_msg = f"✗ Error en registro {i}: {str(e)}"
-                    self.agregar_log(error_msg, 'error')
-                    self.agregar_log(f"  → Fecha: {mov['fecha'].strftime('%Y-%m-%d')}, Desc: {mov['descripcion'][:40]}, Valor: {mov['valor']}", 'error')
-                
-                # Actualizar progreso
-                self.progress_bar['value'] = i
-                if i % 10 == 0 or i == total:
-                    self.root.update_idletasks()
+            movimientos_ordenados = sorted(self.movimientos_nuevos, key=lambda x: x.fecha)
             
-            cursor.close()
-            conn.close()
+            ingesta = IngestaMovimientos(PostgresMovimientoRepository(conn))
+            cargados = len(ingesta.insertar(movimientos_ordenados, tipo))
+            omitidos = total - cargados
+            
+            self.progress_bar['value'] = total
+            self.root.update_idletasks()
             
             # Mostrar resultados
-            if errores == 0:
-                self.agregar_log(f"✓✓✓ CARGA COMPLETADA EXITOSAMENTE ✓✓✓", 'success')
-                self.agregar_log(f"✓ {cargados} movimientos cargados correctamente", 'success')
-                if cuotas_manejo_detectadas > 0:
-                    self.agregar_log(f"✓ {cuotas_manejo_detectadas} cuotas de manejo mapeadas automáticamente a Bancolombia", 'success')
-                self.mostrar_mensaje_custom("Éxito", 
-                                   f"Se cargaron {cargados} movimientos exitosamente.\n" +
-                                   (f"{cuotas_manejo_detectadas} cuotas de manejo mapeadas a Bancolombia." if cuotas_manejo_detectadas > 0 else ""),
-                                   'success')
-            else:
-                self.agregar_log(f"⚠ Carga completada con {errores} errores", 'warning')
-                self.agregar_log(f"✓ {cargados} movimientos cargados, {errores} errores", 'warning')
-                if cuotas_manejo_detectadas > 0:
-                    self.agregar_log(f"✓ {cuotas_manejo_detectadas} cuotas de manejo mapeadas automáticamente a Bancolombia", 'success')
-                self.mostrar_mensaje_custom("Completado con errores",
-                                      f"Se cargaron {cargados} movimientos.\n{errores} registros tuvieron errores.", 'warning')
+            self.agregar_log(f"✓✓✓ CARGA COMPLETADA EXITOSAMENTE ✓✓✓", 'success')
+            self.agregar_log(f"✓ {cargados} movimientos cargados correctamente", 'success')
+            if omitidos > 0:
+                # Otra carga los insertó entre la validación y la carga
+                self.agregar_log(f"⚠ {omitidos} movimientos ya existían y se omitieron", 'warning')
+            if cuotas_manejo_detectadas > 0:
+                self.agregar_log(f"✓ {cuotas_manejo_detectadas} cuotas de manejo mapeadas automáticamente a Bancolombia", 'success')
+            self.mostrar_mensaje_custom("Éxito", 
+                               f"Se cargaron {cargados} movimientos exitosamente.\n" +
+                               (f"{omitidos} ya existían y se omitieron.\n" if omitidos > 0 else "") +
+                               (f"{cuotas_manejo_detectadas} cuotas de manejo mapeadas a Bancolombia." if cuotas_manejo_detectadas > 0 else ""),
+                               'success')
             
             # Resetear
             self.progress_bar['value'] = 0
             
         except Exception as e:
+            # El lote es una sola transacción: si falla, no queda nada a medias
             self.agregar_log(f"✗ Error crítico durante la carga: {e}", 'error')
             self.mostrar_mensaje_custom("Error", f"Error durante la carga:\n{e}", 'error')
             import traceback
             traceback.print_exc()
-            if conn:
-                conn.rollback()
         finally:
             if conn:
                 conn.close()
@@ -1,5 +1,4 @@
 
-import psycopg2
 from psycopg2 import sql
 import csv
 from datetime import datetime
@@ -9,14 +8,7 @@ from tkinter import ttk, scrolledtext, filedialog, messagebox
 import threading
 import os
 
-# Configuración de la base de datos
-DB_CONFIG = {
-    'host': 'localhost',
-    'port': 5433,
-    'user': 'postgres',
-    'password': 'SLB',
-    'database': 'Mvtos'
-}
+from conexion_bd import obtener_conexion, DB_CONFIG
 
 class CargadorMvtosGUI:
     def __init__(self, root):
@@ -426,7 +418,7 @@ class CargadorMvtosGUI:
         conn = None
         try:
             self.actualizar_status("Conectando a BD...")
-            conn = psycopg2.connect(**DB_CONFIG)
+            conn = obtener_conexion()
             cursor = conn.cursor()
             
             # Crear tabla si no existe
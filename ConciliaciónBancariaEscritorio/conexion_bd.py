@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Acceso a Datos Compartido - Herramientas de Escritorio
+Pool de conexiones persistente para todas las interfaces Tkinter.
+
+Evita abrir un psycopg2.connect() por cada clic: las conexiones se reutilizan,
+se validan tras periodos de inactividad (reconexión automática si el servidor
+se reinició) y las consultas más frecuentes se ejecutan como sentencias
+preparadas (PREPARE/EXECUTE) una sola vez por sesión.
+
+Uso:
+    from conexion_bd import obtener_conexion
+
+    conn = obtener_conexion()
+    cursor = conn.cursor()
+    ...
+    conn.close()   # Devuelve la conexión al pool (no la cierra)
+"""
+
+import atexit
+import threading
+import time
+
+import psycopg2
+from psycopg2 import pool
+
+# Configuración de la base de datos (única para todas las herramientas de escritorio)
+DB_CONFIG = {
+    'host': 'localhost',
+    'port': 5433,
+    'user': 'postgres',
+    'password': 'SLB',
+    'database': 'Mvtos'
+}
+
+# Parámetros TCP keepalive para detectar conexiones muertas sin esperar al timeout del SO
+KEEPALIVE_CONFIG = {
+    'keepalives': 1,
+    'keepalives_idle': 30,
+    'keepalives_interval': 10,
+    'keepalives_count': 3
+}
+
+POOL_MIN_CONEXIONES = 1
+POOL_MAX_CONEXIONES = 8
+
+# Una conexión inactiva por más de estos segundos se valida con SELECT 1 antes de entregarla
+SEGUNDOS_VALIDACION = 60
+
+# Consultas calientes de la UI de clasificación, preparadas una vez por conexión.
+# Los parámetros usan la notación posicional de PostgreSQL ($1, $2, ...).
+SENTENCIAS_PREPARADAS = {
+    'movimiento_por_id': """
+        SELECT Id, Fecha, Descripcion, Referencia, Valor, TerceroID, GrupoID, ConceptoID, Detalle
+        FROM movimientos
+        WHERE Id = $1
+    """,
+    'contexto_por_referencia': """
+        SELECT m.Fecha, m.Descripcion, m.Referencia, m.Valor,
+               t.tercero, g.grupo, c.concepto,
+               m.TerceroID, m.GrupoID, m.ConceptoID
+        FROM movimientos m
+        LEFT JOIN terceros t ON m.TerceroID = t.terceroid
+        LEFT JOIN grupos g ON m.GrupoID = g.grupoid
+        LEFT JOIN conceptos c ON m.ConceptoID = c.conceptoid
+        WHERE m.Referencia = $1
+          AND m.Fecha < $2
+          AND m.TerceroID IS NOT NULL
+        ORDER BY m.Fecha DESC
+        LIMIT 5
+    """,
+    'contexto_por_descripcion': """
+        SELECT m.Fecha, m.Descripcion, m.Referencia, m.Valor,
+               t.tercero, g.grupo, c.concepto,
+               m.TerceroID, m.GrupoID, m.ConceptoID
+        FROM movimientos m
+        LEFT JOIN terceros t ON m.TerceroID = t.terceroid
+        LEFT JOIN grupos g ON m.GrupoID = g.grupoid
+        LEFT JOIN conceptos c ON m.ConceptoID = c.conceptoid
+        WHERE m.Descripcion LIKE $1
+          AND m.Fecha < $2
+          AND m.TerceroID IS NOT NULL
+        ORDER BY m.Fecha DESC
+        LIMIT 5
+    """,
+    'tercero_por_id': """
+        SELECT terceroid, tercero FROM terceros WHERE terceroid = $1
+    """,
+    'tercero_por_referencia_alias': """
+        SELECT t.terceroid, t.tercero
+        FROM terceros t
+        JOIN tercero_descripciones td ON t.terceroid = td.terceroid
+        WHERE td.referencia = $1 AND td.activa = TRUE
+        LIMIT 1
+    """,
+    'tercero_por_referencia_historial': """
+        SELECT t.terceroid, t.tercero
+        FROM movimientos m
+        JOIN terceros t ON m.TerceroID = t.terceroid
+        WHERE m.Referencia = $1 AND m.TerceroID IS NOT NULL
+        LIMIT 1
+    """,
+    'tercero_por_alias_exacto': """
+        SELECT DISTINCT t.terceroid, t.tercero, td.descripcion
+        FROM terceros t
+        JOIN tercero_descripciones td ON t.terceroid = td.terceroid
+        WHERE td.activa = TRUE AND t.activa = TRUE
+          AND LOWER(td.descripcion) = $1
+    """,
+    'tercero_por_nombre_exacto': """
+        SELECT terceroid, tercero
+        FROM terceros
+        WHERE activa = TRUE AND LOWER(tercero) = $1
+    """,
+    'alias_terceros_activos': """
+        SELECT DISTINCT t.terceroid, t.tercero, td.descripcion
+        FROM terceros t
+        JOIN tercero_descripciones td ON t.terceroid = td.terceroid
+        WHERE td.activa = TRUE AND t.activa = TRUE
+          AND td.descripcion IS NOT NULL AND td.descripcion <> ''
+    """,
+    'firma_alias_terceros': """
+        SELECT COUNT(*), COALESCE(MAX(td.id), 0),
+               COALESCE(SUM(hashtext(t.terceroid || '|' || t.tercero || '|' || td.descripcion)::BIGINT), 0)
+        FROM terceros t
+        JOIN tercero_descripciones td ON t.terceroid = td.terceroid
+        WHERE td.activa = TRUE AND t.activa = TRUE
+          AND td.descripcion IS NOT NULL AND td.descripcion <> ''
+    """,
+    'grupo_por_id': """
+        SELECT grupo FROM grupos WHERE grupoid = $1
+    """,
+    'concepto_por_id': """
+        SELECT concepto FROM conceptos WHERE conceptoid = $1
+    """,
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Estado por conexión física (clave: id() de la conexión psycopg2)
+_ultimo_uso = {}
+_preparadas = {}
+
+
+class ConexionPool:
+    """
+    Envoltorio de una conexión del pool.
+    Se comporta como una conexión psycopg2 normal, pero close() la devuelve
+    al pool en lugar de cerrarla, de modo que el código existente
+    (conn = ...; ...; conn.close()) sigue funcionando sin cambios.
+    """
+
+    def __init__(self, conn, pool_origen):
+        self._conn = conn
+        self._pool = pool_origen
+
+    def __getattr__(self, nombre):
+        if self._conn is None:
+            raise psycopg2.InterfaceError("La conexión ya fue devuelta al pool")
+        return getattr(self._conn, nombre)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._conn.__exit__(exc_type, exc_value, traceback)
+
+    @property
+    def closed(self):
+        return 1 if self._conn is None else self._conn.closed
+
+    def close(self):
+        """Devuelve la conexión al pool (o la descarta si quedó inservible)."""
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        _devolver(self._pool, conn)
+
+
+def _obtener_pool():
+    """Crea el pool de forma perezosa (al primer uso)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = pool.ThreadedConnectionPool(
+                    minconn=POOL_MIN_CONEXIONES,
+                    maxconn=POOL_MAX_CONEXIONES,
+                    **DB_CONFIG,
+                    **KEEPALIVE_CONFIG
+                )
+    return _pool
+
+
+def _descartar(pool_origen, conn):
+    """Cierra físicamente una conexión y olvida su estado."""
+    _ultimo_uso.pop(id(conn), None)
+    _preparadas.pop(id(conn), None)
+    try:
+        pool_origen.putconn(conn, close=True)
+    except Exception:
+        pass
+
+
+def _devolver(pool_origen, conn):
+    if conn.closed:
+        _descartar(pool_origen, conn)
+        return
+    _ultimo_uso[id(conn)] = time.monotonic()
+    # El pool hace rollback de cualquier transacción abierta al recibirla
+    pool_origen.putconn(conn)
+
+
+def _conexion_viva(conn):
+    """Valida la conexión solo si estuvo inactiva más de SEGUNDOS_VALIDACION."""
+    if conn.closed:
+        return False
+    ultimo = _ultimo_uso.get(id(conn))
+    if ultimo is not None and time.monotonic() - ultimo < SEGUNDOS_VALIDACION:
+        return True
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.close()
+        conn.rollback()
+        return True
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        return False
+
+
+def obtener_conexion():
+    """
+    Obtiene una conexión del pool compartido.
+    Si la conexión entregada por el pool está caída (p.ej. reinicio del servidor),
+    se descarta y se abre una nueva de forma transparente.
+    """
+    pool_actual = _obtener_pool()
+    for _ in range(POOL_MAX_CONEXIONES + 1):
+        conn = pool_actual.getconn()
+        if _conexion_viva(conn):
+            return ConexionPool(conn, pool_actual)
+        _descartar(pool_actual, conn)
+    raise psycopg2.OperationalError("No fue posible obtener una conexión válida a la base de datos")
+
+
+def ejecutar_preparada(cursor, nombre, params=()):
+    """
+    Ejecuta una sentencia de SENTENCIAS_PREPARADAS sobre el cursor dado.
+    La sentencia se prepara (PREPARE) la primera vez que se usa en cada conexión
+    física; las siguientes llamadas solo envían EXECUTE con los parámetros.
+    """
+    conn = cursor.connection
+    preparadas = _preparadas.setdefault(id(conn), set())
+    if nombre not in preparadas:
+        cursor.execute(f"PREPARE {nombre} AS {SENTENCIAS_PREPARADAS[nombre]}")
+        preparadas.add(nombre)
+
+    if params:
+        marcadores = ", ".join(["%s"] * len(params))
+        cursor.execute(f"EXECUTE {nombre} ({marcadores})", tuple(params))
+    else:
+        cursor.execute(f"EXECUTE {nombre}")
+
+
+def cerrar_pool():
+    """Cierra todas las conexiones del pool. Se registra automáticamente al salir."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+            _ultimo_uso.clear()
+            _preparadas.clear()
+
+
+atexit.register(cerrar_pool)
@@ -8,19 +8,12 @@ y editar la clasificación (Tercero, Grupo, Concepto) y datos del registro.
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-import psycopg2
 from datetime import datetime, date, timedelta
 from dateutil.relativedelta import relativedelta
 from tkcalendar import DateEntry  # Requiere: pip install tkcalendar
 
-# Configuración de la base de datos
-DB_CONFIG = {
-    'host': 'localhost',
-    'port': 5433,
-    'user': 'postgres',
-    'password': 'SLB',
-    'database': 'Mvtos'
-}
+from conexion_bd import obtener_conexion
+from grilla_virtual import GrillaVirtual
 
 class ConsultarMovimientosGUI:
     def __init__(self, root):
@@ -253,6 +246,9 @@ class ConsultarMovimientosGUI:
         # Doble click para editar
         self.tree.bind('<Double-1>', self.abrir_editor)
         
+        # Carga por ventanas desde un cursor del servidor
+        self.grilla = GrillaVirtual(self.tree, y_scroll, formatear=self._formatear_fila, iid=lambda row: row[0])
+        
         # --- 3. Barra de Estado y Total ---
         bottom_frame = ttk.Frame(main_frame)
         bottom_frame.pack(fill=tk.X, pady=(5, 0))
@@ -265,7 +261,7 @@ class ConsultarMovimientosGUI:
         self.lbl_total.pack(side=tk.RIGHT, padx=(10, 0), ipadx=10)
 
     def conectar(self):
-        return psycopg2.connect(**DB_CONFIG)
+        return obtener_conexion()
 
     def cargar_catalogos(self):
         """Carga listas para los comboboxes del editor."""
@@ -386,74 +382,63 @@ class ConsultarMovimientosGUI:
         elif self.filtro_signo == 'neg':
             query += " AND m.Valor < 0"
             
+        # Totales calculados en el servidor (sin traer las filas)
+        query_totales = f"SELECT COUNT(*), COALESCE(SUM(q.valor), 0) FROM ({query}) q"
+        
         query += " ORDER BY m.Fecha DESC, m.Id DESC"
         
         try:
-            conn = self.conectar()
-            cur = conn.cursor()
-            cur.execute(query, params)
-            rows = cur.fetchall()
-            conn.close()
-            
-            # Limpiar treeview
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-            
             if hasattr(self, 'lbl_total'):
                 self.lbl_total.config(text="Total: $0.00")
-                
-            self.movimientos = {} # Guardar referencia para edición
             
-            for row in rows:
-                mid = row[0]
-                self.movimientos[mid] = row # Guardamos toda la data raw
-                
-                # ID(0), Fecha(1), Cuenta(2), Moneda(3), Desc(4), Ref(5), 
-                # TerceroNam(6), Grupo(7), Concepto(8), Valor(9), Detalle(10)
-                # TerceroID(11), GrupoID(12), ConceptoID(13), CuentaID(14), MonedaID(15)
-                
-                # Cuenta: ID - Cuenta
-                cuenta_str = f"{row[14]} - {row[2]}" if row[14] is not None else ""
-                
-                # Moneda: ID - Moneda
-                moneda_str = f"{row[15]} - {row[3]}" if row[15] is not None else ""
-                
-                # Tercero: ID - Tercero (sin descripción)
-                tercero_str = f"{row[11]} - {row[6]}" if row[11] is not None else ""
-                
-                # Grupo: ID - Grupo
-                grupo_str = f"{row[12]} - {row[7]}" if row[12] is not None else ""
-                
-                # Concepto: ID - Concepto
-                concepto_str = f"{row[13]} - {row[8]}" if row[13] is not None else ""
-                
-                val_str = f"${row[9]:,.2f}" if row[9] is not None else "$0.00"
-                
-                # Manejo de Detalle None -> ""
-                detalle_str = row[10] if row[10] is not None else ""
-                
-                display_values = (
-                    mid, row[1], cuenta_str, moneda_str, row[4], row[5], 
-                    tercero_str, grupo_str, concepto_str, val_str, detalle_str
-                )
-                self.tree.insert('', 'end', iid=mid, values=display_values)
-                
-            # Calcular total general de la consulta
-            total_valor = 0.0
-            if rows:
-                try:
-                    total_valor = sum(float(r[9]) for r in rows if r[9] is not None)
-                except Exception as e:
-                    print(f"Error sumando total: {e}")
+            # Primera ventana de filas; el resto se trae al desplazarse
+            self.grilla.cargar_consulta(query, params)
+            self.movimientos = self.grilla.filas # Guardar referencia para edición
+            
+            conn = self.conectar()
+            cur = conn.cursor()
+            cur.execute(query_totales, params)
+            total_registros, total_valor = cur.fetchone()
+            cur.close()
+            conn.close()
             
-            self.status_bar.config(text=f"Total registros encontrados: {len(rows)}")
+            self.status_bar.config(text=f"Total registros encontrados: {total_registros}")
             if hasattr(self, 'lbl_total'):
-                self.lbl_total.config(text=f"Total: ${total_valor:,.2f}")
+                self.lbl_total.config(text=f"Total: ${float(total_valor):,.2f}")
             
         except Exception as e:
             self.mostrar_mensaje("Error", f"Error en búsqueda: {e}", 'error')
 
-
+    def _formatear_fila(self, row):
+        """Convierte una fila cruda de la consulta en los valores visibles del Treeview."""
+        # ID(0), Fecha(1), Cuenta(2), Moneda(3), Desc(4), Ref(5), 
+        # TerceroNam(6), Grupo(7), Concepto(8), Valor(9), Detalle(10)
+        # TerceroID(11), GrupoID(12), ConceptoID(13), CuentaID(14), MonedaID(15)
+        
+        # Cuenta: ID - Cuenta
+        cuenta_str = f"{row[14]} - {row[2]}" if row[14] is not None else ""
+        
+        # Moneda: ID - Moneda
+        moneda_str = f"{row[15]} - {row[3]}" if row[15] is not None else ""
+        
+        # Tercero: ID - Tercero (sin descripción)
+        tercero_str = f"{row[11]} - {row[6]}" if row[11] is not None else ""
+        
+        # Grupo: ID - Grupo
+        grupo_str = f"{row[12]} - {row[7]}" if row[12] is not None else ""
+        
+        # Concepto: ID - Concepto
+        concepto_str = f"{row[13]} - {row[8]}" if row[13] is not None else ""
+        
+        val_str = f"${row[9]:,.2f}" if row[9] is not None else "$0.00"
+        
+        # Manejo de Detalle None -> ""
+        detalle_str = row[10] if row[10] is not None else ""
+        
+        return (
+            row[0], row[1], cuenta_str, moneda_str, row[4], row[5], 
+            tercero_str, grupo_str, concepto_str, val_str, detalle_str
+        )
 
     def limpiar_filtros(self):
         self.txt_search.delete(0, tk.END)
@@ -8,8 +8,6 @@ Incluye KPIs, gráficos y resúmenes tabulares agrupados.
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-import psycopg2
-import pandas as pd
 from datetime import date, datetime, timedelta
 from dateutil.relativedelta import relativedelta
 import matplotlib
@@ -20,14 +18,9 @@ from tkcalendar import DateEntry
 # Configurar backend de matplotlib para Tkinter
 matplotlib.use("TkAgg")
 
-# Configuración de base de datos (compartida)
-DB_CONFIG = {
-    'host': 'localhost',
-    'port': 5433,
-    'user': 'postgres',
-    'password': 'SLB',
-    'database': 'Mvtos'
-}
+from conexion_bd import obtener_conexion
+from agregados_movimientos import obtener_resumen
+from grilla_virtual import GrillaVirtual
 
 class DashboardMovimientosUI:
     def __init__(self, root):
@@ -35,7 +28,7 @@ class DashboardMovimientosUI:
         self.root.title("Dashboard Financiero - Gastos SLB")
         self.root.geometry("1400x900")
         
-        self.df_movimientos = pd.DataFrame()
+        self.resumen = None # Agregados calculados en el servidor (ver agregados_movimientos)
         self.cuentas_lista = []
         self.terceros_lista = []
         self.grupos_lista = [] # Tuplas (id, nombre)
@@ -57,7 +50,7 @@ class DashboardMovimientosUI:
         self.actualizar_dashboard()
 
     def conectar(self):
-        return psycopg2.connect(**DB_CONFIG)
+        return obtener_conexion()
 
     def setup_ui(self):
         # --- Frame Principal ---
@@ -127,7 +120,7 @@ class DashboardMovimientosUI:
         self.chk_compras.pack(side=tk.LEFT, padx=(5, 0))
 
         # Botones
-        ttk.Button(row1, text="🔄 Actualizar", command=self.actualizar_dashboard)\
+        ttk.Button(row1, text="🔄 Actualizar", command=lambda: self.actualizar_dashboard(forzar=True))\
             .pack(side=tk.RIGHT, padx=5)
         ttk.Button(row1, text="🧹 Limpiar", command=self.limpiar_filtros)\
             .pack(side=tk.RIGHT, padx=5)
@@ -220,17 +213,17 @@ class DashboardMovimientosUI:
         # Tab: Por Grupo
         self.tab_grupo = ttk.Frame(self.notebook)
         self.notebook.add(self.tab_grupo, text="Resumen por Grupo")
-        self.tree_grupo = self._crear_treeview(self.tab_grupo, columns=("Grupo", "Total", "Conteo", "% del Total"))
+        self.tree_grupo, self.grilla_grupo = self._crear_treeview(self.tab_grupo, columns=("Grupo", "Total", "Conteo", "% del Total"))
 
         # Tab: Por Concepto
         self.tab_concepto = ttk.Frame(self.notebook)
         self.notebook.add(self.tab_concepto, text="Resumen por Concepto")
-        self.tree_concepto = self._crear_treeview(self.tab_concepto, columns=("Concepto", "Grupo", "Total", "Conteo"))
+        self.tree_concepto, self.grilla_concepto = self._crear_treeview(self.tab_concepto, columns=("Concepto", "Grupo", "Total", "Conteo"))
         
         # Tab: Por Tercero (Bonus)
         self.tab_tercero = ttk.Frame(self.notebook)
         self.notebook.add(self.tab_tercero, text="Top Terceros")
-        self.tree_tercero = self._crear_treeview(self.tab_tercero, columns=("Tercero", "Total", "Conteo"))
+        self.tree_tercero, self.grilla_tercero = self._crear_treeview(self.tab_tercero, columns=("Tercero", "Total", "Conteo"))
 
 
     def _crear_treeview(self, parent, columns):
@@ -251,8 +244,11 @@ class DashboardMovimientosUI:
                 tree.column(col, width=100, anchor='e')
             else:
                 tree.column(col, width=200, anchor='w')
+        
+        # Inserción por ventanas a medida que se desplaza
+        grilla = GrillaVirtual(tree, y_scroll)
                 
-        return tree
+        return tree, grilla
 
     def cargar_catalogos(self):
         try:
@@ -411,7 +407,7 @@ class DashboardMovimientosUI:
         self.cb_concepto['values'] = self.conceptos_f_validos
         self.cb_concepto.set('')
 
-    def actualizar_dashboard(self):
+    def actualizar_dashboard(self, forzar=False):
         # 1. Obtener filtros
         f_inicio = self.date_from.get_date()
         f_fin = self.date_to.get_date()
@@ -425,64 +421,19 @@ class DashboardMovimientosUI:
         grupo_id = get_id(self.cb_grupo.get())
         concepto_id = get_id(self.cb_concepto.get())
         
-        # 2. Query Data con Psycopg2 (luego a Pandas)
-        query = """
-            SELECT 
-                m.Id, m.Fecha, m.Valor,
-                CASE WHEN g.grupoid IS NOT NULL THEN CAST(g.grupoid AS TEXT) || ' - ' || g.grupo ELSE 'Sin Grupo' END as grupo,
-                CASE WHEN c.conceptoid IS NOT NULL THEN CAST(c.conceptoid AS TEXT) || ' - ' || c.concepto ELSE 'Sin Concepto' END as concepto,
-                CASE WHEN t.terceroid IS NOT NULL THEN CAST(t.terceroid AS TEXT) || ' - ' || t.tercero ELSE 'Sin Tercero' END as tercero,
-                cu.cuenta
-            FROM movimientos m
-            LEFT JOIN grupos g ON m.GrupoID = g.grupoid
-            LEFT JOIN conceptos c ON m.ConceptoID = c.conceptoid
-            LEFT JOIN terceros t ON m.TerceroID = t.terceroid
-            LEFT JOIN cuentas cu ON m.CuentaID = cu.cuentaid
-            WHERE m.Fecha BETWEEN %s AND %s
-        """
-        params = [f_inicio, f_fin]
-        
-        if cuenta_id:
-            query += " AND m.CuentaID = %s"
-            params.append(cuenta_id)
-            
-        if tercero_id:
-            query += " AND m.TerceroID = %s"
-            params.append(tercero_id)
-            
-        if grupo_id:
-            query += " AND m.GrupoID = %s"
-            params.append(grupo_id)
-            
-        if concepto_id:
-            query += " AND m.ConceptoID = %s"
-            params.append(concepto_id)
-            
-        # Filtro de Traslados (Grupo 47)
-        if self.var_excluir_traslados.get():
-            query += " AND (m.GrupoID <> 47 OR m.GrupoID IS NULL)"
-
-        # Filtro de Compras Especificas
-        if self.var_excluir_compras.get():
-            query += """ AND NOT (
-                (m.GrupoID = 4 AND m.ConceptoID = 20) OR 
-                (m.GrupoID = 149 AND m.ConceptoID = 26) OR 
-                (m.GrupoID = 199 AND m.ConceptoID = 27)
-            )"""
-
-        # Filtro Signo
-        if self.filtro_signo == 'pos':
-            query += " AND m.Valor > 0"
-        elif self.filtro_signo == 'neg':
-            query += " AND m.Valor < 0"
-
+        # 2. Agregados calculados en PostgreSQL (con caché por firma de filtros)
         try:
-            conn = self.conectar()
-            # Usar pandas directo para SQL es más cómodo
-            df = pd.read_sql_query(query, conn, params=params)
-            conn.close()
-            
-            self.df_movimientos = df
+            self.resumen = obtener_resumen(
+                f_inicio, f_fin,
+                cuenta_id=cuenta_id,
+                tercero_id=tercero_id,
+                grupo_id=grupo_id,
+                concepto_id=concepto_id,
+                excluir_traslados=self.var_excluir_traslados.get(),
+                excluir_compras=self.var_excluir_compras.get(),
+                signo=self.filtro_signo,
+                forzar=forzar
+            )
             
             # Procesar datos y actualizar UI
             self._actualizar_kpis()
@@ -495,13 +446,13 @@ class DashboardMovimientosUI:
             traceback.print_exc()
 
     def _actualizar_kpis(self):
-        if self.df_movimientos.empty:
+        if not self.resumen or not self.resumen['kpis']['conteo']:
             total = 0
             n_grupos = 0
             promedio = 0
         else:
-            total = self.df_movimientos['valor'].sum()
-            n_grupos = self.df_movimientos['grupo'].nunique()
+            total = self.resumen['kpis']['total']
+            n_grupos = self.resumen['kpis']['n_grupos']
             
             # Promedio diario
             dias = (self.date_to.get_date() - self.date_from.get_date()).days + 1
@@ -516,7 +467,7 @@ class DashboardMovimientosUI:
         self.ax_grupos.clear()
         self.ax_conceptos.clear()
         
-        if self.df_movimientos.empty:
+        if not self.resumen or not self.resumen['kpis']['conteo']:
             self.canvas_grupos.draw()
             self.canvas_conceptos.draw()
             return
@@ -524,22 +475,24 @@ class DashboardMovimientosUI:
         # --- Lógica dinámica según el filtro de signo ---
         # Si el usuario eligió 'pos' (Ingresos), graficamos ingresos.
         # Si eligió 'neg' (Gastos) o 'todos' (Default), graficamos gastos.
+        # Los agregados ya traen la magnitud de ingresos y gastos por separado.
 
         modo_ingreso = (self.filtro_signo == 'pos')
         
         if modo_ingreso:
-            df_target = self.df_movimientos[self.df_movimientos['valor'] > 0].copy()
+            idx_grupo, idx_concepto = 3, 4  # columna 'ingresos'
             titulo_pie = "Distribución de INGRESOS por Grupo"
             titulo_bar = "Top 10 Conceptos (Mayores INGRESOS)"
             color_bar = '#27ae60' # Verde
         else:
-            # Gastos (o todos, graficamos la parte negativa)
-            df_target = self.df_movimientos[self.df_movimientos['valor'] < 0].copy()
+            idx_grupo, idx_concepto = 4, 5  # columna 'gastos' (positiva)
             titulo_pie = "Distribución de GASTOS por Grupo"
             titulo_bar = "Top 10 Conceptos (Mayor GASTO)"
             color_bar = '#e74c3c' # Rojo
 
-        if df_target.empty:
+        grupos_target = [(fila[0], fila[idx_grupo]) for fila in self.resumen['por_grupo'] if fila[idx_grupo] > 0]
+
+        if not grupos_target:
             msg = "Sin ingresos registrados" if modo_ingreso else "Sin gastos registrados"
             self.ax_grupos.text(0.5, 0.5, msg, ha='center')
             self.ax_conceptos.text(0.5, 0.5, msg, ha='center')
@@ -547,31 +500,38 @@ class DashboardMovimientosUI:
             self.canvas_conceptos.draw()
             return
             
-        # Convertir a positivo para graficar magnitud
-        df_target['valor_abs'] = df_target['valor'].abs()
-            
         # --- Gráfico 1: Pie Grupos ---
-        df_g = df_target.groupby('grupo')['valor_abs'].sum().sort_values(ascending=False)
+        grupos_target.sort(key=lambda x: x[1], reverse=True)
         
         # Tomar top 8 y agrupar resto en "Otros"
-        if len(df_g) > 8:
-            otros = df_g.iloc[8:].sum()
-            df_g = df_g.iloc[:8]
-            df_g['Otros'] = otros
+        if len(grupos_target) > 8:
+            otros = sum(v for _, v in grupos_target[8:])
+            grupos_target = grupos_target[:8] + [('Otros', otros)]
+            
+        etiquetas = [g for g, _ in grupos_target]
+        valores = [v for _, v in grupos_target]
             
         # Colores
-        colors = matplotlib.colormaps['tab20c'](range(len(df_g)))
+        colors = matplotlib.colormaps['tab20c'](range(len(valores)))
 
         wedges, texts, autotexts = self.ax_grupos.pie(
-            df_g, labels=df_g.index, autopct='%1.1f%%', 
+            valores, labels=etiquetas, autopct='%1.1f%%', 
             startangle=140, colors=colors, textprops={'fontsize': 8}
         )
         self.ax_grupos.set_title(titulo_pie, fontsize=10, fontweight='bold')
         
         # --- Gráfico 2: Bar Conceptos (Top 10) ---
-        df_c = df_target.groupby('concepto')['valor_abs'].sum().sort_values(ascending=True).tail(10)
-        
-        bars = self.ax_conceptos.barh(df_c.index, df_c.values, color=color_bar) 
+        # El resumen viene por (concepto, grupo); se consolida por concepto
+        por_concepto = {}
+        for fila in self.resumen['por_concepto']:
+            por_concepto[fila[0]] = por_concepto.get(fila[0], 0) + fila[idx_concepto]
+        top_conceptos = sorted(
+            ((c, v) for c, v in por_concepto.items() if v > 0), key=lambda x: x[1]
+        )[-10:]
+        
+        bars = self.ax_conceptos.barh(
+            [c for c, _ in top_conceptos], [v for _, v in top_conceptos], color=color_bar
+        ) 
         self.ax_conceptos.set_title(titulo_bar, fontsize=10, fontweight='bold')
         self.ax_conceptos.tick_params(axis='y', labelsize=8)
         self.ax_conceptos.tick_params(axis='x', labelsize=8)
@@ -593,44 +553,29 @@ class DashboardMovimientosUI:
         self.canvas_conceptos.draw()
 
     def _actualizar_tablas(self):
-        # Limpiar tablas
-        for tree in [self.tree_grupo, self.tree_concepto, self.tree_tercero]:
-            for item in tree.get_children():
-                tree.delete(item)
-                
-        if self.df_movimientos.empty:
+        if not self.resumen or not self.resumen['kpis']['conteo']:
+            # Limpiar tablas
+            for grilla in [self.grilla_grupo, self.grilla_concepto, self.grilla_tercero]:
+                grilla.cargar_lista([])
             return
             
-        total_global = self.df_movimientos['valor'].sum() or 1 # Evitar div/0
+        total_global = self.resumen['kpis']['total'] or 1 # Evitar div/0
 
         # --- Tabla 1: Por Grupo ---
-        df_g = self.df_movimientos.groupby('grupo')['valor'].agg(['sum', 'count']).reset_index()
-        df_g = df_g.sort_values(by='sum', ascending=False)
-        
-        for _, row in df_g.iterrows():
-            pct = (row['sum'] / total_global) * 100
-            vals = (row['grupo'], f"${row['sum']:,.2f}", int(row['count']), f"{pct:.1f}%")
-            self.tree_grupo.insert('', 'end', values=vals)
+        self.grilla_grupo.formatear = lambda fila: (
+            fila[0], f"${fila[1]:,.2f}", int(fila[2]), f"{(fila[1] / total_global) * 100:.1f}%"
+        )
+        self.grilla_grupo.cargar_lista(self.resumen['por_grupo'])
 
         # --- Tabla 2: Por Concepto ---
         # Incluimos el grupo al que pertenece el concepto para contexto
-        # Suponemos que un concepto pertenece a un grupo predominante si hay ambigüedad, 
-        # pero en la BD es M:1 por movimiento. 
-        # Agrupamos por Concepto y Grupo
-        df_c = self.df_movimientos.groupby(['concepto', 'grupo'])['valor'].agg(['sum', 'count']).reset_index()
-        df_c = df_c.sort_values(by='sum', ascending=False)
-        
-        for _, row in df_c.iterrows():
-            vals = (row['concepto'], row['grupo'], f"${row['sum']:,.2f}", int(row['count']))
-            self.tree_concepto.insert('', 'end', values=vals)
+        # (agrupado por Concepto y Grupo, ya que en la BD es M:1 por movimiento)
+        self.grilla_concepto.formatear = lambda fila: (fila[0], fila[1], f"${fila[2]:,.2f}", int(fila[3]))
+        self.grilla_concepto.cargar_lista(self.resumen['por_concepto'])
             
         # --- Tabla 3: Por Tercero ---
-        df_t = self.df_movimientos.groupby('tercero')['valor'].agg(['sum', 'count']).reset_index()
-        df_t = df_t.sort_values(by='sum', ascending=False)
-        
-        for _, row in df_t.iterrows():
-            vals = (row['tercero'], f"${row['sum']:,.2f}", int(row['count']))
-            self.tree_tercero.insert('', 'end', values=vals)
+        self.grilla_tercero.formatear = lambda fila: (fila[0], f"${fila[1]:,.2f}", int(fila[2]))
+        self.grilla_tercero.cargar_lista(self.resumen['por_tercero'])
 
 if __name__ == "__main__":
     try:
@@ -9,19 +9,12 @@ Fecha: 2025-12-29
 Actualizado: 2026-01-07 - Removidas columnas claveconcepto y grupo (3NF)
 """
 
-import psycopg2
 from psycopg2 import IntegrityError
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
 
-DB_CONFIG = {
-    'host': 'localhost',
-    'port': 5433,
-    'user': 'postgres',
-    'password': 'SLB',
-    'database': 'Mvtos'
-}
+from conexion_bd import obtener_conexion
 
 
 class GestionarConceptosGUI:
@@ -112,7 +105,7 @@ class GestionarConceptosGUI:
         
     def conectar(self):
         try:
-            self.conn = psycopg2.connect(**DB_CONFIG)
+            self.conn = obtener_conexion()
             self.cursor = self.conn.cursor()
             return True
         except Exception as e:
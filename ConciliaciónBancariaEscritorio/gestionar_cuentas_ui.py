@@ -8,20 +8,12 @@ Autor: Antigravity
 Fecha: 2025-12-29
 """
 
-import psycopg2
 from psycopg2 import IntegrityError
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
 
-# Configuración de BD
-DB_CONFIG = {
-    'host': 'localhost',
-    'port': 5433,
-    'user': 'postgres',
-    'password': 'SLB',
-    'database': 'Mvtos'
-}
+from conexion_bd import obtener_conexion
 
 
 class GestionarCuentasGUI:
@@ -131,7 +123,7 @@ class GestionarCuentasGUI:
     def conectar(self):
         """Conecta a la base de datos."""
         try:
-            self.conn = psycopg2.connect(**DB_CONFIG)
+            self.conn = obtener_conexion()
             self.cursor = self.conn.cursor()
             return True
         except Exception as e:
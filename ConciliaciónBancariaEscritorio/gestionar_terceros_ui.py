@@ -12,20 +12,12 @@ Fecha: 2025-12-29
 Actualizado: 2026-01-07 - Adaptado a esquema normalizado 3NF
 """
 
-import psycopg2
 from psycopg2 import IntegrityError
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
 
-# Configuración de BD
-DB_CONFIG = {
-    'host': 'localhost',
-    'port': 5433,
-    'user': 'postgres',
-    'password': 'SLB',
-    'database': 'Mvtos'
-}
+from conexion_bd import obtener_conexion
 
 
 class GestionarTercerosGUI:
@@ -138,7 +130,7 @@ class GestionarTercerosGUI:
         
     def conectar(self):
         try:
-            self.conn = psycopg2.connect(**DB_CONFIG)
+            self.conn = obtener_conexion()
             self.cursor = self.conn.cursor()
             return True
         except Exception as e:
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Grilla Virtual - Herramientas de Escritorio
+Treeview poblado por ventanas a medida que el usuario se desplaza.
+
+En lugar de traer todo el resultado con fetchall() e insertar cada fila antes de
+mostrar la primera, la grilla abre un cursor del lado del servidor (cursor con
+nombre de psycopg2) y trae solo TAM_VENTANA filas. Cuando la barra de
+desplazamiento se acerca al final se pide la siguiente ventana. El tiempo hasta
+ver la primera fila es constante, sin importar el tamaño del resultado.
+
+También acepta listas ya calculadas (p.ej. resúmenes del dashboard), que se
+insertan por ventanas con el mismo mecanismo.
+
+Uso:
+    grilla = GrillaVirtual(tree, y_scroll, formatear=lambda fila: (...), iid=lambda fila: fila[0])
+    grilla.cargar_consulta(query, params)   # o grilla.cargar_lista(filas)
+    fila = grilla.filas[iid]                # fila cruda de una fila ya mostrada
+"""
+
+import itertools
+
+from conexion_bd import obtener_conexion
+
+# Filas que se traen/insertan por cada ventana
+TAM_VENTANA = 200
+
+# Fracción de desplazamiento a partir de la cual se pide la siguiente ventana
+UMBRAL_DESPLAZAMIENTO = 0.9
+
+
+class GrillaVirtual:
+    """Envoltorio de un ttk.Treeview con carga incremental por ventanas."""
+
+    _secuencia = itertools.count(1)
+
+    def __init__(self, tree, y_scroll, formatear=None, iid=None, tam_ventana=TAM_VENTANA):
+        """
+        Args:
+            tree: ttk.Treeview ya creado
+            y_scroll: Scrollbar vertical asociada al tree
+            formatear: función(fila) -> tupla de valores a mostrar (por defecto la fila tal cual)
+            iid: función(fila) -> iid del item (por defecto lo asigna el Treeview)
+        """
+        self.tree = tree
+        self.y_scroll = y_scroll
+        self.formatear = formatear or (lambda fila: fila)
+        self.iid = iid
+        self.tam_ventana = tam_ventana
+
+        self.filas = {}        # iid -> fila cruda de lo ya insertado
+        self.cargadas = 0
+        self.agotado = True
+
+        self._conn = None
+        self._cursor = None
+        self._iterador = None
+        self._pidiendo = False
+
+        self.tree.configure(yscrollcommand=self._on_desplazamiento)
+        self.tree.bind('<Destroy>', lambda e: self.cerrar(), add='+')
+
+    def cargar_consulta(self, query, params=()):
+        """Ejecuta la consulta con un cursor del servidor y muestra la primera ventana."""
+        self._reiniciar()
+
+        self._conn = obtener_conexion()
+        try:
+            self._cursor = self._conn.cursor(name=f"grilla_virtual_{next(self._secuencia)}")
+            self._cursor.itersize = self.tam_ventana
+            self._cursor.execute(query, params)
+        except Exception:
+            self.cerrar()
+            raise
+
+        self.agotado = False
+        self.siguiente_ventana()
+
+    def cargar_lista(self, filas):
+        """Muestra una lista en memoria, insertándola por ventanas."""
+        self._reiniciar()
+        self._iterador = iter(filas)
+        self.agotado = False
+        self.siguiente_ventana()
+
+    def siguiente_ventana(self):
+        """Trae e inserta la siguiente ventana de filas. Retorna cuántas se insertaron."""
+        if self.agotado:
+            return 0
+
+        if self._cursor is not None:
+            lote = self._cursor.fetchmany(self.tam_ventana)
+        else:
+            lote = list(itertools.islice(self._iterador, self.tam_ventana))
+
+        for fila in lote:
+            if self.iid:
+                item = self.iid(fila)
+                self.tree.insert('', 'end', iid=item, values=self.formatear(fila))
+            else:
+                item = self.tree.insert('', 'end', values=self.formatear(fila))
+            self.filas[item] = fila
+
+        self.cargadas += len(lote)
+        if len(lote) < self.tam_ventana:
+            self.agotado = True
+            self._liberar()
+
+        return len(lote)
+
+    def cerrar(self):
+        """Libera el cursor del servidor y devuelve la conexión al pool."""
+        self.agotado = True
+        self._liberar()
+
+    def _reiniciar(self):
+        self.cerrar()
+        self.tree.delete(*self.tree.get_children())
+        self.filas = {}
+        self.cargadas = 0
+        self._iterador = None
+
+    def _liberar(self):
+        if self._cursor is not None:
+            try:
+                self._cursor.close()
+            except Exception:
+                pass
+            self._cursor = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _on_desplazamiento(self, primero, ultimo):
+        self.y_scroll.set(primero, ultimo)
+        if self.agotado or self._pidiendo:
+            return
+        if float(ultimo) >= UMBRAL_DESPLAZAMIENTO:
+            # Diferir la consulta para no bloquear el evento de desplazamiento
+            self._pidiendo = True
+            self.tree.after_idle(self._pedir_ventana)
+
+    def _pedir_ventana(self):
+        try:
+            self.siguiente_ventana()
+        finally:
+            self._pidiendo = False
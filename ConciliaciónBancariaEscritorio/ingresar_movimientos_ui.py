@@ -11,18 +11,10 @@ Fecha: 2025-12-31
 
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
-import psycopg2
 from datetime import datetime
 from tkcalendar import DateEntry
 
-# Configuración de la base de datos
-DB_CONFIG = {
-    'host': 'localhost',
-    'port': 5433,
-    'user': 'postgres',
-    'password': 'SLB',
-    'database': 'Mvtos'
-}
+from conexion_bd import obtener_conexion
 
 class IngresarMovimientosGUI:
     def __init__(self, root):
@@ -165,7 +157,7 @@ class IngresarMovimientosGUI:
     def cargar_datos_iniciales(self):
         """Carga datos de los combos desde BD."""
         try:
-            conn = psycopg2.connect(**DB_CONFIG)
+            conn = obtener_conexion()
             cursor = conn.cursor()
             
             # 1. Cuentas
@@ -286,7 +278,7 @@ class IngresarMovimientosGUI:
             concepto_id = int(concepto_txt.split(':')[0]) if concepto_txt and ':' in concepto_txt else None
             
             # Insertar
-            conn = psycopg2.connect(**DB_CONFIG)
+            conn = obtener_conexion()
             cursor = conn.cursor()
             
             sql = """
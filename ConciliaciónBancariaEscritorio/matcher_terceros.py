@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Matcher de Terceros - Herramientas de Escritorio
+Sugerencia difusa de terceros a partir de la descripción de un movimiento.
+
+Los alias activos de tercero_descripciones se cargan y normalizan una sola vez
+y se mantienen en memoria. Antes de puntuar se consulta una firma liviana de
+la tabla (conteo, id máximo y hash del contenido); solo si cambió se vuelven
+a cargar los alias. La puntuación usa rapidfuzz (token_set_ratio) con
+score_cutoff, de modo que los candidatos por debajo del umbral se descartan
+sin calcular el puntaje completo.
+
+Uso:
+    from matcher_terceros import obtener_matcher
+
+    sugerencias = obtener_matcher().sugerir("PAGO PSE EPM MEDELLIN")
+    # [(terceroid, tercero, score), ...] ordenado por score descendente
+"""
+
+import threading
+import time
+
+from rapidfuzz import fuzz, process, utils
+
+from conexion_bd import obtener_conexion, ejecutar_preparada
+
+UMBRAL_SIMILITUD = 60
+
+# Segundos durante los cuales se confía en la caché sin volver a consultar la firma
+SEGUNDOS_VERIFICACION = 30
+
+
+class MatcherTerceros:
+    """Caché de alias normalizados con puntuación difusa."""
+
+    def __init__(self, umbral=UMBRAL_SIMILITUD):
+        self.umbral = umbral
+        self._lock = threading.Lock()
+        self._firma = None
+        self._ultima_verificacion = 0.0
+        self._alias = []       # Descripciones normalizadas (choices de rapidfuzz)
+        self._terceros = []    # (terceroid, tercero) alineado con _alias
+
+    def invalidar(self):
+        """
+        Fuerza la recarga de alias en la próxima consulta. Deben llamarlo los
+        guardados de terceros o alias de este proceso; los de otros procesos los
+        detecta la firma al vencer SEGUNDOS_VERIFICACION.
+        """
+        with self._lock:
+            self._firma = None
+            self._ultima_verificacion = 0.0
+
+    def _asegurar_cargado(self):
+        """Recarga los alias solo si la firma de tercero_descripciones cambió."""
+        ahora = time.monotonic()
+        if self._firma is not None and ahora - self._ultima_verificacion < SEGUNDOS_VERIFICACION:
+            return
+
+        conn = obtener_conexion()
+        try:
+            cursor = conn.cursor()
+            ejecutar_preparada(cursor, 'firma_alias_terceros')
+            firma = tuple(cursor.fetchone())
+
+            if firma != self._firma:
+                ejecutar_preparada(cursor, 'alias_terceros_activos')
+                filas = cursor.fetchall()
+                alias = []
+                terceros = []
+                for tid, tercero, descripcion in filas:
+                    normalizada = utils.default_process(descripcion)
+                    if normalizada:
+                        alias.append(normalizada)
+                        terceros.append((tid, tercero))
+                self._alias = alias
+                self._terceros = terceros
+                self._firma = firma
+
+            self._ultima_verificacion = ahora
+            cursor.close()
+        finally:
+            conn.close()
+
+    def sugerir(self, descripcion, limite=None):
+        """
+        Retorna los terceros cuyos alias superan el umbral de similitud con la descripción.
+        Un tercero con varios alias aparece una sola vez, con su mejor puntaje.
+
+        Returns:
+            list: [(terceroid, tercero, score), ...] ordenado por score descendente
+        """
+        consulta = utils.default_process(descripcion or '')
+        if not consulta:
+            return []
+
+        with self._lock:
+            self._asegurar_cargado()
+            alias = self._alias
+            terceros = self._terceros
+
+        coincidencias = process.extract(
+            consulta,
+            alias,
+            scorer=fuzz.token_set_ratio,
+            processor=None,
+            score_cutoff=self.umbral,
+            limit=None
+        )
+        return self._agrupar_por_tercero(
+            ((indice, score) for _, score, indice in coincidencias),
+            terceros,
+            limite
+        )
+
+    @staticmethod
+    def _agrupar_por_tercero(puntajes, terceros, limite):
+        mejores = {}
+        for indice, score in puntajes:
+            tid, tercero = terceros[indice]
+            if tid not in mejores or score > mejores[tid][2]:
+                mejores[tid] = (tid, tercero, score)
+        ordenados = sorted(mejores.values(), key=lambda x: x[2], reverse=True)
+        return ordenados[:limite] if limite else ordenados
+
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+
+def obtener_matcher():
+    """Retorna la instancia compartida del matcher (se crea al primer uso)."""
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = MatcherTerceros()
+    return _matcher
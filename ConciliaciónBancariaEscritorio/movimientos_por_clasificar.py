@@ -13,16 +13,10 @@ from tkinter import ttk, scrolledtext, messagebox
 import psycopg2
 from datetime import datetime
 import re
-from thefuzz import fuzz
 
-# Configuración de la base de datos
-DB_CONFIG = {
-    'host': 'localhost',
-    'port': 5433,
-    'user': 'postgres',
-    'password': 'SLB',
-    'database': 'Mvtos'
-}
+from conexion_bd import obtener_conexion, ejecutar_preparada
+from matcher_terceros import obtener_matcher
+from prefetch_clasificacion import PrefetcherClasificacion, PREFETCH_SIGUIENTES
 
 
 class AsignarClasificacionGUI:
@@ -58,6 +52,10 @@ class AsignarClasificacionGUI:
         self.grupo_seleccionado_id = None
         self.concepto_seleccionado_id = None
         self.regla_actual = None  # Almacena la regla detectada para el movimiento actual
+        self.contexto_actual = None  # Entrada precalculada del movimiento en edición
+        
+        # Precarga en segundo plano del contexto de los siguientes pendientes
+        self.prefetcher = PrefetcherClasificacion(self._calcular_contexto)
         
         # Filtro de Cuenta
         self.cuenta_filtro_id = None
@@ -247,13 +245,13 @@ class AsignarClasificacionGUI:
     
     def cargar_cuentas_filtro(self):
         """Carga las cuentas disponibles para el filtro."""
+        conn = None
         try:
-            conn = psycopg2.connect(**DB_CONFIG)
+            conn = obtener_conexion()
             cursor = conn.cursor()
             cursor.execute("SELECT cuentaid, cuenta FROM cuentas ORDER BY cuenta")
             cuentas = cursor.fetchall()
             cursor.close()
-            conn.close()
             
             # Formato: "ID: Nombre"
             self.cuentas_filtro_map = {f"{c[0]}: {c[1]}": c[0] for c in cuentas}
@@ -263,6 +261,10 @@ class AsignarClasificacionGUI:
             
         except Exception as e:
             self.agregar_log(f"✗ Error al cargar cuentas: {e}", 'error')
+        finally:
+            # Devolver la conexión al pool aunque falle la consulta
+            if conn:
+                conn.close()
 
     def on_cuenta_filtro_changed(self, event):
         """Maneja el cambio de filtro de cuenta."""
@@ -276,8 +278,9 @@ class AsignarClasificacionGUI:
 
     def cargar_movimientos_pendientes(self):
         """Carga los movimientos que faltan tercero, grupo o concepto."""
+        conn = None
         try:
-            conn = psycopg2.connect(**DB_CONFIG)
+            conn = obtener_conexion()
             cursor = conn.cursor()
             
             # Construir query dinámica
@@ -301,6 +304,8 @@ class AsignarClasificacionGUI:
             cursor.execute(sql, tuple(params))
             
             self.movimientos_pendientes = cursor.fetchall()
+            cursor.close()
+            conn.close()
             
             # Limpiar TreeView
             for item in self.pendientes_tree.get_children():
@@ -332,16 +337,19 @@ class AsignarClasificacionGUI:
                     cuenta_nombre if cuenta_nombre else ""
                 ))
             
-            cursor.close()
-            conn.close()
-            
             # Actualizar contador
             self.lbl_contador.config(text=f"Movimientos por revisar: {len(self.movimientos_pendientes)}")
             
             self.agregar_log(f"✓ Cargados {len(self.movimientos_pendientes)} movimientos pendientes", 'success')
             
+            # Precalcular el contexto de los primeros pendientes
+            self.prefetcher.programar([mov[0] for mov in self.movimientos_pendientes[:PREFETCH_SIGUIENTES]])
+            
         except Exception as e:
             self.agregar_log(f"✗ Error al cargar movimientos: {e}", 'error')
+        finally:
+            if conn:
+                conn.close()
     
     def seleccionar_movimiento(self, event):
         """Maneja la selección de un movimiento pendiente."""
@@ -354,26 +362,41 @@ class AsignarClasificacionGUI:
         
         self.agregar_log(f"📝 Abriendo editor para movimiento ID={mov_id}", 'info')
         
+        # Precalcular los siguientes mientras el usuario trabaja en este
+        ids = [mov[0] for mov in self.movimientos_pendientes]
+        if mov_id in ids:
+            inicio = ids.index(mov_id) + 1
+            self.prefetcher.programar(ids[inicio:inicio + PREFETCH_SIGUIENTES])
+        
         # Cargar datos y abrir modal
         self.abrir_editor_modal(mov_id)
 
     def abrir_editor_modal(self, mov_id):
         """Abre una ventana modal para editar el movimiento."""
-        try:
-            conn = psycopg2.connect(**DB_CONFIG)
-            cursor = conn.cursor()
-            cursor.execute("SELECT Id, Fecha, Descripcion, Referencia, Valor, TerceroID, GrupoID, ConceptoID, Detalle FROM movimientos WHERE Id = %s", (mov_id,))
-            data = cursor.fetchone()
-            cursor.close()
-            conn.close()
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo cargar el movimiento: {e}")
-            return
+        # Usar el contexto precalculado si está listo; si no, calcularlo al vuelo
+        entrada = self.prefetcher.obtener(mov_id)
+        if entrada is None:
+            conn = None
+            try:
+                conn = obtener_conexion()
+                cursor = conn.cursor()
+                entrada = self._calcular_contexto(cursor, mov_id)
+                cursor.close()
+            except Exception as e:
+                messagebox.showerror("Error", f"No se pudo cargar el movimiento: {e}")
+                return
+            finally:
+                if conn:
+                    conn.close()
+            if entrada:
+                self.prefetcher.guardar(mov_id, entrada)
 
-        if not data:
+        if not entrada:
             return
             
+        data = entrada['movimiento']
         self.movimiento_actual = data
+        self.contexto_actual = entrada
         
         # Crear ventana modal
         dialog = tk.Toplevel(self.root)
@@ -441,15 +464,14 @@ class AsignarClasificacionGUI:
         self.lbl_patron.grid(row=2, column=0, columnspan=6, sticky=tk.W, pady=(5,0))
         
         # Lógica de detección de patrón y contexto (para cargar contexto aunque no se muestre interactivo acá)
-        patron_ref = self.detectar_patron_referencia(data[3])
+        patron_ref = entrada['patron_ref']
         if patron_ref == 'celular':
              self.lbl_patron.config(text="📱 Celular detectado en referencia")
         elif patron_ref == 'cuenta':
              self.lbl_patron.config(text="🏦 Cuenta bancaria detectada en referencia")
         
         # Detectar regla automática
-        # Detectar regla automática
-        self.regla_actual = self.detectar_regla(data[2])
+        self.regla_actual = entrada['regla']
         # self.cargar_contexto_historico... MOVIDO ABAJO para que existan los combos
 
         # --- Clasificación ---
@@ -495,10 +517,10 @@ class AsignarClasificacionGUI:
         
         # Cargar contexto histórico AHORA que los combos existen
         # (Esto puede setear valores en los combos si encuentra reglas)
-        self.cargar_contexto_historico(data[1], data[3], patron_ref, data[5], data[6], data[7]) 
+        self.cargar_contexto_historico(entrada)
 
         # Configure Combos Data
-        self.cargar_terceros_para_busqueda() # Repopulate third combos
+        self.cargar_terceros_para_busqueda(resultado=self._terceros_todos(entrada)) # Repopulate third combos
         # Set values if exist
         if data[5]: # TerceroID
             # Asignar valor al combo (buscando en values)
@@ -582,8 +604,9 @@ class AsignarClasificacionGUI:
              try: cid = int(c_text.split(':')[0])
              except: pass
 
+        conn = None
         try:
-            conn = psycopg2.connect(**DB_CONFIG)
+            conn = obtener_conexion()
             cursor = conn.cursor()
             
             cursor.execute("""
@@ -598,6 +621,10 @@ class AsignarClasificacionGUI:
             
             self.agregar_log(f"✓ Movimiento ID={mov_id} actualizado.", 'success')
             
+            # Descartar los contextos precalculados que este cambio pudo alterar
+            guardado = self.movimiento_actual
+            self.prefetcher.invalidar(lambda e: self._contexto_afectado(e, guardado))
+            
             # Cerrar modal
             if hasattr(self, 'current_dialog'):
                 self.current_dialog.destroy()
@@ -607,6 +634,10 @@ class AsignarClasificacionGUI:
             
         except Exception as e:
             messagebox.showerror("Error", f"Error al guardar: {e}")
+        finally:
+            # Al volver al pool se descarta cualquier transacción sin confirmar
+            if conn:
+                conn.close()
     
     def seleccionar_desde_contexto(self, event):
         """
@@ -693,60 +724,162 @@ class AsignarClasificacionGUI:
         
         return None
     
-    def cargar_contexto_historico(self, fecha_mov, referencia_mov, patron, tercero_id, grupo_id, concepto_id):
-        """Carga los 5 registros anteriores completos."""
-        try:
-            conn = psycopg2.connect(**DB_CONFIG)
-            cursor = conn.cursor()
-            
-            desc_mov = ""
-            if self.movimiento_actual:
-                desc_mov = self.movimiento_actual[2]
+    def _calcular_contexto(self, cursor, mov_id):
+        """
+        Consulta todo lo que el editor necesita para un movimiento: datos, contexto
+        histórico, regla, tercero/grupo/concepto sugeridos y catálogos.
+        No toca widgets, de modo que puede ejecutarse en el hilo del prefetcher.
+        
+        Returns:
+            dict con los resultados, o None si el movimiento no existe
+        """
+        ejecutar_preparada(cursor, 'movimiento_por_id', (mov_id,))
+        data = cursor.fetchone()
+        if not data:
+            return None
+        
+        fecha_mov, desc_mov, referencia_mov = data[1], data[2] or "", data[3]
+        entrada = {
+            'movimiento': data,
+            'patron_ref': self.detectar_patron_referencia(referencia_mov),
+            'regla': self.detectar_regla(desc_mov),
+            'prefijo': None,
+            'tercero_regla': None,
+            'tercero_referencia': None,
+            'origen_referencia': "",
+            'tercero_contexto': None,
+            'busqueda_terceros': None,
+            'grupo_sugerido': None,
+            'concepto_sugerido': None,
+            'lote_pendientes': None,
+        }
+        
+        # Estrategia de búsqueda de contexto:
+        # 1. Si hay referencia -> Buscar por referencia
+        # 2. Si NO hay referencia -> Buscar por similitud en descripción (ej. "Traslado A Fondo")
+        if referencia_mov:
+            ejecutar_preparada(cursor, 'contexto_por_referencia', (referencia_mov, fecha_mov))
+        else:
+            palabras = desc_mov.split()
+            prefijo = " ".join(palabras[:2]) if len(palabras) >= 2 else (palabras[0] if palabras else "")
+            entrada['prefijo'] = prefijo
+            ejecutar_preparada(cursor, 'contexto_por_descripcion', (f"%{prefijo}%", fecha_mov))
+        
+        contexto = cursor.fetchall()
+        entrada['contexto'] = contexto
+        regla = entrada['regla']
+        
+        # 1. REGLA DE NEGOCIO (Prioridad Máxima)
+        if regla:
+            ejecutar_preparada(cursor, 'tercero_por_id', (regla['tid'],))
+            entrada['tercero_regla'] = cursor.fetchone()
             
-            # Detectar Regla al inicio
-            self.regla_actual = self.detectar_regla(desc_mov)
+            cursor.execute("""
+                SELECT COUNT(*)
+                FROM movimientos
+                WHERE Descripcion ILIKE %s
+                  AND Id != %s
+                  AND (TerceroID IS NULL OR GrupoID IS NULL OR ConceptoID IS NULL)
+            """, (f"%{regla['patron']}%", data[0]))
+            row = cursor.fetchone()
+            entrada['lote_pendientes'] = row[0] if row else 0
+        
+        if not entrada['tercero_regla']:
+            # 2. REFERENCIA exacta: a) alias en tercero_descripciones, b) histórico de movimientos
+            if referencia_mov:
+                ejecutar_preparada(cursor, 'tercero_por_referencia_alias', (referencia_mov,))
+                entrada['tercero_referencia'] = cursor.fetchone()
+                if entrada['tercero_referencia']:
+                    entrada['origen_referencia'] = "Maestro"
+                else:
+                    ejecutar_preparada(cursor, 'tercero_por_referencia_historial', (referencia_mov,))
+                    entrada['tercero_referencia'] = cursor.fetchone()
+                    if entrada['tercero_referencia']:
+                        entrada['origen_referencia'] = "Historial"
+            
+            if not entrada['tercero_referencia']:
+                # 3. Contexto histórico (ordenado por fecha DESC): primero que tenga Tercero
+                for ctx in contexto:
+                    ctx_tid = ctx[7]
+                    if ctx_tid:
+                        ejecutar_preparada(cursor, 'tercero_por_id', (ctx_tid,))
+                        t_info = cursor.fetchone()
+                        if t_info:
+                            entrada['tercero_contexto'] = (ctx_tid, t_info[1])
+                            break
+                
+                # 4. Búsqueda por alias / nombre / similitud
+                if not entrada['tercero_contexto']:
+                    entrada['busqueda_terceros'] = self._consultar_terceros(cursor, desc_mov)
+        
+        # Sugerencia de grupo/concepto por contexto (solo si no aplica regla)
+        if not regla and contexto:
+            # indices: c_fecha(0), c_desc(1), c_ref(2), c_valor(3), c_tercero(4), c_grupo(5), c_concepto(6), c_tid(7), c_gid(8), c_cid(9)
+            grupos_ctx = [ctx[8] for ctx in contexto if ctx[8]]
+            conceptos_ctx = [ctx[9] for ctx in contexto if ctx[9]]
+            
+            # Si todos los registros del contexto tienen el mismo grupo
+            if grupos_ctx and len(set(grupos_ctx)) == 1:
+                ejecutar_preparada(cursor, 'grupo_por_id', (grupos_ctx[0],))
+                grupo_nombre = cursor.fetchone()
+                if grupo_nombre:
+                    entrada['grupo_sugerido'] = (grupos_ctx[0], grupo_nombre[0])
+            
+            # Si todos los registros del contexto tienen el mismo concepto
+            if conceptos_ctx and len(set(conceptos_ctx)) == 1:
+                ejecutar_preparada(cursor, 'concepto_por_id', (conceptos_ctx[0],))
+                concepto_nombre = cursor.fetchone()
+                if concepto_nombre:
+                    entrada['concepto_sugerido'] = (conceptos_ctx[0], concepto_nombre[0])
+        
+        # Catálogos para los combos
+        if entrada['busqueda_terceros']:
+            entrada['terceros'] = entrada['busqueda_terceros'][0]
+        else:
+            entrada['terceros'] = self._consultar_terceros(cursor)[0]
+        
+        cursor.execute("SELECT grupoid, grupo FROM grupos ORDER BY grupo")
+        entrada['grupos'] = cursor.fetchall()
+        cursor.execute("SELECT conceptoid, concepto, grupoid_fk FROM conceptos ORDER BY concepto")
+        entrada['conceptos'] = cursor.fetchall()
+        
+        return entrada
+    
+    def _contexto_afectado(self, entrada, guardado):
+        """Indica si la entrada precalculada pudo cambiar al clasificar el movimiento guardado."""
+        mov = entrada['movimiento']
+        if mov[0] == guardado[0]:
+            return True
+        # Misma referencia: cambia el contexto y el tercero por historial
+        if mov[3] and mov[3] == guardado[3]:
+            return True
+        # Contexto por descripción (LIKE '%prefijo%')
+        if entrada['prefijo'] is not None and entrada['prefijo'] in (guardado[2] or ""):
+            return True
+        # Conteo del lote de la misma regla
+        if entrada['regla'] and entrada['regla'] is self.detectar_regla(guardado[2]):
+            return True
+        return False
+    
+    def _terceros_todos(self, entrada):
+        """Resultado de búsqueda de terceros equivalente a 'mostrar todos'."""
+        return (entrada['terceros'], 'todos', entrada['terceros'])
+    
+    def cargar_contexto_historico(self, entrada):
+        """Muestra los 5 registros anteriores y aplica las sugerencias precalculadas."""
+        try:
+            data = entrada['movimiento']
+            referencia_mov = data[3]
+            desc_mov = data[2] or ""
             
-            # Estrategia de búsqueda de contexto:
-            # 1. Si hay referencia -> Buscar por referencia
-            # 2. Si NO hay referencia -> Buscar por similitud en descripción (ej. "Traslado A Fondo")
+            self.regla_actual = entrada['regla']
             
             if referencia_mov:
-                cursor.execute("""
-                    SELECT m.Fecha, m.Descripcion, m.Referencia, m.Valor,
-                           t.tercero, g.grupo, c.concepto,
-                           m.TerceroID, m.GrupoID, m.ConceptoID
-                    FROM movimientos m
-                    LEFT JOIN terceros t ON m.TerceroID = t.terceroid
-                    LEFT JOIN grupos g ON m.GrupoID = g.grupoid
-                    LEFT JOIN conceptos c ON m.ConceptoID = c.conceptoid
-                    WHERE m.Referencia = %s
-                      AND m.Fecha < %s
-                      AND m.TerceroID IS NOT NULL
-                    ORDER BY m.Fecha DESC
-                    LIMIT 5
-                """, (referencia_mov, fecha_mov))
                 self.agregar_log(f"🔍 Buscando contexto con referencia: {referencia_mov}", 'info')
             else:
-                palabras = desc_mov.split()
-                prefijo = " ".join(palabras[:2]) if len(palabras) >= 2 else (palabras[0] if palabras else "")
-                
-                cursor.execute("""
-                    SELECT m.Fecha, m.Descripcion, m.Referencia, m.Valor,
-                           t.tercero, g.grupo, c.concepto,
-                           m.TerceroID, m.GrupoID, m.ConceptoID
-                    FROM movimientos m
-                    LEFT JOIN terceros t ON m.TerceroID = t.terceroid
-                    LEFT JOIN grupos g ON m.GrupoID = g.grupoid
-                    LEFT JOIN conceptos c ON m.ConceptoID = c.conceptoid
-                    WHERE m.Descripcion LIKE %s
-                      AND m.Fecha < %s
-                      AND m.TerceroID IS NOT NULL
-                    ORDER BY m.Fecha DESC
-                    LIMIT 5
-                """, (f"%{prefijo}%", fecha_mov))
-                self.agregar_log(f"🔍 Buscando contexto por descripción similar: {prefijo}...", 'info')
-            
-            self.contexto_historico = cursor.fetchall()
+                self.agregar_log(f"🔍 Buscando contexto por descripción similar: {entrada['prefijo']}...", 'info')
+            
+            self.contexto_historico = entrada['contexto']
             
             # Limpiar TreeView de contexto
             for item in self.contexto_tree.get_children():
@@ -773,119 +906,57 @@ class AsignarClasificacionGUI:
             # Limpiar selección previa
             self.tercero_combo.set('')
             self.tercero_seleccionado_id = None
-                    
-            tercero_asignado_por_regla = False
             
-            # 1. Aplicar REGLA DE NEGOCIO (Prioridad Máxima)
-            if self.regla_actual:
-                tid = self.regla_actual['tid']
-                cursor.execute("SELECT terceroid, tercero FROM terceros WHERE terceroid = %s", (tid,))
-                res = cursor.fetchone()
-                if res:
-                    t_db, tname = res
-                    self.tercero_combo.set(f"{t_db}: {tname}")
-                    self.tercero_seleccionado_id = t_db
-                    self.agregar_log(f"✨ Regla aplicada: '{self.regla_actual['patron']}' -> Tercero {t_db}", 'success')
-                    tercero_asignado_por_regla = True
-            
-            if not tercero_asignado_por_regla:
-                # 2. Intentar buscar por REFERENCIA exacta en TERCEROS (Maestro)
-                tercero_encontrado_por_ref = None
-                origen_ref = ""
+            if entrada['tercero_regla']:
+                # 1. Aplicar REGLA DE NEGOCIO (Prioridad Máxima)
+                t_db, tname = entrada['tercero_regla']
+                self.tercero_combo.set(f"{t_db}: {tname}")
+                self.tercero_seleccionado_id = t_db
+                self.agregar_log(f"✨ Regla aplicada: '{self.regla_actual['patron']}' -> Tercero {t_db}", 'success')
+            elif entrada['tercero_referencia']:
+                # 2. Tercero por REFERENCIA exacta (Maestro o Historial)
+                tid, tname = entrada['tercero_referencia']
+                self.tercero_combo.set(f"{tid}: {tname}")
+                self.tercero_seleccionado_id = tid
+                self.agregar_log(f"✓ Tercero encontrado por Referencia ({entrada['origen_referencia']}): {referencia_mov}", 'success')
+                # Cargar lista completa
+                self.cargar_terceros_para_busqueda(resultado=self._terceros_todos(entrada))
+            elif entrada['tercero_contexto']:
+                # 3. Tercero del contexto histórico (Prioridad sobre Fuzzy)
+                tid, tname = entrada['tercero_contexto']
+                self.tercero_combo.set(f"{tid}: {tname}")
+                self.tercero_seleccionado_id = tid
+                self.agregar_log(f"✓ Tercero sugerido por historial reciente: {tname}", 'success')
+                # Igual cargamos la lista completa para permitir cambiar
+                self.cargar_terceros_para_busqueda(resultado=self._terceros_todos(entrada))
+            else:
+                # 4. Si no hay match por referencia ni historial, comportamiento normal
                 if referencia_mov:
-                    # a) Buscar en tabla tercero_descripciones (referencia está ahí después de 3NF)
-                    cursor.execute("""
-                        SELECT t.terceroid, t.tercero 
-                        FROM terceros t
-                        JOIN tercero_descripciones td ON t.terceroid = td.terceroid
-                        WHERE td.referencia = %s AND td.activa = TRUE
-                        LIMIT 1
-                    """, (referencia_mov,))
-                    tercero_encontrado_por_ref = cursor.fetchone()
-                    if tercero_encontrado_por_ref:
-                        origen_ref = "Maestro"
-                    else:
-                        # b) Buscar en Histórico de Movimientos
-                        cursor.execute("""
-                            SELECT t.terceroid, t.tercero 
-                            FROM movimientos m
-                            JOIN terceros t ON m.TerceroID = t.terceroid
-                            WHERE m.Referencia = %s AND m.TerceroID IS NOT NULL
-                            LIMIT 1
-                        """, (referencia_mov,))
-                        tercero_encontrado_por_ref = cursor.fetchone()
-                        if tercero_encontrado_por_ref:
-                            origen_ref = "Historial"
+                    self.agregar_log(f"ℹ Referencia '{referencia_mov}' no existe en Terceros ni historial. Abriendo creación...", 'warning')
+                    # Abrir diálogo para crear nuevo tercero automáticamente
+                    self.root.after(100, self.crear_nuevo_tercero)
                 
-                if tercero_encontrado_por_ref:
-                     tid, tname = tercero_encontrado_por_ref
-                     self.tercero_combo.set(f"{tid}: {tname}")
-                     self.tercero_seleccionado_id = tid
-                     self.agregar_log(f"✓ Tercero encontrado por Referencia ({origen_ref}): {referencia_mov}", 'success')
-                     # Cargar lista completa
-                     self.cargar_terceros_para_busqueda() 
-                else:
-                    tercero_encontrado_en_contexto = False
-                    
-                    # 3. Intentar buscar en el Contexto Histórico Recién Cargado (Prioridad sobre Fuzzy)
-                    if self.contexto_historico:
-                        # El contexto viene ordenado por fecha DESC, tomamos el primero que tenga Tercero
-                        for ctx in self.contexto_historico:
-                            # ctx indices: ... fecha(0), desc(1), ref(2), val(3), tercero_str(4) ... tid(7)
-                            ctx_tid = ctx[7]
-                            ctx_tname = ctx[4] # Este string puede venir como "ID-Nombre" o solo Nombre? SQL dice: t.tercero
-                            
-                            if ctx_tid:
-                                # Recuperar info completa del tercero para el combo
-                                cursor.execute("SELECT tercero FROM terceros WHERE terceroid = %s", (ctx_tid,))
-                                t_info = cursor.fetchone()
-                                if t_info:
-                                    tname = t_info[0]
-                                    self.tercero_combo.set(f"{ctx_tid}: {tname}")
-                                    self.tercero_seleccionado_id = ctx_tid
-                                    self.agregar_log(f"✓ Tercero sugerido por historial reciente: {tname}", 'success')
-                                    tercero_encontrado_en_contexto = True
-                                    break
-                    
-                    if not tercero_encontrado_en_contexto:
-                        # 4. Si no hay match por referencia ni historial, comportamiento normal
-                        if referencia_mov:
-                             self.agregar_log(f"ℹ Referencia '{referencia_mov}' no existe en Terceros ni historial. Abriendo creación...", 'warning')
-                             # Abrir diálogo para crear nuevo tercero automáticamente
-                             self.root.after(100, self.crear_nuevo_tercero)
-                        
-                        self.agregar_log(f"🔍 Buscando terceros similares para: '{desc_mov}'", 'info')
-                        self.cargar_terceros_para_busqueda(desc_mov)
-                    else:
-                        # Si encontramos en contexto, igual cargamos la lista completa para permitir cambiar
-                        self.cargar_terceros_para_busqueda()
+                self.agregar_log(f"🔍 Buscando terceros similares para: '{desc_mov}'", 'info')
+                self.cargar_terceros_para_busqueda(desc_mov, resultado=entrada['busqueda_terceros'])
             
             # Cargar y analizar grupos y conceptos
-            self.cargar_grupos_conceptos(grupo_id, concepto_id)
-            
-            cursor.close()
-            conn.close()
+            self.cargar_grupos_conceptos(entrada)
             
         except Exception as e:
             self.agregar_log(f"✗ Error al cargar contexto: {e}", 'error')
 
-    def cargar_grupos_conceptos(self, grupo_id_actual, concepto_id_actual):
+    def cargar_grupos_conceptos(self, entrada):
         """Carga los grupos y conceptos, sugiere basado en contexto."""
         try:
-            conn = psycopg2.connect(**DB_CONFIG)
-            cursor = conn.cursor()
-            
-            # Cargar todos los grupos
-            cursor.execute("SELECT grupoid, grupo FROM grupos ORDER BY grupo")
-            grupos = cursor.fetchall()
+            # Todos los grupos
+            grupos = entrada['grupos']
             
             # Guardar listas completas para filtrado
             self.grupos_completos = grupos
             self.grupo_combo['values'] = [f"{gid}: {nombre}" for gid, nombre in grupos]
             
-            # Cargar todos los conceptos (sin filtro por ahora)
-            cursor.execute("SELECT conceptoid, concepto, grupoid_fk FROM conceptos ORDER BY concepto")
-            conceptos = cursor.fetchall()
+            # Todos los conceptos (sin filtro por ahora)
+            conceptos = entrada['conceptos']
             
             # Guardar lista completa de conceptos con grupoid_fk
             self.conceptos_completos = conceptos  # Ahora incluye grupoid_fk
@@ -920,43 +991,28 @@ class AsignarClasificacionGUI:
                  
                  regla_aplicada = True
 
-            # Analizar contexto para sugerencias (solo si no aplicó regla)
-            if not regla_aplicada and self.contexto_historico:
-                # Extraer grupos y conceptos del contexto
-                # c_fecha, c_desc, c_ref, c_valor, c_tercero, c_grupo, c_concepto, c_tid, c_gid, c_cid = ctx
-                # indices: 0        1       2       3        4          5        6           7      8      9
-                grupos_ctx = [ctx[8] for ctx in self.contexto_historico if ctx[8]]  # GrupoID
-                conceptos_ctx = [ctx[9] for ctx in self.contexto_historico if ctx[9]]  # ConceptoID
-                
-                # Si todos los registros del contexto tienen el mismo grupo
-                if grupos_ctx and len(set(grupos_ctx)) == 1:
-                    grupo_sugerido_id = grupos_ctx[0]
-                    cursor.execute("SELECT grupo FROM grupos WHERE grupoid = %s", (grupo_sugerido_id,))
-                    grupo_nombre = cursor.fetchone()
-                    if grupo_nombre:
-                        self.lbl_grupo_sugerido.config(text=f"✓ Sugerido: {grupo_nombre[0]} (basado en contexto)")
-                        # Preseleccionar en combo
-                        for idx, val in enumerate(self.grupo_combo['values']):
-                            if val.startswith(f"{grupo_sugerido_id}:"):
-                                self.grupo_combo.current(idx)
-                                self.grupo_seleccionado_id = grupo_sugerido_id
-                                # Filtrar conceptos por este grupo
-                                self.filtrar_conceptos_por_grupo()
-                                break
-                
-                # Si todos los registros del contexto tienen el mismo concepto
-                if conceptos_ctx and len(set(conceptos_ctx)) == 1:
-                    concepto_sugerido_id = conceptos_ctx[0]
-                    cursor.execute("SELECT concepto FROM conceptos WHERE conceptoid = %s", (concepto_sugerido_id,))
-                    concepto_nombre = cursor.fetchone()
-                    if concepto_nombre:
-                        self.lbl_concepto_sugerido.config(text=f"✓ Sugerido: {concepto_nombre[0]} (basado en contexto)")
-                        # Preseleccionar en combo
-                        for idx, val in enumerate(self.concepto_combo['values']):
-                            if val.startswith(f"{concepto_sugerido_id}:"):
-                                self.concepto_combo.current(idx)
-                                self.concepto_seleccionado_id = concepto_sugerido_id
-                                break
+            # Sugerencias por contexto (solo si no aplicó regla)
+            if not regla_aplicada and entrada['grupo_sugerido']:
+                grupo_sugerido_id, grupo_nombre = entrada['grupo_sugerido']
+                self.lbl_grupo_sugerido.config(text=f"✓ Sugerido: {grupo_nombre} (basado en contexto)")
+                # Preseleccionar en combo
+                for idx, val in enumerate(self.grupo_combo['values']):
+                    if val.startswith(f"{grupo_sugerido_id}:"):
+                        self.grupo_combo.current(idx)
+                        self.grupo_seleccionado_id = grupo_sugerido_id
+                        # Filtrar conceptos por este grupo
+                        self.filtrar_conceptos_por_grupo()
+                        break
+            
+            if not regla_aplicada and entrada['concepto_sugerido']:
+                concepto_sugerido_id, concepto_nombre = entrada['concepto_sugerido']
+                self.lbl_concepto_sugerido.config(text=f"✓ Sugerido: {concepto_nombre} (basado en contexto)")
+                # Preseleccionar en combo
+                for idx, val in enumerate(self.concepto_combo['values']):
+                    if val.startswith(f"{concepto_sugerido_id}:"):
+                        self.concepto_combo.current(idx)
+                        self.concepto_seleccionado_id = concepto_sugerido_id
+                        break
             
             # Validar si se puede actualizar
             # Verificar si aplica para LOTE (Si hay regla activa)
@@ -982,9 +1038,6 @@ class AsignarClasificacionGUI:
 
             self.setup_filtering(self.concepto_combo, get_conceptos_validos)
             
-            cursor.close()
-            conn.close()
-            
         except Exception as e:
             self.agregar_log(f"✗ Error al cargar grupos/conceptos: {e}", 'error')
     
@@ -1198,107 +1251,96 @@ class AsignarClasificacionGUI:
         self.limpiar_editor()
         self.agregar_log("⏭ Editor limpiado - selecciona otro movimiento", 'info')
 
-    def cargar_terceros_para_busqueda(self, descripcion_mov=None):
-        """Carga la lista de terceros, con fuzzy matching si hay descripción.
+    def _consultar_terceros(self, cursor, descripcion_mov=None):
+        """Consulta los terceros y, si hay descripción, las coincidencias por alias, nombre o similitud.
         Después de 3NF, descripcion/referencia están en tercero_descripciones.
+        No toca widgets (se usa también desde el prefetcher).
+        
+        Returns:
+            tuple: (terceros, modo, filas) con modo en 'alias', 'nombre', 'similares' o 'todos'
+        """
+        # Cargar solo terceros (sin descripcion/referencia - esas están en tercero_descripciones)
+        cursor.execute("""
+            SELECT terceroid, tercero
+            FROM terceros
+            WHERE activa = TRUE
+            ORDER BY tercero
+        """)
+        terceros = cursor.fetchall()
+        
+        if not descripcion_mov:
+            return terceros, 'todos', terceros
+        
+        desc_mov_lower = descripcion_mov.lower()
+        
+        # Coincidencia exacta por descripción en alias
+        ejecutar_preparada(cursor, 'tercero_por_alias_exacto', (desc_mov_lower,))
+        exactos = cursor.fetchall()
+        if exactos:
+            return terceros, 'alias', exactos
+        
+        # Si no hay exactos, buscar por nombre del tercero
+        ejecutar_preparada(cursor, 'tercero_por_nombre_exacto', (desc_mov_lower,))
+        por_nombre = cursor.fetchall()
+        if por_nombre:
+            return terceros, 'nombre', por_nombre
+        
+        # Si no hay exactos, usar fuzzy matching en tercero_descripciones (alias en caché)
+        terceros_similares = obtener_matcher().sugerir(descripcion_mov)
+        if terceros_similares:
+            return terceros, 'similares', terceros_similares
+        
+        return terceros, 'todos', terceros
+
+    def cargar_terceros_para_busqueda(self, descripcion_mov=None, resultado=None):
+        """Carga la lista de terceros, con fuzzy matching si hay descripción.
+        Si se recibe un resultado precalculado de _consultar_terceros no se consulta la BD.
         """
         try:
-            conn = psycopg2.connect(**DB_CONFIG)
-            cursor = conn.cursor()
-            
-            # Cargar solo terceros (sin descripcion/referencia - esas están en tercero_descripciones)
-            cursor.execute("""
-                SELECT terceroid, tercero
-                FROM terceros
-                WHERE activa = TRUE
-                ORDER BY tercero
-            """)
+            if resultado is None:
+                conn = obtener_conexion()
+                try:
+                    cursor = conn.cursor()
+                    resultado = self._consultar_terceros(cursor, descripcion_mov)
+                    cursor.close()
+                finally:
+                    conn.close()
             
-            terceros = cursor.fetchall()
+            terceros, modo, filas = resultado
             self.terceros_completos = terceros
             
-            # Si hay descripción del movimiento, buscar coincidencias en tercero_descripciones
-            if descripcion_mov:
-                desc_mov_lower = descripcion_mov.lower()
-                
-                # Buscar coincidencias en tercero_descripciones
-                cursor.execute("""
-                    SELECT DISTINCT t.terceroid, t.tercero, td.descripcion
-                    FROM terceros t
-                    JOIN tercero_descripciones td ON t.terceroid = td.terceroid
-                    WHERE td.activa = TRUE AND t.activa = TRUE
-                      AND LOWER(td.descripcion) = %s
-                """, (desc_mov_lower,))
-                exactos = cursor.fetchall()
-                
-                if exactos:
-                    # Encontramos coincidencia exacta por descripción en alias
-                    self.tercero_combo['values'] = [f"{t[0]}: {t[1]}" for t in exactos]
-                    self.agregar_log(f"✓ Encontrado tercero exacto por alias: {exactos[0][1]}", 'success')
-                    if len(exactos) == 1:
-                        self.tercero_combo.set(self.tercero_combo['values'][0])
-                        self.tercero_seleccionado_id = exactos[0][0]
-                        self.validar_actualizacion()
-                    cursor.close()
-                    conn.close()
-                    return
-                
-                # Si no hay exactos, buscar por nombre del tercero
-                cursor.execute("""
-                    SELECT terceroid, tercero
-                    FROM terceros
-                    WHERE activa = TRUE AND LOWER(tercero) = %s
-                """, (desc_mov_lower,))
-                por_nombre = cursor.fetchall()
-                
-                if por_nombre:
-                    self.tercero_combo['values'] = [f"{t[0]}: {t[1]}" for t in por_nombre]
-                    self.agregar_log(f"✓ Encontrado tercero exacto por nombre: {por_nombre[0][1]}", 'success')
-                    if len(por_nombre) == 1:
-                        self.tercero_combo.set(self.tercero_combo['values'][0])
-                        self.tercero_seleccionado_id = por_nombre[0][0]
-                        self.validar_actualizacion()
-                    cursor.close()
-                    conn.close()
-                    return
-                
-                # Si no hay exactos, usar fuzzy matching en tercero_descripciones
-                cursor.execute("""
-                    SELECT DISTINCT t.terceroid, t.tercero, td.descripcion
-                    FROM terceros t
-                    JOIN tercero_descripciones td ON t.terceroid = td.terceroid
-                    WHERE td.activa = TRUE AND t.activa = TRUE
-                """)
-                terceros_con_alias = cursor.fetchall()
-                
-                terceros_con_score = []
-                for tid, tercero, desc in terceros_con_alias:
-                    if desc:
-                        score = fuzz.token_set_ratio(descripcion_mov.lower(), desc.lower())
-                        terceros_con_score.append((tid, tercero, score))
-                    else:
-                        terceros_con_score.append((tid, tercero, 0))
-                
-                # Ordenar por score descendente
-                terceros_con_score.sort(key=lambda x: x[2], reverse=True)
-                
-                # Filtrar solo los que tienen más de 60% de similitud
-                UMBRAL_SIMILITUD = 60
-                terceros_similares = [(tid, t, s) for tid, t, s in terceros_con_score if s >= UMBRAL_SIMILITUD]
-                
-                if terceros_similares:
-                    self.tercero_combo['values'] = [
-                        f"{tid}: {tercero}" 
-                        for tid, tercero, score in terceros_similares
-                    ]
-                    self.agregar_log(f"✓ Encontrados {len(terceros_similares)} terceros similares a '{descripcion_mov[:30]}...'", 'success')
-                else:
-                    # No hay similares, mostrar todos
-                    self.tercero_combo['values'] = [
-                        f"{tid}: {tercero}" 
-                        for tid, tercero in terceros
-                    ]
-                    self.agregar_log(f"⚠ No hay terceros similares. Mostrando todos ({len(terceros)})", 'warning')
+            if modo == 'alias':
+                # Encontramos coincidencia exacta por descripción en alias
+                self.tercero_combo['values'] = [f"{t[0]}: {t[1]}" for t in filas]
+                self.agregar_log(f"✓ Encontrado tercero exacto por alias: {filas[0][1]}", 'success')
+                if len(filas) == 1:
+                    self.tercero_combo.set(self.tercero_combo['values'][0])
+                    self.tercero_seleccionado_id = filas[0][0]
+                    self.validar_actualizacion()
+                return
+            
+            if modo == 'nombre':
+                self.tercero_combo['values'] = [f"{t[0]}: {t[1]}" for t in filas]
+                self.agregar_log(f"✓ Encontrado tercero exacto por nombre: {filas[0][1]}", 'success')
+                if len(filas) == 1:
+                    self.tercero_combo.set(self.tercero_combo['values'][0])
+                    self.tercero_seleccionado_id = filas[0][0]
+                    self.validar_actualizacion()
+                return
+            
+            if modo == 'similares':
+                self.tercero_combo['values'] = [
+                    f"{tid}: {tercero}" 
+                    for tid, tercero, score in filas
+                ]
+                self.agregar_log(f"✓ Encontrados {len(filas)} terceros similares a '{descripcion_mov[:30]}...'", 'success')
+            elif descripcion_mov:
+                # No hay similares, mostrar todos
+                self.tercero_combo['values'] = [
+                    f"{tid}: {tercero}" 
+                    for tid, tercero in terceros
+                ]
+                self.agregar_log(f"⚠ No hay terceros similares. Mostrando todos ({len(terceros)})", 'warning')
             else:
                 # Sin descripción, mostrar todos (Solo ID - Nombre)
                 self.tercero_combo['values'] = [
@@ -1309,9 +1351,6 @@ class AsignarClasificacionGUI:
                 
             self.setup_filtering(self.tercero_combo, self.tercero_combo['values'])
             
-            cursor.close()
-            conn.close()
-            
         except Exception as e:
             self.agregar_log(f"✗ Error al cargar terceros: {e}", 'error')
     
@@ -1401,8 +1440,9 @@ class AsignarClasificacionGUI:
                 messagebox.showerror("Error", "El campo 'Tercero' es requerido")
                 return
             
+            conn = None
             try:
-                conn = psycopg2.connect(**DB_CONFIG)
+                conn = obtener_conexion()
                 cursor = conn.cursor()
                 
                 # Validar existencia previa (solo por nombre ahora)
@@ -1415,7 +1455,6 @@ class AsignarClasificacionGUI:
                 if existe:
                     messagebox.showerror("Duplicado", f"Ya existe un tercero con ese nombre (ID: {existe[0]}).\nNombre: {tercero_nombre}")
                     cursor.close()
-                    conn.close()
                     return
 
                 # Insertar nuevo tercero (solo columnas existentes: tercero, activa)
@@ -1433,6 +1472,10 @@ class AsignarClasificacionGUI:
                 cursor.close()
                 conn.close()
                 
+                # Los catálogos precalculados y los alias en caché ya no incluyen al nuevo tercero
+                self.prefetcher.invalidar()
+                obtener_matcher().invalidar()
+                
                 # Seleccionar el nuevo tercero
                 self.tercero_seleccionado_id = nuevo_id
                 self.tercero_combo.set(f"{nuevo_id}: {tercero_nombre}")
@@ -1447,13 +1490,15 @@ class AsignarClasificacionGUI:
                 messagebox.showinfo("Éxito", f"Tercero '{tercero_nombre}' creado correctamente")
                 
             except psycopg2.IntegrityError as e:
-                conn.rollback()
                 self.agregar_log(f"✗ Error: Tercero duplicado - {e}", 'error')
                 messagebox.showerror("Error", f"Ya existe un tercero con ese nombre:\n{e}")
             except Exception as e:
-                conn.rollback()
                 self.agregar_log(f"✗ Error al crear tercero: {e}", 'error')
                 messagebox.showerror("Error", f"Error al crear tercero:\n{e}")
+            finally:
+                # Al volver al pool se descarta la transacción fallida
+                if conn:
+                    conn.close()
         
         # Botones
         btn_frame = ttk.Frame(dialog)
@@ -1479,32 +1524,40 @@ class AsignarClasificacionGUI:
             if not self.movimiento_actual or not self.regla_actual:
                 return
 
-            conn = psycopg2.connect(**DB_CONFIG)
-            cursor = conn.cursor()
-            
-            # Usamos parámetro para el patrón
-            patron = f"%{self.regla_actual['patron']}%"
             current_id = self.movimiento_actual[0]
+            entrada = self.contexto_actual
             
-            cursor.execute("""
-                SELECT COUNT(*)
-                FROM movimientos
-                WHERE Descripcion ILIKE %s
-                  AND Id != %s
-                  AND (TerceroID IS NULL OR GrupoID IS NULL OR ConceptoID IS NULL)
-            """, (patron, current_id))
-            
-            row = cursor.fetchone()
-            count = row[0] if row else 0
+            if entrada and entrada['movimiento'][0] == current_id and entrada['lote_pendientes'] is not None:
+                # Conteo ya calculado junto con el contexto
+                count = entrada['lote_pendientes']
+            else:
+                conn = obtener_conexion()
+                try:
+                    cursor = conn.cursor()
+                    
+                    # Usamos parámetro para el patrón
+                    patron = f"%{self.regla_actual['patron']}%"
+                    
+                    cursor.execute("""
+                        SELECT COUNT(*)
+                        FROM movimientos
+                        WHERE Descripcion ILIKE %s
+                          AND Id != %s
+                          AND (TerceroID IS NULL OR GrupoID IS NULL OR ConceptoID IS NULL)
+                    """, (patron, current_id))
+                    
+                    row = cursor.fetchone()
+                    count = row[0] if row else 0
+                    
+                    cursor.close()
+                finally:
+                    conn.close()
             
             if count > 0:
                 self.btn_batch_update.config(text=f"⚡ Aplicar a Todos ({count} más)", state='normal')
                 self.agregar_log(f"ℹ Se detectaron {count} movimientos adicionales ('{self.regla_actual['patron']}') para procesar en lote.", 'info')
             else:
                 self.btn_batch_update.config(text="⚡ Aplicar a Todos", state='disabled')
-            
-            cursor.close()
-            conn.close()
         except Exception as e:
             self.agregar_log(f"✗ Error verificando lote: {e}", 'error')
             print(f"Error detallado lote: {e}")
@@ -1519,8 +1572,9 @@ class AsignarClasificacionGUI:
         cid = self.regla_actual['cid']
         patron_texto = self.regla_actual['patron']
 
+        conn = None
         try:
-            conn = psycopg2.connect(**DB_CONFIG)
+            conn = obtener_conexion()
             cursor = conn.cursor()
             
             # Usar parámetros para todo para evitar conflictos con %
@@ -1552,7 +1606,6 @@ class AsignarClasificacionGUI:
             
             if not messagebox.askyesno("Confirmar Lote", msg):
                 cursor.close()
-                conn.close()
                 return
 
             # 2. Ejecutar actualización
@@ -1570,6 +1623,7 @@ class AsignarClasificacionGUI:
             conn.commit()
             
             self.agregar_log(f"🚀 Lote procesado: {filas_afectadas} movimientos actualizados.", 'success')
+            self.prefetcher.invalidar()
             messagebox.showinfo("Lote Procesado", f"Se actualizaron {filas_afectadas} movimientos correctamente.")
             
             cursor.close()
@@ -1582,6 +1636,9 @@ class AsignarClasificacionGUI:
         except Exception as e:
             self.agregar_log(f"✗ Error al procesar lote: {e}", 'error')
             messagebox.showerror("Error", f"Error en lote: {e}")
+        finally:
+            if conn:
+                conn.close()
 
     def seleccionar_por_id(self, combo):
         """Busca el ID ingresado en los valores del combo y lo selecciona."""
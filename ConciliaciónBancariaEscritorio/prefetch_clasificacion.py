@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prefetch de Clasificación - Herramientas de Escritorio
+Precalcula en segundo plano el contexto de los próximos movimientos pendientes.
+
+Un hilo trabajador toma los IDs programados, ejecuta la función de cálculo
+(contexto histórico, regla, tercero sugerido, catálogos) con su propia conexión
+del pool y guarda el resultado en una caché acotada (LRU). La interfaz solo lee
+de la caché: nunca se tocan widgets Tk desde el hilo.
+
+Uso:
+    prefetcher = PrefetcherClasificacion(calcular)   # calcular(cursor, mov_id) -> dict | None
+    prefetcher.programar([101, 102, 103])
+    entrada = prefetcher.obtener(101)                # None si aún no está lista
+"""
+
+import threading
+from collections import OrderedDict, deque
+
+from conexion_bd import obtener_conexion
+
+# Cantidad de movimientos siguientes que se precalculan tras cada selección
+PREFETCH_SIGUIENTES = 10
+
+# Máximo de entradas retenidas en memoria
+CAPACIDAD_CACHE = 30
+
+
+class PrefetcherClasificacion:
+    """Caché acotada de contextos de clasificación alimentada por un hilo de fondo."""
+
+    def __init__(self, calcular, capacidad=CAPACIDAD_CACHE):
+        self._calcular = calcular
+        self._capacidad = capacidad
+        self._cache = OrderedDict()
+        self._cola = deque()
+        self._lock = threading.Lock()
+        self._evento = threading.Event()
+        self._generacion = 0
+        self._activo = True
+
+        self._hilo = threading.Thread(target=self._trabajar, daemon=True)
+        self._hilo.start()
+
+    def programar(self, mov_ids):
+        """Reemplaza la cola de trabajo por los IDs dados (los ya cacheados se omiten)."""
+        with self._lock:
+            self._cola = deque(mid for mid in mov_ids if mid not in self._cache)
+        self._evento.set()
+
+    def obtener(self, mov_id):
+        """Retorna la entrada precalculada o None si no está disponible."""
+        with self._lock:
+            entrada = self._cache.get(mov_id)
+            if entrada is not None:
+                self._cache.move_to_end(mov_id)
+            return entrada
+
+    def guardar(self, mov_id, entrada):
+        """Agrega una entrada calculada fuera del hilo (p.ej. de forma síncrona en la UI)."""
+        with self._lock:
+            self._guardar(mov_id, entrada)
+
+    def invalidar(self, criterio=None):
+        """
+        Descarta entradas de la caché.
+
+        Args:
+            criterio: función(entrada) -> bool; si es None se descarta todo.
+        """
+        with self._lock:
+            self._generacion += 1
+            if criterio is None:
+                self._cache.clear()
+            else:
+                for mov_id in [mid for mid, e in self._cache.items() if criterio(e)]:
+                    del self._cache[mov_id]
+
+    def detener(self):
+        self._activo = False
+        self._evento.set()
+
+    def _guardar(self, mov_id, entrada):
+        self._cache[mov_id] = entrada
+        self._cache.move_to_end(mov_id)
+        while len(self._cache) > self._capacidad:
+            self._cache.popitem(last=False)
+
+    def _siguiente(self):
+        with self._lock:
+            while self._cola:
+                mov_id = self._cola.popleft()
+                if mov_id not in self._cache:
+                    return mov_id, self._generacion
+            self._evento.clear()
+            return None, None
+
+    def _trabajar(self):
+        while self._activo:
+            self._evento.wait()
+            if not self._activo:
+                break
+
+            mov_id, generacion = self._siguiente()
+            if mov_id is None:
+                continue
+
+            try:
+                conn = obtener_conexion()
+                try:
+                    cursor = conn.cursor()
+                    entrada = self._calcular(cursor, mov_id)
+                    cursor.close()
+                finally:
+                    conn.close()
+            except Exception:
+                # El prefetch es una optimización: ante cualquier error la UI calcula al vuelo
+                continue
+
+            with self._lock:
+                # Si hubo una invalidación mientras se calculaba, la entrada puede estar obsoleta
+                if entrada is not None and generacion == self._generacion:
+                    self._guardar(mov_id, entrada)
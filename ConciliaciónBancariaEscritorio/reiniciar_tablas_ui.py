@@ -9,20 +9,12 @@ Fecha: 2025-12-29
 Actualizado: 2026-01-06 - Agregadas tablas nuevas y campo Detalle
 """
 
-import psycopg2
 from datetime import datetime
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import threading
 
-# Configuración de la base de datos
-DB_CONFIG = {
-    'host': 'localhost',
-    'port': 5433,
-    'user': 'postgres',
-    'password': 'SLB',
-    'database': 'Mvtos'
-}
+from conexion_bd import obtener_conexion, DB_CONFIG
 
 # Información de tablas con sus dependencias (orden de dependencias invertido para DROP)
 TABLAS_INFO = [
@@ -323,7 +315,7 @@ class ReiniciarTablasGUI:
     def conectar(self):
         """Conecta a la base de datos."""
         try:
-            self.conn = psycopg2.connect(**DB_CONFIG)
+            self.conn = obtener_conexion()
             return True
         except Exception as e:
             self.log(f"✗ Error al conectar: {e}", 'ERROR')
@@ -11,18 +11,10 @@ Fecha: 2025-12-29
 
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
-import psycopg2
 from datetime import datetime
 import threading
 
-# Configuración de la base de datos
-DB_CONFIG = {
-    'host': 'localhost',
-    'port': 5433,
-    'user': 'postgres',
-    'password': 'SLB',
-    'database': 'Mvtos'
-}
+from conexion_bd import obtener_conexion
 
 
 class UnificarCuotaManejoGUI:
@@ -191,7 +183,7 @@ class UnificarCuotaManejoGUI:
         try:
             # Conectar a la base de datos
             self.agregar_log("📡 Conectando a la base de datos...", 'info')
-            conn = psycopg2.connect(**DB_CONFIG)
+            conn = obtener_conexion()
             self.agregar_log("✓ Conexión exitosa", 'success')
             
             cursor = conn.cursor()
@@ -319,7 +311,7 @@ class UnificarCuotaManejoGUI:
         try:
             # Conectar a la base de datos
             self.agregar_log("📡 Conectando a la base de datos...", 'info')
-            conn = psycopg2.connect(**DB_CONFIG)
+            conn = obtener_conexion()
             cursor = conn.cursor()
             
             # Paso 1: Crear/Verificar contacto Bancolombia (sin descripcion/referencia - 3NF)
@@ -0,0 +1,247 @@
+"""
+Corpus de extractores: exactitud contra salidas "golden" y throughput.
+
+Ejecuta cada extractor disponible (los del backend en
+src/infrastructure/extractors y los heredados de extractores/ en la raíz del
+repositorio) sobre un directorio de extractos PDF. Para cada PDF compara las
+filas extraídas contra su golden JSON (mismo nombre, extensión .json) y mide
+páginas/s y filas/s.
+
+Organización del corpus: un subdirectorio por tipo de cuenta
+(bancolombia_ahorro, credit_card, fondo_renta). Si el directorio es plano, el
+tipo se deduce del nombre del archivo (Cuentas / Tarjetas / Inversiones) o se
+fija con --tipo.
+
+Uso (desde ConciliaciónBancariaWeb/Backend):
+    python -m benchmarks.generador_extractos --movimientos 3000 --destino benchmarks/corpus_sintetico
+    python -m benchmarks.corpus_extractores benchmarks/corpus_sintetico --salida benchmarks/extractores.json
+
+    # Crear goldens para extractos reales (revisarlos antes de confiar en ellos):
+    python -m benchmarks.corpus_extractores ../../MovimientosPendientes --generar-golden
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+import pdfplumber
+
+# Los extractores heredados viven en la raíz del repositorio (paquete `extractores`)
+RAIZ_REPO = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+if RAIZ_REPO not in sys.path:
+    sys.path.append(RAIZ_REPO)
+
+from src.infrastructure.extractors.bancolombia import extraer_movimientos_bancolombia  # noqa: E402
+from src.infrastructure.extractors.creditcard import extraer_movimientos_credito  # noqa: E402
+from src.infrastructure.extractors.fondorenta import extraer_movimientos_fondorenta  # noqa: E402
+from extractores import bancolombia_extractor, creditcard_extractor, fondorenta_extractor  # noqa: E402
+
+TIPOS = ('bancolombia_ahorro', 'credit_card', 'fondo_renta')
+
+# Palabras del nombre de archivo de Bancolombia -> tipo de cuenta
+TIPO_POR_NOMBRE = {
+    'cuentas': 'bancolombia_ahorro',
+    'tarjetas': 'credit_card',
+    'inversiones': 'fondo_renta',
+}
+
+
+def _abrir(funcion):
+    """Adapta un extractor del backend (recibe un archivo abierto) a una ruta."""
+    def extraer(ruta):
+        with open(ruta, 'rb') as f:
+            return funcion(f)
+    return extraer
+
+
+# tipo -> [(nombre, extractor(ruta), invierte_signo)]
+# El extractor heredado de tarjeta de crédito no invierte el signo como el del
+# backend; se normaliza para compararlos contra el mismo golden.
+EXTRACTORES = {
+    'bancolombia_ahorro': [
+        ('backend', _abrir(extraer_movimientos_bancolombia), False),
+        ('heredado', bancolombia_extractor.extraer_movimientos_bancolombia, False),
+    ],
+    'credit_card': [
+        ('backend', _abrir(extraer_movimientos_credito), False),
+        ('heredado', creditcard_extractor.extraer_movimientos_credito, True),
+    ],
+    'fondo_renta': [
+        ('backend', _abrir(extraer_movimientos_fondorenta), False),
+        ('heredado', fondorenta_extractor.extraer_movimientos_fondorenta, False),
+    ],
+}
+
+
+def normalizar(movimiento: dict, invertir_signo: bool = False) -> dict:
+    """Lleva una fila extraída a la forma del golden (fecha ISO, valor con 2 decimales)."""
+    fecha = movimiento['fecha']
+    if isinstance(fecha, (date, datetime)):
+        fecha = fecha.strftime('%Y-%m-%d')
+
+    valor = Decimal(str(movimiento['valor']))
+    if invertir_signo:
+        valor = -valor
+
+    fila = {
+        'fecha': fecha,
+        'descripcion': (movimiento.get('descripcion') or '').strip(),
+        'referencia': (movimiento.get('referencia') or '').strip(),
+        'valor': f"{valor.quantize(Decimal('0.01'))}",
+    }
+    if 'moneda' in movimiento:
+        fila['moneda'] = movimiento['moneda']
+    return fila
+
+
+def comparar_filas(esperadas, obtenidas, max_diferencias: int = 5):
+    """Compara fila a fila; retorna la lista de diferencias (limitada)."""
+    diferencias = []
+    if len(esperadas) != len(obtenidas):
+        diferencias.append(f"filas: esperadas {len(esperadas)}, obtenidas {len(obtenidas)}")
+    for i, (esperada, obtenida) in enumerate(zip(esperadas, obtenidas)):
+        if esperada != obtenida:
+            diferencias.append(f"fila {i}: esperada {esperada}, obtenida {obtenida}")
+            if len(diferencias) >= max_diferencias:
+                break
+    return diferencias
+
+
+def descubrir(directorio: str, tipo_forzado: str = None):
+    """Retorna [(ruta_pdf, tipo)] del corpus."""
+    encontrados = []
+    for raiz, _, archivos in os.walk(directorio):
+        carpeta = os.path.basename(raiz)
+        for archivo in sorted(archivos):
+            if not archivo.lower().endswith('.pdf'):
+                continue
+            tipo = tipo_forzado
+            if not tipo and carpeta in TIPOS:
+                tipo = carpeta
+            if not tipo:
+                nombre = archivo.lower()
+                tipo = next((t for clave, t in TIPO_POR_NOMBRE.items() if clave in nombre), None)
+            if tipo:
+                encontrados.append((os.path.join(raiz, archivo), tipo))
+            else:
+                print(f"  (omitido, tipo desconocido) {archivo}")
+    return encontrados
+
+
+def medir_extractor(extractor, ruta: str, repeticiones: int):
+    """Ejecuta el extractor `repeticiones` veces; retorna (filas, mejor tiempo en s)."""
+    mejor = None
+    filas = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        filas = extractor(ruta)
+        transcurrido = time.perf_counter() - inicio
+        mejor = transcurrido if mejor is None else min(mejor, transcurrido)
+    return filas, mejor
+
+
+def ejecutar(corpus, repeticiones: int = 3, generar_golden: bool = False, solo=None):
+    """
+    Ejecuta todos los extractores sobre el corpus.
+
+    Returns:
+        (resultados por archivo, total de fallos de exactitud)
+    """
+    resultados = []
+    fallos = 0
+    for ruta, tipo in corpus:
+        ruta_golden = os.path.splitext(ruta)[0] + '.json'
+        with pdfplumber.open(ruta) as pdf:
+            paginas = len(pdf.pages)
+
+        golden = None
+        if os.path.exists(ruta_golden):
+            with open(ruta_golden, encoding='utf-8') as f:
+                golden = json.load(f)
+
+        print(f"{os.path.basename(ruta)} [{tipo}] {paginas} páginas")
+        for nombre, extractor, invertir in EXTRACTORES[tipo]:
+            if solo and nombre not in solo:
+                continue
+            try:
+                filas, segundos = medir_extractor(extractor, ruta, repeticiones)
+            except Exception as e:
+                fallos += 1
+                print(f"  {nombre:<9} ERROR {e}")
+                resultados.append({'archivo': ruta, 'tipo': tipo, 'extractor': nombre, 'error': str(e)})
+                continue
+
+            obtenidas = [normalizar(m, invertir) for m in filas]
+
+            if golden is None and generar_golden and nombre == 'backend':
+                golden = {'tipo': tipo, 'paginas': paginas, 'movimientos': obtenidas}
+                with open(ruta_golden, 'w', encoding='utf-8') as f:
+                    json.dump(golden, f, indent=1, ensure_ascii=False)
+                print(f"  golden creado: {ruta_golden}")
+
+            diferencias = comparar_filas(golden['movimientos'], obtenidas) if golden else None
+            if diferencias:
+                fallos += 1
+
+            resultado = {
+                'archivo': ruta,
+                'tipo': tipo,
+                'extractor': nombre,
+                'paginas': paginas,
+                'filas': len(obtenidas),
+                'segundos': round(segundos, 4),
+                'paginas_s': round(paginas / segundos, 1) if segundos else None,
+                'filas_s': round(len(obtenidas) / segundos, 1) if segundos else None,
+                'exacto': None if golden is None else not diferencias,
+                'diferencias': diferencias or [],
+            }
+            resultados.append(resultado)
+
+            estado = 'sin golden' if golden is None else ('OK' if not diferencias else 'DIFIERE')
+            print(f"  {nombre:<9} {len(obtenidas):>6} filas  {resultado['paginas_s']:>8} pág/s  "
+                  f"{resultado['filas_s']:>9} filas/s  {estado}")
+            for diferencia in diferencias or []:
+                print(f"      {diferencia}")
+
+    return resultados, fallos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exactitud y throughput de los extractores PDF")
+    parser.add_argument('directorio', help="Directorio con los extractos PDF (y sus golden .json)")
+    parser.add_argument('--tipo', choices=TIPOS, help="Tipo de cuenta de todos los PDF del directorio")
+    parser.add_argument('--solo', nargs='*', choices=('backend', 'heredado'), help="Ejecutar solo estos extractores")
+    parser.add_argument('--repeticiones', type=int, default=3, help="Se reporta la mejor de N ejecuciones")
+    parser.add_argument('--generar-golden', action='store_true',
+                        help="Crear el golden con el extractor del backend cuando no exista")
+    parser.add_argument('--salida', help="Archivo JSON donde guardar los resultados")
+    args = parser.parse_args()
+
+    corpus = descubrir(args.directorio, args.tipo)
+    if not corpus:
+        print(f"No se encontraron extractos PDF en {args.directorio}")
+        sys.exit(1)
+
+    resultados, fallos = ejecutar(corpus, args.repeticiones, args.generar_golden, args.solo)
+
+    if args.salida:
+        os.makedirs(os.path.dirname(os.path.abspath(args.salida)), exist_ok=True)
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump({
+                'fecha': datetime.now().isoformat(timespec='seconds'),
+                'repeticiones': args.repeticiones,
+                'resultados': resultados,
+            }, f, indent=2, ensure_ascii=False)
+        print(f"Resultados guardados en {args.salida}")
+
+    if fallos:
+        print(f"{fallos} extracción(es) no coinciden con su golden o fallaron")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
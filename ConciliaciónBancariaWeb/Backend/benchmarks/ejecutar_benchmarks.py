@@ -0,0 +1,231 @@
+"""
+Suite de benchmarks de extremo a extremo del backend.
+
+Siembra (opcionalmente) la base de pruebas con generador_ledger, ejecuta los
+caminos críticos de la API en proceso (TestClient, igual que tests/) y escribe
+los percentiles p50/p95/p99 en milisegundos a un JSON. Si se indica una línea
+base, compara el p95 de cada escenario y termina con código 1 ante regresiones.
+
+Uso (desde ConciliaciónBancariaWeb/Backend):
+    python -m benchmarks.ejecutar_benchmarks --movimientos 50000 --repeticiones 30 \\
+        --salida benchmarks/resultados.json --baseline benchmarks/baseline.json
+
+    # Ingesta (analizar/cargar) con un extracto PDF propio:
+    python -m benchmarks.ejecutar_benchmarks --sin-sembrar --pdf extracto.pdf --tipo-cuenta bancolombia_ahorro
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+# La API lee la configuración de BD al importarse: apuntar a la base de pruebas antes
+os.environ.setdefault('DB_NAME', 'Mvtos_bench')
+
+from benchmarks.generador_ledger import (  # noqa: E402
+    conectar_bench, es_base_de_pruebas, sembrar, restaurar_pendientes
+)
+
+
+def percentil(valores, p):
+    """Percentil por rango más cercano (sin interpolación)."""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    rango = max(1, math.ceil(p / 100 * len(ordenados)))
+    return ordenados[rango - 1]
+
+
+def medir(nombre, funcion, repeticiones, calentamiento=1, antes=None):
+    """
+    Ejecuta `funcion` varias veces y retorna sus estadísticas en ms.
+    `antes` se ejecuta fuera del cronómetro antes de cada repetición.
+    """
+    tiempos = []
+    errores = 0
+    for i in range(calentamiento + repeticiones):
+        if antes:
+            antes()
+        inicio = time.perf_counter()
+        respuesta = funcion()
+        transcurrido = (time.perf_counter() - inicio) * 1000
+        if respuesta.status_code >= 400:
+            errores += 1
+        if i >= calentamiento:
+            tiempos.append(transcurrido)
+
+    resultado = {
+        'n': len(tiempos),
+        'errores': errores,
+        'p50': round(percentil(tiempos, 50), 2),
+        'p95': round(percentil(tiempos, 95), 2),
+        'p99': round(percentil(tiempos, 99), 2),
+        'media': round(statistics.fmean(tiempos), 2),
+    }
+    print(f"  {nombre:<32} p50={resultado['p50']:>9.2f}ms  p95={resultado['p95']:>9.2f}ms  "
+          f"p99={resultado['p99']:>9.2f}ms  errores={errores}")
+    return resultado
+
+
+def escenarios(client, conn, args):
+    """Define los caminos críticos a medir: nombre -> (funcion, antes)."""
+    hasta = date.today()
+    desde = hasta - timedelta(days=365)
+    rango = {'desde': desde.isoformat(), 'hasta': hasta.isoformat()}
+
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT Id FROM movimientos
+        WHERE TerceroID IS NULL OR GrupoID IS NULL OR ConceptoID IS NULL
+        ORDER BY Id LIMIT 1
+    """)
+    fila = cursor.fetchone()
+    cursor.close()
+    pendiente_id = fila[0] if fila else 1
+
+    casos = {
+        'listar_movimientos': (lambda: client.get('/api/movimientos', params=rango), None),
+        'listar_pendientes': (lambda: client.get('/api/movimientos/pendientes'), None),
+        'reporte_clasificacion': (
+            lambda: client.get('/api/movimientos/reporte/clasificacion', params={**rango, 'tipo': 'grupo'}), None),
+        'reporte_ingresos_gastos_mes': (
+            lambda: client.get('/api/movimientos/reporte/ingresos-gastos-mes', params=rango), None),
+        'reporte_desglose_gastos': (
+            lambda: client.get('/api/movimientos/reporte/desglose-gastos', params={**rango, 'nivel': 'grupo'}), None),
+        'sugerencia_clasificacion': (lambda: client.get(f'/api/clasificacion/sugerencia/{pendiente_id}'), None),
+        'sugerencias_reclasificacion': (
+            lambda: client.get('/api/movimientos/sugerencias/reclasificacion', params=rango), None),
+        'auto_clasificar': (
+            lambda: client.post('/api/clasificacion/auto-clasificar'), lambda: restaurar_pendientes(conn)),
+    }
+
+    if args.pdf:
+        with open(args.pdf, 'rb') as f:
+            contenido = f.read()
+        nombre_pdf = os.path.basename(args.pdf)
+        insertados = []
+
+        def archivo():
+            return {'file': (nombre_pdf, contenido, 'application/pdf')}
+
+        def cargar():
+            respuesta = client.post('/api/archivos/cargar', files=archivo(),
+                                    data={'tipo_cuenta': args.tipo_cuenta, 'cuenta_id': str(args.cuenta_id)})
+            if respuesta.status_code < 400:
+                insertados.extend(respuesta.json().get('ids_insertados', []))
+            return respuesta
+
+        def limpiar_carga():
+            # Borrar exactamente lo que insertó la repetición anterior para medir siempre una carga completa
+            if not insertados:
+                return
+            cursor = conn.cursor()
+            try:
+                cursor.execute("DELETE FROM movimientos WHERE Id = ANY(%s)", (list(insertados),))
+                conn.commit()
+                insertados.clear()
+            finally:
+                cursor.close()
+
+        casos['ingesta_analizar'] = (
+            lambda: client.post('/api/archivos/analizar', files=archivo(),
+                                data={'tipo_cuenta': args.tipo_cuenta, 'cuenta_id': str(args.cuenta_id)}),
+            None)
+        casos['ingesta_cargar'] = (cargar, limpiar_carga)
+
+    return casos
+
+
+def comparar(resultados, baseline, tolerancia):
+    """Retorna la lista de escenarios cuyo p95 empeoró más que la tolerancia."""
+    regresiones = []
+    for nombre, actual in resultados.items():
+        base = baseline.get('resultados', {}).get(nombre)
+        if not base or not base.get('p95'):
+            continue
+        variacion = (actual['p95'] - base['p95']) / base['p95']
+        actual['variacion_p95'] = round(variacion, 4)
+        if variacion > tolerancia:
+            regresiones.append((nombre, base['p95'], actual['p95'], variacion))
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de extremo a extremo del backend")
+    parser.add_argument('--movimientos', type=int, default=20000)
+    parser.add_argument('--terceros', type=int, default=500)
+    parser.add_argument('--pendientes', type=float, default=0.1)
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--sin-sembrar', action='store_true', help="Usar los datos ya existentes en la base de pruebas")
+    parser.add_argument('--repeticiones', type=int, default=20)
+    parser.add_argument('--solo', nargs='*', help="Ejecutar solo estos escenarios")
+    parser.add_argument('--pdf', help="Extracto PDF para medir la ingesta (analizar/cargar)")
+    parser.add_argument('--tipo-cuenta', default='bancolombia_ahorro')
+    parser.add_argument('--cuenta-id', type=int, default=1)
+    parser.add_argument('--salida', default='benchmarks/resultados.json')
+    parser.add_argument('--baseline', help="JSON de resultados previos contra el cual comparar")
+    parser.add_argument('--tolerancia', type=float, default=0.2, help="Regresión máxima admitida en p95 (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    # La API usa DB_NAME y los escenarios escriben (auto-clasificar, carga): nunca
+    # correr contra una base que no sea de benchmarks, se siembre o no.
+    if 'bench' not in os.environ['DB_NAME'].lower():
+        sys.exit(f"DB_NAME='{os.environ['DB_NAME']}' no es una base de benchmarks (debe contener 'bench')")
+    conn = conectar_bench()
+    if not es_base_de_pruebas(conn):
+        conn.close()
+        sys.exit("La conexión no apunta a una base de benchmarks (el nombre debe contener 'bench')")
+    datos = None
+    if not args.sin_sembrar:
+        print(f"Sembrando {args.movimientos} movimientos sintéticos...")
+        datos = sembrar(conn, args.movimientos, args.terceros, args.pendientes, semilla=args.semilla)
+
+    from fastapi.testclient import TestClient
+    from src.infrastructure.api.main import app
+
+    resultados = {}
+    with TestClient(app) as client:
+        casos = escenarios(client, conn, args)
+        for nombre, (funcion, antes) in casos.items():
+            if args.solo and nombre not in args.solo:
+                continue
+            resultados[nombre] = medir(nombre, funcion, args.repeticiones, antes=antes)
+            if antes:
+                # Dejar la base como estaba (pendientes restaurados, carga borrada)
+                antes()
+
+    conn.close()
+
+    salida = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'repeticiones': args.repeticiones,
+        'datos': datos,
+        'resultados': resultados,
+    }
+
+    regresiones = []
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            regresiones = comparar(resultados, json.load(f), args.tolerancia)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.salida)), exist_ok=True)
+    with open(args.salida, 'w', encoding='utf-8') as f:
+        json.dump(salida, f, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {args.salida}")
+
+    if regresiones:
+        print("Regresiones de p95 respecto a la línea base:")
+        for nombre, base, actual, variacion in regresiones:
+            print(f"  {nombre}: {base:.2f}ms -> {actual:.2f}ms (+{variacion:.0%})")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
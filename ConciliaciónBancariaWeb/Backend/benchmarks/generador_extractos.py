@@ -0,0 +1,200 @@
+"""
+Generador de extractos PDF sintéticos (multipágina) con su salida esperada.
+
+Produce PDFs con el mismo formato de línea que leen los extractores
+(Bancolombia Ahorros, Tarjeta de Crédito y Fondo Renta) y, junto a cada PDF,
+un JSON "golden" con los movimientos que el extractor debe devolver. Como el
+generador sabe qué escribió, el golden es exacto por construcción.
+
+El PDF se escribe directamente (fuente Helvetica estándar, una línea por
+operador de texto), sin dependencias adicionales.
+
+Uso:
+    python -m benchmarks.generador_extractos --tipo bancolombia_ahorro --movimientos 5000 \\
+        --destino benchmarks/corpus_sintetico
+"""
+
+import argparse
+import json
+import os
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+TIPOS = ('bancolombia_ahorro', 'credit_card', 'fondo_renta')
+
+MESES = ['ene', 'feb', 'mar', 'abr', 'may', 'jun', 'jul', 'ago', 'sep', 'oct', 'nov', 'dic']
+
+DESCRIPCIONES = [
+    'COMPRA EN EXITO POBLADO', 'PAGO PSE EPM', 'PAGO PSE CLARO', 'TRANSFERENCIA A NEQUI',
+    'ABONO INTERESES AHORROS', 'IMPTO GOBIERNO 4X1000', 'RETIRO CAJERO LAURELES', 'PAGO NOMINA',
+    'COMPRA EN CARULLA', 'CUOTA DE MANEJO', 'TRASLADO DE FONDO', 'PAGO TARJETA CREDITO'
+]
+COMERCIOS_TC = [
+    'NETFLIX.COM', 'SPOTIFY', 'UBER TRIP', 'RAPPI COLOMBIA', 'AMAZON MKTPLACE', 'AVIANCA',
+    'TERPEL LA 33', 'FARMATODO', 'HOMECENTER', 'JUAN VALDEZ CAFE'
+]
+
+
+def _fecha_texto(fecha: date) -> str:
+    return f"{fecha.day:02d} {MESES[fecha.month - 1]} {fecha.year}"
+
+
+def _valor_texto(valor: Decimal, con_signo: bool = True) -> str:
+    """Formato colombiano: -$ 1.234.567,89"""
+    entero, decimales = f"{abs(valor):.2f}".split('.')
+    miles = f"{int(entero):,}".replace(',', '.')
+    signo = '-' if con_signo and valor < 0 else ''
+    return f"{signo}$ {miles},{decimales}"
+
+
+def _escapar(texto: str) -> str:
+    return texto.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def escribir_pdf(ruta: str, paginas, ancho: int = 612, alto: int = 792):
+    """
+    Escribe un PDF mínimo válido.
+
+    Args:
+        paginas: lista de páginas; cada página es una lista de líneas de texto
+    """
+    objetos = []
+    primera_pagina = 4
+    kids = ' '.join(f"{primera_pagina + 2 * i} 0 R" for i in range(len(paginas)))
+
+    objetos.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    objetos.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(paginas)} >>".encode())
+    objetos.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+    for i, lineas in enumerate(paginas):
+        numero_contenido = primera_pagina + 2 * i + 1
+        operaciones = ["BT", "/F1 9 Tf"]
+        y = alto - 40
+        for linea in lineas:
+            operaciones.append(f"1 0 0 1 36 {y} Tm ({_escapar(linea)}) Tj")
+            y -= 14
+        operaciones.append("ET")
+        contenido = "\n".join(operaciones).encode('latin-1', errors='replace')
+
+        objetos.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {ancho} {alto}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {numero_contenido} 0 R >>".encode()
+        )
+        objetos.append(
+            f"<< /Length {len(contenido)} >>\nstream\n".encode() + contenido + b"\nendstream"
+        )
+
+    salida = bytearray(b"%PDF-1.4\n")
+    desplazamientos = []
+    for numero, objeto in enumerate(objetos, start=1):
+        desplazamientos.append(len(salida))
+        salida += f"{numero} 0 obj\n".encode() + objeto + b"\nendobj\n"
+
+    inicio_xref = len(salida)
+    salida += f"xref\n0 {len(objetos) + 1}\n0000000000 65535 f \n".encode()
+    for desplazamiento in desplazamientos:
+        salida += f"{desplazamiento:010d} 00000 n \n".encode()
+    salida += (f"trailer\n<< /Size {len(objetos) + 1} /Root 1 0 R >>\n"
+               f"startxref\n{inicio_xref}\n%%EOF\n").encode()
+
+    with open(ruta, 'wb') as f:
+        f.write(salida)
+
+
+def _filas(tipo: str, movimientos: int, rnd: random.Random):
+    """Genera (lineas_por_movimiento, esperado) para cada movimiento."""
+    fecha = date.today() - timedelta(days=movimientos // 3 + 1)
+    for _ in range(movimientos):
+        fecha += timedelta(days=rnd.choice((0, 0, 1)))
+        valor = Decimal(rnd.randint(100, 5_000_000)) + Decimal(rnd.randint(0, 99)) / 100
+
+        if tipo == 'credit_card':
+            descripcion = rnd.choice(COMERCIOS_TC)
+            moneda = 'USD' if rnd.random() < 0.1 else 'COP'
+            cuotas = rnd.choice((1, 1, 1, 3, 6, 12))
+            fecha_corte = _fecha_texto(fecha + timedelta(days=1))
+            if rnd.random() < 0.1:
+                # Valor en la línea siguiente (formato partido del extracto)
+                lineas = [f"{_fecha_texto(fecha)} {descripcion} {fecha_corte} {moneda} {cuotas}",
+                          _valor_texto(valor)]
+            else:
+                lineas = [f"{_fecha_texto(fecha)} {descripcion} {fecha_corte} {moneda} {_valor_texto(valor)} {cuotas}"]
+            # En tarjeta de crédito las compras vienen positivas y se registran como gasto
+            esperado = {'fecha': fecha.isoformat(), 'descripcion': descripcion, 'referencia': '',
+                        'valor': f"{-valor:.2f}", 'moneda': moneda}
+        else:
+            descripcion = rnd.choice(DESCRIPCIONES)
+            if rnd.random() < 0.75:
+                valor = -valor
+            referencia = str(rnd.randint(10**6, 10**10)) if rnd.random() < 0.4 else ''
+            texto = f"{descripcion} {referencia}".strip()
+            lineas = [f"{_fecha_texto(fecha)} {texto} {_valor_texto(valor)}"]
+            esperado = {'fecha': fecha.isoformat(), 'descripcion': descripcion, 'referencia': referencia,
+                        'valor': f"{valor:.2f}"}
+        yield lineas, esperado
+
+
+def generar_extracto(ruta_pdf: str, tipo: str, movimientos: int = 1000,
+                     lineas_por_pagina: int = 48, semilla: int = 7) -> dict:
+    """
+    Genera un extracto sintético y su golden JSON (misma ruta con extensión .json).
+
+    Returns:
+        dict con el golden escrito
+    """
+    if tipo not in TIPOS:
+        raise ValueError(f"Tipo no soportado: {tipo}")
+
+    rnd = random.Random(semilla)
+    paginas = []
+    actual = []
+    esperados = []
+
+    def encabezado():
+        return [
+            "BANCOLOMBIA S.A. - EXTRACTO SINTETICO",
+            f"Tipo de cuenta: {tipo}",
+            "FECHA DESCRIPCION REFERENCIA VALOR",
+        ]
+
+    actual = encabezado()
+    for lineas, esperado in _filas(tipo, movimientos, rnd):
+        # Un movimiento partido en dos líneas no se separa entre páginas
+        if len(actual) + len(lineas) > lineas_por_pagina:
+            paginas.append(actual)
+            actual = encabezado()
+        actual.extend(lineas)
+        esperados.append(esperado)
+    paginas.append(actual)
+
+    total = len(paginas)
+    for numero, pagina in enumerate(paginas, start=1):
+        pagina.append(f"Pagina {numero} de {total}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(ruta_pdf)), exist_ok=True)
+    escribir_pdf(ruta_pdf, paginas)
+
+    golden = {'tipo': tipo, 'paginas': total, 'movimientos': esperados}
+    with open(os.path.splitext(ruta_pdf)[0] + '.json', 'w', encoding='utf-8') as f:
+        json.dump(golden, f, indent=1, ensure_ascii=False)
+    return golden
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera extractos PDF sintéticos con golden JSON")
+    parser.add_argument('--tipo', choices=TIPOS, nargs='*', default=list(TIPOS))
+    parser.add_argument('--movimientos', type=int, default=2000)
+    parser.add_argument('--lineas-por-pagina', type=int, default=48)
+    parser.add_argument('--semilla', type=int, default=7)
+    parser.add_argument('--destino', default='benchmarks/corpus_sintetico')
+    args = parser.parse_args()
+
+    for tipo in args.tipo:
+        ruta = os.path.join(args.destino, tipo, f"sintetico_{args.movimientos}.pdf")
+        golden = generar_extracto(ruta, tipo, args.movimientos, args.lineas_por_pagina, args.semilla)
+        print(f"{ruta}: {golden['paginas']} páginas, {len(golden['movimientos'])} movimientos")
+
+
+if __name__ == "__main__":
+    main()
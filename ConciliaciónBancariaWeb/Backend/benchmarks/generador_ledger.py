@@ -0,0 +1,250 @@
+"""
+Generador de un libro de movimientos sintético para benchmarks.
+
+Siembra una base de datos de pruebas (con el esquema de Mvtos ya creado) con
+cuentas, monedas, grupos, conceptos, terceros con alias, reglas de
+clasificación, configuración de filtros/pendientes y N movimientos, de los
+cuales una proporción configurable queda pendiente de clasificar.
+
+Por seguridad solo opera sobre bases de datos cuyo nombre contiene "bench".
+
+Uso:
+    python -m benchmarks.generador_ledger --movimientos 50000 --terceros 800
+"""
+
+import argparse
+import os
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+import psycopg2
+from psycopg2.extras import execute_values
+from dotenv import load_dotenv
+
+# Marca en Detalle para poder restaurar los pendientes entre repeticiones
+MARCA_PENDIENTE = 'bench-pendiente'
+
+GRUPO_TRASLADOS = 47
+GRUPO_POR_CLASIFICAR = 34
+
+COMERCIOS = [
+    'EXITO', 'CARULLA', 'JUMBO', 'D1', 'ARA', 'OLIMPICA', 'EPM', 'CLARO', 'MOVISTAR', 'TIGO',
+    'UNE', 'UBER', 'RAPPI', 'NETFLIX', 'SPOTIFY', 'AMAZON', 'MERCADOLIBRE', 'FALABELLA',
+    'HOMECENTER', 'PANAMERICANA', 'CRUZ VERDE', 'FARMATODO', 'COLSANITAS', 'SURA', 'TERPEL',
+    'PRIMAX', 'TEXACO', 'AVIANCA', 'LATAM', 'CINE COLOMBIA', 'PROCINAL', 'JUAN VALDEZ',
+    'CREPES Y WAFFLES', 'EL CORRAL', 'PRESTO', 'KOAJ', 'ARTURO CALLE', 'TOSTAO', 'DIDI', 'CABIFY'
+]
+PREFIJOS = ['COMPRA EN', 'PAGO PSE', 'PAGO A', 'CARGO', 'DEBITO AUTOMATICO', 'COMPRA INTL']
+CIUDADES = ['MEDELLIN', 'BOGOTA', 'CALI', 'POBLADO', 'ENVIGADO', 'LAURELES', 'CHAPINERO']
+
+GRUPOS = {
+    4: 'Ahorros', 20: 'Alimentación', 21: 'Transporte', 22: 'Impuestos', 23: 'Servicios Públicos',
+    24: 'Salud', 25: 'Entretenimiento', 26: 'Vestuario', GRUPO_POR_CLASIFICAR: 'Por Clasificar',
+    35: 'Préstamos', 46: 'Tita', GRUPO_TRASLADOS: 'Traslados', 50: 'Ingresos', 51: 'Hogar'
+}
+
+REGLAS = [
+    ('Abono Intereses Ahorros', 'contiene'),
+    ('Impto Gobierno', 'contiene'),
+    ('Traslado De Fondo', 'contiene'),
+]
+
+
+def es_base_de_pruebas(conn) -> bool:
+    """True si la conexión apunta a una base de benchmarks (nombre con 'bench')."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT current_database()")
+    nombre = cursor.fetchone()[0]
+    cursor.close()
+    return 'bench' in nombre.lower()
+
+
+def _descripcion_alias(rnd: random.Random, comercio: str) -> str:
+    return f"{rnd.choice(PREFIJOS)} {comercio} {rnd.choice(CIUDADES)}"
+
+
+def sembrar(conn,
+            movimientos: int = 20000,
+            terceros: int = 500,
+            proporcion_pendientes: float = 0.1,
+            alias_por_tercero: int = 2,
+            anios: int = 3,
+            semilla: int = 42) -> dict:
+    """
+    Borra y vuelve a sembrar las tablas de la base de pruebas.
+
+    Returns:
+        dict con los conteos generados y los IDs de referencia (cuentas, pendientes)
+    """
+    if not es_base_de_pruebas(conn):
+        raise ValueError("La base de datos de destino debe contener 'bench' en su nombre")
+
+    rnd = random.Random(semilla)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            TRUNCATE movimientos, reglas_clasificacion, tercero_descripciones, config_filtros_grupos,
+                     config_valores_pendientes, conceptos, grupos, terceros, cuentas, monedas
+            RESTART IDENTITY CASCADE
+        """)
+
+        # Monedas y cuentas
+        execute_values(cursor, "INSERT INTO monedas (isocode, moneda, activa) VALUES %s",
+                       [('COP', 'Peso Colombiano', True), ('USD', 'Dólar', True)])
+        execute_values(cursor, "INSERT INTO cuentas (cuenta, activa, permite_carga) VALUES %s",
+                       [('Ahorros Bancolombia', True, True),
+                        ('Tarjeta de Crédito', True, True),
+                        ('Fondo Renta', True, True)])
+
+        # Grupos con IDs fijos (el código usa algunos IDs conocidos, p.ej. Traslados = 47)
+        execute_values(cursor, "INSERT INTO grupos (grupoid, grupo, activa) VALUES %s",
+                       [(gid, nombre, True) for gid, nombre in GRUPOS.items()])
+        cursor.execute("SELECT setval(pg_get_serial_sequence('grupos', 'grupoid'), (SELECT MAX(grupoid) FROM grupos))")
+
+        # Conceptos: 5 por grupo, el primero del grupo Traslados se llama 'Traslado'
+        conceptos = []
+        for gid, nombre in GRUPOS.items():
+            for i in range(5):
+                etiqueta = 'Traslado' if gid == GRUPO_TRASLADOS and i == 0 else f"{nombre} {i + 1}"
+                conceptos.append((etiqueta, gid, True))
+        filas = execute_values(
+            cursor, "INSERT INTO conceptos (concepto, grupoid_fk, activa) VALUES %s RETURNING conceptoid, grupoid_fk",
+            conceptos, fetch=True)
+        conceptos_por_grupo = {}
+        for cid, gid in filas:
+            conceptos_por_grupo.setdefault(gid, []).append(cid)
+
+        # Terceros y alias
+        nombres = []
+        for i in range(terceros):
+            base = COMERCIOS[i % len(COMERCIOS)]
+            nombres.append(base if i < len(COMERCIOS) else f"{base} {i // len(COMERCIOS)}")
+        ids_terceros = [r[0] for r in execute_values(
+            cursor, "INSERT INTO terceros (tercero, activa) VALUES %s RETURNING terceroid",
+            [(n, True) for n in nombres], fetch=True)]
+
+        alias = []
+        for tid, nombre in zip(ids_terceros, nombres):
+            for _ in range(alias_por_tercero):
+                referencia = str(rnd.randint(10**9, 10**10 - 1)) if rnd.random() < 0.3 else None
+                alias.append((tid, _descripcion_alias(rnd, nombre), referencia, True))
+        execute_values(cursor,
+                       "INSERT INTO tercero_descripciones (terceroid, descripcion, referencia, activa) VALUES %s",
+                       alias)
+
+        # Reglas, filtros de exclusión y valores "pendiente"
+        grupos_regla = [g for g in GRUPOS if g not in (GRUPO_POR_CLASIFICAR, GRUPO_TRASLADOS)]
+        execute_values(cursor, """
+            INSERT INTO reglas_clasificacion (patron, tercero_id, grupo_id, concepto_id, tipo_match) VALUES %s
+        """, [(patron, ids_terceros[i], grupos_regla[i], conceptos_por_grupo[grupos_regla[i]][0], tipo)
+              for i, (patron, tipo) in enumerate(REGLAS)])
+        execute_values(cursor, "INSERT INTO config_filtros_grupos (grupo_id, etiqueta, activo_por_defecto) VALUES %s",
+                       [(35, 'Excluir Préstamos', True), (46, 'Excluir Tita', True),
+                        (GRUPO_TRASLADOS, 'Excluir Traslados', True)])
+        execute_values(cursor, "INSERT INTO config_valores_pendientes (tipo, valor_id, descripcion, activo) VALUES %s",
+                       [('grupo', GRUPO_POR_CLASIFICAR, 'Por Clasificar', True),
+                        ('concepto', conceptos_por_grupo[GRUPO_POR_CLASIFICAR][0], 'Por Clasificar', True)])
+
+        # Movimientos
+        alias_por_tercero_id = {}
+        for tid, descripcion, referencia, _ in alias:
+            alias_por_tercero_id.setdefault(tid, []).append((descripcion, referencia))
+        grupo_de_tercero = {tid: rnd.choice(grupos_regla) for tid in ids_terceros}
+
+        hoy = date.today()
+        dias = 365 * anios
+        filas_mov = []
+        pendientes = 0
+        for _ in range(movimientos):
+            tid = rnd.choice(ids_terceros)
+            descripcion, referencia = rnd.choice(alias_por_tercero_id[tid])
+            if rnd.random() < 0.05:
+                descripcion, _ = rnd.choice(REGLAS)
+            fecha = hoy - timedelta(days=rnd.randint(0, dias))
+            valor = Decimal(rnd.randint(1_000, 2_000_000)) * (1 if rnd.random() < 0.15 else -1)
+            cuenta_id = rnd.choice((1, 1, 1, 2, 2, 3))
+            gid = grupo_de_tercero[tid]
+            cid = rnd.choice(conceptos_por_grupo[gid])
+            detalle = None
+            if rnd.random() < proporcion_pendientes:
+                tid_mov, gid, cid, detalle = None, None, None, MARCA_PENDIENTE
+                pendientes += 1
+            else:
+                tid_mov = tid
+            filas_mov.append((fecha, descripcion, referencia or '', valor, None, None,
+                              1, cuenta_id, tid_mov, gid, cid, detalle))
+
+        execute_values(cursor, """
+            INSERT INTO movimientos (
+                Fecha, Descripcion, Referencia, Valor, USD, TRM,
+                MonedaID, CuentaID, TerceroID, GrupoID, ConceptoID, Detalle
+            ) VALUES %s
+        """, filas_mov, page_size=2000)
+
+        cursor.execute("ANALYZE")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    return {
+        'movimientos': movimientos,
+        'pendientes': pendientes,
+        'terceros': terceros,
+        'alias': len(alias),
+        'semilla': semilla,
+    }
+
+
+def restaurar_pendientes(conn) -> int:
+    """Devuelve a pendientes los movimientos sembrados como tal (p.ej. tras auto-clasificar)."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            UPDATE movimientos
+            SET TerceroID = NULL, GrupoID = NULL, ConceptoID = NULL
+            WHERE Detalle = %s
+        """, (MARCA_PENDIENTE,))
+        afectados = cursor.rowcount
+        conn.commit()
+        return afectados
+    finally:
+        cursor.close()
+
+
+def conectar_bench():
+    """Conexión a la base de benchmarks (variables DB_* con DB_NAME por defecto 'Mvtos_bench')."""
+    load_dotenv()
+    return psycopg2.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        port=os.getenv('DB_PORT', '5433'),
+        database=os.getenv('DB_NAME', 'Mvtos_bench'),
+        user=os.getenv('DB_USER', 'postgres'),
+        password=os.getenv('DB_PASSWORD')
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Siembra un libro de movimientos sintético")
+    parser.add_argument('--movimientos', type=int, default=20000)
+    parser.add_argument('--terceros', type=int, default=500)
+    parser.add_argument('--pendientes', type=float, default=0.1, help="Proporción de movimientos pendientes")
+    parser.add_argument('--alias', type=int, default=2, help="Alias por tercero")
+    parser.add_argument('--anios', type=int, default=3)
+    parser.add_argument('--semilla', type=int, default=42)
+    args = parser.parse_args()
+
+    conn = conectar_bench()
+    try:
+        resumen = sembrar(conn, args.movimientos, args.terceros, args.pendientes,
+                          args.alias, args.anios, args.semilla)
+    finally:
+        conn.close()
+    print(resumen)
+
+
+if __name__ == "__main__":
+    main()
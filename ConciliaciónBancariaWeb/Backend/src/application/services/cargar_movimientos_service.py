@@ -36,30 +36,17 @@ class CargarMovimientosService:
             movimientos = lector.leer_archivo(ruta_archivo)
             resultado['total_leidos'] = len(movimientos)
             
+            # 2. Completar datos faltantes que el extractor no conoce
             for mov in movimientos:
-                try:
-                    # 2. Completar datos faltantes que el extractor no conoce
-                    mov.cuenta_id = cuenta_id
-                    mov.moneda_id = moneda_id
-                    
-                    # 3. Verificar duplicados (Regla de negocio)
-                    # Usamos el repo para chequear si ya existe
-                    ya_existe = self.repositorio.existe_movimiento(
-                        fecha=mov.fecha,
-                        valor=mov.valor,
-                        referencia=mov.referencia
-                    )
-                    
-                    if ya_existe:
-                        resultado['duplicados'] += 1
-                    else:
-                        # 4. Guardar
-                        self.repositorio.guardar(mov)
-                        resultado['nuevos'] += 1
-                        
-                except Exception as e:
-                    resultado['errores'].append(f"Error procesando movimiento {mov.descripcion}: {str(e)}")
-                    
+                mov.cuenta_id = cuenta_id
+                mov.moneda_id = moneda_id
+
+            # 3. Guardar los que no existan (la huella del movimiento decide
+            # qué es duplicado, sin consultar fila por fila)
+            nuevos = self.repositorio.guardar_nuevos(movimientos)
+            resultado['nuevos'] = len(nuevos)
+            resultado['duplicados'] = len(movimientos) - len(nuevos)
+
         except Exception as e:
             resultado['errores'].append(f"Error crítico leyendo archivo: {str(e)}")
             
@@ -7,11 +7,27 @@ from src.domain.ports.tercero_repository import TerceroRepository
 from src.domain.ports.tercero_descripcion_repository import TerceroDescripcionRepository
 from src.domain.ports.grupo_repository import GrupoRepository
 from src.domain.ports.concepto_repository import ConceptoRepository
+from src.application.services.clasificador_texto import ClasificadorTexto, Prediccion
+
+# Probabilidad mínima del modelo de texto para guardar la clasificación sin
+# revisión (auto-clasificar) o solo para sugerirla
+UMBRAL_MODELO_AUTO = 0.9
+UMBRAL_MODELO_SUGERENCIA = 0.5
+
+# La probabilidad sola no basta para guardar sin revisión (Naive Bayes no está
+# calibrado): además se exige que la clase haya visto algún token de la
+# descripción o referencia y que tenga suficientes ejemplos.
+MIN_EVIDENCIA_TEXTO_AUTO = 1
+MIN_EJEMPLOS_CLASE_AUTO = 5
+
+# Campos que usa el modelo de texto al puntuar la cola de pendientes
+CAMPOS_MODELO = ['descripcion', 'referencia', 'usd', 'cuenta_id', 'grupo_id', 'concepto_id']
 
 class ClasificacionService:
     """
     Servicio de Aplicación para clasificar movimientos automáticamente.
-    Combina Reglas Estáticas y Aprendizaje Histórico.
+    Combina Reglas Estáticas, Aprendizaje Histórico y, como último recurso,
+    el modelo de texto entrenado con los movimientos ya clasificados.
     """
     
     def __init__(self, 
@@ -20,19 +36,33 @@ class ClasificacionService:
                  tercero_repo: TerceroRepository,
                  tercero_descripcion_repo: TerceroDescripcionRepository = None,
                  concepto_repo: ConceptoRepository = None,
-                 grupo_repo: GrupoRepository = None):
+                 grupo_repo: GrupoRepository = None,
+                 clasificador_texto: ClasificadorTexto = None):
         self.movimiento_repo = movimiento_repo
         self.reglas_repo = reglas_repo
         self.tercero_repo = tercero_repo
         self.tercero_descripcion_repo = tercero_descripcion_repo
         self.concepto_repo = concepto_repo
         self.grupo_repo = grupo_repo
+        self.clasificador_texto = clasificador_texto
+
+    def _predecir(self, movimientos: List[Movimiento]) -> list:
+        """
+        Predicciones del modelo de texto para el lote (una sola llamada), luego
+        de ponerlo al día con los movimientos clasificados desde la última vez.
+        """
+        if not self.clasificador_texto or not movimientos:
+            return [None] * len(movimientos)
+        self.clasificador_texto.sincronizar(self.movimiento_repo)
+        return self.clasificador_texto.predecir(movimientos)
 
-    def clasificar_movimiento(self, movimiento: Movimiento) -> Tuple[bool, str]:
+    def clasificar_movimiento(self, movimiento: Movimiento, prediccion: Optional[Prediccion] = None) -> Tuple[bool, str]:
         """
         Intenta clasificar un movimiento.
         Retorna (exito, razon).
         Modifica el objeto movimiento en sitio si tiene éxito.
+        `prediccion` es la del modelo de texto, calculada por lote; solo se usa
+        si reglas e histórico no coinciden.
         """
         # Si ya está clasificado, no hacer nada
         if not movimiento.necesita_clasificacion:
@@ -90,6 +120,26 @@ class ClasificacionService:
                 movimiento.concepto_id = mejor_candidato.concepto_id
                 return True, f"Histórico por Referencia ({movimiento.referencia})"
 
+        # 3. Estrategia: Modelo de texto (último recurso)
+        # -----------------------------------------------
+        return self._aplicar_prediccion(movimiento, prediccion)
+
+    @staticmethod
+    def _prediccion_confiable(prediccion: Optional[Prediccion]) -> bool:
+        """Si la predicción alcanza para guardar sin revisión (ver MIN_*_AUTO)."""
+        return (prediccion is not None
+                and prediccion.probabilidad >= UMBRAL_MODELO_AUTO
+                and prediccion.evidencia_texto >= MIN_EVIDENCIA_TEXTO_AUTO
+                and prediccion.ejemplos_clase >= MIN_EJEMPLOS_CLASE_AUTO)
+
+    def _aplicar_prediccion(self, movimiento: Movimiento, prediccion: Optional[Prediccion]) -> Tuple[bool, str]:
+        """Asigna grupo/concepto del modelo solo si la predicción es confiable."""
+        # No cambiar un grupo ya asignado por otro
+        if self._prediccion_confiable(prediccion) and movimiento.grupo_id in (None, prediccion.grupo_id):
+            movimiento.grupo_id = prediccion.grupo_id
+            movimiento.concepto_id = prediccion.concepto_id
+            return True, f"Modelo de texto ({prediccion.probabilidad:.0%})"
+
         return False, "Sin coincidencias"
 
     def auto_clasificar_pendientes(self) -> dict:
@@ -100,12 +150,23 @@ class ClasificacionService:
         pendientes = self.movimiento_repo.buscar_pendientes_clasificacion()
         resumen = {'total': len(pendientes), 'clasificados': 0, 'detalles': []}
         
+        sin_coincidencia = []
         for mov in pendientes:
             exito, razon = self.clasificar_movimiento(mov)
             if exito:
                 self.movimiento_repo.guardar(mov)
                 resumen['clasificados'] += 1
                 resumen['detalles'].append(f"ID {mov.id}: {razon}")
+            elif mov.necesita_clasificacion:
+                sin_coincidencia.append(mov)
+        
+        # Los que no resolvieron reglas ni histórico: el modelo los puntúa en una sola llamada
+        for mov, prediccion in zip(sin_coincidencia, self._predecir(sin_coincidencia)):
+            exito, razon = self._aplicar_prediccion(mov, prediccion)
+            if exito:
+                self.movimiento_repo.guardar(mov)
+                resumen['clasificados'] += 1
+                resumen['detalles'].append(f"ID {mov.id}: {razon}")
         
         return resumen
 
@@ -296,6 +357,20 @@ class ClasificacionService:
                     if contexto_filtrado:
                         contexto_movimientos = contexto_filtrado
         
+        # ============================================
+        # 6. MODELO DE TEXTO (si nada sugirió grupo/concepto)
+        # ============================================
+        if sugerencia['grupo_id'] is None:
+            prediccion = self._predecir([movimiento])[0]
+            if prediccion and prediccion.probabilidad >= UMBRAL_MODELO_SUGERENCIA:
+                sugerencia['grupo_id'] = prediccion.grupo_id
+                sugerencia['concepto_id'] = prediccion.concepto_id
+                razon_modelo = f"Modelo de texto ({prediccion.probabilidad:.0%})"
+                if not prediccion.evidencia_texto:
+                    razon_modelo += " sin coincidencias en la descripción"
+                sugerencia['razon'] = f"{sugerencia['razon']} · {razon_modelo}" if sugerencia['razon'] else razon_modelo
+                sugerencia['tipo_match'] = sugerencia['tipo_match'] or 'modelo_texto'
+        
         # Ordenar por fecha descendente
         contexto_movimientos.sort(key=lambda x: x.fecha, reverse=True)
         contexto_movimientos = contexto_movimientos[:5]
@@ -308,6 +383,34 @@ class ClasificacionService:
             'referencia': movimiento.referencia if referencia_no_existe else None
         }
 
+    def sugerir_pendientes(self, umbral: float = UMBRAL_MODELO_SUGERENCIA) -> dict:
+        """
+        Puntúa toda la cola de pendientes con el modelo de texto en una sola
+        llamada. No guarda nada; retorna las sugerencias con probabilidad >= umbral
+        y la evidencia de cada una (`confiable` = la guardaría auto-clasificar).
+        """
+        pendientes = self.movimiento_repo.buscar_pendientes_clasificacion(CAMPOS_MODELO)
+        sugerencias = []
+        for mov, prediccion in zip(pendientes, self._predecir(pendientes)):
+            if not prediccion or prediccion.probabilidad < umbral:
+                continue
+            if mov.grupo_id not in (None, prediccion.grupo_id):
+                continue
+            sugerencias.append({
+                'movimiento_id': mov.id,
+                'grupo_id': prediccion.grupo_id,
+                'concepto_id': prediccion.concepto_id,
+                'probabilidad': round(prediccion.probabilidad, 4),
+                'evidencia_texto': prediccion.evidencia_texto,
+                'ejemplos_clase': prediccion.ejemplos_clase,
+                'confiable': self._prediccion_confiable(prediccion)
+            })
+        return {
+            'total_pendientes': len(pendientes),
+            'ejemplos_modelo': self.clasificador_texto.total_ejemplos if self.clasificador_texto else 0,
+            'sugerencias': sugerencias
+        }
+
     def aplicar_regla_lote(self, patron: str, tercero_id: int, grupo_id: int, concepto_id: int) -> int:
         """
         Aplica una clasificación a todos los movimientos pendientes que coinciden con un patrón.
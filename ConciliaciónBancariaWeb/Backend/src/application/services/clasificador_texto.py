@@ -0,0 +1,249 @@
+"""
+Clasificador de texto local para sugerir grupo/concepto a partir de los
+movimientos ya clasificados.
+
+Naive Bayes multinomial sobre características hasheadas de la descripción
+(palabras y pares de palabras), la referencia, la cuenta y el rango del monto;
+al puntuar, las características se ponderan por IDF para que las palabras que
+aparecen en casi todo ("pago", "compra") pesen menos.
+
+- Entrenamiento incremental: el modelo solo acumula conteos por clase, así que
+  aprender u olvidar un movimiento es sumar o restar su vector. `sincronizar`
+  lee los cambios desde la última row_version vista (la misma versión de
+  GET /api/sync), de modo que cada reclasificación entra al modelo sin
+  reentrenar desde cero.
+- Inferencia vectorizada: `predecir` puntúa un lote completo (toda la cola de
+  pendientes) con una multiplicación de matrices por bloque.
+
+Las probabilidades de Naive Bayes no están calibradas: una descripción nunca
+vista puede salir con 0.99 solo por la cuenta y el rango del monto. Por eso
+cada predicción trae también la evidencia textual (tokens de descripción o
+referencia que la clase vio al entrenar) y cuántos ejemplos tiene la clase;
+ClasificacionService exige ambas antes de guardar sin revisión.
+
+Es el último recurso de ClasificacionService, después de reglas y alias.
+"""
+
+import math
+import re
+import threading
+import unicodedata
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.domain.models.movimiento import Movimiento
+from src.domain.ports.movimiento_repository import MovimientoRepository
+
+DIMENSIONES = 2 ** 14  # Espacio del hashing trick
+ALFA = 0.1  # Suavizado de Laplace
+TAMANO_LOTE = 1000  # Filas por bloque al puntuar
+LIMITE_SINCRONIZACION = 5000  # Cambios por consulta al sincronizar
+
+_PATRON_PALABRA = re.compile(r'[a-z0-9]+')
+
+# Prefijos de los tokens que salen de la descripción y la referencia
+PREFIJOS_TEXTO = ('p:', 'b:', 'r:')
+
+Etiqueta = Tuple[int, int]  # (grupo_id, concepto_id)
+
+
+@dataclass
+class Prediccion:
+    grupo_id: int
+    concepto_id: int
+    probabilidad: float
+    evidencia_texto: int  # Tokens de descripción/referencia vistos en la clase
+    ejemplos_clase: int  # Movimientos con los que se entrenó la clase
+
+
+def _sin_tildes(texto: str) -> str:
+    return ''.join(c for c in unicodedata.normalize('NFKD', texto) if not unicodedata.combining(c))
+
+
+def _rango_monto(movimiento: Movimiento) -> str:
+    """Moneda, signo y orden de magnitud del monto: 'cop-5' es un débito de cientos de miles."""
+    if movimiento.usd:
+        moneda, monto = 'usd', movimiento.usd
+    else:
+        moneda, monto = 'cop', movimiento.valor or 0
+    if not monto:
+        return f"{moneda}0"
+    signo = '-' if monto < 0 else '+'
+    return f"{moneda}{signo}{int(math.log10(abs(float(monto))))}"
+
+
+def caracteristicas(movimiento: Movimiento) -> List[str]:
+    """
+    Tokens del movimiento. Los números sueltos de la descripción se ignoran
+    (cambian de un extracto a otro); la referencia entra completa, sin ceros
+    iniciales.
+    """
+    texto = _sin_tildes((movimiento.descripcion or '').lower())
+    palabras = [p for p in _PATRON_PALABRA.findall(texto) if not p.isdigit()]
+
+    tokens = [f"p:{p}" for p in palabras]
+    tokens += [f"b:{a}_{b}" for a, b in zip(palabras, palabras[1:])]
+    referencia = (movimiento.referencia or '').strip().lstrip('0')
+    if referencia:
+        tokens.append(f"r:{referencia}")
+    if movimiento.cuenta_id is not None:
+        tokens.append(f"c:{movimiento.cuenta_id}")
+    tokens.append(f"m:{_rango_monto(movimiento)}")
+    return tokens
+
+
+class ClasificadorTexto:
+    """
+    Modelo compartido del proceso (ver routers/clasificacion.py). Todas las
+    operaciones toman el candado: las peticiones concurrentes pueden
+    sincronizar y predecir a la vez.
+    """
+
+    def __init__(self, dimensiones: int = DIMENSIONES, alfa: float = ALFA):
+        self.dimensiones = dimensiones
+        self.alfa = alfa
+        self._candado = threading.RLock()
+        self.reiniciar()
+
+    def reiniciar(self) -> None:
+        """Olvida todo; el siguiente `sincronizar` reentrena desde cero."""
+        with self._candado:
+            self.version = 0
+            self.etiquetas: List[Etiqueta] = []
+            self._indice_etiqueta: Dict[Etiqueta, int] = {}
+            self._conteos = np.zeros((0, self.dimensiones), dtype=np.float32)
+            self._documentos_clase = np.zeros(0, dtype=np.int64)
+            self._frecuencia_documentos = np.zeros(self.dimensiones, dtype=np.int64)
+            # id -> (clase, índices, conteos): lo necesario para olvidarlo
+            self._ejemplos: Dict[int, Tuple[int, np.ndarray, np.ndarray]] = {}
+            self._parametros = None
+
+    @property
+    def total_ejemplos(self) -> int:
+        return len(self._ejemplos)
+
+    def _hash(self, tokens: List[str]) -> np.ndarray:
+        return np.fromiter(
+            (zlib.crc32(t.encode('utf-8')) % self.dimensiones for t in tokens),
+            dtype=np.int64, count=len(tokens)
+        )
+
+    def _vectorizar(self, movimiento: Movimiento) -> Tuple[np.ndarray, np.ndarray]:
+        indices, conteos = np.unique(self._hash(caracteristicas(movimiento)), return_counts=True)
+        return indices, conteos.astype(np.float32)
+
+    def _indices_texto(self, movimiento: Movimiento) -> np.ndarray:
+        return np.unique(self._hash([t for t in caracteristicas(movimiento) if t.startswith(PREFIJOS_TEXTO)]))
+
+    def _clase(self, etiqueta: Etiqueta) -> int:
+        clase = self._indice_etiqueta.get(etiqueta)
+        if clase is None:
+            clase = len(self.etiquetas)
+            self.etiquetas.append(etiqueta)
+            self._indice_etiqueta[etiqueta] = clase
+            self._conteos = np.vstack([self._conteos, np.zeros((1, self.dimensiones), dtype=np.float32)])
+            self._documentos_clase = np.append(self._documentos_clase, 0)
+        return clase
+
+    def aprender(self, movimiento: Movimiento) -> None:
+        """Agrega (o actualiza, si ya lo conocía) un movimiento clasificado."""
+        with self._candado:
+            self.olvidar(movimiento.id)
+            clase = self._clase((movimiento.grupo_id, movimiento.concepto_id))
+            indices, conteos = self._vectorizar(movimiento)
+            self._conteos[clase, indices] += conteos
+            self._documentos_clase[clase] += 1
+            self._frecuencia_documentos[indices] += 1
+            self._ejemplos[movimiento.id] = (clase, indices, conteos)
+            self._parametros = None
+
+    def olvidar(self, movimiento_id: int) -> None:
+        """Quita un movimiento del modelo (si no lo conocía, no hace nada)."""
+        with self._candado:
+            ejemplo = self._ejemplos.pop(movimiento_id, None)
+            if ejemplo is None:
+                return
+            clase, indices, conteos = ejemplo
+            self._conteos[clase, indices] -= conteos
+            self._documentos_clase[clase] -= 1
+            self._frecuencia_documentos[indices] -= 1
+            self._parametros = None
+
+    def sincronizar(self, movimiento_repo: MovimientoRepository) -> int:
+        """
+        Aplica los cambios desde la última versión vista: aprende los movimientos
+        clasificados y olvida los que volvieron a quedar pendientes o se
+        inactivaron. Retorna cuántos cambios leyó.
+        """
+        with self._candado:
+            leidos = 0
+            while True:
+                cambios = movimiento_repo.obtener_etiquetados_desde(self.version, LIMITE_SINCRONIZACION)
+                for row_version, etiquetado, mov in cambios:
+                    if etiquetado and mov.grupo_id is not None and mov.concepto_id is not None:
+                        self.aprender(mov)
+                    else:
+                        self.olvidar(mov.id)
+                    self.version = row_version
+                leidos += len(cambios)
+                if len(cambios) < LIMITE_SINCRONIZACION:
+                    return leidos
+
+    def _calcular_parametros(self):
+        if self._parametros is None:
+            total_clase = self._conteos.sum(axis=1, keepdims=True)
+            log_theta = np.log(self._conteos + self.alfa) - np.log(total_clase + self.alfa * self.dimensiones)
+            with np.errstate(divide='ignore'):
+                # Una clase sin ejemplos (todos olvidados) queda con prior -inf;
+                # predecir la excluye antes de comparar
+                log_prior = np.log(self._documentos_clase / self.total_ejemplos)
+            idf = np.log((1 + self.total_ejemplos) / (1 + self._frecuencia_documentos)) + 1
+            self._parametros = (log_theta, log_prior, idf.astype(np.float32))
+        return self._parametros
+
+    def predecir(self, movimientos: List[Movimiento]) -> List[Optional[Prediccion]]:
+        """
+        Clase más probable de cada movimiento, en orden, con su evidencia.
+        None para todos si el modelo aún no tiene ejemplos.
+        """
+        with self._candado:
+            if not movimientos or not self.total_ejemplos:
+                return [None] * len(movimientos)
+
+            log_theta, log_prior, idf = self._calcular_parametros()
+            # Solo compiten las clases que aún tienen ejemplos
+            activas = np.flatnonzero(self._documentos_clase > 0)
+            log_theta, log_prior = log_theta[activas], log_prior[activas]
+            resultados: List[Optional[Prediccion]] = []
+            for inicio in range(0, len(movimientos), TAMANO_LOTE):
+                vectores = [self._vectorizar(m) for m in movimientos[inicio:inicio + TAMANO_LOTE]]
+
+                # Matriz densa solo sobre las columnas que aparecen en el bloque
+                indices = np.concatenate([v[0] for v in vectores])
+                columnas = np.unique(indices)
+                filas = np.repeat(np.arange(len(vectores)), [len(v[0]) for v in vectores])
+                x = np.zeros((len(vectores), len(columnas)), dtype=np.float32)
+                x[filas, np.searchsorted(columnas, indices)] = np.concatenate([v[1] for v in vectores])
+                x *= idf[columnas]
+
+                puntajes = x @ log_theta[:, columnas].T + log_prior
+                puntajes -= puntajes.max(axis=1, keepdims=True)
+                probabilidades = np.exp(puntajes)
+                probabilidades /= probabilidades.sum(axis=1, keepdims=True)
+
+                mejores = probabilidades.argmax(axis=1)
+                for fila, mejor in enumerate(mejores):
+                    clase = activas[mejor]
+                    texto = self._indices_texto(movimientos[inicio + fila])
+                    grupo_id, concepto_id = self.etiquetas[clase]
+                    resultados.append(Prediccion(
+                        grupo_id=grupo_id,
+                        concepto_id=concepto_id,
+                        probabilidad=float(probabilidades[fila, mejor]),
+                        evidencia_texto=int(np.count_nonzero(self._conteos[clase, texto] > 0)),
+                        ejemplos_clase=int(self._documentos_clase[clase])
+                    ))
+            return resultados
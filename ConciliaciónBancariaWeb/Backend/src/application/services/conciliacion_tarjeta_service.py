@@ -0,0 +1,136 @@
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import List, Optional, Sequence, Tuple
+
+from src.domain.models.movimiento import Movimiento
+from src.domain.ports.conciliacion_tarjeta_repository import ConciliacionTarjetaRepository
+
+TOLERANCIA_VALOR = Decimal('1')
+TOLERANCIA_DIAS = 5
+
+
+@dataclass
+class VinculoPago:
+    """Un pago en la cuenta de la tarjeta y su débito en la cuenta de ahorros."""
+    pago: Movimiento
+    debito: Movimiento
+
+    @property
+    def diferencia_valor(self) -> Decimal:
+        return abs(self.pago.valor) - abs(self.debito.valor)
+
+    @property
+    def diferencia_dias(self) -> int:
+        return (self.pago.fecha - self.debito.fecha).days
+
+
+def conciliar_pagos(pagos: Sequence[Movimiento],
+                    debitos: Sequence[Movimiento],
+                    tolerancia_valor: Decimal = TOLERANCIA_VALOR,
+                    tolerancia_dias: int = TOLERANCIA_DIAS
+                    ) -> Tuple[List[VinculoPago], List[Movimiento], List[Movimiento]]:
+    """
+    Vincula cada pago de tarjeta con un débito de ahorros de valor y fecha cercanos.
+
+    Los débitos se ordenan una vez por |valor|; para cada pago se buscan por
+    bisección solo los de |valor| dentro de la tolerancia y luego se filtran por
+    fecha. Con todos los candidatos se asigna de mejor a peor (menor diferencia
+    de valor, luego de días), usando cada movimiento una sola vez. Costo
+    O((n + m) log m + k log k) con k candidatos, así que un año de extractos se
+    resuelve en una pasada.
+
+    Returns:
+        (vínculos, pagos sin pareja, débitos sin pareja)
+    """
+    ordenados = sorted(debitos, key=lambda d: abs(d.valor))
+    montos = [abs(d.valor) for d in ordenados]
+
+    candidatos = []
+    for i, pago in enumerate(pagos):
+        monto = abs(pago.valor)
+        inicio = bisect_left(montos, monto - tolerancia_valor)
+        fin = bisect_right(montos, monto + tolerancia_valor)
+        for j in range(inicio, fin):
+            debito = ordenados[j]
+            dias = abs((pago.fecha - debito.fecha).days)
+            if dias <= tolerancia_dias:
+                candidatos.append((abs(monto - montos[j]), dias, i, j))
+
+    candidatos.sort()
+    pagos_usados, debitos_usados = set(), set()
+    vinculos = []
+    for _, _, i, j in candidatos:
+        if i in pagos_usados or j in debitos_usados:
+            continue
+        pagos_usados.add(i)
+        debitos_usados.add(j)
+        vinculos.append(VinculoPago(pago=pagos[i], debito=ordenados[j]))
+
+    vinculos.sort(key=lambda v: (v.pago.fecha, v.pago.id or 0))
+    pagos_sin_pareja = [p for i, p in enumerate(pagos) if i not in pagos_usados]
+    debitos_sin_pareja = sorted(
+        (d for j, d in enumerate(ordenados) if j not in debitos_usados),
+        key=lambda d: (d.fecha, d.id or 0)
+    )
+    return vinculos, pagos_sin_pareja, debitos_sin_pareja
+
+
+class ConciliacionTarjetaService:
+    """
+    Servicio de Aplicación: concilia los pagos registrados en el extracto de la
+    tarjeta de crédito contra los débitos del extracto de ahorros.
+    """
+
+    def __init__(self, repo: ConciliacionTarjetaRepository):
+        self.repo = repo
+
+    def conciliar(self,
+                  cuenta_tarjeta_id: int,
+                  cuenta_ahorros_id: int,
+                  fecha_inicio: date,
+                  fecha_fin: date,
+                  tolerancia_valor: Decimal = TOLERANCIA_VALOR,
+                  tolerancia_dias: int = TOLERANCIA_DIAS,
+                  patron_ahorros: Optional[str] = None,
+                  guardar: bool = False) -> dict:
+        """
+        Concilia los pagos del periodo. Los débitos de ahorros se buscan también
+        `tolerancia_dias` antes y después del periodo.
+
+        Args:
+            patron_ahorros: texto de la descripción de los débitos de pago de
+                tarjeta (p.ej. 'PAGO TARJ'). Sin él, todos los débitos son candidatos
+                y los que quedan sin pareja no se reportan (serían casi todos).
+            guardar: si es True, marca ambos lados como conciliados.
+        """
+        pagos = self.repo.obtener_pagos_tarjeta(cuenta_tarjeta_id, fecha_inicio, fecha_fin)
+        debitos = self.repo.obtener_debitos_ahorros(
+            cuenta_ahorros_id,
+            fecha_inicio - timedelta(days=tolerancia_dias),
+            fecha_fin + timedelta(days=tolerancia_dias),
+            patron_ahorros
+        )
+        vinculos, pagos_sin_pareja, debitos_sin_pareja = conciliar_pagos(
+            pagos, debitos, tolerancia_valor, tolerancia_dias
+        )
+
+        guardados = 0
+        if guardar:
+            guardados = self.repo.guardar_vinculos([
+                {
+                    "movimiento_tarjeta_id": v.pago.id,
+                    "movimiento_ahorros_id": v.debito.id,
+                    "diferencia_valor": v.diferencia_valor,
+                    "diferencia_dias": v.diferencia_dias,
+                }
+                for v in vinculos
+            ])
+
+        return {
+            "vinculos": vinculos,
+            "pagos_sin_pareja": pagos_sin_pareja,
+            "debitos_sin_pareja": debitos_sin_pareja if patron_ahorros else [],
+            "guardados": guardados,
+        }
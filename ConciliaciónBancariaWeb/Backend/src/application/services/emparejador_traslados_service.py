@@ -0,0 +1,138 @@
+from collections import deque
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from itertools import groupby
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from src.domain.models.movimiento import Movimiento
+from src.domain.ports.movimiento_repository import MovimientoRepository
+
+DIAS_VENTANA = 3
+
+
+@dataclass
+class ParTraslado:
+    """Un egreso de una cuenta y el ingreso por el mismo valor en otra cuenta."""
+    egreso: Movimiento
+    ingreso: Movimiento
+
+    @property
+    def dias(self) -> int:
+        return abs((self.ingreso.fecha - self.egreso.fecha).days)
+
+
+def _clave_monto(mov: Movimiento) -> Tuple[int, Decimal]:
+    return mov.moneda_id or 0, abs(mov.valor)
+
+
+def emparejar_traslados(movimientos: Sequence[Movimiento],
+                        dias_ventana: int = DIAS_VENTANA,
+                        anclas: Optional[Set[int]] = None) -> List[ParTraslado]:
+    """
+    Empareja movimientos de signo opuesto y mismo valor (y moneda) de cuentas
+    distintas cuya diferencia de fechas no supera `dias_ventana`.
+
+    Barrido en O(n log n): se ordena una vez por (moneda, |valor|, fecha) y cada
+    grupo de igual monto se recorre en orden de fecha. Los movimientos aún sin
+    pareja esperan en colas FIFO por (signo, cuenta, es_ancla). Al llegar un
+    movimiento, de cada cola opuesta compatible (otra cuenta; ancla si él no lo
+    es) se descartan por el frente los que quedaron fuera de la ventana y se
+    toma el más antiguo entre los frentes (el primero en llegar es el primero
+    en emparejarse, de modo que pagos repetidos del mismo valor no se cruzan).
+    Solo se mira el frente de cada cola, así que cada movimiento cuesta
+    O(número de cuentas) y nunca se borra del medio de una cola.
+
+    Args:
+        anclas: si se indica (IDs recién cargados), solo se devuelven pares en
+            los que al menos uno de los dos movimientos es ancla. El resto de la
+            lista sirve como contraparte.
+    """
+    pares: List[ParTraslado] = []
+    candidatos = sorted(
+        (m for m in movimientos if m.valor),
+        key=lambda m: (*_clave_monto(m), m.fecha, m.id or 0)
+    )
+
+    def es_ancla(mov: Movimiento) -> bool:
+        return anclas is None or mov.id in anclas
+
+    for _, grupo in groupby(candidatos, key=_clave_monto):
+        # signo -> (cuenta_id, es_ancla) -> cola en orden de fecha
+        pendientes: Dict[int, Dict[Tuple[Optional[int], bool], deque]] = {1: {}, -1: {}}
+        for mov in grupo:
+            signo = 1 if mov.valor > 0 else -1
+            ancla = es_ancla(mov)
+
+            cola_pareja = None
+            for (cuenta_id, cola_ancla), cola in pendientes[-signo].items():
+                if cuenta_id == mov.cuenta_id or not (ancla or cola_ancla):
+                    continue
+                while cola and (mov.fecha - cola[0].fecha).days > dias_ventana:
+                    cola.popleft()
+                if cola and (cola_pareja is None
+                             or (cola[0].fecha, cola[0].id or 0) < (cola_pareja[0].fecha, cola_pareja[0].id or 0)):
+                    cola_pareja = cola
+
+            if cola_pareja is None:
+                pendientes[signo].setdefault((mov.cuenta_id, ancla), deque()).append(mov)
+                continue
+
+            pareja = cola_pareja.popleft()
+            if signo < 0:
+                pares.append(ParTraslado(egreso=mov, ingreso=pareja))
+            else:
+                pares.append(ParTraslado(egreso=pareja, ingreso=mov))
+
+    pares.sort(key=lambda p: (p.egreso.fecha, p.egreso.id or 0))
+    return pares
+
+
+class EmparejadorTrasladosService:
+    """
+    Servicio de Aplicación: detecta traslados entre cuentas propias y los
+    reclasifica en bloque como Traslado (reclasificar_movimientos_grupo).
+    """
+
+    def __init__(self, movimiento_repo: MovimientoRepository):
+        self.movimiento_repo = movimiento_repo
+
+    def proponer(self,
+                 fecha_inicio: Optional[date] = None,
+                 fecha_fin: Optional[date] = None,
+                 dias_ventana: int = DIAS_VENTANA,
+                 creados_desde: Optional[datetime] = None) -> List[ParTraslado]:
+        """
+        Pares propuestos entre los movimientos pendientes de clasificar.
+
+        Con `creados_desde` (modo incremental, p.ej. tras una carga) solo se
+        proponen pares que involucren movimientos creados desde esa marca; sus
+        contrapartes se buscan en la ventana de fechas alrededor de ellos.
+        """
+        anclas = None
+        if creados_desde is not None:
+            nuevos = self.movimiento_repo.obtener_candidatos_traslado(creados_desde=creados_desde)
+            if not nuevos:
+                return []
+            anclas = {m.id for m in nuevos}
+            desde = min(m.fecha for m in nuevos)
+            hasta = max(m.fecha for m in nuevos)
+            fecha_inicio = max(fecha_inicio, desde) if fecha_inicio else desde
+            fecha_fin = min(fecha_fin, hasta) if fecha_fin else hasta
+            if fecha_inicio > fecha_fin:
+                return []
+            # La contraparte puede estar hasta `dias_ventana` antes o después
+            fecha_inicio -= timedelta(days=dias_ventana)
+            fecha_fin += timedelta(days=dias_ventana)
+
+        candidatos = self.movimiento_repo.obtener_candidatos_traslado(
+            fecha_inicio=fecha_inicio, fecha_fin=fecha_fin
+        )
+        return emparejar_traslados(candidatos, dias_ventana, anclas)
+
+    def aplicar(self, pares: Sequence[ParTraslado]) -> int:
+        """Reclasifica ambos lados de cada par como Traslado. Retorna filas actualizadas."""
+        ids = sorted({p.egreso.id for p in pares} | {p.ingreso.id for p in pares})
+        if not ids:
+            return 0
+        return self.movimiento_repo.reclasificar_movimientos_grupo(tercero_id=None, movimiento_ids=ids)
@@ -0,0 +1,158 @@
+"""
+Núcleo de ingesta de extractos, compartido por la carga web
+(ProcesadorArchivosService) y el cargador de escritorio
+(ConciliaciónBancariaEscritorio/cargar_movimientos_ui.py).
+
+Etapas:
+    1. extraer_movimientos: PDF -> movimientos crudos (dicts) con el extractor
+       del tipo de cuenta y la descripción normalizada.
+    2. IngestaMovimientos.normalizar: crudo -> Movimiento (fecha, moneda, USD).
+    3. IngestaMovimientos.marcar_duplicados: una sola consulta para el lote.
+    4. IngestaMovimientos.insertar: un solo INSERT ... ON CONFLICT para el lote.
+
+La detección de duplicados y la inserción usan la misma huella
+(ver Sql/agregar_huella_movimientos.sql), así que lo que la vista previa marca
+como nuevo es exactamente lo que la carga inserta.
+"""
+
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.domain.models.movimiento import Movimiento
+from src.domain.ports.moneda_repository import MonedaRepository
+from src.domain.ports.movimiento_repository import MovimientoRepository
+from src.infrastructure.extractors.bancolombia import extraer_movimientos_bancolombia
+from src.infrastructure.extractors.creditcard import extraer_movimientos_credito
+from src.infrastructure.extractors.fondorenta import extraer_movimientos_fondorenta
+
+EXTRACTORES = {
+    'bancolombia_ahorro': extraer_movimientos_bancolombia,
+    'credit_card': extraer_movimientos_credito,
+    'fondo_renta': extraer_movimientos_fondorenta,
+}
+
+MONEDA_COP = 1
+
+
+def extraer_movimientos(file_obj: Any, tipo_cuenta: str) -> List[Dict[str, Any]]:
+    """
+    Extrae los movimientos crudos del PDF (ruta o archivo abierto).
+    Cada uno trae fecha (ISO), descripcion, referencia, valor y, en tarjeta, moneda.
+    """
+    extractor = EXTRACTORES.get(tipo_cuenta)
+    if extractor is None:
+        raise ValueError(f"Tipo de cuenta no soportado: {tipo_cuenta}")
+
+    raw_movs = extractor(file_obj)
+
+    # Normalizar descripción: "Título De Caso"
+    for m in raw_movs:
+        if m.get('descripcion'):
+            m['descripcion'] = m['descripcion'].strip().title()
+
+    return raw_movs
+
+
+def huella_con_descripcion(tipo_cuenta: str) -> bool:
+    """
+    LÓGICA ESPECIAL PARA TARJETA DE CRÉDITO (aplica a COP y USD): las
+    descripciones pueden variar entre extractos, así que su huella solo usa
+    cuenta, fecha, valor/usd y referencia.
+    """
+    return tipo_cuenta != 'credit_card'
+
+
+class IngestaMovimientos:
+    """
+    Etapas de normalización, detección de duplicados e inserción por lotes.
+    La normalización no toca la BD: `movimiento_repo` solo se necesita para
+    marcar_duplicados e insertar.
+    """
+
+    def __init__(self,
+                 movimiento_repo: Optional[MovimientoRepository] = None,
+                 moneda_repo: Optional[MonedaRepository] = None):
+        self.movimiento_repo = movimiento_repo
+        self.moneda_repo = moneda_repo
+
+        # Cache de monedas para evitar consultas repetitivas
+        self._monedas_cache = {}
+
+    def _obtener_id_moneda(self, codigo_iso: str) -> int:
+        """Resuelve el ID de moneda. Default: 1 (COP) si no encuentra o no viene."""
+        if not codigo_iso or codigo_iso == 'COP' or self.moneda_repo is None:
+            return MONEDA_COP
+
+        if codigo_iso in self._monedas_cache:
+            return self._monedas_cache[codigo_iso]
+
+        for m in self.moneda_repo.obtener_todos():
+            self._monedas_cache[m.isocode] = m.monedaid
+        return self._monedas_cache.get(codigo_iso, MONEDA_COP)
+
+    def normalizar_movimiento(self, raw: Dict[str, Any], cuenta_id: int,
+                              cuenta_usd_id: Optional[int] = None) -> Movimiento:
+        """
+        Convierte un movimiento crudo en la entidad a guardar.
+
+        MANEJO ESPECIAL PARA USD:
+        - El valor del PDF va al campo 'usd'
+        - El campo 'valor' queda en 0 (hasta que se aplique TRM)
+        - La moneda siempre es COP (id=1)
+        - Si se indica `cuenta_usd_id`, el movimiento va a esa cuenta
+        """
+        fecha = raw['fecha']
+        if isinstance(fecha, str):
+            fecha = date.fromisoformat(fecha)
+
+        if raw.get('moneda') == 'USD':
+            usd_val = raw['valor']
+            valor_para_bd = 0
+            moneda_id = MONEDA_COP
+            cuenta_destino = cuenta_usd_id or cuenta_id
+        else:
+            usd_val = None
+            valor_para_bd = raw['valor']
+            moneda_id = self._obtener_id_moneda(raw.get('moneda', 'COP'))
+            cuenta_destino = cuenta_id
+
+        return Movimiento(
+            fecha=fecha,
+            descripcion=raw['descripcion'],
+            referencia=raw.get('referencia', ''),
+            valor=valor_para_bd,
+            moneda_id=moneda_id,
+            cuenta_id=cuenta_destino,
+            usd=usd_val,
+            trm=None,
+            tercero_id=None, grupo_id=None, concepto_id=None,
+            id=None  # Se genera al guardar
+        )
+
+    def normalizar(self, raw_movs: List[Dict[str, Any]], cuenta_id: int,
+                   cuenta_usd_id: Optional[int] = None
+                   ) -> Tuple[List[Tuple[Dict[str, Any], Movimiento]], List[Tuple[Dict[str, Any], Exception]]]:
+        """
+        Normaliza el lote. Un movimiento inválido no detiene los demás.
+
+        Returns:
+            (pares (crudo, Movimiento) válidos, pares (crudo, error))
+        """
+        validos, errores = [], []
+        for raw in raw_movs:
+            try:
+                validos.append((raw, self.normalizar_movimiento(raw, cuenta_id, cuenta_usd_id)))
+            except Exception as e:
+                errores.append((raw, e))
+        return validos, errores
+
+    def marcar_duplicados(self, movimientos: List[Movimiento], tipo_cuenta: str) -> List[bool]:
+        """Para cada movimiento, True si ya está en BD (misma huella)."""
+        return self.movimiento_repo.marcar_existentes(movimientos, huella_con_descripcion(tipo_cuenta))
+
+    def insertar(self, movimientos: List[Movimiento], tipo_cuenta: str) -> List[Movimiento]:
+        """
+        Inserta el lote en una sola sentencia, omitiendo los que ya existan.
+        Retorna los insertados (con id).
+        """
+        return self.movimiento_repo.guardar_nuevos(movimientos, huella_con_descripcion(tipo_cuenta))
@@ -0,0 +1,124 @@
+import csv
+import io
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Optional, Tuple
+
+from src.domain.ports.trm_repository import TrmRepository
+from src.infrastructure.logging.config import logger
+
+# Encabezados aceptados (en minúsculas). El CSV de datos abiertos de la
+# Superfinanciera trae VALOR, UNIDAD, VIGENCIADESDE, VIGENCIAHASTA.
+COLUMNAS_FECHA = ('fecha', 'vigenciadesde', 'date')
+COLUMNAS_VALOR = ('valor', 'trm', 'value')
+
+_FORMATOS_FECHA = ('%Y-%m-%d', '%d/%m/%Y', '%Y/%m/%d', '%d-%m-%Y')
+
+# La TRM nunca ha estado por debajo de ~600 COP/USD (1991). Un valor menor es
+# un error de formato (p.ej. '4.123' leído como 4,123) y se descarta en vez
+# de guardarse 1000 veces más bajo.
+TRM_MINIMA = Decimal('100')
+
+
+def _parsear_fecha(texto: str) -> Optional[date]:
+    texto = (texto or '').strip()[:10]
+    for formato in _FORMATOS_FECHA:
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _parsear_tasa(texto: str) -> Optional[Decimal]:
+    """
+    Acepta '4123.45', '4,123.45', '4.123,45', '4123,45' y '4.123': si aparecen
+    ambos separadores el último es el decimal; si solo hay uno, es decimal salvo
+    que separe miles (se repite o lleva exactamente tres dígitos después).
+    Retorna None si el valor no es válido o es menor que TRM_MINIMA.
+    """
+    texto = (texto or '').strip().replace('$', '').replace(' ', '')
+    if not texto:
+        return None
+    if ',' in texto and '.' in texto:
+        if texto.rfind(',') > texto.rfind('.'):
+            texto = texto.replace('.', '').replace(',', '.')
+        else:
+            texto = texto.replace(',', '')
+    else:
+        for separador in (',', '.'):
+            if separador in texto:
+                entero, _, decimales = texto.rpartition(separador)
+                if len(decimales) == 3 or separador in entero:
+                    texto = texto.replace(separador, '')
+                else:
+                    texto = f"{entero}.{decimales}"
+    try:
+        valor = Decimal(texto)
+    except InvalidOperation:
+        return None
+    return valor if valor >= TRM_MINIMA else None
+
+
+def leer_csv_trm(contenido: str) -> Tuple[List[Tuple[date, Decimal]], int]:
+    """
+    Lee un CSV de TRM con columnas de fecha y valor (ver COLUMNAS_FECHA y
+    COLUMNAS_VALOR; el separador se detecta). Si una fecha se repite gana la última.
+
+    Returns:
+        (tasas ordenadas por fecha, filas descartadas)
+    """
+    try:
+        dialecto = csv.Sniffer().sniff(contenido[:4096], delimiters=',;\t')
+    except csv.Error:
+        dialecto = csv.excel
+    lector = csv.DictReader(io.StringIO(contenido), dialect=dialecto)
+    encabezados = {(c or '').strip().lower(): c for c in (lector.fieldnames or [])}
+
+    col_fecha = next((encabezados[c] for c in COLUMNAS_FECHA if c in encabezados), None)
+    col_valor = next((encabezados[c] for c in COLUMNAS_VALOR if c in encabezados), None)
+    if not col_fecha or not col_valor:
+        raise ValueError(
+            f"El CSV debe tener una columna de fecha ({', '.join(COLUMNAS_FECHA)}) "
+            f"y una de valor ({', '.join(COLUMNAS_VALOR)})"
+        )
+
+    tasas: Dict[date, Decimal] = {}
+    descartadas = 0
+    for fila in lector:
+        fecha = _parsear_fecha(fila.get(col_fecha))
+        valor = _parsear_tasa(fila.get(col_valor))
+        if fecha is None or valor is None:
+            descartadas += 1
+            continue
+        tasas[fecha] = valor
+    return sorted(tasas.items()), descartadas
+
+
+class TrmService:
+    """
+    Servicio de Aplicación: carga la TRM desde CSV y convierte a COP los
+    movimientos USD pendientes.
+    """
+
+    def __init__(self, repo: TrmRepository):
+        self.repo = repo
+
+    def cargar_csv(self, contenido: str, aplicar: bool = True) -> dict:
+        """
+        Guarda las tasas del CSV y, si `aplicar`, llena TRM y Valor de todos los
+        movimientos USD pendientes que ya tengan una TRM vigente.
+        """
+        tasas, descartadas = leer_csv_trm(contenido)
+        guardadas = self.repo.guardar_tasas(tasas)
+        aplicados = 0
+        if aplicar and tasas:
+            aplicados = self.repo.aplicar_trm_pendientes()
+        logger.info(f"TRM: {guardadas} tasas guardadas, {descartadas} filas descartadas, {aplicados} movimientos convertidos")
+        return {
+            "tasas_guardadas": guardadas,
+            "filas_descartadas": descartadas,
+            "desde": tasas[0][0] if tasas else None,
+            "hasta": tasas[-1][0] if tasas else None,
+            "movimientos_convertidos": aplicados
+        }
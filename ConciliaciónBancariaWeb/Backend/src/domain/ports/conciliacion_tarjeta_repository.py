@@ -0,0 +1,43 @@
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import List, Optional
+from src.domain.models.movimiento import Movimiento
+
+
+class ConciliacionTarjetaRepository(ABC):
+    """
+    Puerto para la conciliación de pagos de tarjeta de crédito contra la cuenta de ahorros.
+    """
+
+    @abstractmethod
+    def obtener_pagos_tarjeta(self, cuenta_tarjeta_id: int, fecha_inicio: date, fecha_fin: date) -> List[Movimiento]:
+        """Abonos (valor > 0) de la cuenta de la tarjeta que aún no están conciliados"""
+        pass
+
+    @abstractmethod
+    def obtener_debitos_ahorros(self, cuenta_ahorros_id: int, fecha_inicio: date, fecha_fin: date,
+                                patron: Optional[str] = None) -> List[Movimiento]:
+        """
+        Débitos (valor < 0) de la cuenta de ahorros que aún no están conciliados.
+        Si se indica `patron` (ILIKE), solo los de descripción coincidente.
+        """
+        pass
+
+    @abstractmethod
+    def guardar_vinculos(self, vinculos: List[dict]) -> int:
+        """
+        Guarda vínculos {movimiento_tarjeta_id, movimiento_ahorros_id, diferencia_valor,
+        diferencia_dias}. Ignora los que ya existan. Retorna cuántos se guardaron.
+        """
+        pass
+
+    @abstractmethod
+    def obtener_vinculos(self, cuenta_tarjeta_id: Optional[int] = None,
+                         fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None) -> List[dict]:
+        """Vínculos guardados, con fecha, valor y descripción de ambos lados"""
+        pass
+
+    @abstractmethod
+    def eliminar_vinculo(self, id: int) -> bool:
+        """Deshace una conciliación. Retorna False si no existía"""
+        pass
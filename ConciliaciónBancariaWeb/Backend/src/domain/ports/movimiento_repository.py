@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import List, Optional
-from datetime import date
+from datetime import date, datetime
 from src.domain.models.movimiento import Movimiento
 
 class MovimientoRepository(ABC):
@@ -24,29 +24,41 @@ class MovimientoRepository(ABC):
         pass
 
     @abstractmethod
-    def buscar_pendientes_clasificacion(
-        self,
-        terceros_pendientes: List[int] = None,
-        grupos_pendientes: List[int] = None,
-        conceptos_pendientes: List[int] = None
-    ) -> List[Movimiento]:
+    def buscar_pendientes_clasificacion(self, campos: Optional[List[str]] = None) -> List[Movimiento]:
         """
         Obtiene movimientos pendientes de clasificación.
-        Incluye movimientos con campos NULL o con IDs que semánticamente significan "pendiente".
+        Incluye movimientos con campos NULL o con IDs que semánticamente significan "pendiente"
+        (config_valores_pendientes).
+        Si se indican `campos` (atributos de Movimiento), solo se cargan esos (además de id, fecha y valor).
         """
         pass
 
+    @abstractmethod
+    def contar_pendientes(self) -> int:
+        """Número de movimientos pendientes de clasificación"""
+        pass
+
     @abstractmethod
     def buscar_por_referencia(self, referencia: str) -> List[Movimiento]:
         """Busca movimientos por su referencia bancaria exacta"""
         pass
     
     @abstractmethod
-    def existe_movimiento(self, fecha: date, valor: float, referencia: str, descripcion: str = None, usd: float = None) -> bool:
+    def guardar_nuevos(self, movimientos: List[Movimiento], con_descripcion: bool = True) -> List[Movimiento]:
+        """
+        Inserta los movimientos cuya huella (cuenta, fecha, monto, descripción,
+        referencia) no exista, en una sola sentencia. Los que ya existan se
+        omiten sin error, también si los inserta otra carga simultánea.
+        Con con_descripcion=False la huella ignora la descripción (extractos de tarjeta).
+        Retorna los insertados, con id y created_at.
+        """
+        pass
+
+    @abstractmethod
+    def marcar_existentes(self, movimientos: List[Movimiento], con_descripcion: bool = True) -> List[bool]:
         """
-        Verifica si existe un movimiento duplicado (misma fecha, valor, referencia - y descripción si no hay Ref).
-        Útil para evitar cargas duplicadas de extractos.
-        Si se pasa 'usd', se valida contra la columna USD en la BD.
+        Para cada movimiento (en el mismo orden) indica si ya existe uno con su
+        huella. Una sola consulta para todo el lote.
         """
         pass
 
@@ -67,10 +79,14 @@ class MovimientoRepository(ABC):
                        solo_pendientes: bool = False,
                        tipo_movimiento: Optional[str] = None,
                        skip: int = 0,
-                       limit: Optional[int] = None
+                       limit: Optional[int] = None,
+                       campos: Optional[List[str]] = None
     ) -> tuple[List[Movimiento], int]:
         """
         Búsqueda con múltiples filtros opcionales y paginación.
+        `solo_pendientes` usa la misma regla que buscar_pendientes_clasificacion:
+        campos NULL o con valores de config_valores_pendientes.
+        Si se indican `campos` (atributos de Movimiento), solo se cargan esos (además de id, fecha y valor).
         
         Returns:
             tuple: (lista de movimientos, total de registros)
@@ -100,6 +116,15 @@ class MovimientoRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def previsualizar_clasificacion_lote(self, patron: str, limite: int = 50,
+                                         campos: Optional[List[str]] = None) -> tuple:
+        """
+        Preview de actualizar_clasificacion_lote sin modificar nada.
+        Retorna (primeros `limite` movimientos, total que se actualizaría).
+        """
+        pass
+
     @abstractmethod
     def actualizar_clasificacion_lote(self, patron: str, tercero_id: int, grupo_id: int, concepto_id: int) -> int:
         """
@@ -109,6 +134,54 @@ class MovimientoRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def buscar_texto(self, texto: str, skip: int = 0, limit: int = 50,
+                     campos: Optional[List[str]] = None) -> tuple:
+        """
+        Búsqueda libre ordenada por relevancia sobre descripción, referencia y detalle,
+        con coincidencia por prefijo de cada palabra.
+        Retorna (movimientos de la página, total de coincidencias).
+        """
+        pass
+
+    @abstractmethod
+    def obtener_candidatos_traslado(self, fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None,
+                                    creados_desde: Optional[datetime] = None) -> List[Movimiento]:
+        """
+        Movimientos pendientes de clasificar (y que no son Traslado) con valor
+        distinto de cero, en el rango de fechas y/o creados desde una marca (para
+        emparejar solo lo recién cargado).
+        """
+        pass
+
+    @abstractmethod
+    def reclasificar_movimientos_grupo(self, tercero_id: Optional[int], grupo_id_anterior: Optional[int] = None,
+                                       concepto_id_anterior: Optional[int] = None, fecha_inicio: Optional[date] = None,
+                                       fecha_fin: Optional[date] = None, movimiento_ids: Optional[List[int]] = None) -> int:
+        """
+        Reclasifica como Traslado los movimientos del tercero (o exactamente los
+        movimiento_ids indicados). Retorna el número de filas actualizadas.
+        """
+        pass
+
+    @abstractmethod
+    def obtener_cambios_desde(self, version: int, limite: int) -> List[tuple]:
+        """
+        Movimientos con row_version mayor que `version`, en orden de versión
+        (máximo `limite`). Retorna tuplas (row_version, activa, Movimiento).
+        Base de la sincronización incremental (GET /api/sync).
+        """
+        pass
+
+    @abstractmethod
+    def obtener_etiquetados_desde(self, version: int, limite: int) -> List[tuple]:
+        """
+        Como obtener_cambios_desde, pero solo con los campos que usa el
+        clasificador de texto. Retorna tuplas (row_version, etiquetado, Movimiento);
+        etiquetado es False si el movimiento está pendiente o inactivo.
+        """
+        pass
+
     @abstractmethod
     def obtener_desglose_gastos(self, 
                                nivel: str,
@@ -0,0 +1,22 @@
+from abc import ABC, abstractmethod
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional
+
+
+class SaldoRepository(ABC):
+    """
+    Puerto para consultar saldos por cuenta (tabla saldos_mensuales).
+    """
+
+    @abstractmethod
+    def obtener_saldo(self, cuenta_id: int, fecha: date) -> Decimal:
+        """Saldo de la cuenta al final del día `fecha`"""
+        pass
+
+    @abstractmethod
+    def obtener_saldos_mensuales(self, cuenta_id: int,
+                                 fecha_inicio: Optional[date] = None,
+                                 fecha_fin: Optional[date] = None) -> List[dict]:
+        """Cierres mensuales {mes, neto_mes, saldo_cierre} de la cuenta, en orden de mes"""
+        pass
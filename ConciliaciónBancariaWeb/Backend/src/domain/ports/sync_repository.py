@@ -0,0 +1,26 @@
+from abc import ABC, abstractmethod
+
+
+class SyncRepository(ABC):
+    """
+    Puerto para la sincronización incremental de movimientos y catálogos.
+    """
+
+    @abstractmethod
+    def obtener_cambios(self, desde: int, limite: int) -> dict:
+        """
+        Cambios con row_version mayor que `desde`.
+
+        Args:
+            desde: última versión que el cliente ya tiene (0 = todo)
+            limite: máximo de filas por tabla en una respuesta
+
+        Returns:
+            dict con:
+            - version: versión hasta la que llega la respuesta (el próximo `desde`)
+            - hay_mas: True si quedaron cambios posteriores por traer
+            - cambios: tabla -> filas nuevas o modificadas (movimientos como Movimiento,
+              catálogos como dict)
+            - eliminados: tabla -> IDs borrados (física o lógicamente)
+        """
+        pass
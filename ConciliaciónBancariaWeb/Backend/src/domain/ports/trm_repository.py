@@ -0,0 +1,37 @@
+from abc import ABC, abstractmethod
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional, Tuple
+
+
+class TrmRepository(ABC):
+    """
+    Puerto para la TRM (tasa de cambio COP/USD) por fecha.
+    """
+
+    @abstractmethod
+    def guardar_tasas(self, tasas: List[Tuple[date, Decimal]]) -> int:
+        """Inserta o actualiza tasas (fecha, valor). Retorna cuántas se guardaron"""
+        pass
+
+    @abstractmethod
+    def obtener_tasa(self, fecha: date) -> Optional[Tuple[date, Decimal]]:
+        """TRM vigente a la fecha: la del día o la del día anterior más cercano"""
+        pass
+
+    @abstractmethod
+    def obtener_tasas(self, fecha_inicio: date, fecha_fin: date) -> List[dict]:
+        """
+        TRM vigente para cada día del rango: {fecha, fecha_tasa, valor}.
+        fecha_tasa es el día del que se tomó la tasa (None si no hay ninguna anterior).
+        """
+        pass
+
+    @abstractmethod
+    def aplicar_trm_pendientes(self, fecha_inicio: Optional[date] = None,
+                               fecha_fin: Optional[date] = None) -> int:
+        """
+        Llena TRM y Valor (= USD * TRM) en los movimientos USD pendientes
+        (Valor = 0). Retorna cuántos se actualizaron.
+        """
+        pass
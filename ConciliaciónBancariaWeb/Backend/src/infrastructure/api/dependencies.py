@@ -67,3 +67,30 @@ def get_config_filtro_grupo_repository(conn=Depends(get_db_connection)) -> Confi
 def get_config_valor_pendiente_repository(conn=Depends(get_db_connection)) -> ConfigValorPendienteRepository:
     return PostgresConfigValorPendienteRepository(conn)
 
+
+from src.infrastructure.database.postgres_sync_repository import PostgresSyncRepository
+from src.domain.ports.sync_repository import SyncRepository
+
+def get_sync_repository(conn=Depends(get_db_connection)) -> SyncRepository:
+    return PostgresSyncRepository(conn)
+
+
+from src.infrastructure.database.postgres_conciliacion_tarjeta_repository import PostgresConciliacionTarjetaRepository
+from src.domain.ports.conciliacion_tarjeta_repository import ConciliacionTarjetaRepository
+
+def get_conciliacion_tarjeta_repository(conn=Depends(get_db_connection)) -> ConciliacionTarjetaRepository:
+    return PostgresConciliacionTarjetaRepository(conn)
+
+
+from src.infrastructure.database.postgres_saldo_repository import PostgresSaldoRepository
+from src.domain.ports.saldo_repository import SaldoRepository
+
+def get_saldo_repository(conn=Depends(get_db_connection)) -> SaldoRepository:
+    return PostgresSaldoRepository(conn)
+
+
+from src.infrastructure.database.postgres_trm_repository import PostgresTrmRepository
+from src.domain.ports.trm_repository import TrmRepository
+
+def get_trm_repository(conn=Depends(get_db_connection)) -> TrmRepository:
+    return PostgresTrmRepository(conn)
@@ -1,10 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
 import uvicorn
 import os
 from src.infrastructure.logging.config import logger
 from src.infrastructure.api.exception_handlers import register_exception_handlers
+from src.infrastructure.api.middleware import MetricasMiddleware
+from src.infrastructure.metrics.metricas import registro
 from src.infrastructure.database.connection import get_connection_pool, close_all_connections
 
 # Importar routers
@@ -21,7 +24,12 @@ from src.infrastructure.api.routers import (
     archivos,
     reglas,
     config_filtros_grupos,
-    tercero_descripciones
+    tercero_descripciones,
+    diagnostico,
+    sync,
+    conciliacion,
+    saldos,
+    trm
 )
 
 
@@ -78,6 +86,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Métricas por ruta (latencia, en curso, tamaño de respuesta), expuestas en /metrics
+app.add_middleware(MetricasMiddleware)
+
 # Registrar exception handlers globales
 register_exception_handlers(app)
 logger.info("Exception handlers registrados")
@@ -96,6 +107,11 @@ app.include_router(archivos.router)
 app.include_router(reglas.router)
 app.include_router(config_filtros_grupos.router)
 app.include_router(tercero_descripciones.router)
+app.include_router(diagnostico.router)
+app.include_router(sync.router)
+app.include_router(conciliacion.router)
+app.include_router(saldos.router)
+app.include_router(trm.router)
 
 logger.info("Todos los routers registrados")
 
@@ -117,6 +133,14 @@ def health_check():
         "version": "1.0.0"
     }
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Métricas en formato de texto de Prometheus."""
+    return PlainTextResponse(
+        registro.exportar(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
 if __name__ == "__main__":
     # Configuración desde variables de entorno
     host = os.getenv("API_HOST", "0.0.0.0")
@@ -0,0 +1,57 @@
+"""
+Middlewares ASGI de la API.
+
+MetricasMiddleware registra, por ruta, latencia, estado y tamaño de respuesta,
+y el número de solicitudes en curso. Es un middleware ASGI puro (no
+BaseHTTPMiddleware) para no envolver el cuerpo de la respuesta en un stream
+adicional.
+"""
+
+import time
+
+from src.infrastructure.metrics.metricas import (
+    http_solicitudes,
+    http_duracion,
+    http_en_curso,
+    http_respuesta_bytes,
+)
+
+# Etiqueta para solicitudes que no coinciden con ninguna ruta (404)
+RUTA_DESCONOCIDA = "sin_ruta"
+
+
+class MetricasMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metodo = scope["method"]
+        estado = {"codigo": 500, "bytes": 0}
+
+        async def send_con_metricas(mensaje):
+            if mensaje["type"] == "http.response.start":
+                estado["codigo"] = mensaje["status"]
+            elif mensaje["type"] == "http.response.body":
+                estado["bytes"] += len(mensaje.get("body", b""))
+            await send(mensaje)
+
+        http_en_curso.sumar(metodo=metodo)
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_con_metricas)
+        finally:
+            duracion = time.perf_counter() - inicio
+            http_en_curso.restar(metodo=metodo)
+
+            # La plantilla de la ruta (/api/movimientos/{id}) y no la URL, para no
+            # crear una serie por cada ID. FastAPI la deja en el scope al enrutar.
+            ruta = scope.get("route")
+            plantilla = getattr(ruta, "path", None) or RUTA_DESCONOCIDA
+
+            http_solicitudes.incrementar(metodo=metodo, ruta=plantilla, estado=str(estado["codigo"]))
+            http_duracion.observar(duracion, metodo=metodo, ruta=plantilla)
+            http_respuesta_bytes.observar(estado["bytes"], metodo=metodo, ruta=plantilla)
@@ -2,19 +2,26 @@ from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException
 from typing import Dict, Any
 
 from src.application.services.procesador_archivos_service import ProcesadorArchivosService
-from src.infrastructure.api.dependencies import get_movimiento_repository, get_moneda_repository, get_tercero_repository
+from src.infrastructure.api.dependencies import (
+    get_movimiento_repository,
+    get_moneda_repository,
+    get_tercero_repository,
+    get_saldo_repository
+)
 from src.domain.ports.movimiento_repository import MovimientoRepository
 from src.domain.ports.moneda_repository import MonedaRepository
 from src.domain.ports.tercero_repository import TerceroRepository
+from src.domain.ports.saldo_repository import SaldoRepository
 
 router = APIRouter(prefix="/api/archivos", tags=["archivos"])
 
 def get_procesador_service(
     mov_repo: MovimientoRepository = Depends(get_movimiento_repository),
     moneda_repo: MonedaRepository = Depends(get_moneda_repository),
-    tercero_repo: TerceroRepository = Depends(get_tercero_repository)
+    tercero_repo: TerceroRepository = Depends(get_tercero_repository),
+    saldo_repo: SaldoRepository = Depends(get_saldo_repository)
 ) -> ProcesadorArchivosService:
-    return ProcesadorArchivosService(mov_repo, moneda_repo, tercero_repo)
+    return ProcesadorArchivosService(mov_repo, moneda_repo, tercero_repo, saldo_repo)
 
 @router.post("/cargar")
 async def cargar_archivo(
@@ -49,16 +56,18 @@ async def cargar_archivo(
 async def analizar_archivo(
     file: UploadFile = File(...),
     tipo_cuenta: str = Form(...),
+    cuenta_id: int = Form(...),
     service: ProcesadorArchivosService = Depends(get_procesador_service)
 ) -> Dict[str, Any]:
     """
     Analiza un archivo PDF y retorna estadísticas preliminares sin guardar.
+    La cuenta es parte de la huella con la que se detectan los duplicados.
     """
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Solo se permiten archivos PDF")
 
     try:
-        resultado = service.analizar_archivo(file.file, file.filename, tipo_cuenta)
+        resultado = service.analizar_archivo(file.file, file.filename, tipo_cuenta, cuenta_id)
         return resultado
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
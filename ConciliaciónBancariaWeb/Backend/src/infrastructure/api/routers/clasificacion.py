@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from src.infrastructure.api.dependencies import (
     get_movimiento_repository, 
@@ -16,11 +16,17 @@ from src.domain.ports.tercero_repository import TerceroRepository
 from src.domain.ports.tercero_descripcion_repository import TerceroDescripcionRepository
 from src.domain.ports.grupo_repository import GrupoRepository
 from src.domain.ports.concepto_repository import ConceptoRepository
-from src.application.services.clasificacion_service import ClasificacionService
+from src.application.services.clasificacion_service import ClasificacionService, UMBRAL_MODELO_SUGERENCIA
+from src.application.services.clasificador_texto import ClasificadorTexto
 from src.infrastructure.api.routers.movimientos import MovimientoResponse, _to_response # Reuse existing DTOs
+from src.infrastructure.api.serializacion import movimientos_a_filas, respuesta_json
 
 router = APIRouter(prefix="/api/clasificacion", tags=["clasificacion"])
 
+# Modelo de texto compartido por el proceso: se entrena en la primera petición
+# que lo usa y luego solo aplica los cambios (row_version) desde la anterior.
+_clasificador_texto = ClasificadorTexto()
+
 class SugerenciaSchema(BaseModel):
     tercero_id: Optional[int]
     grupo_id: Optional[int]
@@ -55,7 +61,8 @@ def get_clasificacion_service(
         tercero_repo, 
         tercero_desc_repo, 
         concepto_repo, 
-        grupo_repo
+        grupo_repo,
+        _clasificador_texto
     )
 
 @router.get("/sugerencia/{id}", response_model=ContextoClasificacionResponse)
@@ -96,6 +103,37 @@ def auto_clasificar_todos(service: ClasificacionService = Depends(get_clasificac
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/sugerencias-modelo")
+def sugerencias_modelo(
+    umbral: float = Query(UMBRAL_MODELO_SUGERENCIA, ge=0, le=1, description="Probabilidad mínima"),
+    service: ClasificacionService = Depends(get_clasificacion_service)
+):
+    """
+    Sugerencias de grupo/concepto del modelo de texto para toda la cola de
+    pendientes. No guarda cambios.
+    """
+    try:
+        return service.sugerir_pendientes(umbral)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/modelo/reentrenar")
+def reentrenar_modelo(mov_repo: MovimientoRepository = Depends(get_movimiento_repository)):
+    """
+    Descarta el modelo de texto y lo entrena de nuevo con todos los movimientos
+    clasificados (normalmente basta el entrenamiento incremental).
+    """
+    try:
+        _clasificador_texto.reiniciar()
+        _clasificador_texto.sincronizar(mov_repo)
+        return {
+            "ejemplos": _clasificador_texto.total_ejemplos,
+            "clases": len(_clasificador_texto.etiquetas),
+            "version": _clasificador_texto.version
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/clasificar-lote")
 def clasificar_lote(
     dto: ClasificacionLoteDTO,
@@ -114,49 +152,23 @@ def clasificar_lote(
 
 class PreviewLoteRequest(BaseModel):
     patron: str
+    limite: int = Field(50, ge=1, le=500, description="Tamaño de la primera página")
+
+class PreviewLoteResponse(BaseModel):
+    total: int
+    items: List[MovimientoResponse]
 
-@router.post("/preview-lote", response_model=List[MovimientoResponse])
+@router.post("/preview-lote", response_model=PreviewLoteResponse)
 def preview_clasificacion_lote(
     dto: PreviewLoteRequest,
     mov_repo: MovimientoRepository = Depends(get_movimiento_repository)
 ):
     """
-    Retorna lista de movimientos pendientes que coinciden con el patrón.
+    Retorna cuántos movimientos pendientes coinciden con el patrón y la primera página.
     NO modifica nada, solo para preview antes de aplicar en lote.
     """
     try:
-        # Buscar pendientes que coinciden con el patrón (ILIKE)
-        from src.infrastructure.database.postgres_movimiento_repository import PostgresMovimientoRepository
-        
-        if isinstance(mov_repo, PostgresMovimientoRepository):
-            cursor = mov_repo.conn.cursor()
-            query = """
-                SELECT m.Id, m.Fecha, m.Descripcion, m.Referencia, m.Valor, m.USD, m.TRM, 
-                       m.MonedaID, m.CuentaID, m.TerceroID, m.GrupoID, m.ConceptoID, m.created_at, m.Detalle,
-                       c.cuenta AS cuenta_nombre,
-                       mon.moneda AS moneda_nombre,
-                       t.tercero AS tercero_nombre,
-                       g.grupo AS grupo_nombre,
-                       con.concepto AS concepto_nombre
-                FROM movimientos m
-                LEFT JOIN cuentas c ON m.CuentaID = c.cuentaid
-                LEFT JOIN monedas mon ON m.MonedaID = mon.monedaid
-                LEFT JOIN terceros t ON m.TerceroID = t.terceroid
-                LEFT JOIN grupos g ON m.GrupoID = g.grupoid
-                LEFT JOIN conceptos con ON m.ConceptoID = con.conceptoid
-                WHERE UPPER(m.Descripcion) LIKE UPPER(%s)
-                  AND (m.TerceroID IS NULL OR m.GrupoID IS NULL OR m.ConceptoID IS NULL)
-                ORDER BY m.Fecha DESC
-                LIMIT 50
-            """
-            patron = f"%{dto.patron}%"
-            cursor.execute(query, (patron,))
-            rows = cursor.fetchall()
-            cursor.close()
-            
-            movimientos = [mov_repo._row_to_movimiento(row) for row in rows]
-            return [_to_response(m) for m in movimientos]
-        
-        return []
+        movimientos, total = mov_repo.previsualizar_clasificacion_lote(dto.patron, dto.limite)
+        return respuesta_json({"total": total, "items": movimientos_a_filas(movimientos)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
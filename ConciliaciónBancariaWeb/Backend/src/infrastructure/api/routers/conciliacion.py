@@ -0,0 +1,108 @@
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+
+from src.application.services.conciliacion_tarjeta_service import (
+    TOLERANCIA_DIAS,
+    TOLERANCIA_VALOR,
+    ConciliacionTarjetaService,
+)
+from src.domain.ports.conciliacion_tarjeta_repository import ConciliacionTarjetaRepository
+from src.infrastructure.api.dependencies import get_conciliacion_tarjeta_repository
+from src.infrastructure.api.serializacion import movimiento_a_dict, respuesta_json
+from src.infrastructure.logging.config import logger
+
+router = APIRouter(prefix="/api/conciliacion", tags=["conciliacion"])
+
+
+class ConciliarPagosTarjetaRequest(BaseModel):
+    cuenta_tarjeta_id: int
+    cuenta_ahorros_id: int
+    desde: date
+    hasta: date
+    tolerancia_valor: Decimal = Field(TOLERANCIA_VALOR, ge=0)
+    tolerancia_dias: int = Field(TOLERANCIA_DIAS, ge=0, le=31)
+    patron_ahorros: Optional[str] = None
+    guardar: bool = False
+
+
+def get_conciliacion_tarjeta_service(
+    repo: ConciliacionTarjetaRepository = Depends(get_conciliacion_tarjeta_repository)
+) -> ConciliacionTarjetaService:
+    return ConciliacionTarjetaService(repo)
+
+
+@router.post("/pagos-tarjeta")
+def conciliar_pagos_tarjeta(
+    request: ConciliarPagosTarjetaRequest,
+    service: ConciliacionTarjetaService = Depends(get_conciliacion_tarjeta_service)
+):
+    """
+    Vincula los pagos de la tarjeta con los débitos de la cuenta de ahorros por
+    valor y fecha (dentro de las tolerancias). Con guardar=False solo propone.
+    """
+    if request.desde > request.hasta:
+        raise HTTPException(status_code=400, detail="La fecha 'desde' no puede ser posterior a 'hasta'")
+
+    try:
+        resultado = service.conciliar(
+            request.cuenta_tarjeta_id,
+            request.cuenta_ahorros_id,
+            request.desde,
+            request.hasta,
+            request.tolerancia_valor,
+            request.tolerancia_dias,
+            request.patron_ahorros,
+            request.guardar
+        )
+        logger.info(
+            f"Conciliación tarjeta {request.cuenta_tarjeta_id} vs ahorros {request.cuenta_ahorros_id}: "
+            f"{len(resultado['vinculos'])} vínculos, {len(resultado['pagos_sin_pareja'])} pagos sin pareja, "
+            f"{resultado['guardados']} guardados"
+        )
+        return respuesta_json({
+            "vinculos": [
+                {
+                    "tarjeta": movimiento_a_dict(v.pago),
+                    "ahorros": movimiento_a_dict(v.debito),
+                    "diferencia_valor": float(v.diferencia_valor),
+                    "diferencia_dias": v.diferencia_dias,
+                }
+                for v in resultado['vinculos']
+            ],
+            "pagos_sin_pareja": [movimiento_a_dict(m) for m in resultado['pagos_sin_pareja']],
+            "debitos_sin_pareja": [movimiento_a_dict(m) for m in resultado['debitos_sin_pareja']],
+            "guardados": resultado['guardados'],
+        })
+    except Exception as e:
+        logger.error(f"Error conciliando pagos de tarjeta: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Error conciliando pagos de tarjeta")
+
+
+@router.get("/pagos-tarjeta")
+def listar_pagos_conciliados(
+    cuenta_tarjeta_id: Optional[int] = None,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    repo: ConciliacionTarjetaRepository = Depends(get_conciliacion_tarjeta_repository)
+):
+    """Pagos de tarjeta ya conciliados con su débito de ahorros."""
+    try:
+        return respuesta_json(repo.obtener_vinculos(cuenta_tarjeta_id, desde, hasta))
+    except Exception as e:
+        logger.error(f"Error listando pagos conciliados: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Error listando pagos conciliados")
+
+
+@router.delete("/pagos-tarjeta/{id}")
+def eliminar_conciliacion_pago(
+    id: int,
+    repo: ConciliacionTarjetaRepository = Depends(get_conciliacion_tarjeta_repository)
+):
+    """Deshace una conciliación; ambos movimientos vuelven a quedar sin conciliar."""
+    if not repo.eliminar_vinculo(id):
+        raise HTTPException(status_code=404, detail="Conciliación no encontrada")
+    return {"mensaje": "Conciliación eliminada"}
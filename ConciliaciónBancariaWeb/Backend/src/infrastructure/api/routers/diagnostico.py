@@ -0,0 +1,38 @@
+from fastapi import APIRouter
+from pydantic import BaseModel, Field
+from typing import Optional
+
+from src.infrastructure.database import consultas_lentas
+from src.infrastructure.logging.config import logger
+
+router = APIRouter(prefix="/api/diagnostico", tags=["diagnostico"])
+
+# DTO Schemas
+class ConsultasLentasConfig(BaseModel):
+    """Configuración del registro de consultas lentas."""
+    activo: bool
+    umbral_ms: float
+    explain_analyze: bool
+
+class ConsultasLentasUpdateDTO(BaseModel):
+    """Cambios parciales a la configuración del registro de consultas lentas."""
+    activo: Optional[bool] = Field(None, description="Activa o desactiva el registro")
+    umbral_ms: Optional[float] = Field(None, ge=0, description="Umbral en milisegundos")
+    explain_analyze: Optional[bool] = Field(None, description="Capturar el plan con EXPLAIN ANALYZE")
+
+
+@router.get("/consultas-lentas", response_model=ConsultasLentasConfig)
+def obtener_config_consultas_lentas():
+    """Configuración actual del registro de consultas lentas."""
+    return consultas_lentas.obtener_configuracion()
+
+
+@router.put("/consultas-lentas", response_model=ConsultasLentasConfig)
+def actualizar_config_consultas_lentas(dto: ConsultasLentasUpdateDTO):
+    """
+    Activa/desactiva el registro de consultas lentas o cambia su umbral sin reiniciar.
+    Aplica a todas las conexiones del pool desde la siguiente sentencia.
+    """
+    config = consultas_lentas.configurar(dto.activo, dto.umbral_ms, dto.explain_analyze)
+    logger.info(f"Registro de consultas lentas actualizado: {config}")
+    return config
@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response
+from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import date, datetime
 from decimal import Decimal
@@ -12,6 +13,7 @@ from src.domain.ports.moneda_repository import MonedaRepository
 from src.domain.ports.tercero_repository import TerceroRepository
 from src.domain.ports.grupo_repository import GrupoRepository
 from src.domain.ports.concepto_repository import ConceptoRepository
+from src.application.services.emparejador_traslados_service import DIAS_VENTANA, EmparejadorTrasladosService
 
 from src.infrastructure.api.dependencies import (
     get_movimiento_repository,
@@ -19,10 +21,18 @@ from src.infrastructure.api.dependencies import (
     get_moneda_repository,
     get_tercero_repository,
     get_grupo_repository,
-    get_concepto_repository,
-    get_config_valor_pendiente_repository
+    get_concepto_repository
+)
+from src.infrastructure.cache.cache_reportes import cache_reportes, clave_reporte, generacion_actual
+from src.infrastructure.api.serializacion import (
+    PATRON_FORMATO,
+    atributos_de_campos,
+    codificar_json,
+    movimiento_a_dict,
+    parsear_campos,
+    respuesta_json,
+    respuesta_movimientos
 )
-from src.domain.ports.config_valor_pendiente_repository import ConfigValorPendienteRepository
 
 router = APIRouter(prefix="/api/movimientos", tags=["movimientos"])
 
@@ -68,31 +78,29 @@ class PaginatedMovimientosResponse(BaseModel):
     page: int
     page_size: int
     total_pages: int
-    totales: dict  # Global totals: {ingresos, egresos, saldo}
+    totales: Optional[dict] = None  # Global totals: {ingresos, egresos, saldo}
 
 def _to_response(mov: Movimiento) -> MovimientoResponse:
     """Convierte un Movimiento de dominio a MovimientoResponse con formato display"""
-    return MovimientoResponse(
-        id=mov.id,
-        fecha=mov.fecha,
-        descripcion=mov.descripcion,
-        referencia=mov.referencia,
-        valor=float(mov.valor),
-        usd=float(mov.usd) if mov.usd else None,
-        trm=float(mov.trm) if mov.trm else None,
-        moneda_id=mov.moneda_id,
-        cuenta_id=mov.cuenta_id,
-        tercero_id=mov.tercero_id,
-        grupo_id=mov.grupo_id,
-        concepto_id=mov.concepto_id,
-        created_at=mov.created_at,
-        detalle=mov.detalle,
-        cuenta_display=f"{mov.cuenta_id} - {mov.cuenta_nombre}" if mov.cuenta_id and mov.cuenta_nombre else (str(mov.cuenta_id) if mov.cuenta_id else "Sin Cuenta"),
-        moneda_display=f"{mov.moneda_id} - {mov.moneda_nombre}" if mov.moneda_id and mov.moneda_nombre else (str(mov.moneda_id) if mov.moneda_id else "Sin Moneda"),
-        tercero_display=f"{mov.tercero_id} - {mov.tercero_nombre}" if mov.tercero_id and mov.tercero_nombre else None,
-        grupo_display=f"{mov.grupo_id} - {mov.grupo_nombre}" if mov.grupo_id and mov.grupo_nombre else None,
-        concepto_display=f"{mov.concepto_id} - {mov.concepto_nombre}" if mov.concepto_id and mov.concepto_nombre else None
-    )
+    return MovimientoResponse(**movimiento_a_dict(mov))
+
+def _respuesta_reporte(request: Request, endpoint: str, filtros: dict, calcular) -> Response:
+    """
+    Sirve un reporte desde la caché versionada por generación del libro.
+    Responde 304 si el cliente ya tiene la versión vigente (If-None-Match).
+    """
+    clave = clave_reporte(endpoint, filtros)
+    entrada = cache_reportes.obtener(clave)
+    if entrada is None:
+        generacion = generacion_actual()
+        entrada = cache_reportes.guardar(clave, codificar_json(calcular()), generacion)
+    cuerpo, etag = entrada
+
+    # Obligar al navegador a revalidar siempre; el 304 evita re-descargar
+    encabezados = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in [e.strip() for e in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=encabezados)
+    return Response(content=cuerpo, media_type="application/json", headers=encabezados)
 
 def _validar_catalogos(
     dto: MovimientoDTO,
@@ -138,10 +146,13 @@ def listar_movimientos(
     grupos_excluidos: Optional[List[int]] = Query(None),
     solo_pendientes: bool = False,
     tipo_movimiento: Optional[str] = None,
+    formato: str = Query("objetos", pattern=PATRON_FORMATO, description="'objetos' o 'columnas' (un arreglo por campo)"),
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por coma, p.ej. fecha,valor (por defecto todos)"),
     repo: MovimientoRepository = Depends(get_movimiento_repository)
 ):
     """Lista todos los movimientos con filtros (sin paginación)."""
     logger.info(f"Listando todos los movimientos sin paginación")
+    campos = parsear_campos(fields)
     try:
         # Obtener TODOS los movimientos sin límites de paginación
         movimientos, total = repo.buscar_avanzado(
@@ -155,7 +166,8 @@ def listar_movimientos(
             solo_pendientes=solo_pendientes,
             tipo_movimiento=tipo_movimiento,
             skip=0,
-            limit=None  # Sin límite - retornar todos
+            limit=None,  # Sin límite - retornar todos
+            campos=atributos_de_campos(campos)
         )
         
         # Calcular totales globales
@@ -163,57 +175,73 @@ def listar_movimientos(
         egresos = sum(abs(float(m.valor)) for m in movimientos if m.valor < 0)
         saldo = ingresos - egresos
         
-        return PaginatedMovimientosResponse(
-            items=[_to_response(m) for m in movimientos],
-            total=total,
-            page=1,  # Siempre página 1 (sin paginación)
-            page_size=total,  # Tamaño = total de registros
-            total_pages=1,  # Siempre 1 página
-            totales={
+        return respuesta_movimientos(movimientos, formato, campos=campos, envoltura={
+            "total": total,
+            "page": 1,  # Siempre página 1 (sin paginación)
+            "page_size": total,  # Tamaño = total de registros
+            "total_pages": 1,  # Siempre 1 página
+            "totales": {
                 "ingresos": ingresos,
                 "egresos": egresos,
                 "saldo": saldo
             }
-        )
+        })
     except Exception as e:
         logger.error(f"Error listando movimientos: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error interno al listar movimientos")
 
+@router.get("/buscar", response_model=PaginatedMovimientosResponse)
+def buscar_movimientos_texto(
+    q: str = Query(..., min_length=1, description="Texto libre; cada palabra se busca como prefijo"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=500),
+    formato: str = Query("objetos", pattern=PATRON_FORMATO),
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por coma, p.ej. fecha,valor (por defecto todos)"),
+    repo: MovimientoRepository = Depends(get_movimiento_repository)
+):
+    """Búsqueda de texto completo en descripción, referencia y detalle, ordenada por relevancia."""
+    campos = parsear_campos(fields)
+    movimientos, total = repo.buscar_texto(
+        q,
+        skip=(page - 1) * page_size,
+        limit=page_size,
+        campos=atributos_de_campos(campos)
+    )
+    return respuesta_movimientos(movimientos, formato, campos=campos, envoltura={
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": (total + page_size - 1) // page_size
+    })
+
 @router.get("/pendientes", response_model=List[MovimientoResponse])
 def obtener_pendientes_dashboard(
-    repo: MovimientoRepository = Depends(get_movimiento_repository),
-    config_repo: ConfigValorPendienteRepository = Depends(get_config_valor_pendiente_repository)
+    formato: str = Query("objetos", pattern=PATRON_FORMATO),
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por coma, p.ej. fecha,valor (por defecto todos)"),
+    repo: MovimientoRepository = Depends(get_movimiento_repository)
 ):
     """Obtiene movimientos pendientes (igual que el anterior pero con URL compatible con Dashboard)"""
-    # Obtener IDs de valores que semánticamente significan "pendiente"
-    terceros_pendientes = config_repo.obtener_ids_por_tipo('tercero')
-    grupos_pendientes = config_repo.obtener_ids_por_tipo('grupo')
-    conceptos_pendientes = config_repo.obtener_ids_por_tipo('concepto')
+    campos = parsear_campos(fields)
     
-    pendientes = repo.buscar_pendientes_clasificacion(
-        terceros_pendientes=terceros_pendientes,
-        grupos_pendientes=grupos_pendientes,
-        conceptos_pendientes=conceptos_pendientes
-    )
-    return [_to_response(m) for m in pendientes]
+    pendientes = repo.buscar_pendientes_clasificacion(campos=atributos_de_campos(campos))
+    return respuesta_movimientos(pendientes, formato, campos=campos)
+
+@router.get("/pendientes/count")
+def contar_pendientes(repo: MovimientoRepository = Depends(get_movimiento_repository)):
+    """Número de movimientos pendientes de clasificación (para badges del frontend)"""
+    return {"total": repo.contar_pendientes()}
 
 @router.get("/pendientes/clasificacion", response_model=List[MovimientoResponse])
 def obtener_pendientes_clasificacion(
-    repo: MovimientoRepository = Depends(get_movimiento_repository),
-    config_repo: ConfigValorPendienteRepository = Depends(get_config_valor_pendiente_repository)
+    formato: str = Query("objetos", pattern=PATRON_FORMATO),
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por coma, p.ej. fecha,valor (por defecto todos)"),
+    repo: MovimientoRepository = Depends(get_movimiento_repository)
 ):
     """Obtiene movimientos pendientes de clasificación (sin grupo o concepto o con valores 'Por Clasificar')"""
-    # Obtener IDs de valores que semánticamente significan "pendiente"
-    terceros_pendientes = config_repo.obtener_ids_por_tipo('tercero')
-    grupos_pendientes = config_repo.obtener_ids_por_tipo('grupo')
-    conceptos_pendientes = config_repo.obtener_ids_por_tipo('concepto')
+    campos = parsear_campos(fields)
     
-    pendientes = repo.buscar_pendientes_clasificacion(
-        terceros_pendientes=terceros_pendientes,
-        grupos_pendientes=grupos_pendientes,
-        conceptos_pendientes=conceptos_pendientes
-    )
-    return [_to_response(m) for m in pendientes]
+    pendientes = repo.buscar_pendientes_clasificacion(campos=atributos_de_campos(campos))
+    return respuesta_movimientos(pendientes, formato, campos=campos)
 
 @router.get("/{id}", response_model=MovimientoResponse)
 def obtener_movimiento(id: int, repo: MovimientoRepository = Depends(get_movimiento_repository)):
@@ -224,6 +252,7 @@ def obtener_movimiento(id: int, repo: MovimientoRepository = Depends(get_movimie
 
 @router.get("/reporte/clasificacion")
 def reporte_clasificacion(
+    request: Request,
     tipo: str,
     desde: Optional[date] = None,
     hasta: Optional[date] = None,
@@ -235,24 +264,27 @@ def reporte_clasificacion(
     tipo_movimiento: Optional[str] = None,
     repo: MovimientoRepository = Depends(get_movimiento_repository)
 ):
+    filtros = dict(
+        tipo_agrupacion=tipo,
+        fecha_inicio=desde,
+        fecha_fin=hasta,
+        cuenta_id=cuenta_id,
+        tercero_id=tercero_id,
+        grupo_id=grupo_id,
+        concepto_id=concepto_id,
+        grupos_excluidos=grupos_excluidos,
+        tipo_movimiento=tipo_movimiento
+    )
     try:
-        return repo.resumir_por_clasificacion(
-            tipo_agrupacion=tipo,
-            fecha_inicio=desde,
-            fecha_fin=hasta,
-            cuenta_id=cuenta_id,
-            tercero_id=tercero_id,
-            grupo_id=grupo_id,
-            concepto_id=concepto_id,
-            grupos_excluidos=grupos_excluidos,
-            tipo_movimiento=tipo_movimiento
-        )
+        return _respuesta_reporte(request, "clasificacion", filtros,
+                                  lambda: repo.resumir_por_clasificacion(**filtros))
     except Exception as e:
         logger.error(f"Error generando reporte: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error generando reporte")
 
 @router.get("/reporte/ingresos-gastos-mes")
 def reporte_ingresos_gastos_mes(
+    request: Request,
     desde: Optional[date] = None,
     hasta: Optional[date] = None,
     cuenta_id: Optional[int] = None,
@@ -262,22 +294,25 @@ def reporte_ingresos_gastos_mes(
     grupos_excluidos: Optional[List[int]] = Query(None),
     repo: MovimientoRepository = Depends(get_movimiento_repository)
 ):
+    filtros = dict(
+        fecha_inicio=desde,
+        fecha_fin=hasta,
+        cuenta_id=cuenta_id,
+        tercero_id=tercero_id,
+        grupo_id=grupo_id,
+        concepto_id=concepto_id,
+        grupos_excluidos=grupos_excluidos
+    )
     try:
-        return repo.resumir_ingresos_gastos_por_mes(
-            fecha_inicio=desde,
-            fecha_fin=hasta,
-            cuenta_id=cuenta_id,
-            tercero_id=tercero_id,
-            grupo_id=grupo_id,
-            concepto_id=concepto_id,
-            grupos_excluidos=grupos_excluidos
-        )
+        return _respuesta_reporte(request, "ingresos-gastos-mes", filtros,
+                                  lambda: repo.resumir_ingresos_gastos_por_mes(**filtros))
     except Exception as e:
         logger.error(f"Error generando reporte mensual: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error generando reporte mensual")
 
 @router.get("/reporte/desglose-gastos")
 def reporte_desglose_gastos(
+    request: Request,
     nivel: str,
     desde: Optional[date] = None,
     hasta: Optional[date] = None,
@@ -288,17 +323,19 @@ def reporte_desglose_gastos(
     grupos_excluidos: Optional[List[int]] = Query(None),
     repo: MovimientoRepository = Depends(get_movimiento_repository)
 ):
+    filtros = dict(
+        nivel=nivel,
+        fecha_inicio=desde,
+        fecha_fin=hasta,
+        cuenta_id=cuenta_id,
+        tercero_id=tercero_id,
+        grupo_id=grupo_id,
+        concepto_id=concepto_id,
+        grupos_excluidos=grupos_excluidos
+    )
     try:
-        return repo.obtener_desglose_gastos(
-            nivel=nivel,
-            fecha_inicio=desde,
-            fecha_fin=hasta,
-            cuenta_id=cuenta_id,
-            tercero_id=tercero_id,
-            grupo_id=grupo_id,
-            concepto_id=concepto_id,
-            grupos_excluidos=grupos_excluidos
-        )
+        return _respuesta_reporte(request, "desglose-gastos", filtros,
+                                  lambda: repo.obtener_desglose_gastos(**filtros))
     except Exception as e:
         logger.error(f"Error generando reporte desglose: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error generando reporte")
@@ -428,20 +465,24 @@ def obtener_detalles_sugerencia(
     concepto_id: Optional[int] = None,
     desde: Optional[date] = None,
     hasta: Optional[date] = None,
+    formato: str = Query("objetos", pattern=PATRON_FORMATO),
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por coma, p.ej. fecha,valor (por defecto todos)"),
     repo: MovimientoRepository = Depends(get_movimiento_repository)
 ):
     """
     Obtiene los movimientos individuales de un grupo sugerido.
     """
+    campos = parsear_campos(fields)
     try:
         movimientos = repo.obtener_movimientos_grupo(
             tercero_id=tercero_id, 
             grupo_id=grupo_id, 
             concepto_id=concepto_id,
             fecha_inicio=desde,
-            fecha_fin=hasta
+            fecha_fin=hasta,
+            campos=atributos_de_campos(campos)
         )
-        return [_to_response(m) for m in movimientos]
+        return respuesta_movimientos(movimientos, formato, campos=campos)
     except Exception as e:
         logger.error(f"Error obteniendo detalles de sugerencia: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error obteniendo detalles")
@@ -468,6 +509,66 @@ def reclasificar_lote(
         logger.error(f"Error reclasificando lote: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error reclasificando movimientos")
 
+class ParTrasladoIds(BaseModel):
+    egreso_id: int
+    ingreso_id: int
+
+class AplicarTrasladosRequest(BaseModel):
+    desde: Optional[date] = None
+    hasta: Optional[date] = None
+    dias: int = Field(DIAS_VENTANA, ge=0, le=31)
+    creados_desde: Optional[datetime] = None
+    pares: Optional[List[ParTrasladoIds]] = None  # Si se indica, solo se aplican estos (de los propuestos)
+
+def get_emparejador_traslados_service(
+    repo: MovimientoRepository = Depends(get_movimiento_repository)
+) -> EmparejadorTrasladosService:
+    return EmparejadorTrasladosService(repo)
+
+@router.get("/traslados/propuestos")
+def proponer_traslados(
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    dias: int = Query(DIAS_VENTANA, ge=0, le=31, description="Máxima diferencia de días entre egreso e ingreso"),
+    creados_desde: Optional[datetime] = Query(None, description="Solo pares con movimientos cargados desde esta marca"),
+    service: EmparejadorTrasladosService = Depends(get_emparejador_traslados_service)
+):
+    """
+    Propone traslados entre cuentas propias: egreso e ingreso del mismo valor en
+    cuentas distintas dentro de la ventana de días. No modifica nada.
+    """
+    try:
+        pares = service.proponer(desde, hasta, dias, creados_desde)
+        return respuesta_json([
+            {"egreso": movimiento_a_dict(p.egreso), "ingreso": movimiento_a_dict(p.ingreso), "dias": p.dias}
+            for p in pares
+        ])
+    except Exception as e:
+        logger.error(f"Error proponiendo traslados: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Error proponiendo traslados")
+
+@router.post("/traslados/aplicar")
+def aplicar_traslados(
+    request: AplicarTrasladosRequest,
+    service: EmparejadorTrasladosService = Depends(get_emparejador_traslados_service)
+):
+    """
+    Reclasifica como Traslado los pares propuestos (todos, o solo los indicados
+    en `pares` que sigan siendo válidos).
+    """
+    try:
+        pares = service.proponer(request.desde, request.hasta, request.dias, request.creados_desde)
+        if request.pares is not None:
+            elegidos = {(p.egreso_id, p.ingreso_id) for p in request.pares}
+            pares = [p for p in pares if (p.egreso.id, p.ingreso.id) in elegidos]
+        afectados = service.aplicar(pares)
+        return {"mensaje": "Traslados aplicados", "pares": len(pares), "registros_actualizados": afectados}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error aplicando traslados: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Error aplicando traslados")
+
 @router.get("/configuracion/filtros-exclusion")
 def obtener_configuracion_filtros_exclusion(
     repo_grupo: GrupoRepository = Depends(get_grupo_repository)
@@ -0,0 +1,44 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from src.domain.ports.saldo_repository import SaldoRepository
+from src.infrastructure.api.dependencies import get_saldo_repository
+from src.infrastructure.logging.config import logger
+
+router = APIRouter(prefix="/api/saldos", tags=["saldos"])
+
+
+@router.get("/{cuenta_id}")
+def obtener_saldo(
+    cuenta_id: int,
+    fecha: Optional[date] = Query(None, description="Fecha de corte (por defecto hoy)"),
+    repo: SaldoRepository = Depends(get_saldo_repository)
+):
+    """
+    Saldo de la cuenta al final del día indicado: cierre del último mes anterior
+    más los movimientos del mes de la fecha.
+    """
+    fecha = fecha or date.today()
+    try:
+        saldo = repo.obtener_saldo(cuenta_id, fecha)
+        return {"cuenta_id": cuenta_id, "fecha": fecha, "saldo": float(saldo)}
+    except Exception as e:
+        logger.error(f"Error obteniendo saldo de la cuenta {cuenta_id}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Error obteniendo saldo")
+
+
+@router.get("/{cuenta_id}/mensuales")
+def obtener_saldos_mensuales(
+    cuenta_id: int,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    repo: SaldoRepository = Depends(get_saldo_repository)
+):
+    """Cierres mensuales de la cuenta (solo meses con movimientos)."""
+    try:
+        return repo.obtener_saldos_mensuales(cuenta_id, desde, hasta)
+    except Exception as e:
+        logger.error(f"Error obteniendo saldos mensuales de la cuenta {cuenta_id}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Error obteniendo saldos mensuales")
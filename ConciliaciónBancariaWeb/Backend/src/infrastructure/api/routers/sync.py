@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, Query
+
+from src.domain.ports.sync_repository import SyncRepository
+from src.infrastructure.api.dependencies import get_sync_repository
+from src.infrastructure.api.serializacion import movimiento_a_dict, respuesta_json
+from src.infrastructure.logging.config import logger
+
+router = APIRouter(prefix="/api/sync", tags=["sync"])
+
+
+@router.get("")
+def sincronizar(
+    since: int = Query(0, ge=0, description="Última versión recibida (0 = sincronización completa)"),
+    limite: int = Query(5000, ge=1, le=50000, description="Máximo de filas por tabla"),
+    repo: SyncRepository = Depends(get_sync_repository)
+):
+    """
+    Cambios en movimientos y catálogos desde la versión `since`.
+
+    El cliente aplica `cambios` (upsert por id) y `eliminados` (IDs a quitar) sobre
+    su caché y guarda `version` para la próxima llamada. Si `hay_mas` es True debe
+    volver a llamar de inmediato con since=version.
+    """
+    resultado = repo.obtener_cambios(since, limite)
+    cambios = resultado['cambios']
+    cambios['movimientos'] = [movimiento_a_dict(m) for m in cambios['movimientos']]
+
+    logger.debug(
+        f"Sync desde {since}: versión {resultado['version']}, "
+        f"{sum(len(f) for f in cambios.values())} cambios, "
+        f"{sum(len(i) for i in resultado['eliminados'].values())} eliminados"
+    )
+    return respuesta_json(resultado)
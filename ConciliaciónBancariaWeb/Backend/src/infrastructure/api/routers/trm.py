@@ -0,0 +1,81 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile
+
+from src.application.services.trm_service import TrmService
+from src.domain.ports.trm_repository import TrmRepository
+from src.infrastructure.api.dependencies import get_trm_repository
+from src.infrastructure.logging.config import logger
+
+router = APIRouter(prefix="/api/trm", tags=["trm"])
+
+MAX_DIAS_RANGO = 366
+
+
+def get_trm_service(repo: TrmRepository = Depends(get_trm_repository)) -> TrmService:
+    return TrmService(repo)
+
+
+@router.get("")
+def obtener_trm(
+    fecha: date = Query(..., description="Fecha a consultar"),
+    repo: TrmRepository = Depends(get_trm_repository)
+):
+    """TRM vigente a la fecha (la del día o la del día anterior más cercano)."""
+    tasa = repo.obtener_tasa(fecha)
+    if tasa is None:
+        raise HTTPException(status_code=404, detail=f"No hay TRM cargada en o antes de {fecha}")
+    return {"fecha": fecha, "fecha_tasa": tasa[0], "valor": float(tasa[1])}
+
+
+@router.get("/rango")
+def obtener_trm_rango(
+    desde: date,
+    hasta: date,
+    repo: TrmRepository = Depends(get_trm_repository)
+):
+    """TRM vigente para cada día del rango."""
+    if desde > hasta:
+        raise HTTPException(status_code=400, detail="La fecha 'desde' no puede ser posterior a 'hasta'")
+    if (hasta - desde).days >= MAX_DIAS_RANGO:
+        raise HTTPException(status_code=400, detail=f"El rango no puede superar {MAX_DIAS_RANGO} días")
+    return repo.obtener_tasas(desde, hasta)
+
+
+@router.post("/cargar")
+async def cargar_trm(
+    file: UploadFile = File(...),
+    aplicar: bool = Form(True),
+    service: TrmService = Depends(get_trm_service)
+):
+    """
+    Carga un CSV de TRM (columnas fecha/vigenciadesde y valor/trm) y, si
+    `aplicar`, convierte los movimientos USD pendientes.
+    """
+    if not file.filename.lower().endswith('.csv'):
+        raise HTTPException(status_code=400, detail="Solo se permiten archivos CSV")
+
+    try:
+        contenido = (await file.read()).decode('utf-8-sig')
+        return service.cargar_csv(contenido, aplicar)
+    except (ValueError, UnicodeDecodeError) as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        logger.error(f"Error cargando TRM: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Error cargando TRM")
+
+
+@router.post("/aplicar")
+def aplicar_trm(
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    repo: TrmRepository = Depends(get_trm_repository)
+):
+    """Llena TRM y Valor (USD * TRM) de los movimientos USD pendientes (Valor = 0)."""
+    try:
+        actualizados = repo.aplicar_trm_pendientes(desde, hasta)
+        return {"mensaje": "TRM aplicada", "registros_actualizados": actualizados}
+    except Exception as e:
+        logger.error(f"Error aplicando TRM: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Error aplicando TRM")
@@ -0,0 +1,146 @@
+"""
+Serialización rápida de listas de movimientos.
+
+Para listas grandes, construir un MovimientoResponse por fila y que luego
+response_model vuelva a validar la lista completa cuesta más que la consulta.
+Aquí cada Movimiento se convierte a un dict plano (los mismos campos y formatos
+de MovimientoResponse) y la lista se codifica directo a bytes JSON con orjson.
+Al retornar un Response, FastAPI no vuelve a validar contra response_model
+(que se conserva solo para la documentación OpenAPI).
+
+Formatos:
+- 'objetos' (por defecto): lista de objetos, igual que antes.
+- 'columnas': un arreglo por campo ({"id": [...], "fecha": [...], ...}),
+  más compacto para las tablas del frontend.
+
+Campos dispersos (?fields=fecha,valor): solo se devuelven esos campos y el
+repositorio solo lee las columnas y JOINs que necesitan (ver atributos_de_campos).
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional
+
+import orjson
+from fastapi import HTTPException
+from fastapi.responses import Response
+
+from src.domain.models.movimiento import Movimiento
+
+FORMATOS = ("objetos", "columnas")
+
+# Patrón para validar el parámetro ?formato= en los endpoints
+PATRON_FORMATO = "^(objetos|columnas)$"
+
+
+def _display(id_, nombre, defecto=None):
+    """Formato "id - nombre" de los campos *_display."""
+    if id_ and nombre:
+        return f"{id_} - {nombre}"
+    return defecto(id_) if callable(defecto) else defecto
+
+
+# campo de MovimientoResponse -> cómo obtenerlo del Movimiento
+CAMPOS_MOVIMIENTO: Dict[str, Callable[[Movimiento], object]] = {
+    "id": lambda m: m.id,
+    "fecha": lambda m: m.fecha,
+    "descripcion": lambda m: m.descripcion,
+    "referencia": lambda m: m.referencia,
+    "valor": lambda m: float(m.valor),
+    "usd": lambda m: float(m.usd) if m.usd else None,
+    "trm": lambda m: float(m.trm) if m.trm else None,
+    "moneda_id": lambda m: m.moneda_id,
+    "cuenta_id": lambda m: m.cuenta_id,
+    "tercero_id": lambda m: m.tercero_id,
+    "grupo_id": lambda m: m.grupo_id,
+    "concepto_id": lambda m: m.concepto_id,
+    "created_at": lambda m: m.created_at,
+    "detalle": lambda m: m.detalle,
+    "cuenta_display": lambda m: _display(
+        m.cuenta_id, m.cuenta_nombre, lambda i: str(i) if i else "Sin Cuenta"),
+    "moneda_display": lambda m: _display(
+        m.moneda_id, m.moneda_nombre, lambda i: str(i) if i else "Sin Moneda"),
+    "tercero_display": lambda m: _display(m.tercero_id, m.tercero_nombre),
+    "grupo_display": lambda m: _display(m.grupo_id, m.grupo_nombre),
+    "concepto_display": lambda m: _display(m.concepto_id, m.concepto_nombre),
+}
+
+
+# Campos *_display -> atributos del Movimiento que necesitan (el resto usa el propio nombre)
+ATRIBUTOS_DISPLAY = {
+    "cuenta_display": ["cuenta_id", "cuenta_nombre"],
+    "moneda_display": ["moneda_id", "moneda_nombre"],
+    "tercero_display": ["tercero_id", "tercero_nombre"],
+    "grupo_display": ["grupo_id", "grupo_nombre"],
+    "concepto_display": ["concepto_id", "concepto_nombre"],
+}
+
+
+def parsear_campos(fields: Optional[str]) -> Optional[List[str]]:
+    """
+    'fecha,valor' -> ['fecha', 'valor']. None si no se pidió un subconjunto.
+    Lanza 400 ante campos que no existen en MovimientoResponse.
+    """
+    if not fields:
+        return None
+    campos = list(dict.fromkeys(c.strip() for c in fields.split(",") if c.strip()))
+    desconocidos = [c for c in campos if c not in CAMPOS_MOVIMIENTO]
+    if desconocidos:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Campos desconocidos: {', '.join(desconocidos)}. Válidos: {', '.join(CAMPOS_MOVIMIENTO)}"
+        )
+    return campos or None
+
+
+def atributos_de_campos(campos: Optional[List[str]]) -> Optional[List[str]]:
+    """Atributos del Movimiento que el repositorio debe cargar para esos campos."""
+    if not campos:
+        return None
+    atributos = []
+    for campo in campos:
+        atributos.extend(ATRIBUTOS_DISPLAY.get(campo, [campo]))
+    return list(dict.fromkeys(atributos))
+
+
+def movimiento_a_dict(mov: Movimiento, campos: Optional[List[str]] = None) -> dict:
+    """Movimiento -> dict con los campos de MovimientoResponse (o solo `campos`)."""
+    if campos:
+        return {campo: CAMPOS_MOVIMIENTO[campo](mov) for campo in campos}
+    return {campo: obtener(mov) for campo, obtener in CAMPOS_MOVIMIENTO.items()}
+
+
+def movimientos_a_filas(movimientos: Iterable[Movimiento], formato: str = "objetos",
+                        campos: Optional[List[str]] = None):
+    """Convierte la lista al formato pedido (lista de dicts o dict de columnas)."""
+    if formato == "columnas":
+        movimientos = list(movimientos)
+        return {
+            campo: [CAMPOS_MOVIMIENTO[campo](m) for m in movimientos]
+            for campo in (campos or CAMPOS_MOVIMIENTO)
+        }
+    return [movimiento_a_dict(m, campos) for m in movimientos]
+
+
+def codificar_json(contenido) -> bytes:
+    """Codifica con orjson (fechas y datetimes nativos)."""
+    return orjson.dumps(contenido)
+
+
+def respuesta_json(contenido) -> Response:
+    """Respuesta JSON codificada con orjson, sin pasar por response_model."""
+    return Response(content=codificar_json(contenido), media_type="application/json")
+
+
+def respuesta_movimientos(movimientos: List[Movimiento], formato: str = "objetos",
+                          envoltura: Optional[dict] = None,
+                          campos: Optional[List[str]] = None) -> Response:
+    """
+    Respuesta JSON de una lista de movimientos.
+
+    Args:
+        envoltura: si se indica, la lista va en su clave 'items' (p.ej. respuesta paginada)
+        campos: subconjunto de campos a incluir (por defecto todos)
+    """
+    filas = movimientos_a_filas(movimientos, formato, campos)
+    if envoltura is not None:
+        return respuesta_json({"items": filas, **envoltura})
+    return respuesta_json(filas)
@@ -0,0 +1,107 @@
+"""
+Caché de reportes versionada por generación del libro de movimientos.
+
+Los reportes (/api/movimientos/reporte/*) solo cambian cuando cambia el libro:
+carga de archivos o clasificación. Cada camino de escritura del repositorio de
+movimientos llama a incrementar_generacion(); una entrada de la caché solo es
+válida si se calculó en la generación actual.
+
+Las entradas se guardan ya codificadas (bytes JSON) con su ETag (hash del
+contenido), de modo que un acierto no vuelve a serializar y el cliente puede
+revalidar con If-None-Match y recibir 304.
+
+El contador es del proceso: las escrituras hechas por fuera de la API (p.ej. las
+herramientas de escritorio) no lo incrementan, por eso las entradas además
+vencen a los SEGUNDOS_VIGENCIA.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Optional, Tuple
+
+CAPACIDAD = 256
+SEGUNDOS_VIGENCIA = 300
+
+_generacion = 0
+_generacion_lock = threading.Lock()
+
+
+def generacion_actual() -> int:
+    return _generacion
+
+
+def incrementar_generacion() -> int:
+    """Invalida todos los reportes calculados hasta ahora."""
+    global _generacion
+    with _generacion_lock:
+        _generacion += 1
+        return _generacion
+
+
+def clave_reporte(endpoint: str, filtros: dict) -> str:
+    """
+    Clave normalizada: sin filtros vacíos, listas ordenadas y sin duplicados,
+    para que ?grupos_excluidos=47&grupos_excluidos=46 y 46,47 compartan entrada.
+    """
+    normalizados = {}
+    for nombre, valor in filtros.items():
+        if valor is None or valor == []:
+            continue
+        if isinstance(valor, (list, tuple, set)):
+            valor = sorted(set(valor))
+        elif isinstance(valor, date):
+            valor = valor.isoformat()
+        normalizados[nombre] = valor
+    return endpoint + "?" + json.dumps(normalizados, sort_keys=True, default=str)
+
+
+def calcular_etag(cuerpo: bytes) -> str:
+    return '"' + hashlib.blake2b(cuerpo, digest_size=12).hexdigest() + '"'
+
+
+class CacheReportes:
+    """LRU de respuestas de reportes etiquetadas con la generación del libro."""
+
+    def __init__(self, capacidad: int = CAPACIDAD, segundos_vigencia: float = SEGUNDOS_VIGENCIA):
+        self.capacidad = capacidad
+        self.segundos_vigencia = segundos_vigencia
+        self._entradas = OrderedDict()   # clave -> (generacion, instante, cuerpo, etag)
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: str) -> Optional[Tuple[bytes, str]]:
+        """(cuerpo, etag) si hay una entrada vigente para la generación actual."""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None
+            generacion, instante, cuerpo, etag = entrada
+            if generacion != _generacion or time.monotonic() - instante > self.segundos_vigencia:
+                del self._entradas[clave]
+                return None
+            self._entradas.move_to_end(clave)
+            return cuerpo, etag
+
+    def guardar(self, clave: str, cuerpo: bytes, generacion: int) -> Tuple[bytes, str]:
+        """
+        Guarda el cuerpo calculado en `generacion` (leída ANTES de consultar: si
+        hubo una escritura durante el cálculo la entrada nace ya vencida).
+        """
+        etag = calcular_etag(cuerpo)
+        with self._lock:
+            self._entradas[clave] = (generacion, time.monotonic(), cuerpo, etag)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.capacidad:
+                self._entradas.popitem(last=False)
+        return cuerpo, etag
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+
+
+# Instancia global compartida por los workers del proceso
+cache_reportes = CacheReportes()
@@ -0,0 +1,118 @@
+"""
+Instantánea inmutable de la configuración de clasificación.
+
+Cada sugerencia o reclasificación buscaba el grupo/concepto de Traslados con
+dos consultas ILIKE, y los filtros de exclusión se leían en cada solicitud. Esa
+configuración casi nunca cambia, así que se carga una vez en una
+ConfiguracionClasificacion (inmutable, compartida entre solicitudes e hilos) y
+solo se vuelve a cargar cuando alguien escribe en ella: los repositorios de
+config_filtros_grupos y conceptos llaman a invalidar_configuracion() después
+del commit.
+
+Los valores de config_valores_pendientes ya no forman parte de la instantánea:
+los aplica la columna movimientos.pendiente (ver
+Sql/agregar_flag_pendiente_movimientos.sql).
+
+Como el contador de cache_reportes, la invalidación es del proceso: la
+instantánea además vence a los SEGUNDOS_VIGENCIA para recoger cambios hechos en
+otro worker o por fuera de la API.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+SEGUNDOS_VIGENCIA = 300
+
+
+@dataclass(frozen=True)
+class FiltroExclusion:
+    grupo_id: int
+    etiqueta: str
+    activo_por_defecto: bool
+
+
+@dataclass(frozen=True)
+class ConfiguracionClasificacion:
+    """Valores de configuración que usan los filtros y la reclasificación de traslados."""
+    filtros_exclusion: Tuple[FiltroExclusion, ...] = ()
+    grupo_traslado_id: Optional[int] = None
+    concepto_traslado_id: Optional[int] = None
+
+    def filtros_exclusion_dict(self) -> List[dict]:
+        return [
+            {
+                "grupo_id": f.grupo_id,
+                "etiqueta": f.etiqueta,
+                "activo_por_defecto": f.activo_por_defecto
+            }
+            for f in self.filtros_exclusion
+        ]
+
+
+def cargar_configuracion(conn) -> ConfiguracionClasificacion:
+    """Lee la configuración completa de la base de datos (2 consultas)."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "SELECT grupo_id, etiqueta, activo_por_defecto FROM config_filtros_grupos ORDER BY etiqueta"
+        )
+        filtros = tuple(FiltroExclusion(grupo_id=r[0], etiqueta=r[1], activo_por_defecto=r[2])
+                        for r in cursor.fetchall())
+
+        # El grupo de Traslados es el del filtro cuya etiqueta menciona 'traslado'
+        # (p.ej. 'Excluir Traslados'); el concepto, el 'Traslado' de ese grupo.
+        grupo_traslado = next((f.grupo_id for f in filtros if 'traslado' in (f.etiqueta or '').lower()), None)
+        concepto_traslado = None
+        if grupo_traslado:
+            cursor.execute(
+                "SELECT conceptoid FROM conceptos WHERE grupoid_fk = %s AND concepto ILIKE %s LIMIT 1",
+                (grupo_traslado, '%traslado%')
+            )
+            row = cursor.fetchone()
+            concepto_traslado = row[0] if row else None
+    finally:
+        cursor.close()
+
+    return ConfiguracionClasificacion(
+        filtros_exclusion=filtros,
+        grupo_traslado_id=grupo_traslado,
+        concepto_traslado_id=concepto_traslado,
+    )
+
+
+_actual: Optional[ConfiguracionClasificacion] = None
+_cargada_en = 0.0
+_version = 0
+_lock = threading.Lock()
+
+
+def obtener_configuracion(conn) -> ConfiguracionClasificacion:
+    """
+    Instantánea vigente; si no hay (primer uso, invalidada o vencida) la carga
+    con `conn`. La instantánea es inmutable: quien la tenga puede seguir usándola
+    aunque otra solicitud la reemplace.
+    """
+    global _actual, _cargada_en
+    actual = _actual
+    if actual is not None and time.monotonic() - _cargada_en <= SEGUNDOS_VIGENCIA:
+        return actual
+
+    with _lock:
+        if _actual is not None and time.monotonic() - _cargada_en <= SEGUNDOS_VIGENCIA:
+            return _actual
+        version = _version
+        nueva = cargar_configuracion(conn)
+        # Si hubo una escritura durante la carga no se publica (podría estar vieja)
+        if version == _version:
+            _actual = nueva
+            _cargada_en = time.monotonic()
+        return nueva
+
+
+def invalidar_configuracion():
+    """Descarta la instantánea; la siguiente lectura la vuelve a cargar."""
+    global _actual, _version
+    _actual = None
+    _version += 1
@@ -4,6 +4,7 @@ import os
 from typing import Generator
 from dotenv import load_dotenv
 from src.infrastructure.logging.config import logger
+from src.infrastructure.database.consultas_lentas import CursorMedido
 
 # Cargar variables de entorno desde archivo .env
 load_dotenv()
@@ -55,6 +56,8 @@ def get_connection_pool() -> pool.SimpleConnectionPool:
             _connection_pool = pool.SimpleConnectionPool(
                 minconn=min_connections,
                 maxconn=max_connections,
+                # Cronometra cada sentencia; ver consultas_lentas.py
+                cursor_factory=CursorMedido,
                 **DB_CONFIG
             )
             logger.info("Connection pool inicializado correctamente")
@@ -0,0 +1,171 @@
+"""
+Registro de consultas lentas con captura automática del plan de ejecución.
+
+CursorMedido es el cursor de todas las conexiones del pool (cursor_factory).
+Cronometra cada sentencia y, si supera el umbral, escribe en un log rotativo
+propio (slow_queries_<entorno>.log):
+- el texto SQL (sin valores),
+- la forma de los parámetros (tipos y tamaños, no los datos),
+- el plan: EXPLAIN (ANALYZE, BUFFERS) dentro de un savepoint que se revierte,
+  de modo que re-ejecutar una escritura no deja efectos.
+
+Como todo el SQL de los repositorios se arma a partir de filtros, el log
+permite saber qué combinación de filtros produjo el plan malo.
+
+Configuración (variables de entorno, modificables en caliente con configurar()
+o con PUT /api/diagnostico/consultas-lentas):
+    SLOW_QUERY_LOG=true|false        Activa el registro (por defecto false)
+    SLOW_QUERY_THRESHOLD_MS=500      Umbral en milisegundos
+    SLOW_QUERY_EXPLAIN_ANALYZE=true  Usar ANALYZE (re-ejecuta la sentencia lenta)
+"""
+
+import logging
+import os
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+import psycopg2.extensions
+
+
+def _env_bool(nombre: str, defecto: str) -> bool:
+    return os.getenv(nombre, defecto).strip().lower() in ('1', 'true', 'si', 'sí', 'yes')
+
+
+_config = {
+    'activo': _env_bool('SLOW_QUERY_LOG', 'false'),
+    'umbral_ms': float(os.getenv('SLOW_QUERY_THRESHOLD_MS', '500')),
+    'explain_analyze': _env_bool('SLOW_QUERY_EXPLAIN_ANALYZE', 'true'),
+}
+_config_lock = threading.Lock()
+
+_slow_logger = None
+
+
+def _obtener_logger() -> logging.Logger:
+    """Logger dedicado con archivo rotativo propio (se crea al primer uso)."""
+    global _slow_logger
+    if _slow_logger is None:
+        slow_logger = logging.getLogger("slow_queries")
+        if not slow_logger.handlers:
+            environment = os.getenv('ENVIRONMENT', 'development')
+            log_dir = os.getenv('LOG_DIR', 'logs')
+            os.makedirs(log_dir, exist_ok=True)
+
+            handler = RotatingFileHandler(
+                os.path.join(log_dir, f"slow_queries_{environment}.log"),
+                maxBytes=10*1024*1024,  # 10MB
+                backupCount=5,
+                encoding='utf-8'
+            )
+            handler.setFormatter(logging.Formatter('[%(asctime)s] %(message)s', datefmt='%Y-%m-%d %H:%M:%S'))
+            slow_logger.addHandler(handler)
+            slow_logger.setLevel(logging.INFO)
+            slow_logger.propagate = False
+        _slow_logger = slow_logger
+    return _slow_logger
+
+
+def configurar(activo: bool = None, umbral_ms: float = None, explain_analyze: bool = None) -> dict:
+    """Cambia la configuración en caliente. Retorna la configuración resultante."""
+    with _config_lock:
+        if activo is not None:
+            _config['activo'] = bool(activo)
+        if umbral_ms is not None:
+            _config['umbral_ms'] = float(umbral_ms)
+        if explain_analyze is not None:
+            _config['explain_analyze'] = bool(explain_analyze)
+        return dict(_config)
+
+
+def obtener_configuracion() -> dict:
+    with _config_lock:
+        return dict(_config)
+
+
+def forma_parametros(params) -> object:
+    """
+    Describe los parámetros sin sus valores.
+    Ej: (date, date, 3, tuple[4]) -> ['date', 'date', 'int', 'tuple[4]']
+    """
+    def tipo(valor):
+        if valor is None:
+            return 'null'
+        if isinstance(valor, (list, tuple)):
+            return f"{type(valor).__name__}[{len(valor)}]"
+        if isinstance(valor, str):
+            return f"str[{len(valor)}]"
+        return type(valor).__name__
+
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {clave: tipo(valor) for clave, valor in params.items()}
+    return [tipo(valor) for valor in params]
+
+
+def _es_lectura(sql: str) -> bool:
+    inicio = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ''
+    return inicio in ('SELECT', 'WITH', 'VALUES', 'TABLE')
+
+
+class CursorMedido(psycopg2.extensions.cursor):
+    """Cursor que cronometra cada sentencia y registra las lentas con su plan."""
+
+    def execute(self, query, vars=None):
+        if not _config['activo']:
+            return super().execute(query, vars)
+
+        inicio = time.perf_counter()
+        exito = False
+        try:
+            resultado = super().execute(query, vars)
+            exito = True
+            return resultado
+        finally:
+            duracion_ms = (time.perf_counter() - inicio) * 1000
+            if duracion_ms >= _config['umbral_ms']:
+                self._registrar_lenta(query, vars, duracion_ms, exito)
+
+    def _registrar_lenta(self, query, vars, duracion_ms: float, exito: bool):
+        try:
+            sql = query.decode() if isinstance(query, bytes) else str(query)
+            # Tras un error la transacción queda abortada y no admite el EXPLAIN
+            plan = self._explicar(sql, vars) if exito else "(la sentencia falló)"
+            _obtener_logger().info(
+                "%.1f ms\nSQL: %s\nParametros: %s\nPlan:\n%s\n%s",
+                duracion_ms, " ".join(sql.split()), forma_parametros(vars), plan, "-" * 80
+            )
+        except Exception:
+            # El diagnóstico nunca debe romper la consulta original
+            pass
+
+    def _explicar(self, sql: str, vars) -> str:
+        """
+        Obtiene el plan dentro de un savepoint que siempre se revierte: ni un
+        error del EXPLAIN ni los efectos de re-ejecutar la sentencia afectan la
+        transacción en curso.
+        """
+        if self.connection.autocommit:
+            # Sin transacción no hay savepoint: solo se re-ejecutan lecturas
+            analizar = _config['explain_analyze'] and _es_lectura(sql)
+        else:
+            analizar = _config['explain_analyze']
+        opciones = "ANALYZE, BUFFERS" if analizar else "COSTS"
+
+        cursor = self.connection.cursor(cursor_factory=psycopg2.extensions.cursor)
+        usar_savepoint = not self.connection.autocommit
+        try:
+            if usar_savepoint:
+                cursor.execute("SAVEPOINT explicar_consulta_lenta")
+            try:
+                cursor.execute(f"EXPLAIN ({opciones}) {sql}", vars)
+                return "\n".join(fila[0] for fila in cursor.fetchall())
+            except Exception as e:
+                return f"(no se pudo obtener el plan: {e})"
+            finally:
+                if usar_savepoint:
+                    cursor.execute("ROLLBACK TO SAVEPOINT explicar_consulta_lenta")
+                    cursor.execute("RELEASE SAVEPOINT explicar_consulta_lenta")
+        finally:
+            cursor.close()
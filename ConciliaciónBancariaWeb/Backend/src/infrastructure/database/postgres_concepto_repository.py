@@ -2,7 +2,10 @@ from typing import List, Optional
 import psycopg2
 from src.domain.models.concepto import Concepto
 from src.domain.ports.concepto_repository import ConceptoRepository
+from src.infrastructure.metrics.metricas import instrumentar_repositorio
+from src.infrastructure.cache.configuracion import invalidar_configuracion
 
+@instrumentar_repositorio
 class PostgresConceptoRepository(ConceptoRepository):
     def __init__(self, connection):
         self.conn = connection
@@ -32,6 +35,7 @@ class PostgresConceptoRepository(ConceptoRepository):
                 )
                 concepto.conceptoid = cursor.fetchone()[0]
             self.conn.commit()
+            invalidar_configuracion()
             return concepto
         except Exception as e:
             self.conn.rollback()
@@ -99,6 +103,7 @@ class PostgresConceptoRepository(ConceptoRepository):
             # Soft delete
             cursor.execute("UPDATE conceptos SET activa = FALSE WHERE conceptoid = %s", (conceptoid,))
             self.conn.commit()
+            invalidar_configuracion()
         except Exception as e:
             self.conn.rollback()
             raise e
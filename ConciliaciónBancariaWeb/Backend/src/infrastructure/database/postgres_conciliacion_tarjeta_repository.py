@@ -0,0 +1,147 @@
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional
+from src.domain.models.movimiento import Movimiento
+from src.domain.ports.conciliacion_tarjeta_repository import ConciliacionTarjetaRepository
+from src.infrastructure.metrics.metricas import instrumentar_repositorio
+
+_SELECT_CANDIDATOS = """
+    SELECT m.Id, m.Fecha, m.Descripcion, m.Referencia, m.Valor, m.MonedaID, m.CuentaID
+    FROM movimientos m
+    WHERE m.CuentaID = %s
+      AND m.Fecha BETWEEN %s AND %s
+"""
+
+
+@instrumentar_repositorio
+class PostgresConciliacionTarjetaRepository(ConciliacionTarjetaRepository):
+    """
+    Adaptador de Base de Datos para la conciliación de pagos de tarjeta
+    (tabla conciliacion_pagos_tarjeta, ver Sql/crear_tabla_conciliacion_pagos_tarjeta.sql).
+    """
+
+    def __init__(self, connection):
+        self.conn = connection
+
+    def _candidatos(self, query: str, params: tuple) -> List[Movimiento]:
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query, params)
+            return [
+                Movimiento(
+                    id=row[0],
+                    fecha=row[1],
+                    descripcion=row[2] or "",
+                    referencia=row[3] or "",
+                    valor=row[4] if row[4] is not None else Decimal('0'),
+                    moneda_id=row[5],
+                    cuenta_id=row[6]
+                )
+                for row in cursor.fetchall()
+            ]
+        finally:
+            cursor.close()
+
+    def obtener_pagos_tarjeta(self, cuenta_tarjeta_id: int, fecha_inicio: date, fecha_fin: date) -> List[Movimiento]:
+        query = _SELECT_CANDIDATOS + """
+              AND m.Valor > 0
+              AND NOT EXISTS (SELECT 1 FROM conciliacion_pagos_tarjeta c WHERE c.movimiento_tarjeta_id = m.Id)
+            ORDER BY m.Fecha, m.Id
+        """
+        return self._candidatos(query, (cuenta_tarjeta_id, fecha_inicio, fecha_fin))
+
+    def obtener_debitos_ahorros(self, cuenta_ahorros_id: int, fecha_inicio: date, fecha_fin: date,
+                                patron: Optional[str] = None) -> List[Movimiento]:
+        query = _SELECT_CANDIDATOS + """
+              AND m.Valor < 0
+              AND NOT EXISTS (SELECT 1 FROM conciliacion_pagos_tarjeta c WHERE c.movimiento_ahorros_id = m.Id)
+        """
+        params = [cuenta_ahorros_id, fecha_inicio, fecha_fin]
+        if patron:
+            query += " AND m.Descripcion ILIKE %s"
+            params.append(f"%{patron}%")
+        query += " ORDER BY m.Fecha, m.Id"
+        return self._candidatos(query, tuple(params))
+
+    def guardar_vinculos(self, vinculos: List[dict]) -> int:
+        if not vinculos:
+            return 0
+        # Todos los vínculos en una sola sentencia. Si alguno de los dos lados
+        # ya quedó conciliado (p.ej. en otra solicitud concurrente) la fila se
+        # omite sin abortar el lote; RETURNING trae solo las insertadas.
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("""
+                INSERT INTO conciliacion_pagos_tarjeta
+                    (movimiento_tarjeta_id, movimiento_ahorros_id, diferencia_valor, diferencia_dias)
+                SELECT * FROM unnest(%s::int[], %s::int[], %s::numeric[], %s::int[])
+                ON CONFLICT DO NOTHING
+                RETURNING id
+            """, (
+                [v['movimiento_tarjeta_id'] for v in vinculos],
+                [v['movimiento_ahorros_id'] for v in vinculos],
+                [v['diferencia_valor'] for v in vinculos],
+                [v['diferencia_dias'] for v in vinculos],
+            ))
+            guardados = len(cursor.fetchall())
+            self.conn.commit()
+            return guardados
+        except Exception as e:
+            self.conn.rollback()
+            raise e
+        finally:
+            cursor.close()
+
+    def obtener_vinculos(self, cuenta_tarjeta_id: Optional[int] = None,
+                         fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None) -> List[dict]:
+        query = """
+            SELECT c.id, c.diferencia_valor, c.diferencia_dias,
+                   t.Id, t.Fecha, t.Descripcion, t.Valor, t.CuentaID,
+                   a.Id, a.Fecha, a.Descripcion, a.Valor, a.CuentaID
+            FROM conciliacion_pagos_tarjeta c
+            JOIN movimientos t ON t.Id = c.movimiento_tarjeta_id
+            JOIN movimientos a ON a.Id = c.movimiento_ahorros_id
+            WHERE 1=1
+        """
+        params = []
+        if cuenta_tarjeta_id:
+            query += " AND t.CuentaID = %s"
+            params.append(cuenta_tarjeta_id)
+        if fecha_inicio:
+            query += " AND t.Fecha >= %s"
+            params.append(fecha_inicio)
+        if fecha_fin:
+            query += " AND t.Fecha <= %s"
+            params.append(fecha_fin)
+        query += " ORDER BY t.Fecha, t.Id"
+
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query, tuple(params))
+            return [
+                {
+                    "id": row[0],
+                    "diferencia_valor": float(row[1] or 0),
+                    "diferencia_dias": row[2],
+                    "tarjeta": {"id": row[3], "fecha": row[4], "descripcion": row[5],
+                                "valor": float(row[6] or 0), "cuenta_id": row[7]},
+                    "ahorros": {"id": row[8], "fecha": row[9], "descripcion": row[10],
+                                "valor": float(row[11] or 0), "cuenta_id": row[12]},
+                }
+                for row in cursor.fetchall()
+            ]
+        finally:
+            cursor.close()
+
+    def eliminar_vinculo(self, id: int) -> bool:
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("DELETE FROM conciliacion_pagos_tarjeta WHERE id = %s", (id,))
+            eliminado = cursor.rowcount > 0
+            self.conn.commit()
+            return eliminado
+        except Exception as e:
+            self.conn.rollback()
+            raise e
+        finally:
+            cursor.close()
@@ -2,7 +2,10 @@ from typing import List, Optional
 import psycopg2
 from src.domain.models.config_filtro_grupo import ConfigFiltroGrupo
 from src.domain.ports.config_filtro_grupo_repository import ConfigFiltroGrupoRepository
+from src.infrastructure.metrics.metricas import instrumentar_repositorio
+from src.infrastructure.cache.configuracion import invalidar_configuracion
 
+@instrumentar_repositorio
 class PostgresConfigFiltroGrupoRepository(ConfigFiltroGrupoRepository):
     """PostgreSQL implementation of ConfigFiltroGrupoRepository."""
     
@@ -33,6 +36,7 @@ class PostgresConfigFiltroGrupoRepository(ConfigFiltroGrupoRepository):
                 config.id = cursor.fetchone()[0]
             
             self.conn.commit()
+            invalidar_configuracion()
             return config
         except psycopg2.IntegrityError as e:
             self.conn.rollback()
@@ -100,6 +104,7 @@ class PostgresConfigFiltroGrupoRepository(ConfigFiltroGrupoRepository):
                 (id,)
             )
             self.conn.commit()
+            invalidar_configuracion()
         except Exception as e:
             self.conn.rollback()
             raise e
@@ -2,7 +2,9 @@ from typing import List, Optional
 import psycopg2
 from src.domain.models.config_valor_pendiente import ConfigValorPendiente
 from src.domain.ports.config_valor_pendiente_repository import ConfigValorPendienteRepository
+from src.infrastructure.metrics.metricas import instrumentar_repositorio
 
+@instrumentar_repositorio
 class PostgresConfigValorPendienteRepository(ConfigValorPendienteRepository):
     """PostgreSQL implementation of ConfigValorPendienteRepository."""
     
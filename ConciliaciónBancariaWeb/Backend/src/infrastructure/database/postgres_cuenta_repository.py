@@ -2,7 +2,9 @@ from typing import List, Optional
 import psycopg2
 from src.domain.models.cuenta import Cuenta
 from src.domain.ports.cuenta_repository import CuentaRepository
+from src.infrastructure.metrics.metricas import instrumentar_repositorio
 
+@instrumentar_repositorio
 class PostgresCuentaRepository(CuentaRepository):
     def __init__(self, connection):
         self.conn = connection
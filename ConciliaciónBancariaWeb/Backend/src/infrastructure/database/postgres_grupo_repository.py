@@ -2,7 +2,10 @@ from typing import List, Optional
 import psycopg2
 from src.domain.models.grupo import Grupo
 from src.domain.ports.grupo_repository import GrupoRepository
+from src.infrastructure.metrics.metricas import instrumentar_repositorio
+from src.infrastructure.cache.configuracion import obtener_configuracion
 
+@instrumentar_repositorio
 class PostgresGrupoRepository(GrupoRepository):
     def __init__(self, connection):
         self.conn = connection
@@ -62,27 +65,7 @@ class PostgresGrupoRepository(GrupoRepository):
             cursor.close()
 
     def obtener_filtros_exclusion(self) -> List[dict]:
-        cursor = self.conn.cursor()
-        query = """
-            SELECT c.grupo_id, c.etiqueta, c.activo_por_defecto
-            FROM config_filtros_grupos c
-            ORDER BY c.etiqueta
-        """
-        cursor.execute(query)
-        rows = cursor.fetchall()
-        cursor.close()
-        return [
-            {
-                "grupo_id": row[0], 
-                "etiqueta": row[1], 
-                "activo_por_defecto": row[2]
-            }
-            for row in rows
-        ]
+        return obtener_configuracion(self.conn).filtros_exclusion_dict()
 
     def obtener_id_traslados(self) -> Optional[int]:
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT grupo_id FROM config_filtros_grupos WHERE etiqueta ILIKE '%traslado%' LIMIT 1")
-        row = cursor.fetchone()
-        cursor.close()
-        return row[0] if row else None
+        return obtener_configuracion(self.conn).grupo_traslado_id
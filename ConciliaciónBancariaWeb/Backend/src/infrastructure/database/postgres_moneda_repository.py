@@ -2,7 +2,9 @@ from typing import List, Optional
 import psycopg2
 from src.domain.models.moneda import Moneda
 from src.domain.ports.moneda_repository import MonedaRepository
+from src.infrastructure.metrics.metricas import instrumentar_repositorio
 
+@instrumentar_repositorio
 class PostgresMonedaRepository(MonedaRepository):
     def __init__(self, connection):
         self.conn = connection
@@ -1,10 +1,51 @@
+import re
 from typing import List, Optional
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
 import psycopg2
 from src.domain.models.movimiento import Movimiento
 from src.domain.ports.movimiento_repository import MovimientoRepository
+from src.infrastructure.metrics.metricas import instrumentar_repositorio
+from src.infrastructure.cache.cache_reportes import incrementar_generacion
+from src.infrastructure.cache.configuracion import obtener_configuracion
 
+# Atributo de Movimiento -> (expresión SQL, JOIN de catálogo que requiere).
+# El orden es el de la fila completa que espera _row_to_movimiento.
+_COLUMNAS_MOVIMIENTO = {
+    'id': ('m.Id', None),
+    'fecha': ('m.Fecha', None),
+    'descripcion': ('m.Descripcion', None),
+    'referencia': ('m.Referencia', None),
+    'valor': ('m.Valor', None),
+    'usd': ('m.USD', None),
+    'trm': ('m.TRM', None),
+    'moneda_id': ('m.MonedaID', None),
+    'cuenta_id': ('m.CuentaID', None),
+    'tercero_id': ('m.TerceroID', None),
+    'grupo_id': ('m.GrupoID', None),
+    'concepto_id': ('m.ConceptoID', None),
+    'created_at': ('m.created_at', None),
+    'detalle': ('m.Detalle', None),
+    'cuenta_nombre': ('c.cuenta', "LEFT JOIN cuentas c ON m.CuentaID = c.cuentaid"),
+    'moneda_nombre': ('mon.moneda', "LEFT JOIN monedas mon ON m.MonedaID = mon.monedaid"),
+    'tercero_nombre': ('t.tercero', "LEFT JOIN terceros t ON m.TerceroID = t.terceroid"),
+    'grupo_nombre': ('g.grupo', "LEFT JOIN grupos g ON m.GrupoID = g.grupoid"),
+    'concepto_nombre': ('con.concepto', "LEFT JOIN conceptos con ON m.ConceptoID = con.conceptoid"),
+}
+
+# Siempre se cargan: identifican la fila, se usan en el ORDER BY y el dominio los exige
+_ATRIBUTOS_BASE = ('id', 'fecha', 'valor')
+
+# Movimientos alcanzados por una clasificación en lote: descripción con el patrón
+# (ILIKE '%patron%', resuelto por el índice de trigramas trgm_idx_movimientos_descripcion)
+# y algún campo de clasificación vacío, para no sobrescribir trabajo manual previo
+_CONDICION_LOTE = """m.Descripcion ILIKE %s
+              AND (m.TerceroID IS NULL OR m.GrupoID IS NULL OR m.ConceptoID IS NULL)"""
+
+# Palabras de una búsqueda libre (letras y dígitos; el resto es separador)
+_PATRON_PALABRA = re.compile(r"[^\W_]+", re.UNICODE)
+
+@instrumentar_repositorio
 class PostgresMovimientoRepository(MovimientoRepository):
     """
     Adaptador de Base de Datos para Movimientos en PostgreSQL.
@@ -14,25 +55,9 @@ class PostgresMovimientoRepository(MovimientoRepository):
         self.conn = connection
 
     def _get_ids_traslados(self) -> tuple[Optional[int], Optional[int]]:
-        """Busca dinámicamente el ID de grupo y concepto para 'Traslados'"""
-        cursor = self.conn.cursor()
-        try:
-            # 1. Buscar grupo en config_filtros_grupos (label 'Excluir Traslados')
-            cursor.execute("SELECT grupo_id FROM config_filtros_grupos WHERE etiqueta ILIKE %s LIMIT 1", ('%traslado%',))
-            row_grupo = cursor.fetchone()
-            grupoid = row_grupo[0] if row_grupo else None
-            
-            if not grupoid:
-                return None, None
-                
-            # 2. Buscar concepto 'Traslado' en ese grupo
-            cursor.execute("SELECT conceptoid FROM conceptos WHERE grupoid_fk = %s AND concepto ILIKE %s LIMIT 1", (grupoid, '%traslado%'))
-            row_concepto = cursor.fetchone()
-            conceptoid = row_concepto[0] if row_concepto else None
-            
-            return grupoid, conceptoid
-        finally:
-            cursor.close()
+        """ID de grupo y concepto para 'Traslados' (de la instantánea de configuración)"""
+        config = obtener_configuracion(self.conn)
+        return config.grupo_traslado_id, config.concepto_traslado_id
 
     def _construir_filtros(self, 
                            fecha_inicio: Optional[date] = None, 
@@ -41,7 +66,9 @@ class PostgresMovimientoRepository(MovimientoRepository):
                            tercero_id: Optional[int] = None,
                            grupo_id: Optional[int] = None,
                            concepto_id: Optional[int] = None,
-                           grupos_excluidos: Optional[List[int]] = None
+                           grupos_excluidos: Optional[List[int]] = None,
+                           solo_pendientes: bool = False,
+                           tipo_movimiento: Optional[str] = None
     ) -> tuple[str, list]:
         """
         Construye la cláusula WHERE y los parámetros para los filtros comunes.
@@ -75,7 +102,7 @@ class PostgresMovimientoRepository(MovimientoRepository):
             params.append(tuple(grupos_excluidos))
              
         if solo_pendientes:
-            conditions.append("(m.TerceroID IS NULL OR m.GrupoID IS NULL OR m.ConceptoID IS NULL)")
+            conditions.append("m.pendiente")
             
         if tipo_movimiento:
             if tipo_movimiento == 'ingresos':
@@ -119,6 +146,54 @@ class PostgresMovimientoRepository(MovimientoRepository):
             concepto_nombre=row[18] if len(row) > 18 and row[18] else None
         )
 
+    def _select_movimientos(self, campos: Optional[List[str]] = None,
+                            columnas_extra: tuple = ()) -> tuple[str, Optional[List[str]]]:
+        """
+        Arma el SELECT ... FROM ... con solo las columnas y JOINs que piden `campos`.
+        Las `columnas_extra` (expresiones SQL) van al inicio de la fila; quien las
+        pida debe quitarlas antes de convertir la fila.
+
+        Returns:
+            tuple: (sql, atributos en el orden de la fila); atributos es None si se
+            pidió la fila completa (se convierte con _row_to_movimiento)
+        """
+        if not campos:
+            atributos = list(_COLUMNAS_MOVIMIENTO)
+        else:
+            desconocidos = set(campos) - set(_COLUMNAS_MOVIMIENTO)
+            if desconocidos:
+                raise ValueError(f"Campos de movimiento desconocidos: {sorted(desconocidos)}")
+            pedidos = set(_ATRIBUTOS_BASE) | set(campos)
+            atributos = [a for a in _COLUMNAS_MOVIMIENTO if a in pedidos]
+
+        columnas = list(columnas_extra)
+        joins = []
+        for atributo in atributos:
+            expresion, join = _COLUMNAS_MOVIMIENTO[atributo]
+            columnas.append(f"{expresion} AS {atributo}" if join else expresion)
+            if join:
+                joins.append(join)
+
+        sql = f"""
+            SELECT {', '.join(columnas)}
+            FROM movimientos m
+            {' '.join(joins)}
+        """
+        return sql, (None if not campos else atributos)
+
+    def _fila_a_movimiento(self, row, atributos: Optional[List[str]] = None) -> Movimiento:
+        """Convierte una fila completa o parcial (ver _select_movimientos)"""
+        if atributos is None:
+            return self._row_to_movimiento(row)
+
+        datos = dict(zip(atributos, row))
+        datos['valor'] = datos['valor'] if datos['valor'] is not None else Decimal('0')
+        datos['descripcion'] = datos.get('descripcion') or ""
+        datos['referencia'] = datos.get('referencia') or ""
+        datos.setdefault('moneda_id', None)
+        datos.setdefault('cuenta_id', None)
+        return Movimiento(**datos)
+
     def guardar(self, mov: Movimiento) -> Movimiento:
         cursor = self.conn.cursor()
         try:
@@ -153,6 +228,7 @@ class PostgresMovimientoRepository(MovimientoRepository):
                 mov.created_at = result[1]
             
             self.conn.commit()
+            incrementar_generacion()
             return mov
         except Exception as e:
             self.conn.rollback()
@@ -230,12 +306,7 @@ class PostgresMovimientoRepository(MovimientoRepository):
         cursor.close()
         return [self._row_to_movimiento(row) for row in rows]
 
-    def buscar_pendientes_clasificacion(
-        self, 
-        terceros_pendientes: List[int] = None,
-        grupos_pendientes: List[int] = None,
-        conceptos_pendientes: List[int] = None
-    ) -> List[Movimiento]:
+    def buscar_pendientes_clasificacion(self, campos: Optional[List[str]] = None) -> List[Movimiento]:
         """
         Busca movimientos pendientes de clasificación.
         
@@ -243,59 +314,30 @@ class PostgresMovimientoRepository(MovimientoRepository):
         - TerceroID, GrupoID o ConceptoID son NULL
         - O si tienen valores que semánticamente significan "pendiente" (ej: "Por identificar")
         
-        Args:
-            terceros_pendientes: IDs de terceros que significan "pendiente"
-            grupos_pendientes: IDs de grupos que significan "pendiente"
-            conceptos_pendientes: IDs de conceptos que significan "pendiente"
+        La regla la evalúan los triggers de la columna m.pendiente (ver
+        Sql/agregar_flag_pendiente_movimientos.sql); la consulta recorre solo el
+        índice parcial idx_movimientos_pendientes, que ya está en el orden pedido.
         """
         cursor = self.conn.cursor()
-        
-        # Construir condiciones dinámicas
-        tercero_conditions = ["m.TerceroID IS NULL"]
-        grupo_conditions = ["m.GrupoID IS NULL"]
-        concepto_conditions = ["m.ConceptoID IS NULL"]
-        params = []
-        
-        if terceros_pendientes and len(terceros_pendientes) > 0:
-            tercero_conditions.append("m.TerceroID IN %s")
-            params.append(tuple(terceros_pendientes))
-        
-        if grupos_pendientes and len(grupos_pendientes) > 0:
-            grupo_conditions.append("m.GrupoID IN %s")
-            params.append(tuple(grupos_pendientes))
-            
-        if conceptos_pendientes and len(conceptos_pendientes) > 0:
-            concepto_conditions.append("m.ConceptoID IN %s")
-            params.append(tuple(conceptos_pendientes))
-        
-        # Combinar condiciones: cualquier campo pendiente hace que el movimiento sea pendiente
-        where_clause = f"""
-            (({' OR '.join(tercero_conditions)})
-            OR ({' OR '.join(grupo_conditions)})
-            OR ({' OR '.join(concepto_conditions)}))
-        """
-        
+        seleccion, atributos = self._select_movimientos(campos)
         query = f"""
-            SELECT m.Id, m.Fecha, m.Descripcion, m.Referencia, m.Valor, m.USD, m.TRM, 
-                   m.MonedaID, m.CuentaID, m.TerceroID, m.GrupoID, m.ConceptoID, m.created_at, m.Detalle,
-                   c.cuenta AS cuenta_nombre,
-                   mon.moneda AS moneda_nombre,
-                   t.tercero AS tercero_nombre,
-                   g.grupo AS grupo_nombre,
-                   con.concepto AS concepto_nombre
-            FROM movimientos m
-            LEFT JOIN cuentas c ON m.CuentaID = c.cuentaid
-            LEFT JOIN monedas mon ON m.MonedaID = mon.monedaid
-            LEFT JOIN terceros t ON m.TerceroID = t.terceroid
-            LEFT JOIN grupos g ON m.GrupoID = g.grupoid
-            LEFT JOIN conceptos con ON m.ConceptoID = con.conceptoid
-            WHERE {where_clause}
+            {seleccion}
+            WHERE m.pendiente
             ORDER BY m.Fecha DESC, ABS(m.Valor) DESC
         """
-        cursor.execute(query, tuple(params))
+        cursor.execute(query)
         rows = cursor.fetchall()
         cursor.close()
-        return [self._row_to_movimiento(row) for row in rows]
+        return [self._fila_a_movimiento(row, atributos) for row in rows]
+
+    def contar_pendientes(self) -> int:
+        """Número de movimientos pendientes (index-only sobre idx_movimientos_pendientes)"""
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("SELECT COUNT(*) FROM movimientos WHERE pendiente")
+            return cursor.fetchone()[0]
+        finally:
+            cursor.close()
     
     def buscar_por_referencia(self, referencia: str) -> List[Movimiento]:
         cursor = self.conn.cursor()
@@ -323,38 +365,109 @@ class PostgresMovimientoRepository(MovimientoRepository):
         cursor.close()
         return [self._row_to_movimiento(row) for row in rows]
 
-    def existe_movimiento(self, fecha: date, valor: Decimal, referencia: str, descripcion: str = None, usd: Decimal = None) -> bool:
+    def guardar_nuevos(self, movimientos: List[Movimiento], con_descripcion: bool = True) -> List[Movimiento]:
+        if not movimientos:
+            return []
+        # Un solo INSERT para todo el lote: las filas llegan como arreglos (unnest)
+        # y la huella la calcula fn_huella_movimiento (Sql/agregar_huella_movimientos.sql).
+        # El índice único uq_movimientos_huella descarta los duplicados, incluso
+        # entre cargas simultáneas o repetidos dentro del mismo extracto, y la
+        # ordinalidad permite devolver el id a cada Movimiento insertado.
+        query = """
+            WITH datos AS (
+                SELECT x.*,
+                       fn_huella_movimiento(x.cuenta, x.fecha, x.valor, x.usd,
+                                            x.descripcion, x.referencia, %s) AS huella
+                FROM unnest(%s::date[], %s::text[], %s::text[], %s::numeric[], %s::numeric[], %s::numeric[],
+                            %s::int[], %s::int[], %s::int[], %s::int[], %s::int[], %s::text[])
+                     WITH ORDINALITY AS x(fecha, descripcion, referencia, valor, usd, trm,
+                                          moneda, cuenta, tercero, grupo, concepto, detalle, n)
+            ),
+            insertados AS (
+                INSERT INTO movimientos (
+                    Fecha, Descripcion, Referencia, Valor, USD, TRM,
+                    MonedaID, CuentaID, TerceroID, GrupoID, ConceptoID, Detalle, huella
+                )
+                SELECT fecha, descripcion, referencia, valor, usd, trm,
+                       moneda, cuenta, tercero, grupo, concepto, detalle, huella
+                FROM datos
+                ORDER BY n
+                ON CONFLICT (huella) DO NOTHING
+                RETURNING Id, created_at, huella
+            )
+            SELECT DISTINCT ON (i.Id) d.n, i.Id, i.created_at
+            FROM insertados i
+            JOIN datos d ON d.huella = i.huella
+            ORDER BY i.Id, d.n
+        """
         cursor = self.conn.cursor()
-        if referencia and referencia.strip():
-            # Si hay referencia unívoca, confiamos en ella (y valor/fecha por seguridad)
-            # Nota: Si es USD, igual el valor podría ser 0 en BD, así que tendríamos cuidado.
-            # Pero normalmente la referencia mata todo.
-            query = "SELECT 1 FROM movimientos WHERE Referencia=%s AND Fecha=%s"
-            # Si hay USD, validamos por USD, sino por Valor
-            if usd is not None:
-                query += " AND USD=%s"
-                cursor.execute(query, (referencia, fecha, usd))
-            else:
-                 query += " AND Valor=%s"
-                 cursor.execute(query, (referencia, fecha, valor))
-        else:
-            # Si no hay referencia, debemos ser más estrictos: validar también Descripción
-            target_val = usd if usd is not None else valor
-            col_val = "USD" if usd is not None else "Valor"
-            
-            if descripcion:
-                # Usamos LOWER o ILIKE para que la comparación sea insensible a mayúsculas
-                query = f"SELECT 1 FROM movimientos WHERE {col_val}=%s AND Fecha=%s AND LOWER(Descripcion) = LOWER(%s)"
-                cursor.execute(query, (target_val, fecha, descripcion))
-            else:
-                # Fallback peligroso, pero necesario si no hay nada más
-                # NOTA: Si usd es None (es COP) y pasamos valor, y en BD guardamos valor, todo bien.
-                query = f"SELECT 1 FROM movimientos WHERE {col_val}=%s AND Fecha=%s"
-                cursor.execute(query, (target_val, fecha))
-            
-        exists = cursor.fetchone() is not None
-        cursor.close()
-        return exists
+        try:
+            if not con_descripcion:
+                # Registrar las cuentas como de tarjeta: el trigger y la carga
+                # inicial de huellas usan la misma regla (fn_huella_con_descripcion)
+                cursor.execute("""
+                    INSERT INTO cuentas_tarjeta (cuentaid)
+                    SELECT DISTINCT unnest(%s::int[])
+                    ON CONFLICT DO NOTHING
+                """, ([m.cuenta_id for m in movimientos],))
+            cursor.execute(query, (
+                con_descripcion,
+                [str(m.fecha) for m in movimientos],
+                [m.descripcion for m in movimientos],
+                [m.referencia for m in movimientos],
+                [m.valor for m in movimientos],
+                [m.usd for m in movimientos],
+                [m.trm for m in movimientos],
+                [m.moneda_id for m in movimientos],
+                [m.cuenta_id for m in movimientos],
+                [m.tercero_id for m in movimientos],
+                [m.grupo_id for m in movimientos],
+                [m.concepto_id for m in movimientos],
+                [m.detalle for m in movimientos],
+            ))
+            insertados = []
+            for n, id_, created_at in sorted(cursor.fetchall()):
+                mov = movimientos[n - 1]
+                mov.id = id_
+                mov.created_at = created_at
+                insertados.append(mov)
+            self.conn.commit()
+            if insertados:
+                incrementar_generacion()
+            return insertados
+        except Exception as e:
+            self.conn.rollback()
+            raise e
+        finally:
+            cursor.close()
+
+    def marcar_existentes(self, movimientos: List[Movimiento], con_descripcion: bool = True) -> List[bool]:
+        if not movimientos:
+            return []
+        query = """
+            SELECT EXISTS (
+                SELECT 1 FROM movimientos m
+                WHERE m.huella = fn_huella_movimiento(x.cuenta, x.fecha, x.valor, x.usd,
+                                                      x.descripcion, x.referencia, %s)
+            )
+            FROM unnest(%s::int[], %s::date[], %s::numeric[], %s::numeric[], %s::text[], %s::text[])
+                 WITH ORDINALITY AS x(cuenta, fecha, valor, usd, descripcion, referencia, n)
+            ORDER BY x.n
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query, (
+                con_descripcion,
+                [m.cuenta_id for m in movimientos],
+                [str(m.fecha) for m in movimientos],
+                [m.valor for m in movimientos],
+                [m.usd for m in movimientos],
+                [m.descripcion for m in movimientos],
+                [m.referencia for m in movimientos],
+            ))
+            return [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
 
     def buscar_avanzado(self, 
                        fecha_inicio: Optional[date] = None, 
@@ -367,7 +480,8 @@ class PostgresMovimientoRepository(MovimientoRepository):
                        solo_pendientes: bool = False,
                        tipo_movimiento: Optional[str] = None,
                        skip: int = 0,
-                       limit: Optional[int] = None
+                       limit: Optional[int] = None,
+                       campos: Optional[List[str]] = None
     ) -> tuple[List[Movimiento], int]:
         """
         Busca movimientos con filtros avanzados y paginación.
@@ -377,23 +491,9 @@ class PostgresMovimientoRepository(MovimientoRepository):
         """
         cursor = self.conn.cursor()
         
-        # Query base para los datos
-        query = """
-            SELECT m.Id, m.Fecha, m.Descripcion, m.Referencia, m.Valor, m.USD, m.TRM, 
-                   m.MonedaID, m.CuentaID, m.TerceroID, m.GrupoID, m.ConceptoID, m.created_at, m.Detalle,
-                   c.cuenta AS cuenta_nombre,
-                   mon.moneda AS moneda_nombre,
-                   t.tercero AS tercero_nombre,
-                   g.grupo AS grupo_nombre,
-                   con.concepto AS concepto_nombre
-            FROM movimientos m
-            LEFT JOIN cuentas c ON m.CuentaID = c.cuentaid
-            LEFT JOIN monedas mon ON m.MonedaID = mon.monedaid
-            LEFT JOIN terceros t ON m.TerceroID = t.terceroid
-            LEFT JOIN grupos g ON m.GrupoID = g.grupoid
-            LEFT JOIN conceptos con ON m.ConceptoID = con.conceptoid
-            WHERE 1=1
-        """
+        # Query base para los datos (solo las columnas y JOINs de los campos pedidos)
+        seleccion, atributos = self._select_movimientos(campos)
+        query = seleccion + " WHERE 1=1"
         
         where_clause, params = self._construir_filtros(
             fecha_inicio=fecha_inicio,
@@ -429,9 +529,48 @@ class PostgresMovimientoRepository(MovimientoRepository):
         rows = cursor.fetchall()
         cursor.close()
         
-        movimientos = [self._row_to_movimiento(row) for row in rows]
+        movimientos = [self._fila_a_movimiento(row, atributos) for row in rows]
         return movimientos, total_count
 
+    def buscar_texto(self, texto: str, skip: int = 0, limit: int = 50,
+                     campos: Optional[List[str]] = None) -> tuple[List[Movimiento], int]:
+        """
+        Búsqueda de texto completo sobre Descripcion, Referencia y Detalle
+        (columna m.busqueda, índice GIN). Cada palabra se busca como prefijo
+        ('pag' encuentra 'pago', 'pagos') y todas deben aparecer.
+
+        Returns:
+            tuple: (página de movimientos ordenada por relevancia, total de coincidencias)
+        """
+        palabras = _PATRON_PALABRA.findall(texto or "")
+        if not palabras:
+            return [], 0
+        # Solo letras y dígitos: ningún operador de tsquery llega desde el usuario
+        consulta = " & ".join(f"{p}:*" for p in palabras)
+
+        cursor = self.conn.cursor()
+        try:
+            seleccion, atributos = self._select_movimientos(campos, columnas_extra=('COUNT(*) OVER()',))
+            query = f"""
+                {seleccion}
+                WHERE m.busqueda @@ to_tsquery('spanish', %s)
+                ORDER BY ts_rank_cd(m.busqueda, to_tsquery('spanish', %s)) DESC, m.Fecha DESC, m.Id DESC
+                OFFSET %s LIMIT %s
+            """
+            cursor.execute(query, (consulta, consulta, skip, limit))
+            rows = cursor.fetchall()
+            if not rows and skip > 0:
+                # Página fuera de rango: el total sale de un conteo aparte
+                cursor.execute(
+                    "SELECT COUNT(*) FROM movimientos m WHERE m.busqueda @@ to_tsquery('spanish', %s)",
+                    (consulta,)
+                )
+                return [], cursor.fetchone()[0]
+            total = rows[0][0] if rows else 0
+            return [self._fila_a_movimiento(row[1:], atributos) for row in rows], total
+        finally:
+            cursor.close()
+
     def resumir_por_clasificacion(self, 
                                  tipo_agrupacion: str,
                                  fecha_inicio: Optional[date] = None, 
@@ -524,15 +663,39 @@ class PostgresMovimientoRepository(MovimientoRepository):
         cursor.close()
         return [self._row_to_movimiento(row) for row in rows]
 
+    def previsualizar_clasificacion_lote(self, patron: str, limite: int = 50,
+                                         campos: Optional[List[str]] = None) -> tuple[List[Movimiento], int]:
+        """
+        Movimientos que actualizaría actualizar_clasificacion_lote con el mismo patrón.
+
+        Returns:
+            tuple: (primeros `limite` por fecha descendente, total que se actualizaría)
+        """
+        cursor = self.conn.cursor()
+        try:
+            like_pattern = f"%{patron}%"
+            cursor.execute(f"SELECT COUNT(*) FROM movimientos m WHERE {_CONDICION_LOTE}", (like_pattern,))
+            total = cursor.fetchone()[0]
+            if not total:
+                return [], 0
+
+            seleccion, atributos = self._select_movimientos(campos)
+            cursor.execute(
+                f"{seleccion} WHERE {_CONDICION_LOTE} ORDER BY m.Fecha DESC LIMIT %s",
+                (like_pattern, limite)
+            )
+            return [self._fila_a_movimiento(row, atributos) for row in cursor.fetchall()], total
+        finally:
+            cursor.close()
+
     def actualizar_clasificacion_lote(self, patron: str, tercero_id: int, grupo_id: int, concepto_id: int) -> int:
         cursor = self.conn.cursor()
         try:
-            # Seguridad: update solo donde hay campos vacíos para no sobrescribir trabajo manual previo
-            query = """
-                UPDATE movimientos
+            # Un solo UPDATE con el mismo predicado del preview (ver _CONDICION_LOTE)
+            query = f"""
+                UPDATE movimientos m
                 SET TerceroID = %s, GrupoID = %s, ConceptoID = %s
-                WHERE Descripcion ILIKE %s
-                  AND (TerceroID IS NULL OR GrupoID IS NULL OR ConceptoID IS NULL)
+                WHERE {_CONDICION_LOTE}
             """
             # Usar %patron%
             like_pattern = f"%{patron}%"
@@ -540,6 +703,8 @@ class PostgresMovimientoRepository(MovimientoRepository):
             
             affected = cursor.rowcount
             self.conn.commit()
+            if affected:
+                incrementar_generacion()
             return affected
         except Exception as e:
             self.conn.rollback()
@@ -707,27 +872,13 @@ class PostgresMovimientoRepository(MovimientoRepository):
             for row in rows
         ]
 
-    def obtener_movimientos_grupo(self, tercero_id: int, grupo_id: Optional[int] = None, concepto_id: Optional[int] = None, fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None) -> List[Movimiento]:
+    def obtener_movimientos_grupo(self, tercero_id: int, grupo_id: Optional[int] = None, concepto_id: Optional[int] = None, fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None, campos: Optional[List[str]] = None) -> List[Movimiento]:
         """
         Obtiene los movimientos de un Tercero sugerido (ignora grupo/concepto específicos).
         """
         cursor = self.conn.cursor()
-        query = """
-            SELECT m.Id, m.Fecha, m.Descripcion, m.Referencia, m.Valor, m.USD, m.TRM, 
-                   m.MonedaID, m.CuentaID, m.TerceroID, m.GrupoID, m.ConceptoID, m.created_at, m.Detalle,
-                   c.cuenta AS cuenta_nombre,
-                   mon.moneda AS moneda_nombre,
-                   t.tercero AS tercero_nombre,
-                   g.grupo AS grupo_nombre,
-                   con.concepto AS concepto_nombre
-            FROM movimientos m
-            LEFT JOIN cuentas c ON m.CuentaID = c.cuentaid
-            LEFT JOIN monedas mon ON m.MonedaID = mon.monedaid
-            LEFT JOIN terceros t ON m.TerceroID = t.terceroid
-            LEFT JOIN grupos g ON m.GrupoID = g.grupoid
-            LEFT JOIN conceptos con ON m.ConceptoID = con.conceptoid
-            WHERE m.TerceroID = %s
-        """
+        seleccion, atributos = self._select_movimientos(campos)
+        query = seleccion + " WHERE m.TerceroID = %s"
         params = [tercero_id]
         
         grupoid_t, _ = self._get_ids_traslados()
@@ -747,13 +898,83 @@ class PostgresMovimientoRepository(MovimientoRepository):
         cursor.execute(query, tuple(params))
         rows = cursor.fetchall()
         cursor.close()
-        return [self._row_to_movimiento(row) for row in rows]
+        return [self._fila_a_movimiento(row, atributos) for row in rows]
+
+    def obtener_cambios_desde(self, version: int, limite: int) -> List[tuple]:
+        """
+        Movimientos insertados o modificados después de `version` (row_version),
+        en orden de versión. Retorna tuplas (row_version, activa, Movimiento).
+        """
+        cursor = self.conn.cursor()
+        try:
+            seleccion, _ = self._select_movimientos(columnas_extra=('m.row_version', 'COALESCE(m.activa, TRUE)'))
+            query = seleccion + " WHERE m.row_version > %s ORDER BY m.row_version LIMIT %s"
+            cursor.execute(query, (version, limite))
+            return [(row[0], row[1], self._row_to_movimiento(row[2:])) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
 
-    def reclasificar_movimientos_grupo(self, tercero_id: int, grupo_id_anterior: Optional[int] = None, concepto_id_anterior: Optional[int] = None, fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None, movimiento_ids: Optional[List[int]] = None) -> int:
+    def obtener_etiquetados_desde(self, version: int, limite: int) -> List[tuple]:
+        """
+        Cambios desde `version` para el entrenamiento incremental del clasificador
+        de texto. Un movimiento que vuelve a quedar pendiente o se inactiva llega
+        con etiquetado = False para que el modelo lo olvide.
+        """
+        cursor = self.conn.cursor()
+        try:
+            seleccion, atributos = self._select_movimientos(
+                ['descripcion', 'referencia', 'usd', 'cuenta_id', 'grupo_id', 'concepto_id'],
+                columnas_extra=('m.row_version', 'NOT m.pendiente AND COALESCE(m.activa, TRUE)')
+            )
+            query = seleccion + " WHERE m.row_version > %s ORDER BY m.row_version LIMIT %s"
+            cursor.execute(query, (version, limite))
+            return [(row[0], row[1], self._fila_a_movimiento(row[2:], atributos)) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def obtener_candidatos_traslado(self, fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None, creados_desde: Optional[datetime] = None) -> List[Movimiento]:
+        """
+        Movimientos pendientes de clasificar y con valor (solo las columnas que
+        usa el emparejador de traslados). Los ya clasificados en otro grupo no
+        son candidatos: aplicar los pares los sobrescribiría con Traslado.
+        """
+        cursor = self.conn.cursor()
+        try:
+            seleccion, atributos = self._select_movimientos(
+                ['descripcion', 'moneda_id', 'cuenta_id', 'tercero_id', 'grupo_id', 'created_at']
+            )
+            query = seleccion + " WHERE m.pendiente AND m.Valor <> 0"
+            params = []
+
+            grupoid_t, _ = self._get_ids_traslados()
+            if grupoid_t:
+                query += " AND (m.GrupoID IS NULL OR m.GrupoID != %s)"
+                params.append(grupoid_t)
+            if fecha_inicio:
+                query += " AND m.Fecha >= %s"
+                params.append(fecha_inicio)
+            if fecha_fin:
+                query += " AND m.Fecha <= %s"
+                params.append(fecha_fin)
+            if creados_desde:
+                query += " AND m.created_at >= %s"
+                params.append(creados_desde)
+
+            cursor.execute(query, tuple(params))
+            return [self._fila_a_movimiento(row, atributos) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def reclasificar_movimientos_grupo(self, tercero_id: Optional[int], grupo_id_anterior: Optional[int] = None, concepto_id_anterior: Optional[int] = None, fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None, movimiento_ids: Optional[List[int]] = None) -> int:
         """
         Actualiza los movimientos de un Tercero para ser Traslado.
         Si se proporcionan movimiento_ids, solo actualiza esos.
+        Sin tercero_id (p.ej. pares del emparejador de traslados, que pueden tener
+        terceros distintos) se exigen movimiento_ids.
         """
+        if tercero_id is None and movimiento_ids is None:
+            raise ValueError("Sin tercero_id se deben indicar los movimiento_ids a reclasificar.")
+
         cursor = self.conn.cursor()
         grupoid_t, conceptoid_t = self._get_ids_traslados()
         
@@ -769,10 +990,13 @@ class PostgresMovimientoRepository(MovimientoRepository):
             query = """
                 UPDATE movimientos
                 SET GrupoID = %s, ConceptoID = %s
-                WHERE TerceroID = %s 
-                  AND (GrupoID IS NULL OR GrupoID != %s)
+                WHERE (GrupoID IS NULL OR GrupoID != %s)
             """
-            params = [NEW_GRUPO_ID, NEW_CONCEPTO_ID, tercero_id, NEW_GRUPO_ID] # Evitar updates redundantes
+            params = [NEW_GRUPO_ID, NEW_CONCEPTO_ID, NEW_GRUPO_ID] # Evitar updates redundantes
+            
+            if tercero_id is not None:
+                query += " AND TerceroID = %s"
+                params.append(tercero_id)
             
             if movimiento_ids is not None:
                 # Si se especifican IDs (incluso vacio), usamos esos especificamente
@@ -790,6 +1014,8 @@ class PostgresMovimientoRepository(MovimientoRepository):
             cursor.execute(query, tuple(params))
             affected = cursor.rowcount
             self.conn.commit()
+            if affected:
+                incrementar_generacion()
             return affected
         except Exception as e:
             self.conn.rollback()
@@ -1,7 +1,9 @@
 from typing import List
 from src.domain.models.regla_clasificacion import ReglaClasificacion
 from src.domain.ports.reglas_repository import ReglasRepository
+from src.infrastructure.metrics.metricas import instrumentar_repositorio
 
+@instrumentar_repositorio
 class PostgresReglasRepository(ReglasRepository):
     """
     Implementación de ReglasRepository usando PostgreSQL.
@@ -0,0 +1,72 @@
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional
+from src.domain.ports.saldo_repository import SaldoRepository
+from src.infrastructure.metrics.metricas import instrumentar_repositorio
+
+
+@instrumentar_repositorio
+class PostgresSaldoRepository(SaldoRepository):
+    """
+    Adaptador de Base de Datos para saldos por cuenta. saldos_mensuales la
+    mantienen los triggers trg_movimientos_saldos_* (ver Sql/crear_tabla_saldos_mensuales.sql).
+    """
+
+    def __init__(self, connection):
+        self.conn = connection
+
+    def obtener_saldo(self, cuenta_id: int, fecha: date) -> Decimal:
+        # Cierre del último mes con movimientos antes del mes de `fecha`
+        # + movimientos del mes de `fecha` hasta ese día.
+        query = """
+            SELECT
+                COALESCE((
+                    SELECT s.saldo_cierre FROM saldos_mensuales s
+                    WHERE s.cuenta_id = %s AND s.mes < date_trunc('month', %s::date)
+                    ORDER BY s.mes DESC LIMIT 1
+                ), 0)
+                + COALESCE((
+                    SELECT SUM(m.Valor) FROM movimientos m
+                    WHERE m.CuentaID = %s
+                      AND m.Fecha >= date_trunc('month', %s::date)
+                      AND m.Fecha <= %s
+                ), 0)
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query, (cuenta_id, fecha, cuenta_id, fecha, fecha))
+            row = cursor.fetchone()
+            return row[0] if row and row[0] is not None else Decimal('0')
+        finally:
+            cursor.close()
+
+    def obtener_saldos_mensuales(self, cuenta_id: int,
+                                 fecha_inicio: Optional[date] = None,
+                                 fecha_fin: Optional[date] = None) -> List[dict]:
+        query = """
+            SELECT mes, neto_mes, saldo_cierre
+            FROM saldos_mensuales
+            WHERE cuenta_id = %s
+        """
+        params = [cuenta_id]
+        if fecha_inicio:
+            query += " AND mes >= date_trunc('month', %s::date)"
+            params.append(fecha_inicio)
+        if fecha_fin:
+            query += " AND mes <= %s"
+            params.append(fecha_fin)
+        query += " ORDER BY mes"
+
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query, tuple(params))
+            return [
+                {
+                    "mes": row[0],
+                    "neto_mes": float(row[1] or 0),
+                    "saldo_cierre": float(row[2] or 0)
+                }
+                for row in cursor.fetchall()
+            ]
+        finally:
+            cursor.close()
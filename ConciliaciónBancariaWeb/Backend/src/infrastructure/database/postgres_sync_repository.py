@@ -0,0 +1,103 @@
+from typing import Dict, List
+from src.domain.ports.sync_repository import SyncRepository
+from src.infrastructure.database.postgres_movimiento_repository import PostgresMovimientoRepository
+from src.infrastructure.metrics.metricas import instrumentar_repositorio
+
+# Catálogo -> (tabla, columnas SQL con el ID primero, claves del dict en la respuesta).
+# Las claves son las mismas de GET /api/catalogos para que el cliente pueda
+# parchar su caché sin transformar nada.
+_CATALOGOS = {
+    'cuentas': ('cuentas', ['cuentaid', 'cuenta'], ['id', 'nombre']),
+    'monedas': ('monedas', ['monedaid', 'moneda', 'isocode'], ['id', 'nombre', 'isocode']),
+    'terceros': ('terceros', ['terceroid', 'tercero'], ['id', 'nombre']),
+    'grupos': ('grupos', ['grupoid', 'grupo'], ['id', 'nombre']),
+    'conceptos': ('conceptos', ['conceptoid', 'concepto', 'grupoid_fk'], ['id', 'nombre', 'grupo_id']),
+    'tercero_descripciones': ('tercero_descripciones', ['id', 'terceroid', 'descripcion', 'referencia'],
+                              ['id', 'terceroid', 'descripcion', 'referencia']),
+}
+
+
+@instrumentar_repositorio
+class PostgresSyncRepository(SyncRepository):
+    """
+    Lee los cambios a partir de row_version (ver Sql/agregar_versionado_sync.sql).
+
+    Cada fuente (movimientos, cada catálogo y sync_eliminados) se lee hasta
+    `limite` filas en orden de versión. Si alguna se llenó, la respuesta se corta
+    en la menor de sus últimas versiones: todo lo que queda por debajo del corte
+    está completo en todas las fuentes, y el cliente pide lo siguiente con
+    since=version.
+
+    Nota: la versión se asigna al escribir, no al confirmar. Una transacción
+    larga que confirme después de una sincronización con versiones mayores no
+    se vería; las escrituras de la API son transacciones cortas, pero las cargas
+    masivas de escritorio conviene que terminen con una sincronización completa
+    (since=0) del cliente.
+    """
+
+    def __init__(self, connection):
+        self.conn = connection
+
+    def obtener_cambios(self, desde: int, limite: int) -> dict:
+        movimientos = PostgresMovimientoRepository(self.conn).obtener_cambios_desde(desde, limite)
+
+        cursor = self.conn.cursor()
+        try:
+            catalogos = {}
+            for nombre, (tabla, columnas, _) in _CATALOGOS.items():
+                cursor.execute(
+                    f"SELECT row_version, COALESCE(activa, TRUE), {', '.join(columnas)} FROM {tabla} "
+                    "WHERE row_version > %s ORDER BY row_version LIMIT %s",
+                    (desde, limite)
+                )
+                catalogos[nombre] = cursor.fetchall()
+
+            cursor.execute(
+                "SELECT row_version, tabla, registro_id FROM sync_eliminados "
+                "WHERE row_version > %s ORDER BY row_version LIMIT %s",
+                (desde, limite)
+            )
+            borrados = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        # Versiones leídas por fuente (ya vienen ordenadas)
+        fuentes: List[List[int]] = [[v for v, _, _ in movimientos], [v for v, _, _ in borrados]]
+        fuentes.extend([fila[0] for fila in filas] for filas in catalogos.values())
+
+        llenas = [versiones[-1] for versiones in fuentes if len(versiones) >= limite]
+        if llenas:
+            corte = min(llenas)
+        else:
+            corte = max((versiones[-1] for versiones in fuentes if versiones), default=desde)
+
+        cambios: Dict[str, list] = {nombre: [] for nombre in ['movimientos', *_CATALOGOS]}
+        eliminados: Dict[str, list] = {nombre: [] for nombre in ['movimientos', *_CATALOGOS]}
+
+        for version, activa, mov in movimientos:
+            if version <= corte:
+                if activa:
+                    cambios['movimientos'].append(mov)
+                else:
+                    eliminados['movimientos'].append(mov.id)
+
+        for nombre, filas in catalogos.items():
+            claves = _CATALOGOS[nombre][2]
+            for fila in filas:
+                if fila[0] > corte:
+                    break
+                if fila[1]:
+                    cambios[nombre].append(dict(zip(claves, fila[2:])))
+                else:
+                    eliminados[nombre].append(fila[2])
+
+        for version, tabla, registro_id in borrados:
+            if version <= corte and tabla in eliminados:
+                eliminados[tabla].append(registro_id)
+
+        return {
+            'version': corte,
+            'hay_mas': bool(llenas),
+            'cambios': cambios,
+            'eliminados': eliminados,
+        }
@@ -1,7 +1,9 @@
 from typing import List, Optional
 from src.domain.models.tercero_descripcion import TerceroDescripcion
 from src.domain.ports.tercero_descripcion_repository import TerceroDescripcionRepository
+from src.infrastructure.metrics.metricas import instrumentar_repositorio
 
+@instrumentar_repositorio
 class PostgresTerceroDescripcionRepository(TerceroDescripcionRepository):
     def __init__(self, conn):
         self.conn = conn
@@ -3,7 +3,9 @@ import psycopg2
 from src.domain.models.tercero import Tercero
 from src.domain.ports.tercero_repository import TerceroRepository
 from src.infrastructure.logging.config import logger
+from src.infrastructure.metrics.metricas import instrumentar_repositorio
 
+@instrumentar_repositorio
 class PostgresTerceroRepository(TerceroRepository):
     """
     Adaptador de Base de Datos para PostgreSQL.
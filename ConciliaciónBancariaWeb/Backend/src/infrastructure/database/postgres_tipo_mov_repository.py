@@ -2,7 +2,9 @@ from typing import List, Optional
 import psycopg2
 from src.domain.models.tipo_mov import TipoMov
 from src.domain.ports.tipo_mov_repository import TipoMovRepository
+from src.infrastructure.metrics.metricas import instrumentar_repositorio
 
+@instrumentar_repositorio
 class PostgresTipoMovRepository(TipoMovRepository):
     def __init__(self, connection):
         self.conn = connection
@@ -0,0 +1,118 @@
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional, Tuple
+from src.domain.ports.trm_repository import TrmRepository
+from src.infrastructure.cache.cache_reportes import incrementar_generacion
+from src.infrastructure.metrics.metricas import instrumentar_repositorio
+
+
+@instrumentar_repositorio
+class PostgresTrmRepository(TrmRepository):
+    """
+    Adaptador de Base de Datos para la tabla trm (ver Sql/crear_tabla_trm.sql).
+    """
+
+    def __init__(self, connection):
+        self.conn = connection
+
+    def guardar_tasas(self, tasas: List[Tuple[date, Decimal]]) -> int:
+        if not tasas:
+            return 0
+        # Una sola sentencia para todo el CSV (la historia completa son ~12k filas).
+        # Las fechas deben venir sin repetir: ON CONFLICT no admite tocar dos
+        # veces la misma fila (leer_csv_trm ya deja una tasa por fecha).
+        fechas = [fecha for fecha, _ in tasas]
+        valores = [valor for _, valor in tasas]
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("""
+                INSERT INTO trm (fecha, valor)
+                SELECT * FROM unnest(%s::date[], %s::numeric[])
+                ON CONFLICT (fecha) DO UPDATE SET valor = EXCLUDED.valor
+            """, (fechas, valores))
+            self.conn.commit()
+            return len(tasas)
+        except Exception as e:
+            self.conn.rollback()
+            raise e
+        finally:
+            cursor.close()
+
+    def obtener_tasa(self, fecha: date) -> Optional[Tuple[date, Decimal]]:
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT fecha, valor FROM trm WHERE fecha <= %s ORDER BY fecha DESC LIMIT 1",
+                (fecha,)
+            )
+            row = cursor.fetchone()
+            return (row[0], row[1]) if row else None
+        finally:
+            cursor.close()
+
+    def obtener_tasas(self, fecha_inicio: date, fecha_fin: date) -> List[dict]:
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT d::date, t.fecha, t.valor
+                FROM generate_series(%s::date, %s::date, interval '1 day') d
+                LEFT JOIN LATERAL (
+                    SELECT fecha, valor FROM trm
+                    WHERE fecha <= d::date
+                    ORDER BY fecha DESC LIMIT 1
+                ) t ON TRUE
+                ORDER BY 1
+            """, (fecha_inicio, fecha_fin))
+            return [
+                {
+                    "fecha": row[0],
+                    "fecha_tasa": row[1],
+                    "valor": float(row[2]) if row[2] is not None else None
+                }
+                for row in cursor.fetchall()
+            ]
+        finally:
+            cursor.close()
+
+    def aplicar_trm_pendientes(self, fecha_inicio: Optional[date] = None,
+                               fecha_fin: Optional[date] = None) -> int:
+        # Una sola sentencia: cada pendiente toma la TRM vigente a su fecha.
+        # Los que no tienen TRM anterior quedan pendientes.
+        filtros = ""
+        params = []
+        if fecha_inicio:
+            filtros += " AND p.Fecha >= %s"
+            params.append(fecha_inicio)
+        if fecha_fin:
+            filtros += " AND p.Fecha <= %s"
+            params.append(fecha_fin)
+
+        query = f"""
+            UPDATE movimientos m
+            SET TRM = x.trm,
+                Valor = ROUND(m.USD * x.trm, 2)
+            FROM (
+                SELECT p.Id, (
+                    SELECT t.valor FROM trm t
+                    WHERE t.fecha <= p.Fecha
+                    ORDER BY t.fecha DESC LIMIT 1
+                ) AS trm
+                FROM movimientos p
+                WHERE p.USD IS NOT NULL AND p.USD <> 0 AND p.Valor = 0
+                {filtros}
+            ) x
+            WHERE m.Id = x.Id AND x.trm IS NOT NULL
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query, tuple(params))
+            affected = cursor.rowcount
+            self.conn.commit()
+            if affected:
+                incrementar_generacion()
+            return affected
+        except Exception as e:
+            self.conn.rollback()
+            raise e
+        finally:
+            cursor.close()
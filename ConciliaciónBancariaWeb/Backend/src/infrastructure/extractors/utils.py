@@ -1,6 +1,8 @@
+import pdfplumber
+import re
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 def parsear_fecha(fecha_str: str) -> Optional[str]:
     """
@@ -66,3 +68,74 @@ def parsear_valor(valor_str: str) -> Optional[Decimal]:
     except Exception as e:
         print(f"⚠ Error al parsear valor '{valor_str}': {e}")
         return None
+
+
+# Montos como los imprimen los extractos: "$ 1.234,56" o "-$ 1.234,56". Exigir
+# el "$" evita tomar fechas ("30/06/2024") o números de cuenta como saldo.
+_PATRON_MONTO = re.compile(r'-?\$\s*\d[\d.]*(?:,\d+)?')
+_ETIQUETAS_SALDO = {
+    'saldo_inicial': re.compile(r'\bsaldo\s+(?:anterior|inicial)\b', re.IGNORECASE),
+    'saldo_final': re.compile(r'\bsaldo\s+(?:actual|final)\b', re.IGNORECASE),
+}
+# Columnas del cuadro resumen ("SALDO ANTERIOR  TOTAL ABONOS  TOTAL CARGOS  SALDO ACTUAL")
+_PATRON_COLUMNA = re.compile(r'\b(?:saldo|total)\s+\w+', re.IGNORECASE)
+
+
+def _monto_de_etiqueta(lineas: List[str], i: int, etiqueta: re.Match) -> Optional[Decimal]:
+    """
+    Monto que corresponde a la etiqueta encontrada en lineas[i]:
+    - En línea: "Saldo final del periodo 30/06/2024 $ 5.000,00" -> primer monto
+      después de la etiqueta en la misma línea.
+    - En cuadro: encabezado sin montos y en la línea siguiente un monto por
+      columna -> el monto de la columna de la etiqueta. Si el número de
+      columnas y de montos no coincide no se adivina.
+    """
+    linea = lineas[i]
+    monto = _PATRON_MONTO.search(linea, etiqueta.end())
+    if monto:
+        return parsear_valor(monto.group(0))
+
+    if _PATRON_MONTO.search(linea) or i + 1 >= len(lineas):
+        return None
+    columnas = [c.start() for c in _PATRON_COLUMNA.finditer(linea)]
+    montos = _PATRON_MONTO.findall(lineas[i + 1])
+    if etiqueta.start() not in columnas or len(columnas) != len(montos):
+        return None
+    return parsear_valor(montos[columnas.index(etiqueta.start())])
+
+
+def extraer_saldos(texto: str) -> Dict[str, Optional[Decimal]]:
+    """
+    Busca en el texto del extracto el saldo inicial ("Saldo anterior"/"Saldo inicial")
+    y el final ("Saldo actual"/"Saldo final"), impresos en línea o en el cuadro
+    resumen. Retorna None en los que no aparezcan.
+    """
+    saldos = {'saldo_inicial': None, 'saldo_final': None}
+    if not texto:
+        return saldos
+
+    lineas = [l.strip() for l in texto.split('\n') if l.strip()]
+    for i, linea in enumerate(lineas):
+        for campo, patron in _ETIQUETAS_SALDO.items():
+            if saldos[campo] is not None:
+                continue
+            etiqueta = patron.search(linea)
+            if etiqueta:
+                saldos[campo] = _monto_de_etiqueta(lineas, i, etiqueta)
+    return saldos
+
+
+def leer_saldos_pdf(file_obj: Any) -> Dict[str, Optional[Decimal]]:
+    """
+    Saldos inicial y final impresos en un extracto PDF. El inicial se toma de la
+    primera página que lo traiga y el final de la última.
+    """
+    saldos = {'saldo_inicial': None, 'saldo_final': None}
+    with pdfplumber.open(file_obj) as pdf:
+        for page in pdf.pages:
+            encontrados = extraer_saldos(page.extract_text() or '')
+            if saldos['saldo_inicial'] is None:
+                saldos['saldo_inicial'] = encontrados['saldo_inicial']
+            if encontrados['saldo_final'] is not None:
+                saldos['saldo_final'] = encontrados['saldo_final']
+    return saldos
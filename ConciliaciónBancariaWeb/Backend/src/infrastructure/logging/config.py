@@ -1,8 +1,97 @@
+import atexit
+import copy
+import json
 import logging
+import queue
+import random
 import sys
 import os
-from logging.handlers import RotatingFileHandler
-from typing import Optional
+from datetime import datetime
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from typing import Dict, Optional
+
+# Atributos estándar de LogRecord; el resto (extra=...) se incluye en el JSON
+_ATRIBUTOS_RECORD = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro, con los campos pasados en extra={...}."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entrada = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'modulo': record.module,
+            'funcion': record.funcName,
+            'linea': record.lineno,
+            'mensaje': record.getMessage(),
+        }
+        for clave, valor in vars(record).items():
+            if clave not in _ATRIBUTOS_RECORD and not clave.startswith('_'):
+                entrada[clave] = valor
+        if record.exc_info:
+            entrada['excepcion'] = self.formatException(record.exc_info)
+        return json.dumps(entrada, ensure_ascii=False, default=str)
+
+
+class FiltroMuestreo(logging.Filter):
+    """
+    Deja pasar solo una fracción de los registros de bajo nivel por módulo.
+
+    Pensado para líneas de alto volumen (p.ej. un logger.info por solicitud en
+    listar_movimientos). WARNING y superiores nunca se muestrean.
+
+    Args:
+        tasas: módulo -> fracción a conservar (0.0 a 1.0), p.ej. {'movimientos': 0.1}
+        nivel_maximo: nivel hasta el cual se aplica el muestreo (incluido)
+    """
+
+    def __init__(self, tasas: Dict[str, float], nivel_maximo: int = logging.INFO):
+        super().__init__()
+        self.tasas = tasas
+        self.nivel_maximo = nivel_maximo
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.nivel_maximo:
+            return True
+        tasa = self.tasas.get(record.module)
+        return tasa is None or random.random() < tasa
+
+
+class QueueHandlerConExcepcion(QueueHandler):
+    """
+    QueueHandler cuyo prepare() conserva exc_info y stack_info.
+
+    El prepare() estándar formatea el traceback dentro de msg y borra
+    exc_info, así que JsonFormatter no podría emitir el campo 'excepcion'.
+    Aquí solo se resuelven los argumentos del mensaje; el traceback lo formatea
+    el listener. La cola es en memoria: el registro no se serializa.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+
+def _leer_tasas_muestreo(valor: str) -> Dict[str, float]:
+    """'movimientos:0.1,procesador_archivos_service:0.5' -> {'movimientos': 0.1, ...}"""
+    tasas = {}
+    for parte in (valor or '').split(','):
+        if ':' not in parte:
+            continue
+        modulo, tasa = parte.split(':', 1)
+        try:
+            tasas[modulo.strip()] = min(1.0, max(0.0, float(tasa)))
+        except ValueError:
+            continue
+    return tasas
+
+
+# Listener que escribe en consola/archivos desde un hilo propio
+_listener: Optional[QueueListener] = None
 
 
 def setup_logger(
@@ -12,46 +101,58 @@ def setup_logger(
     """
     Configura un logger centralizado para la aplicación con
     soporte para diferentes entornos.
-    
+
+    El logger solo encola registros (QueueHandler); un QueueListener en un
+    hilo propio hace la E/S de consola y archivos, de modo que un logger.info
+    en un endpoint no escribe a disco en el hilo de la solicitud.
+
     Args:
         name: Nombre del logger
         level: Nivel de logging (DEBUG, INFO, WARNING, ERROR, CRITICAL)
                Si no se especifica, se lee de la variable de entorno LOG_LEVEL
                o se usa INFO por defecto.
+
+    Variables de entorno:
+        LOG_FORMAT: 'json' (por defecto) o 'text'
+        LOG_SAMPLING: tasas por módulo, p.ej. 'movimientos:0.1,clasificacion:0.25'
+        LOG_SAMPLING_LEVEL: nivel máximo muestreado (por defecto INFO)
     """
+    global _listener
     logger = logging.getLogger(name)
-    
+
     # Evitar duplicidad de manejadores si ya está configurado
     if logger.handlers:
         return logger
-    
+
     # Determinar nivel de logging
     if level is None:
         level = os.getenv('LOG_LEVEL', 'INFO').upper()
-    
+
     log_level = getattr(logging, level, logging.INFO)
     logger.setLevel(log_level)
-    
-    # Formato enriquecido de los logs
-    formatter = logging.Formatter(
-        '[%(asctime)s] %(levelname)-8s [%(name)s:%(funcName)s:%(lineno)d] %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
+
+    # Formato de los logs: JSON estructurado o texto enriquecido
+    if os.getenv('LOG_FORMAT', 'json').lower() == 'text':
+        formatter = logging.Formatter(
+            '[%(asctime)s] %(levelname)-8s [%(name)s:%(funcName)s:%(lineno)d] %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+    else:
+        formatter = JsonFormatter()
+
     # Manejador para consola (stdout)
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
     console_handler.setLevel(log_level)
-    logger.addHandler(console_handler)
-    
+
     # Manejador para archivo (con rotación)
     # Determinar directorio de logs según entorno
     environment = os.getenv('ENVIRONMENT', 'development')
     log_dir = os.getenv('LOG_DIR', 'logs')
-    
+
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
-    
+
     # Archivo de log principal
     file_handler = RotatingFileHandler(
         os.path.join(log_dir, f"backend_{environment}.log"),
@@ -61,8 +162,7 @@ def setup_logger(
     )
     file_handler.setFormatter(formatter)
     file_handler.setLevel(log_level)
-    logger.addHandler(file_handler)
-    
+
     # Archivo separado para errores
     error_handler = RotatingFileHandler(
         os.path.join(log_dir, f"errors_{environment}.log"),
@@ -72,12 +172,34 @@ def setup_logger(
     )
     error_handler.setFormatter(formatter)
     error_handler.setLevel(logging.ERROR)
-    logger.addHandler(error_handler)
-    
+
+    # Cola sin límite: encolar nunca bloquea al hilo que registra
+    cola = queue.SimpleQueue()
+    queue_handler = QueueHandlerConExcepcion(cola)
+
+    # Muestreo por módulo antes de encolar (lo descartado no cuesta formateo ni E/S)
+    tasas = _leer_tasas_muestreo(os.getenv('LOG_SAMPLING', ''))
+    if tasas:
+        nivel_muestreo = getattr(logging, os.getenv('LOG_SAMPLING_LEVEL', 'INFO').upper(), logging.INFO)
+        queue_handler.addFilter(FiltroMuestreo(tasas, nivel_muestreo))
+    logger.addHandler(queue_handler)
+
+    _listener = QueueListener(cola, console_handler, file_handler, error_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logger)
+
     logger.info(f"Logger initialized for environment: {environment}, level: {level}")
-    
+
     return logger
 
 
+def stop_logger():
+    """Vacía la cola y detiene el hilo de escritura. Debe llamarse al shutdown."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
 # Instancia global para importar fácilmente
 logger = setup_logger()
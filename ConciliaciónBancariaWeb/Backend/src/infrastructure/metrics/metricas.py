@@ -0,0 +1,229 @@
+"""
+Métricas de la aplicación en memoria con exposición en formato de texto de Prometheus.
+
+Registro mínimo (contadores, gauges e histogramas con etiquetas) seguro entre
+hilos: los endpoints síncronos de FastAPI corren en un threadpool.
+
+Uso:
+    from src.infrastructure.metrics.metricas import registro, instrumentar_repositorio
+
+    @instrumentar_repositorio
+    class PostgresXRepository(XRepository): ...
+
+    texto = registro.exportar()   # cuerpo de GET /metrics
+"""
+
+import functools
+import inspect
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+# Límites (en segundos) para latencias de HTTP y de consultas
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Límites (en bytes) para tamaños de respuesta
+BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _formatear_etiquetas(nombres: Tuple[str, ...], valores: Tuple, extra: str = '') -> str:
+    partes = [f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)]
+    if extra:
+        partes.append(extra)
+    return '{' + ','.join(partes) + '}' if partes else ''
+
+
+def _formatear_numero(valor: float) -> str:
+    if valor == float('inf'):
+        return '+Inf'
+    if float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+
+class _Metrica:
+    tipo = ''
+
+    def __init__(self, nombre: str, descripcion: str, etiquetas: Iterable[str] = ()):
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.etiquetas = tuple(etiquetas)
+        self._lock = threading.Lock()
+
+    def _clave(self, valores: dict) -> Tuple:
+        return tuple(valores.get(n, '') for n in self.etiquetas)
+
+    def exportar(self) -> str:
+        lineas = [f"# HELP {self.nombre} {self.descripcion}", f"# TYPE {self.nombre} {self.tipo}"]
+        lineas.extend(self._lineas())
+        return '\n'.join(lineas)
+
+    def _lineas(self):
+        raise NotImplementedError
+
+
+class Contador(_Metrica):
+    tipo = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._valores: Dict[Tuple, float] = {}
+
+    def incrementar(self, cantidad: float = 1, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + cantidad
+
+    def _lineas(self):
+        with self._lock:
+            valores = list(self._valores.items())
+        for clave, valor in valores:
+            yield f"{self.nombre}{_formatear_etiquetas(self.etiquetas, clave)} {_formatear_numero(valor)}"
+
+
+class Gauge(_Metrica):
+    tipo = 'gauge'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._valores: Dict[Tuple, float] = {}
+
+    def sumar(self, cantidad: float = 1, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + cantidad
+
+    def restar(self, cantidad: float = 1, **etiquetas):
+        self.sumar(-cantidad, **etiquetas)
+
+    def _lineas(self):
+        with self._lock:
+            valores = list(self._valores.items())
+        for clave, valor in valores:
+            yield f"{self.nombre}{_formatear_etiquetas(self.etiquetas, clave)} {_formatear_numero(valor)}"
+
+
+class Histograma(_Metrica):
+    tipo = 'histogram'
+
+    def __init__(self, nombre: str, descripcion: str, etiquetas: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = BUCKETS_SEGUNDOS):
+        super().__init__(nombre, descripcion, etiquetas)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        # clave -> [conteos por bucket (no acumulados), suma, total]
+        self._series: Dict[Tuple, list] = {}
+
+    def observar(self, valor: float, **etiquetas):
+        clave = self._clave(etiquetas)
+        indice = next(i for i, limite in enumerate(self.buckets) if valor <= limite)
+        with self._lock:
+            serie = self._series.get(clave)
+            if serie is None:
+                serie = self._series[clave] = [[0] * len(self.buckets), 0.0, 0]
+            serie[0][indice] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def _lineas(self):
+        with self._lock:
+            series = [(clave, list(s[0]), s[1], s[2]) for clave, s in self._series.items()]
+        for clave, conteos, suma, total in series:
+            acumulado = 0
+            for limite, conteo in zip(self.buckets, conteos):
+                acumulado += conteo
+                le = f'le="{_formatear_numero(limite)}"'
+                yield f"{self.nombre}_bucket{_formatear_etiquetas(self.etiquetas, clave, le)} {acumulado}"
+            etiquetas = _formatear_etiquetas(self.etiquetas, clave)
+            yield f"{self.nombre}_sum{etiquetas} {_formatear_numero(suma)}"
+            yield f"{self.nombre}_count{etiquetas} {total}"
+
+
+class RegistroMetricas:
+    """Conjunto de métricas de la aplicación."""
+
+    def __init__(self):
+        self._metricas: Dict[str, _Metrica] = {}
+        self._lock = threading.Lock()
+
+    def _registrar(self, metrica: _Metrica) -> _Metrica:
+        with self._lock:
+            existente = self._metricas.get(metrica.nombre)
+            if existente is not None:
+                return existente
+            self._metricas[metrica.nombre] = metrica
+            return metrica
+
+    def contador(self, nombre: str, descripcion: str, etiquetas: Iterable[str] = ()) -> Contador:
+        return self._registrar(Contador(nombre, descripcion, etiquetas))
+
+    def gauge(self, nombre: str, descripcion: str, etiquetas: Iterable[str] = ()) -> Gauge:
+        return self._registrar(Gauge(nombre, descripcion, etiquetas))
+
+    def histograma(self, nombre: str, descripcion: str, etiquetas: Iterable[str] = (),
+                   buckets: Tuple[float, ...] = BUCKETS_SEGUNDOS) -> Histograma:
+        return self._registrar(Histograma(nombre, descripcion, etiquetas, buckets))
+
+    def exportar(self) -> str:
+        """Todas las métricas en formato de texto de Prometheus (versión 0.0.4)."""
+        with self._lock:
+            metricas = list(self._metricas.values())
+        return '\n'.join(m.exportar() for m in metricas) + '\n'
+
+
+# Instancia global para importar fácilmente
+registro = RegistroMetricas()
+
+# HTTP
+http_solicitudes = registro.contador(
+    'http_solicitudes_total', 'Solicitudes HTTP atendidas', ('metodo', 'ruta', 'estado'))
+http_duracion = registro.histograma(
+    'http_solicitud_duracion_segundos', 'Latencia de las solicitudes HTTP', ('metodo', 'ruta'))
+http_en_curso = registro.gauge(
+    'http_solicitudes_en_curso', 'Solicitudes HTTP en proceso', ('metodo',))
+http_respuesta_bytes = registro.histograma(
+    'http_respuesta_tamano_bytes', 'Tamaño del cuerpo de las respuestas HTTP', ('metodo', 'ruta'),
+    buckets=BUCKETS_BYTES)
+
+# Repositorios
+repositorio_duracion = registro.histograma(
+    'repositorio_consulta_duracion_segundos', 'Duración de los métodos de repositorio',
+    ('repositorio', 'metodo'))
+repositorio_errores = registro.contador(
+    'repositorio_consulta_errores_total', 'Métodos de repositorio que terminaron con excepción',
+    ('repositorio', 'metodo'))
+
+
+def _medir_metodo(repositorio: str, nombre: str, metodo):
+    @functools.wraps(metodo)
+    def envoltura(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return metodo(*args, **kwargs)
+        except Exception:
+            repositorio_errores.incrementar(repositorio=repositorio, metodo=nombre)
+            raise
+        finally:
+            repositorio_duracion.observar(time.perf_counter() - inicio, repositorio=repositorio, metodo=nombre)
+    return envoltura
+
+
+def instrumentar_repositorio(cls=None, *, nombre: Optional[str] = None):
+    """
+    Decorador de clase: mide conteo y duración de cada método público del repositorio.
+
+    Los métodos privados (_construir_filtros, _row_to_movimiento...) no se miden;
+    su costo queda incluido en el método público que los llama.
+    """
+    def decorar(clase):
+        repositorio = nombre or clase.__name__
+        for atributo, valor in list(vars(clase).items()):
+            if atributo.startswith('_') or not inspect.isfunction(valor):
+                continue
+            setattr(clase, atributo, _medir_metodo(repositorio, atributo, valor))
+        return clase
+
+    return decorar(cls) if cls is not None else decorar
@@ -16,3 +16,71 @@ def test_obtener_catalogos(client):
     assert "conceptos" in data
     # Verificar que al menos devuelva listas
     assert isinstance(data["cuentas"], list)
+
+def test_metrics(client):
+    """Verifica que /metrics exponga las métricas por ruta en formato Prometheus"""
+    client.get("/")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_solicitudes_total{metodo="GET",ruta="/",estado="200"}' in response.text
+
+def test_sync_incremental(client):
+    """Verifica que /api/sync avance la versión y no repita lo ya sincronizado"""
+    response = client.get("/api/sync", params={"since": 0, "limite": 1})
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data) == {"version", "hay_mas", "cambios", "eliminados"}
+    assert "movimientos" in data["cambios"] and "movimientos" in data["eliminados"]
+
+    siguiente = client.get("/api/sync", params={"since": data["version"], "limite": 1}).json()
+    assert siguiente["version"] >= data["version"]
+    ids_previos = {m["id"] for m in data["cambios"]["movimientos"]}
+    assert not ids_previos & {m["id"] for m in siguiente["cambios"]["movimientos"]}
+
+def test_conciliar_pagos_tarjeta(client):
+    """Verifica que la conciliación de pagos de tarjeta solo proponga pares dentro de las tolerancias"""
+    response = client.post("/api/conciliacion/pagos-tarjeta", json={
+        "cuenta_tarjeta_id": 1, "cuenta_ahorros_id": 2,
+        "desde": "2024-01-01", "hasta": "2024-12-31",
+        "tolerancia_valor": 1, "tolerancia_dias": 5
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert data["guardados"] == 0
+    for v in data["vinculos"]:
+        assert v["tarjeta"]["valor"] > 0 and v["ahorros"]["valor"] < 0
+        assert abs(v["diferencia_valor"]) <= 1
+        assert abs(v["diferencia_dias"]) <= 5
+
+def test_saldo_por_fecha(client):
+    """Verifica que el saldo al último día de cada mes coincida con su cierre mensual"""
+    import calendar
+    mensuales = client.get("/api/saldos/1/mensuales", params={"hasta": "2024-12-31"})
+    assert mensuales.status_code == 200
+    for cierre in mensuales.json()[-3:]:
+        anio, mes = int(cierre["mes"][:4]), int(cierre["mes"][5:7])
+        fin_mes = f"{anio:04d}-{mes:02d}-{calendar.monthrange(anio, mes)[1]:02d}"
+        saldo = client.get("/api/saldos/1", params={"fecha": fin_mes}).json()["saldo"]
+        assert abs(saldo - cierre["saldo_cierre"]) < 0.01
+
+def test_trm_rango(client):
+    """Verifica que el rango de TRM devuelva un día por fecha, con la tasa del día o de uno anterior"""
+    response = client.get("/api/trm/rango", params={"desde": "2024-01-01", "hasta": "2024-01-07"})
+    assert response.status_code == 200
+    dias = response.json()
+    assert len(dias) == 7
+    for dia in dias:
+        if dia["fecha_tasa"] is not None:
+            assert dia["fecha_tasa"] <= dia["fecha"]
+            assert dia["valor"] > 0
+
+def test_sugerencias_modelo(client):
+    """Verifica que el modelo de texto solo sugiera pendientes por encima del umbral"""
+    response = client.get("/api/clasificacion/sugerencias-modelo", params={"umbral": 0.8})
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["sugerencias"]) <= data["total_pendientes"]
+    for s in data["sugerencias"]:
+        assert s["probabilidad"] >= 0.8
+        assert s["grupo_id"] is not None and s["concepto_id"] is not None
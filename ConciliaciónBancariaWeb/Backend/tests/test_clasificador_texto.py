@@ -0,0 +1,115 @@
+from datetime import date
+
+from src.application.services import clasificador_texto
+from src.application.services.clasificacion_service import ClasificacionService
+from src.application.services.clasificador_texto import ClasificadorTexto
+from src.domain.models.movimiento import Movimiento
+
+EXITO = (1, 10)
+EPM = (2, 20)
+
+
+def _mov(id, descripcion, valor, etiqueta=(None, None), cuenta_id=2, referencia=""):
+    return Movimiento(moneda_id=1, cuenta_id=cuenta_id, fecha=date(2024, 1, 1), valor=valor,
+                      descripcion=descripcion, id=id, referencia=referencia,
+                      grupo_id=etiqueta[0], concepto_id=etiqueta[1])
+
+
+def _entrenado():
+    """30 compras en Éxito y 5 pagos a EPM, como en la revisión del modelo."""
+    modelo = ClasificadorTexto()
+    for i in range(30):
+        modelo.aprender(_mov(i + 1, f"COMPRA EXITO SUCURSAL {i}", -120000, EXITO))
+    for i in range(5):
+        modelo.aprender(_mov(100 + i, "PAGO EPM SERVICIOS", -250000, EPM))
+    return modelo
+
+
+class _RepoFalso:
+    def __init__(self):
+        self.cambios = []
+
+    def obtener_etiquetados_desde(self, version, limite):
+        return [c for c in self.cambios if c[0] > version][:limite]
+
+
+def test_predecir_clase_por_descripcion():
+    """Verifica que la descripción decida la clase y aporte evidencia textual"""
+    modelo = _entrenado()
+    exito, epm = modelo.predecir([
+        _mov(None, "COMPRA EXITO ENVIGADO", -95000),
+        _mov(None, "PAGO EPM HOGAR", -130000),
+    ])
+    assert (exito.grupo_id, exito.concepto_id) == EXITO
+    assert (epm.grupo_id, epm.concepto_id) == EPM
+    assert epm.evidencia_texto >= 2
+    assert epm.ejemplos_clase == 5
+
+
+def test_descripcion_desconocida_no_se_guarda_sin_revision():
+    """Verifica que una descripción nunca vista no pase el filtro de auto-clasificar"""
+    modelo = _entrenado()
+    prediccion = modelo.predecir([_mov(None, "TRANSFERENCIA NEQUI JUAN PEREZ", -120000)])[0]
+    assert prediccion.evidencia_texto == 0
+    assert not ClasificacionService._prediccion_confiable(prediccion)
+
+
+def test_olvidar_excluye_clases_vacias():
+    """Verifica que una clase sin ejemplos no pueda ganar y que olvidar sea exacto"""
+    modelo = _entrenado()
+    for i in range(5):
+        modelo.olvidar(100 + i)
+    modelo.olvidar(999)  # Desconocido: no hace nada
+    assert modelo.total_ejemplos == 30
+
+    prediccion = modelo.predecir([_mov(None, "PAGO EPM SERVICIOS", -250000)])[0]
+    assert (prediccion.grupo_id, prediccion.concepto_id) == EXITO
+    # La clase restante gana, pero sin evidencia textual
+    assert prediccion.evidencia_texto == 0
+    assert not ClasificacionService._prediccion_confiable(prediccion)
+
+
+def test_aprender_reemplaza_clasificacion_anterior():
+    """Verifica que reclasificar un movimiento lo mueva de clase sin duplicarlo"""
+    modelo = _entrenado()
+    modelo.aprender(_mov(1, "COMPRA EXITO SUCURSAL 0", -120000, EPM))
+    assert modelo.total_ejemplos == 35
+    prediccion = modelo.predecir([_mov(None, "PAGO EPM", -250000)])[0]
+    assert prediccion.ejemplos_clase == 6
+
+
+def test_sincronizar_incremental():
+    """Verifica que sincronizar aprenda, olvide y avance la versión"""
+    repo = _RepoFalso()
+    repo.cambios = [
+        (1, True, _mov(1, "PAGO EPM", -250000, EPM)),
+        (2, True, _mov(2, "COMPRA EXITO", -90000, EXITO)),
+        (3, True, _mov(3, "SIN GRUPO", -1000, (None, None))),
+    ]
+    modelo = ClasificadorTexto()
+    assert modelo.sincronizar(repo) == 3
+    assert modelo.version == 3
+    assert modelo.total_ejemplos == 2
+
+    # El 1 vuelve a pendiente: solo llega ese cambio
+    repo.cambios.append((4, False, _mov(1, "PAGO EPM", -250000)))
+    assert modelo.sincronizar(repo) == 1
+    assert modelo.version == 4
+    assert modelo.total_ejemplos == 1
+    assert modelo.sincronizar(repo) == 0
+
+
+def test_predecir_lote_en_bloques_conserva_orden(monkeypatch):
+    """Verifica que puntuar por bloques devuelva una predicción por movimiento, en orden"""
+    monkeypatch.setattr(clasificador_texto, 'TAMANO_LOTE', 3)
+    modelo = _entrenado()
+    lote = [_mov(None, "PAGO EPM" if i % 2 else "COMPRA EXITO", -100000) for i in range(10)]
+    predicciones = modelo.predecir(lote)
+    assert len(predicciones) == 10
+    for i, prediccion in enumerate(predicciones):
+        assert (prediccion.grupo_id, prediccion.concepto_id) == (EPM if i % 2 else EXITO)
+
+
+def test_modelo_vacio():
+    """Verifica que sin ejemplos no haya predicciones"""
+    assert ClasificadorTexto().predecir([_mov(None, "PAGO EPM", -1)]) == [None]
@@ -26,3 +26,91 @@ def test_grupos_excluidos(client):
     response_con_exclusion = client.get("/api/movimientos?grupos_excluidos=46")
     assert response_con_exclusion.status_code == 200
 
+
+def test_listar_movimientos_formato_columnas(client):
+    """Verifica la forma columnar: un arreglo por campo, todos del mismo largo"""
+    response = client.get("/api/movimientos?desde=2024-01-01&hasta=2024-01-31&formato=columnas")
+    assert response.status_code == 200
+    columnas = response.json()["items"]
+    assert "fecha" in columnas and "valor" in columnas
+    assert len({len(valores) for valores in columnas.values()}) == 1
+
+def test_listar_movimientos_fields(client):
+    """Verifica que fields= limite los campos devueltos y rechace campos inexistentes"""
+    response = client.get("/api/movimientos?desde=2024-01-01&hasta=2024-01-31&fields=fecha,valor")
+    assert response.status_code == 200
+    for item in response.json()["items"]:
+        assert set(item) == {"fecha", "valor"}
+
+    response = client.get("/api/movimientos?fields=fecha,no_existe")
+    assert response.status_code == 400
+
+def test_reporte_etag_304(client):
+    """Verifica que un reporte repetido con If-None-Match responda 304"""
+    params = {"desde": "2024-01-01", "hasta": "2024-12-31"}
+    response = client.get("/api/movimientos/reporte/ingresos-gastos-mes", params=params)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    revalidacion = client.get("/api/movimientos/reporte/ingresos-gastos-mes", params=params,
+                              headers={"If-None-Match": etag})
+    assert revalidacion.status_code == 304
+
+def test_contar_pendientes(client):
+    """Verifica que el conteo de pendientes coincida con la cola de clasificación"""
+    response = client.get("/api/movimientos/pendientes/count")
+    assert response.status_code == 200
+    total = response.json()["total"]
+    assert total == len(client.get("/api/movimientos/pendientes?fields=id").json())
+
+def test_buscar_texto(client):
+    """Verifica la búsqueda de texto paginada y que los símbolos no rompan la consulta"""
+    response = client.get("/api/movimientos/buscar", params={"q": "pag", "page_size": 5})
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["items"]) <= 5
+    assert data["total_pages"] == (data["total"] + 4) // 5
+
+    response = client.get("/api/movimientos/buscar", params={"q": "&|!:*"})
+    assert response.status_code == 200
+    assert response.json()["total"] == 0
+
+def test_preview_lote(client):
+    """Verifica que el preview de lote devuelva el total y solo la primera página"""
+    response = client.post("/api/clasificacion/preview-lote", json={"patron": "pago", "limite": 3})
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["items"]) <= 3
+    assert data["total"] >= len(data["items"])
+
+def test_proponer_traslados(client):
+    """Verifica que los traslados propuestos crucen cuentas distintas con valores opuestos"""
+    response = client.get("/api/movimientos/traslados/propuestos",
+                          params={"desde": "2024-01-01", "hasta": "2024-12-31", "dias": 3})
+    assert response.status_code == 200
+    for par in response.json():
+        assert par["egreso"]["cuenta_id"] != par["ingreso"]["cuenta_id"]
+        assert par["egreso"]["valor"] == -par["ingreso"]["valor"]
+        assert par["dias"] <= 3
+
+def test_emparejar_traslados_fifo_y_anclas():
+    """Verifica que pagos repetidos se emparejen en orden y que las anclas filtren"""
+    from datetime import date
+    from decimal import Decimal
+    from src.application.services.emparejador_traslados_service import emparejar_traslados
+    from src.domain.models.movimiento import Movimiento
+
+    def mov(id, cuenta_id, dia, valor):
+        return Movimiento(moneda_id=1, cuenta_id=cuenta_id, fecha=date(2024, 3, dia),
+                          valor=Decimal(valor), descripcion="Traslado", id=id)
+
+    movs = [
+        mov(1, 1, 1, -500), mov(2, 1, 2, -500), mov(3, 1, 2, 500),  # Misma cuenta: no se cruzan
+        mov(4, 2, 3, 500), mov(5, 2, 4, 500),
+        mov(6, 3, 20, 500),  # Fuera de la ventana
+    ]
+    pares = [(p.egreso.id, p.ingreso.id) for p in emparejar_traslados(movs, dias_ventana=3)]
+    assert pares == [(1, 4), (2, 5)]
+
+    pares = [(p.egreso.id, p.ingreso.id) for p in emparejar_traslados(movs, dias_ventana=3, anclas={5})]
+    assert pares == [(1, 5)]
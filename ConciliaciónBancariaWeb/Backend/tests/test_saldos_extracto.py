@@ -0,0 +1,96 @@
+import io
+from datetime import date
+from decimal import Decimal
+
+from src.application.services import procesador_archivos_service
+from src.application.services.procesador_archivos_service import ProcesadorArchivosService
+from src.infrastructure.extractors.utils import extraer_saldos
+
+# Textos como los entrega pdfplumber (page.extract_text) para cada formato
+
+CUADRO_RESUMEN = """\
+EXTRACTO CUENTA DE AHORROS
+DESDE: 2024/06/01 HASTA: 2024/06/30
+SALDO ANTERIOR TOTAL ABONOS TOTAL CARGOS SALDO ACTUAL
+$ 1.000,00 $ 500,00 $ 200,00 $ 1.300,00
+FECHA DESCRIPCIÓN SUCURSAL DCTO. VALOR SALDO
+03 jun 2024 ABONO INTERESES AHORROS $ 500,00 $ 1.500,00
+"""
+
+EN_LINEA_CON_FECHA = """\
+Saldo inicial del periodo 01/06/2024 $ 4.200,00
+14 jun 2024 PAGO PSE EPM 123456789 -$ 200,00
+Saldo final del periodo 30/06/2024 $ 5.000,00
+"""
+
+SALDO_NEGATIVO = "Saldo anterior: -$ 1.250,50\nSaldo actual: $ 0,00\n"
+
+
+def test_saldos_en_cuadro_resumen():
+    """Verifica que en el cuadro resumen cada saldo tome el monto de su columna"""
+    saldos = extraer_saldos(CUADRO_RESUMEN)
+    assert saldos['saldo_inicial'] == Decimal('1000.00')
+    assert saldos['saldo_final'] == Decimal('1300.00')
+
+
+def test_saldos_en_linea_ignoran_fechas():
+    """Verifica que la fecha del periodo no se tome como saldo"""
+    saldos = extraer_saldos(EN_LINEA_CON_FECHA)
+    assert saldos['saldo_inicial'] == Decimal('4200.00')
+    assert saldos['saldo_final'] == Decimal('5000.00')
+
+
+def test_saldo_negativo_y_cero():
+    saldos = extraer_saldos(SALDO_NEGATIVO)
+    assert saldos['saldo_inicial'] == Decimal('-1250.50')
+    assert saldos['saldo_final'] == Decimal('0.00')
+
+
+def test_cuadro_sin_montos_completos_no_adivina():
+    """Verifica que si faltan montos en el cuadro no se asigne uno de otra columna"""
+    texto = "SALDO ANTERIOR TOTAL ABONOS TOTAL CARGOS SALDO ACTUAL\n$ 1.000,00 $ 1.300,00\n"
+    assert extraer_saldos(texto) == {'saldo_inicial': None, 'saldo_final': None}
+
+
+def test_texto_sin_saldos():
+    assert extraer_saldos("") == {'saldo_inicial': None, 'saldo_final': None}
+    assert extraer_saldos("03 jun 2024 ABONO $ 500,00") == {'saldo_inicial': None, 'saldo_final': None}
+
+
+class _SaldosFalsos:
+    """Ledger en BD que arranca en cero (como saldos_mensuales) con historia previa al extracto."""
+
+    def __init__(self, movimientos):
+        self.movimientos = movimientos
+
+    def obtener_saldo(self, cuenta_id, fecha):
+        return sum((v for f, v in self.movimientos if f <= fecha), Decimal('0'))
+
+
+def test_cuadra_bd_compara_el_periodo(monkeypatch):
+    """Verifica que el saldo en BD se ancle al saldo inicial del PDF y no a la suma desde cero"""
+    monkeypatch.setattr(procesador_archivos_service, 'leer_saldos_pdf',
+                        lambda f: extraer_saldos(CUADRO_RESUMEN))
+    repo = _SaldosFalsos([
+        (date(2024, 5, 10), Decimal('-750.00')),  # Historia previa: el ledger no vale 1.000
+        (date(2024, 6, 3), Decimal('500.00')),
+        (date(2024, 6, 20), Decimal('-200.00')),
+        (date(2024, 7, 2), Decimal('999.00')),  # Posterior al extracto
+    ])
+    servicio = ProcesadorArchivosService(None, None, None, saldo_repo=repo)
+    raw_movs = [
+        {'fecha': '2024-06-03', 'valor': Decimal('500.00')},
+        {'fecha': '2024-06-20', 'valor': Decimal('-200.00')},
+    ]
+
+    verificacion = servicio._verificar_saldos(io.BytesIO(b''), 'bancolombia_ahorro', raw_movs, cuenta_id=1)
+    assert verificacion['cuadra_extracto']
+    assert verificacion['neto_bd'] == 300.0
+    assert verificacion['saldo_bd'] == 1300.0
+    assert verificacion['cuadra_bd']
+
+    # Falta un movimiento en BD: ya no cuadra
+    repo.movimientos.pop(2)
+    verificacion = servicio._verificar_saldos(io.BytesIO(b''), 'bancolombia_ahorro', raw_movs, cuenta_id=1)
+    assert verificacion['diferencia_bd'] == -200.0
+    assert not verificacion['cuadra_bd']
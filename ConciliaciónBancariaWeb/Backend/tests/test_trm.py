@@ -0,0 +1,30 @@
+from datetime import date
+from decimal import Decimal
+
+from src.application.services.trm_service import leer_csv_trm
+
+
+def test_leer_csv_trm_formatos_y_repetidas():
+    """Verifica separadores de miles/decimales y que una fecha repetida quede una vez"""
+    contenido = (
+        "VALOR;UNIDAD;VIGENCIADESDE;VIGENCIAHASTA\n"
+        "4.123,45;COP;2024-01-02;2024-01-02\n"
+        "4.130;COP;03/01/2024;03/01/2024\n"
+        "4100.5;COP;2024-01-04;2024-01-04\n"
+        "4105,25;COP;2024-01-04;2024-01-04\n"
+    )
+    tasas, descartadas = leer_csv_trm(contenido)
+    assert descartadas == 0
+    assert tasas == [
+        (date(2024, 1, 2), Decimal('4123.45')),
+        (date(2024, 1, 3), Decimal('4130')),
+        (date(2024, 1, 4), Decimal('4105.25')),
+    ]
+
+
+def test_leer_csv_trm_descarta_tasas_imposibles():
+    """Verifica que un valor 1000 veces menor (formato mal leído) no se guarde"""
+    contenido = "fecha,valor\n2024-01-02,4.12\n2024-01-03,0\n2024-01-04,abc\n2024-01-05,3950.10\n"
+    tasas, descartadas = leer_csv_trm(contenido)
+    assert descartadas == 3
+    assert tasas == [(date(2024, 1, 5), Decimal('3950.10'))]
@@ -28,6 +28,7 @@ export const ClasificarMovimientosPage: React.FC = () => {
     // Batch Lote Modal
     const [showBatchModal, setShowBatchModal] = useState(false)
     const [batchPreview, setBatchPreview] = useState<Movimiento[]>([])
+    const [batchTotal, setBatchTotal] = useState(0)
     const [batchPatron, setBatchPatron] = useState('')
     const [loadingBatch, setLoadingBatch] = useState(false)
 
@@ -143,8 +144,9 @@ export const ClasificarMovimientosPage: React.FC = () => {
         setLoadingBatch(true)
 
         try {
-            const preview = await apiService.clasificacion.previewLote(patronDefault) as Movimiento[]
-            setBatchPreview(preview)
+            const preview = await apiService.clasificacion.previewLote(patronDefault)
+            setBatchPreview(preview.items)
+            setBatchTotal(preview.total)
             setShowBatchModal(true)
         } catch (error) {
             console.error("Error obteniendo preview:", error)
@@ -168,6 +170,7 @@ export const ClasificarMovimientosPage: React.FC = () => {
             alert(res.mensaje)
             setShowBatchModal(false)
             setBatchPreview([])
+            setBatchTotal(0)
             // Recargar todo
             cargarDatosIniciales()
             setMovimientoActual(null)
@@ -499,7 +502,7 @@ export const ClasificarMovimientosPage: React.FC = () => {
 
                             <div className="border rounded-lg overflow-hidden">
                                 <div className="bg-gray-100 px-4 py-2 font-medium text-sm text-gray-600">
-                                    Movimientos a clasificar ({batchPreview.length})
+                                    Movimientos a clasificar ({batchTotal}{batchTotal > batchPreview.length ? `, mostrando ${batchPreview.length}` : ''})
                                 </div>
                                 <table className="w-full text-sm">
                                     <thead>
@@ -539,6 +542,7 @@ export const ClasificarMovimientosPage: React.FC = () => {
                                 onClick={() => {
                                     setShowBatchModal(false)
                                     setBatchPreview([])
+                                    setBatchTotal(0)
                                 }}
                                 className="px-6 py-2 rounded-lg border border-gray-300 text-gray-700 hover:bg-gray-100 transition"
                             >
@@ -546,11 +550,11 @@ export const ClasificarMovimientosPage: React.FC = () => {
                             </button>
                             <button
                                 onClick={confirmarLote}
-                                disabled={batchPreview.length === 0}
+                                disabled={batchTotal === 0}
                                 className="px-6 py-2 rounded-lg bg-purple-600 text-white hover:bg-purple-700 transition disabled:opacity-50 flex items-center gap-2"
                             >
                                 <CheckCircle className="h-5 w-5" />
-                                Aplicar a {batchPreview.length} Movimientos
+                                Aplicar a {batchTotal} Movimientos
                             </button>
                         </div>
                     </div>
@@ -36,7 +36,7 @@ export const UploadMovimientosPage: React.FC = () => {
 
     const handleAnalizar = async (e: React.FormEvent) => {
         e.preventDefault()
-        if (!file) return
+        if (!file || !cuentaId) return
 
         setLoading(true)
         setError(null)
@@ -45,7 +45,7 @@ export const UploadMovimientosPage: React.FC = () => {
         setMovimientosPreview([])
 
         try {
-            const data = await apiService.archivos.analizar(file, tipoCuenta)
+            const data = await apiService.archivos.analizar(file, tipoCuenta, cuentaId)
             setStats(data.estadisticas)
             setMovimientosPreview(data.movimientos)
             setAnalyzed(true)
@@ -150,7 +150,7 @@ export const UploadMovimientosPage: React.FC = () => {
                     {!analyzed && !result && (
                         <button
                             type="submit"
-                            disabled={loading || !file}
+                            disabled={loading || !file || !cuentaId}
                             className={`w-full py-3 px-4 rounded-lg font-medium text-white shadow-sm transition-colors
                                 ${loading || !file
                                     ? 'bg-gray-400 cursor-not-allowed'
@@ -16,10 +16,11 @@ export const archivosService = {
         }).then(handleResponse)
     },
 
-    analizar: (file: File, tipo_cuenta: string): Promise<any> => {
+    analizar: (file: File, tipo_cuenta: string, cuenta_id: number): Promise<any> => {
         const formData = new FormData()
         formData.append('file', file)
         formData.append('tipo_cuenta', tipo_cuenta)
+        formData.append('cuenta_id', cuenta_id.toString())
 
         return fetch(`${API_BASE_URL}/api/archivos/analizar`, {
             method: 'POST',
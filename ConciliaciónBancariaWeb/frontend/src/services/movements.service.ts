@@ -30,6 +30,14 @@ export const movimientosService = {
     obtenerPendientes: (): Promise<Movimiento[]> =>
         fetch(`${API_BASE_URL}/api/movimientos/pendientes`).then(handleResponse),
 
+    contarPendientes: (): Promise<{ total: number }> =>
+        fetch(`${API_BASE_URL}/api/movimientos/pendientes/count`).then(handleResponse),
+
+    buscarTexto: (q: string, page = 1, pageSize = 50): Promise<PaginatedResponse<Movimiento>> => {
+        const params = new URLSearchParams({ q, page: String(page), page_size: String(pageSize) })
+        return fetch(`${API_BASE_URL}/api/movimientos/buscar?${params.toString()}`).then(handleResponse)
+    },
+
     obtenerPorId: (id: number): Promise<Movimiento> =>
         fetch(`${API_BASE_URL}/api/movimientos/${id}`).then(handleResponse),
 
@@ -141,7 +149,7 @@ export const clasificacionService = {
             body: JSON.stringify(dto)
         }).then(handleResponse),
 
-    previewLote: (patron: string): Promise<unknown[]> =>
+    previewLote: (patron: string): Promise<{ total: number; items: Movimiento[] }> =>
         fetch(`${API_BASE_URL}/api/clasificacion/preview-lote`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
@@ -0,0 +1,25 @@
+-- Script de migración: Búsqueda de texto completo en movimientos
+-- Fecha: 2026-10-19
+-- Descripción: Columna tsvector (configuración 'spanish') sobre Descripcion,
+-- Referencia y Detalle, con índice GIN, para GET /api/movimientos/buscar.
+-- Reemplaza los LIKE '%...%' de las búsquedas libres, que recorren toda la tabla.
+--
+-- Pesos: Descripcion (A) > Referencia (B) > Detalle (C), para que ts_rank_cd
+-- ordene primero las coincidencias en la descripción.
+-- Es una columna generada: Postgres la recalcula en cada INSERT/UPDATE.
+
+ALTER TABLE movimientos ADD COLUMN IF NOT EXISTS busqueda TSVECTOR
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('spanish', COALESCE(Descripcion, '')), 'A') ||
+        setweight(to_tsvector('spanish', COALESCE(Referencia, '')), 'B') ||
+        setweight(to_tsvector('spanish', COALESCE(Detalle, '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_movimientos_busqueda ON movimientos USING gin (busqueda);
+
+ANALYZE movimientos;
+
+-- Verificación
+SELECT COUNT(*) AS coincidencias
+FROM movimientos
+WHERE busqueda @@ to_tsquery('spanish', 'pago:*');
@@ -0,0 +1,69 @@
+-- Script de migración: Bandera "pendiente" mantenida por triggers
+-- Fecha: 2026-10-19
+-- Descripción: La cola de clasificación filtraba con un OR de condiciones
+-- (TerceroID/GrupoID/ConceptoID NULL o IN config_valores_pendientes) que obliga
+-- a recorrer toda la tabla. Ahora cada movimiento guarda si está pendiente y un
+-- índice parcial cubre solo esas filas, de modo que listar y contar la cola
+-- son búsquedas en el índice.
+--
+-- La bandera no puede ser columna generada porque depende de otra tabla: la
+-- mantienen dos triggers, uno sobre movimientos (al cambiar la clasificación)
+-- y otro sobre config_valores_pendientes (al cambiar qué IDs significan "pendiente").
+
+-- 1. Regla única de "pendiente"
+CREATE OR REPLACE FUNCTION fn_movimiento_es_pendiente(p_tercero INT, p_grupo INT, p_concepto INT)
+RETURNS BOOLEAN AS $$
+    SELECT p_tercero IS NULL OR p_grupo IS NULL OR p_concepto IS NULL
+        OR EXISTS (
+            SELECT 1 FROM config_valores_pendientes c
+            WHERE c.activo = TRUE
+              AND ((c.tipo = 'tercero' AND c.valor_id = p_tercero)
+                OR (c.tipo = 'grupo' AND c.valor_id = p_grupo)
+                OR (c.tipo = 'concepto' AND c.valor_id = p_concepto))
+        );
+$$ LANGUAGE sql STABLE;
+
+-- 2. Columna y carga inicial
+ALTER TABLE movimientos ADD COLUMN IF NOT EXISTS pendiente BOOLEAN NOT NULL DEFAULT TRUE;
+
+UPDATE movimientos
+SET pendiente = fn_movimiento_es_pendiente(TerceroID, GrupoID, ConceptoID)
+WHERE pendiente IS DISTINCT FROM fn_movimiento_es_pendiente(TerceroID, GrupoID, ConceptoID);
+
+-- 3. Trigger sobre movimientos
+CREATE OR REPLACE FUNCTION fn_movimientos_actualizar_pendiente() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.pendiente := fn_movimiento_es_pendiente(NEW.TerceroID, NEW.GrupoID, NEW.ConceptoID);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_movimientos_pendiente ON movimientos;
+CREATE TRIGGER trg_movimientos_pendiente
+    BEFORE INSERT OR UPDATE OF TerceroID, GrupoID, ConceptoID ON movimientos
+    FOR EACH ROW EXECUTE FUNCTION fn_movimientos_actualizar_pendiente();
+
+-- 4. Trigger sobre la configuración: recalcula solo las filas cuya bandera cambia
+CREATE OR REPLACE FUNCTION fn_config_pendientes_recalcular() RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE movimientos
+    SET pendiente = fn_movimiento_es_pendiente(TerceroID, GrupoID, ConceptoID)
+    WHERE pendiente IS DISTINCT FROM fn_movimiento_es_pendiente(TerceroID, GrupoID, ConceptoID);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_config_pendientes_recalcular ON config_valores_pendientes;
+CREATE TRIGGER trg_config_pendientes_recalcular
+    AFTER INSERT OR UPDATE OR DELETE ON config_valores_pendientes
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_config_pendientes_recalcular();
+
+-- 5. Índice parcial con el orden de la cola (ORDER BY Fecha DESC, ABS(Valor) DESC)
+CREATE INDEX IF NOT EXISTS idx_movimientos_pendientes
+    ON movimientos (Fecha DESC, (ABS(Valor)) DESC)
+    WHERE pendiente;
+
+ANALYZE movimientos;
+
+-- Verificación
+SELECT COUNT(*) AS pendientes FROM movimientos WHERE pendiente;
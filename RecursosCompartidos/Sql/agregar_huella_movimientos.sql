@@ -0,0 +1,126 @@
+-- Script de migración: Huella de movimiento para carga idempotente
+-- Fecha: 2026-10-19
+-- Descripción: La carga de extractos evitaba duplicados consultando
+-- existe_movimiento antes de cada INSERT (una o dos consultas por fila). Dos
+-- cargas simultáneas de extractos que se solapan podían pasar ambas la
+-- verificación e insertar dos veces. Ahora cada movimiento guarda una huella
+-- (cuenta, fecha, monto, descripción normalizada, referencia) con índice único
+-- y la carga hace INSERT ... ON CONFLICT (huella) DO NOTHING RETURNING.
+--
+-- Reglas de la huella (las mismas que aplicaba existe_movimiento):
+--   * Monto: USD si el movimiento es en dólares (Valor queda en 0 hasta aplicar
+--     TRM y luego cambia), si no Valor.
+--   * Descripción: minúsculas y espacios colapsados. Los extractos de tarjeta
+--     cambian la descripción entre un corte y otro, así que para ellos se omite
+--     (p_con_descripcion = FALSE). Las cuentas de tarjeta se registran en
+--     cuentas_tarjeta: la carga web (tipo 'credit_card') registra la cuenta al
+--     insertar, y la carga inicial y el trigger consultan la misma tabla, así
+--     que las tres calculan la misma huella.
+--
+-- La huella es la identidad del movimiento al cargarlo: no se recalcula si
+-- luego se edita la descripción o se aplica la TRM.
+
+-- 1. Función de huella
+CREATE OR REPLACE FUNCTION fn_huella_movimiento(
+    p_cuenta INT, p_fecha DATE, p_valor NUMERIC, p_usd NUMERIC,
+    p_descripcion TEXT, p_referencia TEXT, p_con_descripcion BOOLEAN DEFAULT TRUE
+) RETURNS TEXT AS $$
+    SELECT md5(concat_ws('|',
+        COALESCE(p_cuenta, 0),
+        p_fecha - DATE '2000-01-01',
+        CASE WHEN COALESCE(p_usd, 0) <> 0
+             THEN 'USD' || trim_scale(p_usd)::text
+             ELSE trim_scale(COALESCE(p_valor, 0))::text
+        END,
+        CASE WHEN p_con_descripcion
+             THEN lower(regexp_replace(btrim(COALESCE(p_descripcion, '')), '\s+', ' ', 'g'))
+             ELSE ''
+        END,
+        btrim(COALESCE(p_referencia, ''))
+    ));
+$$ LANGUAGE sql IMMUTABLE;
+
+-- 2. Cuentas de tarjeta (huella sin descripción). Semilla con la misma regla
+-- con la que la pantalla de carga infiere el tipo 'credit_card' a partir del
+-- nombre ('Mc Pesos', 'Mc Dolaras', 'Tarjeta Crédito ...'); revisar el
+-- resultado de la verificación y agregar a mano las que falten.
+CREATE TABLE IF NOT EXISTS cuentas_tarjeta (
+    cuentaid INT PRIMARY KEY REFERENCES cuentas(cuentaid)
+);
+
+INSERT INTO cuentas_tarjeta (cuentaid)
+SELECT cuentaid FROM cuentas
+WHERE cuenta ~* '\m(mc|tc)\M|tarjeta|credit|mastercard'
+ON CONFLICT DO NOTHING;
+
+CREATE OR REPLACE FUNCTION fn_huella_con_descripcion(p_cuenta INT) RETURNS BOOLEAN AS $$
+    SELECT NOT EXISTS (SELECT 1 FROM cuentas_tarjeta WHERE cuentaid = p_cuenta);
+$$ LANGUAGE sql STABLE;
+
+-- 3. Columna
+ALTER TABLE movimientos ADD COLUMN IF NOT EXISTS huella TEXT;
+
+-- 4. Corrección (re-ejecución): una versión anterior de este script calculó con
+-- descripción la huella de las cuentas de tarjeta llamadas 'Mc ...'. Se borran
+-- para que la carga inicial las recalcule sin descripción.
+UPDATE movimientos m
+SET huella = NULL
+WHERE m.huella IS NOT NULL
+  AND NOT fn_huella_con_descripcion(m.CuentaID)
+  AND m.huella = fn_huella_movimiento(m.CuentaID, m.Fecha, m.Valor, m.USD, m.Descripcion, m.Referencia, TRUE);
+
+-- 5. Carga inicial. Si ya hay duplicados, solo el más antiguo recibe la
+-- huella; los demás quedan en NULL (no chocan con el índice único) para que
+-- Verificar/buscar_duplicados.py los siga reportando.
+WITH calculadas AS (
+    SELECT m.Id,
+           fn_huella_movimiento(m.CuentaID, m.Fecha, m.Valor, m.USD, m.Descripcion, m.Referencia,
+                                fn_huella_con_descripcion(m.CuentaID)) AS huella
+    FROM movimientos m
+    WHERE m.huella IS NULL
+),
+primeras AS (
+    SELECT Id, huella,
+           ROW_NUMBER() OVER (PARTITION BY huella ORDER BY Id) AS n
+    FROM calculadas
+)
+UPDATE movimientos m
+SET huella = p.huella
+FROM primeras p
+WHERE m.Id = p.Id
+  AND p.n = 1
+  AND NOT EXISTS (SELECT 1 FROM movimientos o WHERE o.huella = p.huella);
+
+-- 6. Índice único
+CREATE UNIQUE INDEX IF NOT EXISTS uq_movimientos_huella ON movimientos (huella);
+
+-- 7. Los INSERT que no traen huella (creación manual, herramientas de
+-- escritorio) la reciben aquí, con la regla de descripción de la cuenta. Si ya existe un movimiento con esa huella el
+-- INSERT no falla: queda sin huella, como los duplicados históricos.
+CREATE OR REPLACE FUNCTION fn_movimientos_huella() RETURNS TRIGGER AS $$
+DECLARE
+    v_huella TEXT;
+BEGIN
+    IF NEW.huella IS NULL THEN
+        v_huella := fn_huella_movimiento(NEW.CuentaID, NEW.Fecha, NEW.Valor, NEW.USD,
+                                         NEW.Descripcion, NEW.Referencia,
+                                         fn_huella_con_descripcion(NEW.CuentaID));
+        IF NOT EXISTS (SELECT 1 FROM movimientos WHERE huella = v_huella) THEN
+            NEW.huella := v_huella;
+        END IF;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_movimientos_huella ON movimientos;
+CREATE TRIGGER trg_movimientos_huella
+    BEFORE INSERT ON movimientos
+    FOR EACH ROW EXECUTE FUNCTION fn_movimientos_huella();
+
+-- Verificación
+SELECT c.cuentaid, c.cuenta FROM cuentas_tarjeta t JOIN cuentas c ON c.cuentaid = t.cuentaid;
+
+SELECT COUNT(*) FILTER (WHERE huella IS NULL) AS sin_huella,
+       COUNT(*) AS total
+FROM movimientos;
@@ -0,0 +1,129 @@
+-- Script de migración: Versionado de filas para sincronización incremental
+-- Fecha: 2026-10-19
+-- Descripción: Agrega updated_at y row_version a movimientos y catálogos, y una
+-- tabla de borrados (sync_eliminados), para que GET /api/sync?since=<version>
+-- devuelva solo lo que cambió desde la última sincronización del cliente.
+--
+-- row_version sale de una única secuencia global: cualquier cambio en cualquier
+-- tabla recibe un número mayor que todos los anteriores, de modo que el cliente
+-- guarda un solo entero como marca de sincronización.
+
+CREATE SEQUENCE IF NOT EXISTS sync_version_seq;
+
+-- 1. Columnas de versionado
+ALTER TABLE movimientos ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+ALTER TABLE movimientos ADD COLUMN IF NOT EXISTS row_version BIGINT;
+ALTER TABLE cuentas ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+ALTER TABLE cuentas ADD COLUMN IF NOT EXISTS row_version BIGINT;
+ALTER TABLE monedas ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+ALTER TABLE monedas ADD COLUMN IF NOT EXISTS row_version BIGINT;
+ALTER TABLE terceros ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+ALTER TABLE terceros ADD COLUMN IF NOT EXISTS row_version BIGINT;
+ALTER TABLE grupos ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+ALTER TABLE grupos ADD COLUMN IF NOT EXISTS row_version BIGINT;
+ALTER TABLE conceptos ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+ALTER TABLE conceptos ADD COLUMN IF NOT EXISTS row_version BIGINT;
+ALTER TABLE tercero_descripciones ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+ALTER TABLE tercero_descripciones ADD COLUMN IF NOT EXISTS row_version BIGINT;
+
+-- 2. Versión inicial para las filas existentes
+UPDATE movimientos SET row_version = nextval('sync_version_seq') WHERE row_version IS NULL;
+UPDATE cuentas SET row_version = nextval('sync_version_seq') WHERE row_version IS NULL;
+UPDATE monedas SET row_version = nextval('sync_version_seq') WHERE row_version IS NULL;
+UPDATE terceros SET row_version = nextval('sync_version_seq') WHERE row_version IS NULL;
+UPDATE grupos SET row_version = nextval('sync_version_seq') WHERE row_version IS NULL;
+UPDATE conceptos SET row_version = nextval('sync_version_seq') WHERE row_version IS NULL;
+UPDATE tercero_descripciones SET row_version = nextval('sync_version_seq') WHERE row_version IS NULL;
+
+-- 3. Tabla de borrados físicos (los catálogos usan borrado lógico con activa = FALSE,
+--    que se sincroniza como un cambio más)
+CREATE TABLE IF NOT EXISTS sync_eliminados (
+    row_version BIGINT PRIMARY KEY DEFAULT nextval('sync_version_seq'),
+    tabla VARCHAR(50) NOT NULL,
+    registro_id BIGINT NOT NULL,
+    eliminado_en TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- 4. Triggers: toda inserción o actualización toma una versión nueva
+CREATE OR REPLACE FUNCTION fn_sync_versionar() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at := NOW();
+    NEW.row_version := nextval('sync_version_seq');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- TG_ARGV[0]: nombre de la columna de clave primaria de la tabla
+CREATE OR REPLACE FUNCTION fn_sync_registrar_eliminado() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO sync_eliminados (tabla, registro_id)
+    VALUES (TG_TABLE_NAME, (to_jsonb(OLD) ->> TG_ARGV[0])::BIGINT);
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_sync_versionar ON movimientos;
+CREATE TRIGGER trg_sync_versionar BEFORE INSERT OR UPDATE ON movimientos
+    FOR EACH ROW EXECUTE FUNCTION fn_sync_versionar();
+DROP TRIGGER IF EXISTS trg_sync_eliminado ON movimientos;
+CREATE TRIGGER trg_sync_eliminado AFTER DELETE ON movimientos
+    FOR EACH ROW EXECUTE FUNCTION fn_sync_registrar_eliminado('id');
+
+DROP TRIGGER IF EXISTS trg_sync_versionar ON cuentas;
+CREATE TRIGGER trg_sync_versionar BEFORE INSERT OR UPDATE ON cuentas
+    FOR EACH ROW EXECUTE FUNCTION fn_sync_versionar();
+DROP TRIGGER IF EXISTS trg_sync_eliminado ON cuentas;
+CREATE TRIGGER trg_sync_eliminado AFTER DELETE ON cuentas
+    FOR EACH ROW EXECUTE FUNCTION fn_sync_registrar_eliminado('cuentaid');
+
+DROP TRIGGER IF EXISTS trg_sync_versionar ON monedas;
+CREATE TRIGGER trg_sync_versionar BEFORE INSERT OR UPDATE ON monedas
+    FOR EACH ROW EXECUTE FUNCTION fn_sync_versionar();
+DROP TRIGGER IF EXISTS trg_sync_eliminado ON monedas;
+CREATE TRIGGER trg_sync_eliminado AFTER DELETE ON monedas
+    FOR EACH ROW EXECUTE FUNCTION fn_sync_registrar_eliminado('monedaid');
+
+DROP TRIGGER IF EXISTS trg_sync_versionar ON terceros;
+CREATE TRIGGER trg_sync_versionar BEFORE INSERT OR UPDATE ON terceros
+    FOR EACH ROW EXECUTE FUNCTION fn_sync_versionar();
+DROP TRIGGER IF EXISTS trg_sync_eliminado ON terceros;
+CREATE TRIGGER trg_sync_eliminado AFTER DELETE ON terceros
+    FOR EACH ROW EXECUTE FUNCTION fn_sync_registrar_eliminado('terceroid');
+
+DROP TRIGGER IF EXISTS trg_sync_versionar ON grupos;
+CREATE TRIGGER trg_sync_versionar BEFORE INSERT OR UPDATE ON grupos
+    FOR EACH ROW EXECUTE FUNCTION fn_sync_versionar();
+DROP TRIGGER IF EXISTS trg_sync_eliminado ON grupos;
+CREATE TRIGGER trg_sync_eliminado AFTER DELETE ON grupos
+    FOR EACH ROW EXECUTE FUNCTION fn_sync_registrar_eliminado('grupoid');
+
+DROP TRIGGER IF EXISTS trg_sync_versionar ON conceptos;
+CREATE TRIGGER trg_sync_versionar BEFORE INSERT OR UPDATE ON conceptos
+    FOR EACH ROW EXECUTE FUNCTION fn_sync_versionar();
+DROP TRIGGER IF EXISTS trg_sync_eliminado ON conceptos;
+CREATE TRIGGER trg_sync_eliminado AFTER DELETE ON conceptos
+    FOR EACH ROW EXECUTE FUNCTION fn_sync_registrar_eliminado('conceptoid');
+
+DROP TRIGGER IF EXISTS trg_sync_versionar ON tercero_descripciones;
+CREATE TRIGGER trg_sync_versionar BEFORE INSERT OR UPDATE ON tercero_descripciones
+    FOR EACH ROW EXECUTE FUNCTION fn_sync_versionar();
+DROP TRIGGER IF EXISTS trg_sync_eliminado ON tercero_descripciones;
+CREATE TRIGGER trg_sync_eliminado AFTER DELETE ON tercero_descripciones
+    FOR EACH ROW EXECUTE FUNCTION fn_sync_registrar_eliminado('id');
+
+-- 5. Valores por defecto e índices para "WHERE row_version > ? ORDER BY row_version"
+ALTER TABLE movimientos ALTER COLUMN row_version SET DEFAULT nextval('sync_version_seq');
+ALTER TABLE cuentas ALTER COLUMN row_version SET DEFAULT nextval('sync_version_seq');
+ALTER TABLE monedas ALTER COLUMN row_version SET DEFAULT nextval('sync_version_seq');
+ALTER TABLE terceros ALTER COLUMN row_version SET DEFAULT nextval('sync_version_seq');
+ALTER TABLE grupos ALTER COLUMN row_version SET DEFAULT nextval('sync_version_seq');
+ALTER TABLE conceptos ALTER COLUMN row_version SET DEFAULT nextval('sync_version_seq');
+ALTER TABLE tercero_descripciones ALTER COLUMN row_version SET DEFAULT nextval('sync_version_seq');
+
+CREATE INDEX IF NOT EXISTS idx_movimientos_row_version ON movimientos (row_version);
+CREATE INDEX IF NOT EXISTS idx_cuentas_row_version ON cuentas (row_version);
+CREATE INDEX IF NOT EXISTS idx_monedas_row_version ON monedas (row_version);
+CREATE INDEX IF NOT EXISTS idx_terceros_row_version ON terceros (row_version);
+CREATE INDEX IF NOT EXISTS idx_grupos_row_version ON grupos (row_version);
+CREATE INDEX IF NOT EXISTS idx_conceptos_row_version ON conceptos (row_version);
+CREATE INDEX IF NOT EXISTS idx_tercero_descripciones_row_version ON tercero_descripciones (row_version);
@@ -0,0 +1,18 @@
+-- Script de migración: Conciliación de pagos de tarjeta de crédito
+-- Fecha: 2026-10-19
+-- Descripción: Cada pago de tarjeta aparece dos veces en el libro: como abono
+-- en la cuenta de la tarjeta (valor > 0) y como débito en la cuenta de ahorros
+-- (valor < 0). Esta tabla vincula ambos lados; un movimiento vinculado está
+-- conciliado. Los UNIQUE garantizan que cada lado se use una sola vez.
+
+CREATE TABLE IF NOT EXISTS conciliacion_pagos_tarjeta (
+    id SERIAL PRIMARY KEY,
+    movimiento_tarjeta_id INT NOT NULL UNIQUE REFERENCES movimientos(Id) ON DELETE CASCADE,
+    movimiento_ahorros_id INT NOT NULL UNIQUE REFERENCES movimientos(Id) ON DELETE CASCADE,
+    diferencia_valor NUMERIC(18, 2) NOT NULL DEFAULT 0,
+    diferencia_dias INT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Búsqueda de candidatos por cuenta y fecha
+CREATE INDEX IF NOT EXISTS idx_movimientos_cuenta_fecha ON movimientos (CuentaID, Fecha);
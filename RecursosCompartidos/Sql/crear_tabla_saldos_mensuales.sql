@@ -0,0 +1,157 @@
+-- Script de migración: Saldos mensuales por cuenta
+-- Fecha: 2026-10-19
+-- Descripción: No existía saldo por cuenta; cualquier vista de saldo tenía que
+-- sumar toda la historia. saldos_mensuales guarda, por cuenta y mes con
+-- movimientos, el neto del mes y el saldo al cierre. Triggers sobre
+-- movimientos la mantienen al insertar, actualizar o borrar, de modo que el saldo
+-- a cualquier fecha es el cierre del último mes anterior con movimientos más los
+-- movimientos del mes de la fecha (a lo sumo un mes de filas).
+--
+-- Un cambio en un mes viejo desplaza el cierre de todos los meses siguientes de
+-- esa cuenta: son unas decenas de filas, no la historia completa. Los triggers
+-- son por sentencia: una carga o actualización masiva desplaza cada mes
+-- afectado una sola vez, no una vez por movimiento.
+
+-- 1. Tabla
+CREATE TABLE IF NOT EXISTS saldos_mensuales (
+    cuenta_id INT NOT NULL REFERENCES cuentas(cuentaid) ON DELETE CASCADE,
+    mes DATE NOT NULL,                             -- primer día del mes
+    neto_mes NUMERIC(18, 2) NOT NULL DEFAULT 0,    -- SUM(Valor) del mes
+    saldo_cierre NUMERIC(18, 2) NOT NULL DEFAULT 0,  -- SUM(Valor) hasta el fin del mes
+    PRIMARY KEY (cuenta_id, mes)
+);
+
+-- 2. Aplicar los deltas de una sentencia
+-- Recibe un delta por (cuenta, mes) ya sumado. Cada fila de saldos_mensuales
+-- afectada se actualiza una sola vez por sentencia, aunque la sentencia toque
+-- miles de movimientos (p.ej. el INSERT por lotes de guardar_nuevos o
+-- aplicar_trm_pendientes).
+DROP TRIGGER IF EXISTS trg_movimientos_saldos ON movimientos;
+DROP FUNCTION IF EXISTS fn_saldos_aplicar(INT, DATE, NUMERIC);
+
+CREATE OR REPLACE FUNCTION fn_saldos_aplicar(p_cuentas INT[], p_meses DATE[], p_deltas NUMERIC[])
+RETURNS VOID AS $$
+BEGIN
+    -- Meses nuevos: arrancan con el cierre del mes anterior más cercano
+    -- (el de antes de esta sentencia; el paso siguiente suma los deltas)
+    INSERT INTO saldos_mensuales (cuenta_id, mes, neto_mes, saldo_cierre)
+    SELECT d.cuenta_id, d.mes, 0, COALESCE((
+        SELECT s.saldo_cierre FROM saldos_mensuales s
+        WHERE s.cuenta_id = d.cuenta_id AND s.mes < d.mes
+        ORDER BY s.mes DESC LIMIT 1
+    ), 0)
+    FROM unnest(p_cuentas, p_meses) AS d(cuenta_id, mes)
+    ON CONFLICT (cuenta_id, mes) DO NOTHING;
+
+    -- Cada mes de las cuentas afectadas suma su propio delta al neto y los de
+    -- ese mes y anteriores al cierre
+    UPDATE saldos_mensuales s
+    SET neto_mes = s.neto_mes + x.neto,
+        saldo_cierre = s.saldo_cierre + x.acumulado
+    FROM (
+        SELECT s2.cuenta_id, s2.mes,
+               COALESCE(SUM(d.delta) FILTER (WHERE d.mes = s2.mes), 0) AS neto,
+               SUM(d.delta) AS acumulado
+        FROM saldos_mensuales s2
+        JOIN unnest(p_cuentas, p_meses, p_deltas) AS d(cuenta_id, mes, delta)
+          ON d.cuenta_id = s2.cuenta_id AND d.mes <= s2.mes
+        GROUP BY s2.cuenta_id, s2.mes
+    ) x
+    WHERE s.cuenta_id = x.cuenta_id AND s.mes = x.mes;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 3. Triggers por sentencia sobre movimientos
+-- Las tablas de transición (nuevos/viejos) traen todas las filas de la
+-- sentencia; se agrupan por (cuenta, mes) antes de tocar saldos_mensuales.
+-- PostgreSQL no permite tablas de transición con lista de columnas ni con
+-- varios eventos en un mismo trigger: hay uno por evento, y en UPDATE las filas
+-- que no cambian cuenta, fecha ni valor se anulan al sumar (+nuevo - viejo).
+CREATE OR REPLACE FUNCTION fn_movimientos_saldos() RETURNS TRIGGER AS $$
+DECLARE
+    v_cuentas INT[];
+    v_meses DATE[];
+    v_deltas NUMERIC[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(cuenta_id), array_agg(mes), array_agg(delta)
+        INTO v_cuentas, v_meses, v_deltas
+        FROM (
+            SELECT CuentaID AS cuenta_id, date_trunc('month', Fecha)::date AS mes, SUM(Valor) AS delta
+            FROM nuevos
+            GROUP BY 1, 2
+        ) t
+        WHERE cuenta_id IS NOT NULL AND mes IS NOT NULL AND delta <> 0;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(cuenta_id), array_agg(mes), array_agg(delta)
+        INTO v_cuentas, v_meses, v_deltas
+        FROM (
+            SELECT CuentaID AS cuenta_id, date_trunc('month', Fecha)::date AS mes, -SUM(Valor) AS delta
+            FROM viejos
+            GROUP BY 1, 2
+        ) t
+        WHERE cuenta_id IS NOT NULL AND mes IS NOT NULL AND delta <> 0;
+    ELSE
+        SELECT array_agg(cuenta_id), array_agg(mes), array_agg(delta)
+        INTO v_cuentas, v_meses, v_deltas
+        FROM (
+            SELECT cuenta_id, date_trunc('month', fecha)::date AS mes, SUM(valor) AS delta
+            FROM (
+                SELECT CuentaID AS cuenta_id, Fecha AS fecha, Valor AS valor FROM nuevos
+                UNION ALL
+                SELECT CuentaID, Fecha, -Valor FROM viejos
+            ) u
+            GROUP BY 1, 2
+        ) t
+        WHERE cuenta_id IS NOT NULL AND mes IS NOT NULL AND delta <> 0;
+    END IF;
+
+    IF v_cuentas IS NOT NULL THEN
+        PERFORM fn_saldos_aplicar(v_cuentas, v_meses, v_deltas);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_movimientos_saldos_insert ON movimientos;
+CREATE TRIGGER trg_movimientos_saldos_insert
+    AFTER INSERT ON movimientos
+    REFERENCING NEW TABLE AS nuevos
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_movimientos_saldos();
+
+DROP TRIGGER IF EXISTS trg_movimientos_saldos_update ON movimientos;
+CREATE TRIGGER trg_movimientos_saldos_update
+    AFTER UPDATE ON movimientos
+    REFERENCING OLD TABLE AS viejos NEW TABLE AS nuevos
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_movimientos_saldos();
+
+DROP TRIGGER IF EXISTS trg_movimientos_saldos_delete ON movimientos;
+CREATE TRIGGER trg_movimientos_saldos_delete
+    AFTER DELETE ON movimientos
+    REFERENCING OLD TABLE AS viejos
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_movimientos_saldos();
+
+-- 4. Carga inicial (reconstruye la tabla desde la historia)
+TRUNCATE saldos_mensuales;
+
+INSERT INTO saldos_mensuales (cuenta_id, mes, neto_mes, saldo_cierre)
+SELECT cuenta_id, mes, neto_mes,
+       SUM(neto_mes) OVER (PARTITION BY cuenta_id ORDER BY mes)
+FROM (
+    SELECT CuentaID AS cuenta_id, date_trunc('month', Fecha)::date AS mes, SUM(Valor) AS neto_mes
+    FROM movimientos
+    WHERE CuentaID IS NOT NULL AND Fecha IS NOT NULL
+    GROUP BY CuentaID, date_trunc('month', Fecha)
+) t;
+
+-- 5. Movimientos del mes de la fecha consultada
+CREATE INDEX IF NOT EXISTS idx_movimientos_cuenta_fecha ON movimientos (CuentaID, Fecha);
+
+-- Verificación: el cierre del último mes debe coincidir con la suma total
+SELECT s.cuenta_id, s.saldo_cierre, t.total
+FROM (
+    SELECT DISTINCT ON (cuenta_id) cuenta_id, saldo_cierre
+    FROM saldos_mensuales ORDER BY cuenta_id, mes DESC
+) s
+JOIN (SELECT CuentaID, SUM(Valor) AS total FROM movimientos GROUP BY CuentaID) t
+  ON t.CuentaID = s.cuenta_id;
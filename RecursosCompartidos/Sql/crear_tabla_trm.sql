@@ -0,0 +1,24 @@
+-- Script de migración: Tabla de TRM por fecha
+-- Fecha: 2026-10-19
+-- Descripción: Los cargos en USD de la tarjeta se guardan con Valor = 0 y el
+-- monto en USD "hasta que se aplique TRM", pero nada la aplicaba, así que los
+-- reportes subestimaban el gasto en dólares. Esta tabla guarda la TRM oficial
+-- por día (se carga desde un CSV). La clave primaria por fecha sirve la búsqueda
+-- "TRM vigente a una fecha" (la del día o, si no hay, la del día anterior más
+-- cercano: fines de semana y festivos) como un solo descenso en el índice.
+
+CREATE TABLE IF NOT EXISTS trm (
+    fecha DATE PRIMARY KEY,
+    valor NUMERIC(10, 4) NOT NULL CHECK (valor > 0),
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Movimientos USD pendientes de conversión (ver PostgresTrmRepository.aplicar_trm_pendientes)
+CREATE INDEX IF NOT EXISTS idx_movimientos_usd_pendientes
+    ON movimientos (Fecha)
+    WHERE USD IS NOT NULL AND USD <> 0 AND Valor = 0;
+
+-- Verificación
+SELECT COUNT(*) AS usd_pendientes
+FROM movimientos
+WHERE USD IS NOT NULL AND USD <> 0 AND Valor = 0;
@@ -34,6 +34,17 @@ def enable_trigram_extension():
             ON terceros USING gin (tercero gin_trgm_ops);
         """)
         
+        # 3. Índice en la descripción de movimientos: los ILIKE '%patron%' de
+        #    /api/clasificacion/preview-lote y clasificar-lote (y el contexto
+        #    histórico) lo usan en lugar de recorrer toda la tabla.
+        #    Solo aplica a patrones de 3 o más caracteres.
+        print("Creando índice de trigramas para Movimientos...")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS trgm_idx_movimientos_descripcion 
+            ON movimientos USING gin (Descripcion gin_trgm_ops);
+        """)
+        cursor.execute("ANALYZE movimientos;")
+        
         conn.commit()
         cursor.close()
         conn.close()